@@ -135,9 +135,8 @@ setup(
     # For an analysis of "install_requires" vs pip's requirements files see:
     # https://packaging.python.org/discussions/install-requires-vs-requirements/
     install_requires=[
-        "changelog2version>=0.9.0,<1",
-        "deepdiff>=6.3.0,<7",
         "mock>=4.0.3,<5",
+        "tomli>=1.1.0; python_version < '3.11'",
     ],  # Optional
     # List additional groups of dependencies here (e.g. development
     # dependencies). Users will be able to install these using the "extras"
@@ -152,6 +151,7 @@ setup(
             "tox>=3.25.1,<4"
         ],
         "test": [
+            "changelog2version>=0.9.0,<1",
             "flake8>=5.0.0,<6",
             "coverage>=6.4.2,<7",
             "nose2>=0.12.0,<1",
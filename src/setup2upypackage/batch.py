@@ -0,0 +1,464 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Validate or create several MicroPython package.json files in parallel
+
+Every package is handled by a fresh worker process of a process pool, as
+running a setup.py file modifies the global interpreter state like
+"sys.modules" or "sys.argv". One NDJSON line is written per package as soon as
+its result is available.
+
+With the "isolate" option all setup.py files are executed by a SetupPool of
+reused worker processes instead, so the package workers are reused as well.
+"""
+
+import json
+import logging
+import multiprocessing
+import sys
+from pathlib import Path
+from typing import IO, Iterator, List, Optional, Union
+
+from .declarative import is_declarative
+from .setup2upypackage import Setup2uPyPackage
+from .setup_pool import DEFAULT_TIMEOUT, SetupPool, SetupPoolError
+from .url_template import UrlTemplate
+
+
+class BatchError(Exception):
+    """Base class for exceptions in this module."""
+    pass
+
+
+class _ExecutedSetup(object):
+    """Setup pool replacement providing the setup.py result of a job"""
+
+    def __init__(self, job: dict) -> None:
+        """
+        Init _ExecutedSetup class
+
+        :param      job:  The job with "setup_data" or "setup_error"
+        :type       job:  dict
+        """
+        self._job = job
+
+    def run(self, setup_file: Path) -> dict:
+        """
+        Get the setup() arguments of the setup.py file executed by the runner
+
+        :param      setup_file:  The setup.py file
+        :type       setup_file:  Path
+
+        :returns:   Plain setup() arguments
+        :rtype:     dict
+
+        :raises     SetupPoolError:  Execution of the setup.py file failed
+        """
+        if self._job.get("setup_error"):
+            raise SetupPoolError(self._job["setup_error"])
+
+        return self._job["setup_data"]
+
+
+def _process_job(job: dict) -> dict:
+    """
+    Validate or create the package.json file of a single package
+
+    This function is executed inside a pool worker process, it never raises
+    but reports errors as part of the returned result.
+
+    :param      job:  The job description
+    :type       job:  dict
+
+    :returns:   Result of the job
+    :rtype:     dict
+    """
+    result = {
+        "setup_file": job["setup_file"],
+        "package_file": job.get("package_file"),
+        "action": job["action"],
+        "engine": None,
+        "success": False,
+        "valid": None,
+        "diff": None,
+        "changed": None,
+        "error": None,
+    }
+
+    profiler = None
+    if job.get("profile"):
+        from .profiling import PhaseProfiler
+
+        profiler = PhaseProfiler()
+        profiler.start()
+
+    logger = logging.getLogger(__name__)
+    logger.disabled = True
+
+    package_file = job.get("package_file")
+    package_changelog_file = job.get("package_changelog_file")
+    version_file = job.get("version_file")
+
+    setup_pool = None
+    if "setup_data" in job or "setup_error" in job:
+        setup_pool = _ExecutedSetup(job=job)
+
+    try:
+        setup_2_upy_package = Setup2uPyPackage(
+            setup_file=Path(job["setup_file"]),
+            package_file=Path(package_file) if package_file else None,
+            package_changelog_file=(Path(package_changelog_file)
+                                    if package_changelog_file else None),
+            logger=logger,
+            engine=job.get("engine", Setup2uPyPackage.ENGINE_RUN_SETUP),
+            cache_dir=job.get("cache_dir"),
+            recursive_packages=job.get("recursive_packages", False),
+            git_files=job.get("git_files", False),
+            excludes=job.get("excludes"),
+            version_file=Path(version_file) if version_file else None,
+            hashes=job.get("hashes", False),
+            hooks=[profiler] if profiler else None,
+            setup_pool=setup_pool)
+        result["engine"] = setup_2_upy_package.setup_engine
+
+        if job["action"] == "validate":
+            is_valid = setup_2_upy_package.validate(
+                ignore_version=job.get("ignore_version", False),
+                ignore_deps=job.get("ignore_deps", False),
+                ignore_boot_main=job.get("ignore_boot_main", False))
+            result["valid"] = is_valid
+            result["success"] = is_valid
+
+            if not is_valid:
+                result["diff"] = setup_2_upy_package.get_validation_diff(
+                    ignore_version=job.get("ignore_version", False),
+                    ignore_deps=job.get("ignore_deps", False),
+                    ignore_boot_main=job.get("ignore_boot_main", False))
+        elif job["action"] == "create":
+            result["changed"] = setup_2_upy_package.create(
+                output_path=Path(package_file) if package_file else None,
+                pretty=job.get("pretty", True))
+            if job.get("url_templates"):
+                result["changed_variants"] = \
+                    setup_2_upy_package.create_variants(
+                        url_templates=[UrlTemplate.from_spec(spec=ele)
+                                       for ele in job["url_templates"]],
+                        ref=job.get("ref"),
+                        output_path=(Path(package_file)
+                                     if package_file else None),
+                        pretty=job.get("pretty", True))
+            result["success"] = True
+        else:
+            raise BatchError("Unknown action '{}'".format(job["action"]))
+    except (Exception, SystemExit) as e:
+        result["error"] = "{}: {}".format(type(e).__name__, e)
+
+    if profiler:
+        profiler.stop()
+        result["profile"] = profiler.report()
+
+    return result
+
+
+class BatchRunner(object):
+    """Validate or create package.json files of several packages"""
+
+    ACTIONS = ("validate", "create")
+
+    def __init__(self,
+                 jobs: List[dict],
+                 processes: Optional[int] = None,
+                 logger: Optional[logging.Logger] = None) -> None:
+        """
+        Init BatchRunner class
+
+        :param      jobs:       The jobs, each with at least a "setup_file"
+        :type       jobs:       List[dict]
+        :param      processes:  Number of worker processes, CPU count if None
+        :type       processes:  Optional[int]
+        :param      logger:     Logger object
+        :type       logger:     Optional[logging.Logger]
+        """
+        if logger is None:
+            logger = logging.getLogger(__name__)
+        self._logger = logger
+
+        self._jobs = [self._normalize_job(job) for job in jobs]
+        self._processes = processes
+
+    @staticmethod
+    def _normalize_job(job: dict) -> dict:
+        """
+        Convert all paths of a job to strings
+
+        :param      job:         The job
+        :type       job:         dict
+
+        :raise      BatchError:  No setup file specified
+
+        :returns:   Job with string paths
+        :rtype:     dict
+        """
+        if not job.get("setup_file"):
+            raise BatchError("No setup file specified in {}".format(job))
+
+        normalized = dict(job)
+        for key in ("setup_file", "package_file", "package_changelog_file",
+                    "version_file"):
+            if normalized.get(key):
+                normalized[key] = str(normalized[key])
+            else:
+                normalized[key] = None
+
+        return normalized
+
+    @classmethod
+    def from_batch_file(cls,
+                        batch_file: Path,
+                        **kwargs) -> 'BatchRunner':
+        """
+        Create a batch runner based on a JSON batch file
+
+        The file either contains a list of packages or a dict with a
+        "packages" list. Each package is a dict with a "setup_file" and an
+        optional "package_file", "package_changelog_file" and "version_file".
+        Relative paths are resolved against the directory of the batch file.
+
+        :param      batch_file:  The batch file
+        :type       batch_file:  Path
+
+        :raise      BatchError:  Invalid batch file content
+
+        :returns:   Batch runner
+        :rtype:     BatchRunner
+        """
+        batch_file = Path(batch_file)
+        with open(batch_file, 'r') as f:
+            content = json.load(f)
+
+        if isinstance(content, dict):
+            content = content.get("packages", [])
+
+        if not isinstance(content, list):
+            raise BatchError("No list of packages found in {}".
+                             format(batch_file))
+
+        root_dir = batch_file.parent
+        jobs = []
+        for package in content:
+            job = {}
+            for key in ("setup_file",
+                        "package_file",
+                        "package_changelog_file",
+                        "version_file"):
+                if package.get(key):
+                    job[key] = (root_dir / package[key]).resolve()
+            jobs.append(job)
+
+        return cls(jobs=jobs, **kwargs)
+
+    @classmethod
+    def from_glob(cls,
+                  pattern: str,
+                  root_dir: Optional[Path] = None,
+                  package_file_name: str = "package.json",
+                  changelog_file_name: str = "changelog.md",
+                  **kwargs) -> 'BatchRunner':
+        """
+        Create a batch runner for all setup files matching a glob pattern
+
+        The package.json file is expected next to each setup file, the
+        changelog file is used if it exists next to the setup file.
+
+        :param      pattern:              The glob pattern of the setup files
+        :type       pattern:              str
+        :param      root_dir:             The root directory, CWD if None
+        :type       root_dir:             Optional[Path]
+        :param      package_file_name:    The package file name
+        :type       package_file_name:    str
+        :param      changelog_file_name:  The changelog file name
+        :type       changelog_file_name:  str
+
+        :returns:   Batch runner
+        :rtype:     BatchRunner
+        """
+        if root_dir is None:
+            root_dir = Path.cwd()
+
+        jobs = []
+        for setup_file in sorted(Path(root_dir).glob(pattern)):
+            if not setup_file.is_file():
+                continue
+
+            package_dir = setup_file.parent
+            job = {
+                "setup_file": setup_file.resolve(),
+                "package_file": (package_dir / package_file_name).resolve()
+            }
+            changelog_file = package_dir / changelog_file_name
+            if changelog_file.is_file():
+                job["package_changelog_file"] = changelog_file.resolve()
+            jobs.append(job)
+
+        return cls(jobs=jobs, **kwargs)
+
+    @property
+    def jobs(self) -> List[dict]:
+        """
+        Get jobs of this batch
+
+        :returns:   The jobs
+        :rtype:     List[dict]
+        """
+        return self._jobs
+
+    def results(self,
+                action: str = "validate",
+                **options) -> Iterator[dict]:
+        """
+        Process all jobs and yield the results in order of completion
+
+        :param      action:      The action, "validate" or "create"
+        :type       action:      str
+        :param      options:     Options of the action like "ignore_version"
+        :type       options:     dict
+
+        :raise      BatchError:  Unknown action
+
+        :returns:   Generator of job results
+        :rtype:     Iterator[dict]
+        """
+        if action not in self.ACTIONS:
+            raise BatchError("Unknown action '{}'".format(action))
+
+        jobs = [dict(job, action=action, **options) for job in self._jobs]
+        if not jobs:
+            self._logger.warning("No packages to process")
+            return
+
+        setup_pool = None
+        engine = options.get("engine", Setup2uPyPackage.ENGINE_RUN_SETUP)
+        if options.get("isolate") and \
+                engine == Setup2uPyPackage.ENGINE_RUN_SETUP:
+            setup_pool = SetupPool(
+                processes=self._processes,
+                timeout=options.get("setup_timeout", DEFAULT_TIMEOUT),
+                memory_limit=options.get("setup_memory_limit"),
+                logger=self._logger)
+            jobs = self._execute_setup_files(jobs=jobs, setup_pool=setup_pool)
+
+        # each worker process handles exactly one package, unless no setup.py
+        # file is executed inside of the worker
+        maxtasksperchild = None if setup_pool else 1
+        try:
+            with multiprocessing.Pool(processes=self._processes,
+                                      maxtasksperchild=maxtasksperchild
+                                      ) as pool:
+                for result in pool.imap_unordered(_process_job, jobs):
+                    yield result
+        finally:
+            if setup_pool:
+                setup_pool.close()
+
+    @staticmethod
+    def _execute_setup_files(jobs: List[dict],
+                             setup_pool: SetupPool) -> Iterator[dict]:
+        """
+        Execute the setup.py files of all jobs with a setup pool
+
+        Jobs of declarative setup files are yielded first, all other jobs
+        with the "setup_data" or "setup_error" of their setup.py file as soon
+        as it is executed. A setup.py file shared by several jobs is executed
+        once.
+
+        :param      jobs:        The jobs
+        :type       jobs:        List[dict]
+        :param      setup_pool:  The setup pool
+        :type       setup_pool:  SetupPool
+
+        :returns:   Generator of jobs
+        :rtype:     Iterator[dict]
+        """
+        executed = {}
+        for job in jobs:
+            if is_declarative(Path(job["setup_file"])):
+                yield job
+            else:
+                executed.setdefault(job["setup_file"], []).append(job)
+
+        for setup_file, result in setup_pool.run_all(setup_files=executed):
+            if isinstance(result, SetupPoolError):
+                update = {"setup_error": str(result)}
+            else:
+                update = {"setup_data": result}
+
+            for job in executed[setup_file]:
+                yield dict(job, **update)
+
+    def run(self,
+            action: str = "validate",
+            stream: Optional[IO[str]] = None,
+            **options) -> int:
+        """
+        Process all jobs and write one NDJSON line per package to a stream
+
+        :param      action:   The action, "validate" or "create"
+        :type       action:   str
+        :param      stream:   The output stream, stdout if None
+        :type       stream:   Optional[IO[str]]
+        :param      options:  Options of the action like "ignore_version"
+        :type       options:  dict
+
+        :returns:   Aggregated exit code, 0 if all packages succeeded
+        :rtype:     int
+        """
+        if stream is None:
+            stream = sys.stdout
+
+        failed = 0
+        changed = 0
+        for result in self.results(action=action, **options):
+            if not result["success"]:
+                failed += 1
+            if result["changed"]:
+                changed += 1
+            stream.write(json.dumps(result) + "\n")
+            stream.flush()
+
+        self._logger.debug("{} of {} packages failed".
+                           format(failed, len(self._jobs)))
+        if action == "create":
+            self._logger.info("{} of {} package.json files changed".
+                              format(changed, len(self._jobs)))
+
+        return 1 if failed else 0
+
+
+def run_batch(jobs: List[Union[dict, Path]],
+              action: str = "validate",
+              processes: Optional[int] = None,
+              stream: Optional[IO[str]] = None,
+              **options) -> int:
+    """
+    Validate or create package.json files of several packages in parallel
+
+    :param      jobs:       The jobs or setup files
+    :type       jobs:       List[Union[dict, Path]]
+    :param      action:     The action, "validate" or "create"
+    :type       action:     str
+    :param      processes:  Number of worker processes, CPU count if None
+    :type       processes:  Optional[int]
+    :param      stream:     The output stream, stdout if None
+    :type       stream:     Optional[IO[str]]
+    :param      options:    Options of the action like "ignore_version"
+    :type       options:    dict
+
+    :returns:   Aggregated exit code, 0 if all packages succeeded
+    :rtype:     int
+    """
+    jobs = [job if isinstance(job, dict) else {"setup_file": job}
+            for job in jobs]
+    runner = BatchRunner(jobs=jobs, processes=processes)
+
+    return runner.run(action=action, stream=stream, **options)
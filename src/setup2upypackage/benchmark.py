@@ -0,0 +1,540 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Benchmark suite based on synthetic package repositories
+
+A repository with a configurable number of packages, modules per package,
+data files, directory depth and changelog entries is generated into a
+temporary directory. The package and data file search, the package data
+creation, the validation, the validation diff and the package.json creation
+are measured separately on fresh Setup2uPyPackage instances, a validation
+through "upy-package" is measured end to end in a subprocess.
+
+    python -m setup2upypackage.benchmark --packages 100 --modules 50 \\
+        --output results.json
+
+The results are written as JSON and can be compared to the results of
+another revision with "--compare".
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .setup2upypackage import Setup2uPyPackage
+from .version import __version__
+
+#: Benchmarks run on a fresh Setup2uPyPackage instance
+BENCHMARKS = ("package_files", "data_files", "package_data", "validate",
+              "validation_diff", "create")
+
+#: Benchmark running "upy-package --validate" in a subprocess
+BENCHMARK_MAIN = "main"
+
+
+class BenchmarkError(Exception):
+    """Base class for exceptions in this module."""
+    pass
+
+
+def _silent_logger() -> logging.Logger:
+    """
+    Get a disabled logger for the measured instances
+
+    :returns:   The logger
+    :rtype:     logging.Logger
+    """
+    logger = logging.getLogger(__name__ + '.package')
+    logger.disabled = True
+
+    return logger
+
+
+class SyntheticRepo(object):
+    """Package repository with generated packages, data files and changelog"""
+
+    #: Project URL of the generated setup.py file
+    URL = 'https://github.com/brainelectronics/synthetic-package'
+
+    def __init__(self,
+                 root_dir: Path,
+                 packages: int = 10,
+                 modules: int = 10,
+                 data_files: int = 10,
+                 depth: int = 1,
+                 changelog_entries: int = 10) -> None:
+        """
+        Init SyntheticRepo class
+
+        :param      root_dir:           The repository directory
+        :type       root_dir:           Path
+        :param      packages:           Number of packages
+        :type       packages:           int
+        :param      modules:            Number of modules per package
+        :type       modules:            int
+        :param      data_files:         Number of data files
+        :type       data_files:         int
+        :param      depth:              Directory depth of packages and data
+                                        files, 1 for top level directories
+        :type       depth:              int
+        :param      changelog_entries:  Number of released versions in the
+                                        changelog
+        :type       changelog_entries:  int
+
+        :raises     BenchmarkError:  Invalid dimensions
+        """
+        if min(packages, modules, data_files, changelog_entries) < 0 or \
+                depth < 1:
+            raise BenchmarkError("Invalid repository dimensions")
+
+        self._root_dir = Path(root_dir)
+        self._packages = packages
+        self._modules = modules
+        self._data_files = data_files
+        self._depth = depth
+        self._changelog_entries = changelog_entries
+
+    @property
+    def root_dir(self) -> Path:
+        """
+        Get directory of the repository
+
+        :returns:   The repository directory
+        :rtype:     Path
+        """
+        return self._root_dir
+
+    @property
+    def setup_file(self) -> Path:
+        """
+        Get path of the setup.py file
+
+        :returns:   The setup.py file path
+        :rtype:     Path
+        """
+        return self._root_dir / 'setup.py'
+
+    @property
+    def package_file(self) -> Path:
+        """
+        Get path of the package.json file
+
+        :returns:   The package.json file path
+        :rtype:     Path
+        """
+        return self._root_dir / 'package.json'
+
+    @property
+    def changelog_file(self) -> Path:
+        """
+        Get path of the changelog file
+
+        :returns:   The changelog file path
+        :rtype:     Path
+        """
+        return self._root_dir / 'changelog.md'
+
+    @property
+    def version(self) -> str:
+        """
+        Get latest version of the changelog
+
+        :returns:   The latest version
+        :rtype:     str
+        """
+        return '{}.0.0'.format(max(self._changelog_entries, 1))
+
+    @property
+    def dimensions(self) -> Dict[str, int]:
+        """
+        Get dimensions of the repository
+
+        :returns:   Number of packages, modules, data files, depth and
+                    changelog entries
+        :rtype:     Dict[str, int]
+        """
+        return {
+            "packages": self._packages,
+            "modules": self._modules,
+            "data_files": self._data_files,
+            "depth": self._depth,
+            "changelog_entries": self._changelog_entries,
+        }
+
+    def _nested(self, name: str) -> List[str]:
+        """
+        Get directory parts of a top level directory at the configured depth
+
+        :param      name:  The top level directory name
+        :type       name:  str
+
+        :returns:   The directory parts
+        :rtype:     List[str]
+        """
+        return [name] + ['level{}'.format(ele)
+                         for ele in range(1, self._depth)]
+
+    def _write_changelog(self) -> None:
+        """Write the changelog, latest version first"""
+        lines = ["# Changelog", "", "## Released"]
+
+        for version in range(self._changelog_entries, 0, -1):
+            lines.extend([
+                "## [{}.0.0] - 2023-01-01".format(version),
+                "### Added",
+                "- Feature {}".format(version),
+                "",
+            ])
+
+        self.changelog_file.write_text('\n'.join(lines) + '\n')
+
+    def generate(self) -> 'SyntheticRepo':
+        """
+        Write setup.py, changelog, package and data files and package.json
+
+        :returns:   The repository
+        :rtype:     SyntheticRepo
+        """
+        self._root_dir.mkdir(parents=True, exist_ok=True)
+
+        packages = []
+        for package in range(self._packages):
+            parts = self._nested('pkg{}'.format(package))
+            package_dir = self._root_dir.joinpath(*parts)
+            package_dir.mkdir(parents=True, exist_ok=True)
+            (package_dir / '__init__.py').write_text('')
+            for module in range(self._modules):
+                (package_dir / 'module{}.py'.format(module)).write_text(
+                    'VALUE = {}\n'.format(module))
+            packages.append('.'.join(parts))
+
+        data_files = []
+        data_dir = self._root_dir.joinpath(*self._nested('static'))
+        data_dir.mkdir(parents=True, exist_ok=True)
+        for file in range(self._data_files):
+            path = data_dir / 'file{}.txt'.format(file)
+            path.write_text('data {}\n'.format(file))
+            data_files.append(path.relative_to(self._root_dir).as_posix())
+
+        self.setup_file.write_text(
+            "from setuptools import setup\n"
+            "\n"
+            "setup(\n"
+            "    name='synthetic-package',\n"
+            "    version={!r},\n"
+            "    url={!r},\n"
+            "    packages={!r},\n"
+            "    data_files=[('static', {!r})],\n"
+            "    install_requires=['dependency_1', 'dependency_2'],\n"
+            ")\n".format(self.version, self.URL, packages, data_files))
+
+        self._write_changelog()
+
+        Setup2uPyPackage(setup_file=self.setup_file,
+                         package_file=None,
+                         package_changelog_file=self.changelog_file,
+                         logger=_silent_logger(),
+                         engine=Setup2uPyPackage.ENGINE_AST).create(
+            output_path=self.package_file, pretty=False)
+
+        return self
+
+
+def _summary(times: List[float]) -> Dict[str, float]:
+    """
+    Get statistics of measured times
+
+    :param      times:  The times in seconds
+    :type       times:  List[float]
+
+    :returns:   Number of runs, minimum, median, mean and maximum
+    :rtype:     Dict[str, float]
+    """
+    return {
+        "runs": len(times),
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.mean(times),
+        "max": max(times),
+    }
+
+
+class BenchmarkRunner(object):
+    """Measure the operations of Setup2uPyPackage on a repository"""
+
+    def __init__(self,
+                 repo: SyntheticRepo,
+                 repeat: int = 5,
+                 engine: str = Setup2uPyPackage.ENGINE_AST,
+                 logger: Optional[logging.Logger] = None) -> None:
+        """
+        Init BenchmarkRunner class
+
+        :param      repo:    The generated repository
+        :type       repo:    SyntheticRepo
+        :param      repeat:  Number of runs of each benchmark
+        :type       repeat:  int
+        :param      engine:  The engine to parse the setup.py file
+        :type       engine:  str
+        :param      logger:  Logger object
+        :type       logger:  Optional[logging.Logger]
+        """
+        if logger is None:
+            logger = logging.getLogger(__name__)
+        self._logger = logger
+
+        self._repo = repo
+        self._repeat = repeat
+        self._engine = engine
+
+    def _create_package(self) -> Setup2uPyPackage:
+        """
+        Create a fresh package instance of the repository
+
+        :returns:   The package
+        :rtype:     Setup2uPyPackage
+        """
+        return Setup2uPyPackage(
+            setup_file=self._repo.setup_file,
+            package_file=self._repo.package_file,
+            package_changelog_file=self._repo.changelog_file,
+            logger=_silent_logger(),
+            engine=self._engine)
+
+    def _operations(self) -> Dict[str, Callable[[Setup2uPyPackage], None]]:
+        """
+        Get the measured operation of each benchmark
+
+        :returns:   Operation per benchmark name
+        :rtype:     Dict[str, Callable[[Setup2uPyPackage], None]]
+        """
+        output_path = self._repo.root_dir / 'benchmark-package.json'
+
+        def _validate(s2pp: Setup2uPyPackage) -> None:
+            if not s2pp.validate():
+                raise BenchmarkError("Generated package.json is not valid")
+
+        return {
+            "package_files": lambda s2pp: s2pp.package_files,
+            "data_files": lambda s2pp: s2pp.data_files,
+            "package_data": lambda s2pp: s2pp.package_data,
+            "validate": _validate,
+            "validation_diff": lambda s2pp: s2pp.validation_diff,
+            "create": lambda s2pp: s2pp.create(output_path=output_path),
+        }
+
+    def _measure(self, operation: Callable[[Setup2uPyPackage], None]) -> dict:
+        """
+        Measure an operation on fresh package instances
+
+        :param      operation:  The operation
+        :type       operation:  Callable[[Setup2uPyPackage], None]
+
+        :returns:   Statistics of the measured times
+        :rtype:     dict
+        """
+        times = []
+
+        for _ in range(self._repeat):
+            s2pp = self._create_package()
+            start = time.perf_counter()
+            operation(s2pp)
+            times.append(time.perf_counter() - start)
+
+        return _summary(times)
+
+    def _measure_main(self) -> dict:
+        """
+        Measure a validation with "upy-package" in a subprocess
+
+        :returns:   Statistics of the measured times
+        :rtype:     dict
+
+        :raises     BenchmarkError:  The validation failed
+        """
+        command = [
+            sys.executable, '-m', 'setup2upypackage.main',
+            '--setup_file', str(self._repo.setup_file),
+            '--package_file', str(self._repo.package_file),
+            '--package_changelog_file', str(self._repo.changelog_file),
+            '--engine', self._engine,
+            '--validate',
+            '--force',
+        ]
+        env = dict(os.environ)
+        # the measured revision, even if not installed
+        env['PYTHONPATH'] = os.pathsep.join(
+            [str(Path(__file__).resolve().parent.parent)] +
+            ([env['PYTHONPATH']] if env.get('PYTHONPATH') else []))
+        times = []
+
+        for _ in range(self._repeat):
+            start = time.perf_counter()
+            result = subprocess.run(command,
+                                    env=env,
+                                    stdout=subprocess.PIPE,
+                                    stderr=subprocess.PIPE)
+            times.append(time.perf_counter() - start)
+
+            if result.returncode:
+                raise BenchmarkError("upy-package failed: {}".format(
+                    result.stderr.decode(errors='replace').strip()))
+
+        return _summary(times)
+
+    def run(self, benchmarks: Optional[List[str]] = None) -> dict:
+        """
+        Run the benchmarks
+
+        :param      benchmarks:  Names of the benchmarks, all if None
+        :type       benchmarks:  Optional[List[str]]
+
+        :returns:   Environment, repository dimensions and statistics of
+                    each benchmark
+        :rtype:     dict
+
+        :raises     BenchmarkError:  Unknown benchmark name
+        """
+        names = list(BENCHMARKS) + [BENCHMARK_MAIN]
+        if benchmarks is None:
+            benchmarks = names
+
+        unknown = set(benchmarks) - set(names)
+        if unknown:
+            raise BenchmarkError("Unknown benchmarks {}, use {}".format(
+                sorted(unknown), names))
+
+        operations = self._operations()
+        results = {}
+
+        for name in benchmarks:
+            self._logger.info("Running benchmark {}".format(name))
+            if name == BENCHMARK_MAIN:
+                results[name] = self._measure_main()
+            else:
+                results[name] = self._measure(operations[name])
+
+        return {
+            "version": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "engine": self._engine,
+            "repeat": self._repeat,
+            "repo": self._repo.dimensions,
+            "benchmarks": results,
+        }
+
+
+def compare(baseline: dict, results: dict) -> Dict[str, dict]:
+    """
+    Compare the median times of two benchmark results
+
+    :param      baseline:  The results of the baseline revision
+    :type       baseline:  dict
+    :param      results:   The results of the compared revision
+    :type       results:   dict
+
+    :returns:   Both medians and their ratio per common benchmark
+    :rtype:     Dict[str, dict]
+    """
+    comparison = {}
+
+    for name, result in results["benchmarks"].items():
+        if name not in baseline["benchmarks"]:
+            continue
+
+        before = baseline["benchmarks"][name]["median"]
+        after = result["median"]
+        comparison[name] = {
+            "baseline": before,
+            "median": after,
+            "ratio": after / before if before else None,
+        }
+
+    return comparison
+
+
+def parse_arguments() -> argparse.Namespace:
+    """
+    Parse CLI arguments.
+    :raise      argparse.ArgumentError  Argparse error
+    :return:    argparse object
+    """
+    parser = argparse.ArgumentParser(description="""
+    Benchmark package.json creation and validation on a synthetic repository
+    """, formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument('--packages', type=int, default=10,
+                        help='Number of packages')
+    parser.add_argument('--modules', type=int, default=10,
+                        help='Number of modules per package')
+    parser.add_argument('--data_files', type=int, default=10,
+                        help='Number of data files')
+    parser.add_argument('--depth', type=int, default=1,
+                        help='Directory depth of packages and data files')
+    parser.add_argument('--changelog_entries', type=int, default=10,
+                        help='Number of released versions in the changelog')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Number of runs of each benchmark')
+    parser.add_argument('--engine',
+                        choices=Setup2uPyPackage.ENGINES,
+                        default=Setup2uPyPackage.ENGINE_AST,
+                        help='Engine to parse the setup.py file')
+    parser.add_argument('--benchmark',
+                        dest='benchmarks',
+                        action='append',
+                        choices=list(BENCHMARKS) + [BENCHMARK_MAIN],
+                        help='Benchmark to run, may be repeated, all if not given')  # noqa: E501
+    parser.add_argument('--output',
+                        type=Path,
+                        help='JSON file of the results, stdout if not given')
+    parser.add_argument('--compare',
+                        type=Path,
+                        help='JSON results of a baseline revision to add the median ratio of each benchmark')  # noqa: E501
+
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        repo = SyntheticRepo(root_dir=Path(tmp_dir) / 'repo',
+                             packages=args.packages,
+                             modules=args.modules,
+                             data_files=args.data_files,
+                             depth=args.depth,
+                             changelog_entries=args.changelog_entries)
+        try:
+            repo.generate()
+            results = BenchmarkRunner(repo=repo,
+                                      repeat=args.repeat,
+                                      engine=args.engine).run(
+                benchmarks=args.benchmarks)
+        except BenchmarkError as e:
+            raise SystemExit(str(e))
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            results["comparison"] = compare(baseline=json.load(f),
+                                            results=results)
+
+    content = json.dumps(results, indent=4)
+    if args.output:
+        args.output.write_text(content + '\n')
+    else:
+        sys.stdout.write(content + '\n')
+
+
+if __name__ == '__main__':
+    main()
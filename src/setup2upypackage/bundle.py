@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Bundle all package and data files into a single tar archive
+
+The bundle contains the generated package.json file followed by all package
+and data files sorted by their path. The "urls" and "hashes" entries of the
+package.json file are sorted by path as well and timestamps, owners and
+permissions are fixed, so the same input always results in the same archive,
+independent of the order files are found on the file system.
+
+Files are streamed into the archive without staging copies. Every member of a
+gzip compressed bundle is stored as a separate gzip member, the concatenation
+is still a valid tar.gz file. The index of the bundle lists the byte range of
+each member, so an installer can fetch and extract single members with HTTP
+range requests
+
+    {"name": "subdir1/asdf.py", "offset": 1536, "length": 1024,
+     "header_size": 512, "size": 123}
+
+The range of a member is decompressed if the bundle is gzip compressed, the
+file content starts after "header_size" bytes of tar headers.
+"""
+
+import json
+import logging
+import os
+import struct
+import tarfile
+import zlib
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+from .setup2upypackage import Setup2uPyPackage
+
+#: Size of the chunks files are streamed with
+CHUNK_SIZE = 64 * 1024
+
+#: Suffixes of the bundle file and their compression
+SUFFIXES = {
+    '.tar': None,
+    '.tar.gz': 'gzip',
+    '.tgz': 'gzip',
+}
+
+#: gzip header with a fixed modification time and unknown OS, see RFC 1952
+GZIP_HEADER = b'\x1f\x8b\x08\x00\x00\x00\x00\x00\x02\xff'
+
+
+class BundleError(Exception):
+    """Base class for exceptions in this module."""
+    pass
+
+
+def default_mtime() -> int:
+    """
+    Get modification time of all bundle members
+
+    :returns:   The SOURCE_DATE_EPOCH environment variable, 0 if not set
+    :rtype:     int
+    """
+    try:
+        return int(os.environ.get('SOURCE_DATE_EPOCH', 0))
+    except ValueError:
+        raise BundleError("Invalid SOURCE_DATE_EPOCH '{}'".format(
+            os.environ['SOURCE_DATE_EPOCH']))
+
+
+class _MemberWriter(object):
+    """Write a single member to a bundle, optionally gzip compressed"""
+
+    def __init__(self, stream: BinaryIO, compression: Optional[str]) -> None:
+        """
+        Init _MemberWriter class
+
+        :param      stream:       The bundle file
+        :type       stream:       BinaryIO
+        :param      compression:  The compression, None or "gzip"
+        :type       compression:  Optional[str]
+        """
+        self._stream = stream
+        self._compressor = None
+        self._crc = 0
+        self._size = 0
+
+        if compression == 'gzip':
+            self._compressor = zlib.compressobj(9, zlib.DEFLATED,
+                                                -zlib.MAX_WBITS)
+            self._stream.write(GZIP_HEADER)
+
+    def write(self, data: bytes) -> None:
+        """
+        Write uncompressed data
+
+        :param      data:  The data
+        :type       data:  bytes
+        """
+        self._size += len(data)
+
+        if self._compressor is None:
+            self._stream.write(data)
+        else:
+            self._crc = zlib.crc32(data, self._crc)
+            self._stream.write(self._compressor.compress(data))
+
+    def close(self) -> None:
+        """Finish the member, write the gzip trailer if compressed"""
+        if self._compressor is not None:
+            self._stream.write(self._compressor.flush())
+            self._stream.write(struct.pack('<II', self._crc,
+                                           self._size & 0xffffffff))
+
+
+class Bundler(object):
+    """Create a deterministic tar archive of a package"""
+
+    def __init__(self,
+                 setup_2_upy_package: Setup2uPyPackage,
+                 output_path: Path,
+                 mtime: Optional[int] = None,
+                 pretty: bool = False,
+                 logger: Optional[logging.Logger] = None) -> None:
+        """
+        Init Bundler class
+
+        :param      setup_2_upy_package:  The package
+        :type       setup_2_upy_package:  Setup2uPyPackage
+        :param      output_path:          The bundle file, ending with
+                                          ".tar", ".tar.gz" or ".tgz"
+        :type       output_path:          Path
+        :param      mtime:                Modification time of all members,
+                                          default_mtime if None
+        :type       mtime:                Optional[int]
+        :param      pretty:               Flag to use an indentation of 4 for
+                                          the bundled package.json file
+        :type       pretty:               bool
+        :param      logger:               Logger object
+        :type       logger:               Optional[logging.Logger]
+
+        :raises     BundleError:  Unsupported file suffix
+        """
+        if logger is None:
+            logger = logging.getLogger(__name__)
+        self._logger = logger
+
+        self._package = setup_2_upy_package
+        self._output_path = Path(output_path)
+        self._mtime = default_mtime() if mtime is None else int(mtime)
+        self._pretty = pretty
+
+        for suffix, compression in SUFFIXES.items():
+            if self._output_path.name.endswith(suffix):
+                self._compression = compression
+                break
+        else:
+            raise BundleError("Unsupported bundle file {}, use one of {}".
+                              format(self._output_path, ', '.join(SUFFIXES)))
+
+    @property
+    def index_file(self) -> Path:
+        """
+        Get path of the index file of the bundle
+
+        :returns:   The bundle path with an additional ".index.json" suffix
+        :rtype:     Path
+        """
+        return self._output_path.with_name(self._output_path.name +
+                                           '.index.json')
+
+    def members(self) -> List[Tuple[str, Path]]:
+        """
+        Get package and data files sorted by their path in the bundle
+
+        :returns:   Path in the bundle and file path of each file
+        :rtype:     List[Tuple[str, Path]]
+
+        :raises     BundleError:  A path is used more than once
+        """
+        root_dir = self._package.root_dir
+        members = {}
+
+        for name in self._package.file_paths:
+            if name in members or name == 'package.json':
+                raise BundleError("Duplicate bundle member {}".format(name))
+            members[name] = root_dir / name
+
+        return sorted(members.items())
+
+    def _tar_info(self, name: str, size: int) -> tarfile.TarInfo:
+        """
+        Create the tar header of a member
+
+        :param      name:  The path in the bundle
+        :type       name:  str
+        :param      size:  The file size
+        :type       size:  int
+
+        :returns:   The tar header
+        :rtype:     tarfile.TarInfo
+        """
+        info = tarfile.TarInfo(name=name)
+        info.size = size
+        info.mtime = self._mtime
+        info.mode = 0o644
+        info.uid = info.gid = 0
+        info.uname = info.gname = ''
+
+        return info
+
+    def _chunks(self, path: Path, size: int) -> Iterator[bytes]:
+        """
+        Read a file in chunks
+
+        :param      path:  The file
+        :type       path:  Path
+        :param      size:  The expected file size
+        :type       size:  int
+
+        :returns:   Generator of the file content
+        :rtype:     Iterator[bytes]
+
+        :raises     BundleError:  The file size changed while reading
+        """
+        remaining = size
+
+        with open(path, 'rb') as file:
+            while remaining:
+                chunk = file.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+            if remaining or file.read(1):
+                raise BundleError("{} changed while bundling".format(path))
+
+    def _write_member(self,
+                      stream: BinaryIO,
+                      name: str,
+                      size: int,
+                      chunks: Iterator[bytes]) -> dict:
+        """
+        Write a member to the bundle
+
+        :param      stream:  The bundle file
+        :type       stream:  BinaryIO
+        :param      name:    The path in the bundle
+        :type       name:    str
+        :param      size:    The content size
+        :type       size:    int
+        :param      chunks:  The content
+        :type       chunks:  Iterator[bytes]
+
+        :returns:   Index entry of the member
+        :rtype:     dict
+        """
+        offset = stream.tell()
+        header = self._tar_info(name=name, size=size).tobuf(
+            format=tarfile.PAX_FORMAT, encoding='utf-8')
+
+        writer = _MemberWriter(stream=stream, compression=self._compression)
+        writer.write(header)
+        for chunk in chunks:
+            writer.write(chunk)
+        # members are padded to full blocks
+        writer.write(tarfile.NUL * (-size % tarfile.BLOCKSIZE))
+        writer.close()
+
+        return {
+            "name": name,
+            "offset": offset,
+            "length": stream.tell() - offset,
+            "header_size": len(header),
+            "size": size,
+        }
+
+    def _write(self, stream: BinaryIO) -> List[dict]:
+        """
+        Write all members and the end of archive marker
+
+        :param      stream:  The bundle file
+        :type       stream:  BinaryIO
+
+        :returns:   Index entry of each member
+        :rtype:     List[dict]
+        """
+        package_data = dict(self._package.package_data)
+        for key in ("urls", "hashes"):
+            if key in package_data:
+                package_data[key] = sorted(package_data[key],
+                                           key=lambda ele: ele[0])
+
+        if self._pretty:
+            package_json = json.dumps(package_data, indent=4)
+        else:
+            package_json = json.dumps(package_data)
+        package_json = package_json.encode()
+
+        index = [self._write_member(stream=stream,
+                                    name='package.json',
+                                    size=len(package_json),
+                                    chunks=iter([package_json]))]
+
+        for name, path in self.members():
+            size = os.stat(path).st_size
+            index.append(self._write_member(
+                stream=stream,
+                name=name,
+                size=size,
+                chunks=self._chunks(path=path, size=size)))
+
+        # two zero blocks, padded to a full record like tarfile does
+        size = sum(ele["header_size"] + ele["size"] +
+                   (-ele["size"] % tarfile.BLOCKSIZE) for ele in index)
+        end = 2 * tarfile.BLOCKSIZE
+        end += -(size + end) % tarfile.RECORDSIZE
+        writer = _MemberWriter(stream=stream, compression=self._compression)
+        writer.write(tarfile.NUL * end)
+        writer.close()
+
+        return index
+
+    def run(self) -> dict:
+        """
+        Write the bundle and its index file
+
+        The bundle is written to a temporary file first, which replaces an
+        existing bundle atomically.
+
+        :returns:   The index of the bundle
+        :rtype:     dict
+        """
+        tmp_path = self._output_path.with_name('.{}.{}.tmp'.format(
+            self._output_path.name, os.urandom(4).hex()))
+
+        try:
+            with open(tmp_path, 'xb') as stream:
+                members = self._write(stream=stream)
+            os.replace(tmp_path, self._output_path)
+        except BaseException:
+            if tmp_path.exists():
+                tmp_path.unlink()
+            raise
+
+        index = {
+            "bundle": self._output_path.name,
+            "compression": self._compression,
+            "mtime": self._mtime,
+            "members": members,
+        }
+        with open(self.index_file, 'w') as file:
+            json.dump(index, file, indent=4 if self._pretty else None)
+
+        self._logger.info("Bundled {} files into {} ({} bytes)".format(
+            len(members), self._output_path,
+            os.stat(self._output_path).st_size))
+
+        return index
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Persistent on-disk cache of parsed package metadata
+
+Entries are JSON files named by a key, which is the content hash of the input
+files and the version of this tool. Entries are written to a temporary file
+and atomically renamed, so parallel runs never read partially written entries.
+Temporary files do not end with ".json", so eviction never removes them.
+The least recently used entries are removed once the cache exceeds its size.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from .version import __version__
+
+
+class MetadataCache(object):
+    """Size bounded on-disk cache of JSON serializable metadata"""
+
+    #: Default cache directory, relative to the current working directory
+    DEFAULT_DIR = '.upy-package-cache'
+
+    def __init__(self,
+                 cache_dir: Path,
+                 max_size: int = 4 * 1024 * 1024,
+                 logger: Optional[logging.Logger] = None) -> None:
+        """
+        Init MetadataCache class
+
+        :param      cache_dir:  The cache directory, created if not existing
+        :type       cache_dir:  Path
+        :param      max_size:   The maximum size of all entries in bytes
+        :type       max_size:   int
+        :param      logger:     Logger object
+        :type       logger:     Optional[logging.Logger]
+        """
+        if logger is None:
+            logger = logging.getLogger(__name__)
+        self._logger = logger
+
+        self._cache_dir = Path(cache_dir)
+        self._max_size = max_size
+
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def cache_dir(self) -> Path:
+        """
+        Get cache directory
+
+        :returns:   The cache directory
+        :rtype:     Path
+        """
+        return self._cache_dir
+
+    @staticmethod
+    def key(*files: Optional[Path], salt: str = '') -> str:
+        """
+        Get cache key of the content of several files
+
+        Not specified or not existing files are part of the key as well.
+
+        :param      files:  The files
+        :type       files:  Optional[Path]
+        :param      salt:   Additional data of the key
+        :type       salt:   str
+
+        :returns:   The cache key
+        :rtype:     str
+        """
+        digest = hashlib.sha256()
+        digest.update('{}\0{}\0'.format(__version__, salt).encode())
+
+        for file in files:
+            if file is None:
+                digest.update(b'\0none\0')
+                continue
+
+            try:
+                with open(file, 'rb') as f:
+                    content = f.read()
+                digest.update('\0{}\0'.format(len(content)).encode())
+                digest.update(content)
+            except OSError:
+                digest.update(b'\0missing\0')
+
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        """
+        Get path of a cache entry
+
+        :param      key:  The key
+        :type       key:  str
+
+        :returns:   Path of the entry
+        :rtype:     Path
+        """
+        return self._cache_dir / '{}.json'.format(key)
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Get a cache entry
+
+        :param      key:  The key
+        :type       key:  str
+
+        :returns:   The cached data, None if not cached or invalid
+        :rtype:     Optional[dict]
+        """
+        path = self._entry_path(key)
+
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            # mark entry as recently used for the eviction
+            os.utime(path)
+        except (OSError, ValueError):
+            self._logger.debug("No cache entry {}".format(key))
+            return None
+
+        self._logger.debug("Using cache entry {}".format(key))
+
+        return data
+
+    def set(self, key: str, data: dict) -> None:
+        """
+        Set a cache entry
+
+        :param      key:   The key
+        :type       key:   str
+        :param      data:  The JSON serializable data
+        :type       data:  dict
+        """
+        try:
+            content = json.dumps(data)
+        except (TypeError, ValueError) as e:
+            self._logger.warning("Data not cacheable: {}".format(e))
+            return
+
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self._cache_dir,
+                                            prefix='.tmp-',
+                                            suffix='.json.tmp')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    f.write(content)
+                os.replace(tmp_path, self._entry_path(key))
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            self._logger.warning("Failed to write cache entry: {}".format(e))
+            return
+
+        self._evict()
+
+    def _evict(self) -> None:
+        """Remove least recently used entries exceeding the cache size"""
+        entries = []
+
+        for path in self._cache_dir.glob('*.json'):
+            try:
+                stat = path.stat()
+            except OSError:
+                # removed by a parallel run
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+        total_size = sum(ele[1] for ele in entries)
+        for _, size, path in sorted(entries, key=lambda ele: ele[0]):
+            if total_size <= self._max_size:
+                break
+
+            try:
+                path.unlink()
+                self._logger.debug("Evicted cache entry {}".format(path))
+            except OSError:
+                pass
+            total_size -= size
+
+    def clear(self) -> None:
+        """Remove all cache entries"""
+        for path in self._cache_dir.glob('*.json'):
+            try:
+                path.unlink()
+            except OSError:
+                pass
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Extract the latest release version of a changelog file
+
+The changelog is read line by line and reading stops at the first release
+version line like "## [1.2.3] - 2023-03-27", so the runtime does not depend on
+the length of the release history. The result is the same as of
+changelog2version's ExtractVersion.parse_changelog and parse_semver_line.
+"""
+
+import logging
+import re
+from pathlib import Path
+from typing import Optional
+
+#: Release version line, e.g. "## [1.2.3] - 2023-03-27", see changelog2version
+VERSION_LINE_REGEX = re.compile(
+    # begin of line with two "#" followed by a single space
+    r"(?P<title_begin>\#\#)[ ]{1}"
+    # anything after a "["
+    r"\[(?P<potential_semver>("
+    # three numbers with one or more digits, seperated by dot
+    r"(\d{1,}\.\d{1,}\.\d{1,})"
+    r"([-+]?)"  # zero or one of either a "-" or "+" character
+    r"([a-zA-Z.+-d]*)"  # any character (a-Z), dot, "-", "+" or number
+    r")(?=\]))\]"    # positive lookahead for the "]" and the "]"
+    r"[ ]{1}\-[ ]{1}"     # exactly one space, "-", exactly one space
+    r"(?P<datetime>\d{4}\-\d{2}-\d{2})"     # datetime as YYYY-MM-DD
+    r"(([T ]{1})"   # seperation between date and time by "T" or space
+    r"(?P<timestamp>\d{2,}:\d{2,}:\d{2,}?))?"   # time as HH:MM:SS
+)
+
+#: Semantic version, see https://semver.org
+SEMVER_REGEX = re.compile(
+    r"^(?P<major>0|[1-9]\d*)\."     # major version part
+    r"(?P<minor>0|[1-9]\d*)\."      # minor version part
+    r"(?P<patch>0|[1-9]\d*)"        # bugfix/patch version part
+    # optional prerelease version part, starting with a "-"
+    r"(?:-(?P<prerelease>(?:0|[1-9]\d*|\d*[a-zA-Z-][0-9a-zA-Z-]*)(?:\.(?:0|[1-9]\d*|\d*[a-zA-Z-][0-9a-zA-Z-]*))*))?"    # noqa: E501
+    # optional build metadata version part, starting with a "+"
+    r"(?:\+(?P<buildmetadata>[0-9a-zA-Z-]+(?:\.[0-9a-zA-Z-]+)*))?$"
+)
+
+#: Version returned if no release version line is found
+NO_VERSION = "0.0.0"
+
+
+def find_version_line(changelog_file: Path) -> str:
+    """
+    Find the first release version line of a changelog file
+
+    Lines before the first release, like an "Unreleased" section, are skipped
+    and reading stops at the first release version line.
+
+    :param      changelog_file:  The changelog file
+    :type       changelog_file:  Path
+
+    :returns:   The release version line, empty if not found
+    :rtype:     str
+    """
+    with open(changelog_file, "r") as f:
+        for line in f:
+            # cheap prefilter, the release line contains "## ["
+            if "## [" not in line:
+                continue
+
+            match = VERSION_LINE_REGEX.search(line)
+            if match:
+                return match.group()
+
+    return ""
+
+
+def parse_version_line(release_version_line: str,
+                       logger: Optional[logging.Logger] = None) -> str:
+    """
+    Parse the semantic version of a release version line
+
+    :param      release_version_line:  The release version line
+    :type       release_version_line:  str
+    :param      logger:                Logger object
+    :type       logger:                Optional[logging.Logger]
+
+    :returns:   Semantic version string, e.g. "1.2.3", "0.0.0" if not found
+    :rtype:     str
+    """
+    if logger is None:
+        logger = logging.getLogger(__name__)
+
+    # try to extract any content between square brackets
+    match = re.search(r"\[(.*?)\]", release_version_line)
+    if not match:
+        return NO_VERSION
+
+    match = SEMVER_REGEX.search(match.group(1))
+    if not match:
+        logger.warning("No SemVer string found in given release version "
+                       "line: '{}'".format(release_version_line))
+        return NO_VERSION
+
+    logger.debug("Extracted SemVer string: '{}'".format(match.group()))
+
+    return match.group()
+
+
+def extract_version(changelog_file: Path,
+                    logger: Optional[logging.Logger] = None) -> str:
+    """
+    Extract the latest release version of a changelog file
+
+    :param      changelog_file:  The changelog file
+    :type       changelog_file:  Path
+    :param      logger:          Logger object
+    :type       logger:          Optional[logging.Logger]
+
+    :returns:   Semantic version string, e.g. "1.2.3", "0.0.0" if not found
+    :rtype:     str
+    """
+    release_version_line = find_version_line(changelog_file=changelog_file)
+
+    return parse_version_line(release_version_line=release_version_line,
+                              logger=logger)
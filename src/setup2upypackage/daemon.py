@@ -0,0 +1,549 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Long-running validation daemon reachable over a Unix socket
+
+The daemon keeps a warm Setup2uPyPackage instance per package, so repeated
+requests do not pay interpreter startup, imports and setup.py parsing again.
+Cached values are dropped if input files, package or data directories change.
+
+Requests and responses are single line JSON objects. A request of the "run"
+command validates, prints and/or creates the package.json of one package
+
+    {"command": "run", "setup_file": "/abs/path/setup.py",
+     "package_file": "/abs/path/package.json", "validate": true}
+
+and is answered by
+
+    {"success": true, "valid": true, "diff": {}}
+
+Further commands are "ping" and "shutdown".
+
+The default socket is created in "$XDG_RUNTIME_DIR", otherwise in a directory
+of the temporary directory only accessible by the current user. Only sockets
+owned by the current user are connected to or removed.
+"""
+
+import json
+import logging
+import os
+import socket
+import stat
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from .profiling import PhaseProfiler
+from .setup2upypackage import Setup2uPyPackage, Setup2uPyPackageError
+from .setup_pool import SetupPool
+from .url_template import UrlTemplate
+from .version import __version__
+
+#: Keys of a request identifying a warm package instance
+PACKAGE_KEYS = ("setup_file", "package_file", "package_changelog_file",
+                "version_file", "engine", "cache_dir", "recursive_packages",
+                "git_files", "hashes", "excludes")
+
+
+class DaemonError(Exception):
+    """Base class for exceptions in this module."""
+    pass
+
+
+class DaemonUnavailableError(DaemonError):
+    """No daemon is listening on the socket"""
+    pass
+
+
+def default_socket_path() -> Path:
+    """
+    Get default path of the daemon socket of the current user
+
+    The socket is placed in "$XDG_RUNTIME_DIR" if set, otherwise in a
+    directory of the temporary directory, which has to be private to the
+    current user.
+
+    :returns:   The socket path
+    :rtype:     Path
+    """
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir and os.path.isabs(runtime_dir):
+        return Path(runtime_dir) / 'upy-package.sock'
+
+    return Path(tempfile.gettempdir()) / 'upy-package-{}'.format(
+        os.getuid()) / 'daemon.sock'
+
+
+def _check_private_dir(directory: Path) -> None:
+    """
+    Check a directory is only accessible by the current user if existing
+
+    :param      directory:  The directory
+    :type       directory:  Path
+
+    :raises     DaemonError:  The path is no directory, a symlink, owned by
+                              another user or accessible by others
+    """
+    try:
+        stat_result = os.lstat(str(directory))
+    except FileNotFoundError:
+        return
+
+    if not stat.S_ISDIR(stat_result.st_mode):
+        raise DaemonError("{} is no directory".format(directory))
+    if stat_result.st_uid != os.getuid():
+        raise DaemonError("{} is owned by another user".format(directory))
+    if stat_result.st_mode & 0o077:
+        raise DaemonError("{} is accessible by other users".
+                          format(directory))
+
+
+def check_socket_path(socket_path: Path, private_dir: bool = False) -> bool:
+    """
+    Check a socket path is safe to connect to or to remove
+
+    :param      socket_path:  The socket path
+    :type       socket_path:  Path
+    :param      private_dir:  Flag to check the directory of the socket is
+                              private to the current user, e.g. of the
+                              default socket path
+    :type       private_dir:  bool
+
+    :returns:   True if a socket exists, False if nothing exists at the path
+    :rtype:     bool
+
+    :raises     DaemonError:  The path is no socket or the socket or its
+                              private directory belongs to another user
+    """
+    socket_path = Path(socket_path)
+    if private_dir:
+        _check_private_dir(directory=socket_path.parent)
+
+    try:
+        stat_result = os.lstat(str(socket_path))
+    except FileNotFoundError:
+        return False
+
+    if not stat.S_ISSOCK(stat_result.st_mode):
+        raise DaemonError("{} exists and is no socket".format(socket_path))
+    if stat_result.st_uid != os.getuid():
+        raise DaemonError("{} is owned by another user".format(socket_path))
+
+    return True
+
+
+def process_request(setup_2_upy_package: Setup2uPyPackage,
+                    request: dict,
+                    profiler: Optional[PhaseProfiler] = None) -> dict:
+    """
+    Validate, print and/or create the package.json data of a package
+
+    The package.json file is not created if the validation fails. The
+    response contains the "profile" of all phases if requested.
+
+    :param      setup_2_upy_package:  The package
+    :type       setup_2_upy_package:  Setup2uPyPackage
+    :param      request:              The request
+    :type       request:              dict
+    :param      profiler:             The profiler of the request, e.g.
+                                      already registered while parsing the
+                                      setup.py file, new one if None
+    :type       profiler:             Optional[PhaseProfiler]
+
+    :returns:   The response
+    :rtype:     dict
+    """
+    if not request.get("profile"):
+        return _process_request(setup_2_upy_package=setup_2_upy_package,
+                                request=request)
+
+    if profiler is None:
+        profiler = PhaseProfiler()
+
+    setup_2_upy_package.add_hook(profiler)
+    try:
+        with profiler:
+            response = _process_request(
+                setup_2_upy_package=setup_2_upy_package,
+                request=request)
+    finally:
+        setup_2_upy_package.remove_hook(profiler)
+
+    response["profile"] = profiler.report()
+
+    return response
+
+
+def _package_key(request: dict) -> tuple:
+    """
+    Get key of the warm package instance of a request
+
+    :param      request:  The request
+    :type       request:  dict
+
+    :returns:   The values of PACKAGE_KEYS, lists as tuples
+    :rtype:     tuple
+    """
+    return tuple(tuple(value) if isinstance(value, list) else value
+                 for value in (request.get(ele) for ele in PACKAGE_KEYS))
+
+
+def _process_request(setup_2_upy_package: Setup2uPyPackage,
+                     request: dict) -> dict:
+    """
+    Validate, print and/or create the package.json data of a package
+
+    :param      setup_2_upy_package:  The package
+    :type       setup_2_upy_package:  Setup2uPyPackage
+    :param      request:              The request
+    :type       request:              dict
+
+    :returns:   The response
+    :rtype:     dict
+    """
+    response = {"success": True}
+    url_templates = [UrlTemplate.from_spec(spec=ele)
+                     for ele in request.get("url_templates") or []]
+
+    if request.get("validate"):
+        options = {
+            "ignore_version": request.get("ignore_version", False),
+            "ignore_deps": request.get("ignore_deps", False),
+            "ignore_boot_main": request.get("ignore_boot_main", False),
+        }
+        diff = setup_2_upy_package.get_validation_diff(**options)
+        response["valid"] = not diff
+        response["diff"] = diff
+
+        if diff:
+            response["success"] = False
+            response["error"] = "Mismatch between setup.py data and " \
+                                "package.json"
+            return response
+
+    if request.get("print"):
+        response["package_data"] = setup_2_upy_package.package_data
+        if url_templates:
+            response["variants"] = {
+                ele.name: setup_2_upy_package.get_variant_data(
+                    url_template=ele, ref=request.get("ref"))
+                for ele in url_templates
+            }
+
+    if request.get("create"):
+        package_file = request.get("package_file")
+        response["changed"] = setup_2_upy_package.create(
+            output_path=Path(package_file) if package_file else None,
+            pretty=request.get("pretty", False))
+        if url_templates:
+            response["changed_variants"] = \
+                setup_2_upy_package.create_variants(
+                    url_templates=url_templates,
+                    ref=request.get("ref"),
+                    output_path=Path(package_file) if package_file else None,
+                    pretty=request.get("pretty", False))
+
+    if request.get("check_urls"):
+        try:
+            report = setup_2_upy_package.check_urls(
+                base=request["url_base"],
+                concurrency=request.get("check_concurrency"),
+                retries=request.get("check_retries"),
+                timeout=request.get("check_timeout"))
+        except Setup2uPyPackageError as e:
+            response["success"] = False
+            response["error"] = str(e)
+            return response
+
+        response["url_check"] = report
+        if report:
+            response["success"] = False
+            response["error"] = "Files not reachable below {}".format(
+                request["url_base"])
+
+    return response
+
+
+class PackageServer(object):
+    """Serve requests of several packages over a Unix socket"""
+
+    #: Maximum number of warm package instances
+    MAX_PACKAGES = 128
+
+    def __init__(self,
+                 socket_path: Optional[Path] = None,
+                 logger: Optional[logging.Logger] = None,
+                 setup_pool: Optional[SetupPool] = None) -> None:
+        """
+        Init PackageServer class
+
+        :param      socket_path:  The socket path, default_socket_path if None
+        :type       socket_path:  Optional[Path]
+        :param      logger:       Logger object
+        :type       logger:       Optional[logging.Logger]
+        :param      setup_pool:   The pool executing setup.py files of all
+                                  packages, in-process if None
+        :type       setup_pool:   Optional[SetupPool]
+        """
+        if logger is None:
+            logger = logging.getLogger(__name__)
+        self._logger = logger
+
+        self._private_dir = socket_path is None
+        if socket_path is None:
+            socket_path = default_socket_path()
+        self._socket_path = Path(socket_path)
+
+        self._setup_pool = setup_pool
+        self._packages = OrderedDict()
+        self._running = False
+
+    @property
+    def socket_path(self) -> Path:
+        """
+        Get path of the socket
+
+        :returns:   The socket path
+        :rtype:     Path
+        """
+        return self._socket_path
+
+    def _get_package(self,
+                     request: dict,
+                     profiler: Optional[PhaseProfiler] = None
+                     ) -> Setup2uPyPackage:
+        """
+        Get the warm package instance of a request, create it if not existing
+
+        :param      request:   The request
+        :type       request:   dict
+        :param      profiler:  The profiler of the request
+        :type       profiler:  Optional[PhaseProfiler]
+
+        :returns:   The package
+        :rtype:     Setup2uPyPackage
+        """
+        key = _package_key(request=request)
+
+        if key in self._packages:
+            self._packages.move_to_end(key)
+            setup_2_upy_package = self._packages[key]
+
+            if setup_2_upy_package.check_for_changes():
+                self._logger.debug("Files of {} changed".
+                                   format(request["setup_file"]))
+
+            return setup_2_upy_package
+
+        package_file = request.get("package_file")
+        package_changelog_file = request.get("package_changelog_file")
+        version_file = request.get("version_file")
+        cache_dir = request.get("cache_dir")
+
+        setup_2_upy_package = Setup2uPyPackage(
+            setup_file=Path(request["setup_file"]),
+            package_file=Path(package_file) if package_file else None,
+            package_changelog_file=(Path(package_changelog_file)
+                                    if package_changelog_file else None),
+            logger=self._logger,
+            engine=request.get("engine") or Setup2uPyPackage.ENGINE_RUN_SETUP,
+            cache_dir=Path(cache_dir) if cache_dir else None,
+            recursive_packages=request.get("recursive_packages", False),
+            git_files=request.get("git_files", False),
+            excludes=request.get("excludes"),
+            version_file=Path(version_file) if version_file else None,
+            hashes=request.get("hashes", False),
+            hooks=[profiler] if profiler else None,
+            setup_pool=self._setup_pool)
+        if profiler:
+            setup_2_upy_package.remove_hook(profiler)
+
+        self._packages[key] = setup_2_upy_package
+        if len(self._packages) > self.MAX_PACKAGES:
+            self._packages.popitem(last=False)
+
+        return setup_2_upy_package
+
+    def handle(self, request: dict) -> dict:
+        """
+        Handle a single request
+
+        :param      request:  The request
+        :type       request:  dict
+
+        :returns:   The response
+        :rtype:     dict
+        """
+        command = request.get("command", "run")
+
+        try:
+            if command == "ping":
+                return {"success": True,
+                        "version": __version__,
+                        "packages": len(self._packages)}
+            elif command == "shutdown":
+                self._running = False
+                return {"success": True}
+            elif command == "run":
+                profiler = None
+                if request.get("profile"):
+                    profiler = PhaseProfiler()
+                    profiler.start()
+
+                try:
+                    setup_2_upy_package = self._get_package(
+                        request=request, profiler=profiler)
+                    return process_request(
+                        setup_2_upy_package=setup_2_upy_package,
+                        request=request,
+                        profiler=profiler)
+                finally:
+                    if profiler:
+                        profiler.stop()
+            else:
+                raise DaemonError("Unknown command '{}'".format(command))
+        except (Exception, SystemExit) as e:
+            self._logger.warning("Failed to handle {}: {}".
+                                 format(request, e))
+            # drop a possibly broken instance, e.g. of a removed setup.py
+            self._packages.pop(_package_key(request=request), None)
+            return {"success": False, "error": str(e)}
+
+    def _handle_connection(self, connection: socket.socket) -> None:
+        """
+        Handle all requests of a client connection
+
+        :param      connection:  The client connection
+        :type       connection:  socket.socket
+        """
+        with connection, connection.makefile('rwb') as stream:
+            for line in stream:
+                try:
+                    request = json.loads(line)
+                except ValueError as e:
+                    response = {"success": False,
+                                "error": "Invalid request: {}".format(e)}
+                else:
+                    response = self.handle(request=request)
+
+                stream.write(json.dumps(response).encode() + b'\n')
+                stream.flush()
+
+                if not self._running:
+                    break
+
+    def _remove_stale_socket(self) -> None:
+        """
+        Remove the socket file of a daemon which is no longer running
+
+        The private directory of the default socket path is created.
+
+        :raises     DaemonError:  Another daemon is running on the socket or
+                                  the path is no socket of the current user
+        """
+        if not check_socket_path(socket_path=self._socket_path,
+                                 private_dir=self._private_dir):
+            if self._private_dir:
+                self._socket_path.parent.mkdir(mode=0o700, exist_ok=True)
+            return
+
+        try:
+            DaemonClient(socket_path=self._socket_path).request(
+                {"command": "ping"})
+        except DaemonUnavailableError:
+            self._socket_path.unlink()
+        else:
+            raise DaemonError("Daemon already running on {}".
+                              format(self._socket_path))
+
+    def serve_forever(self) -> None:
+        """Serve requests until a "shutdown" command is received"""
+        self._remove_stale_socket()
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            server.bind(str(self._socket_path))
+            server.listen()
+            self._running = True
+            self._logger.info("Serving on {}".format(self._socket_path))
+
+            while self._running:
+                connection, _ = server.accept()
+                self._handle_connection(connection=connection)
+        finally:
+            server.close()
+            self._unlink_socket()
+            if self._setup_pool:
+                self._setup_pool.close()
+
+    def _unlink_socket(self) -> None:
+        """Remove the socket file if existing"""
+        try:
+            self._socket_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class DaemonClient(object):
+    """Send requests to a running PackageServer"""
+
+    def __init__(self,
+                 socket_path: Optional[Path] = None,
+                 timeout: Optional[float] = 60) -> None:
+        """
+        Init DaemonClient class
+
+        :param      socket_path:  The socket path, default_socket_path if None
+        :type       socket_path:  Optional[Path]
+        :param      timeout:      The timeout of a request in seconds
+        :type       timeout:      Optional[float]
+        """
+        self._private_dir = socket_path is None
+        if socket_path is None:
+            socket_path = default_socket_path()
+        self._socket_path = Path(socket_path)
+        self._timeout = timeout
+
+    def request(self, request: dict) -> dict:
+        """
+        Send a request and wait for the response
+
+        :param      request:  The request
+        :type       request:  dict
+
+        :returns:   The response
+        :rtype:     dict
+
+        :raises     DaemonUnavailableError:  No daemon is running or the path
+                                             is no socket of the current user
+        :raises     DaemonError:             The daemon did not respond
+        """
+        try:
+            check_socket_path(socket_path=self._socket_path,
+                              private_dir=self._private_dir)
+        except DaemonError as e:
+            raise DaemonUnavailableError("Not connecting to {}: {}".
+                                         format(self._socket_path, e))
+
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.settimeout(self._timeout)
+
+        with client:
+            try:
+                client.connect(str(self._socket_path))
+            except (FileNotFoundError, ConnectionRefusedError) as e:
+                raise DaemonUnavailableError("No daemon running on {}: {}".
+                                             format(self._socket_path, e))
+
+            with client.makefile('rwb') as stream:
+                stream.write(json.dumps(request).encode() + b'\n')
+                stream.flush()
+                line = stream.readline()
+
+        if not line:
+            raise DaemonError("No response of daemon on {}".
+                              format(self._socket_path))
+
+        return json.loads(line)
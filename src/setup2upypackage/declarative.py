@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Read package metadata of declarative pyproject.toml and setup.cfg files
+
+The "[project]" table of a pyproject.toml file is read with tomllib, a
+setup.cfg file with configparser. No code of the package is executed. The
+result uses the same keys and types as the setup() arguments of a setup.py
+file, so it produces the same package data.
+
+Packages and data files are taken from "[tool.setuptools]" of a
+pyproject.toml file respectively the "[options]" and "[options.data_files]"
+sections of a setup.cfg file. A version given as "file:" or "attr:" is read
+from the file respectively statically from the module level assignment.
+"""
+
+import ast
+import configparser
+import fnmatch
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+#: Declarative metadata files in the order of auto-detection
+PYPROJECT_FILE = 'pyproject.toml'
+SETUP_CFG_FILE = 'setup.cfg'
+SETUP_PY_FILE = 'setup.py'
+
+#: Keys of project URLs preferred as package URL, compared in lower case
+URL_KEYS = ('homepage', 'repository', 'source', 'source code')
+
+
+class DeclarativeSetupError(Exception):
+    """Base class for exceptions in this module."""
+    pass
+
+
+def is_declarative(setup_file: Path) -> bool:
+    """
+    Determine whether a file is a declarative metadata file
+
+    :param      setup_file:  The file
+    :type       setup_file:  Path
+
+    :returns:   True for pyproject.toml and setup.cfg files
+    :rtype:     bool
+    """
+    return Path(setup_file).name in (PYPROJECT_FILE, SETUP_CFG_FILE)
+
+
+def _load_toml(path: Path) -> dict:
+    """
+    Load a TOML file
+
+    :param      path:  The file
+    :type       path:  Path
+
+    :returns:   The content
+    :rtype:     dict
+
+    :raises     DeclarativeSetupError:  No TOML parser available or invalid
+                                        content
+    """
+    try:
+        import tomllib
+    except ImportError:
+        # Python < 3.11
+        try:
+            import tomli as tomllib
+        except ImportError:
+            raise DeclarativeSetupError("Reading {} requires Python 3.11+ or "
+                                        "the 'tomli' package".format(path))
+
+    try:
+        with open(path, 'rb') as f:
+            return tomllib.load(f)
+    except (OSError, tomllib.TOMLDecodeError) as e:
+        raise DeclarativeSetupError("Can not read {}: {}".format(path, e))
+
+
+def _load_cfg(path: Path) -> configparser.ConfigParser:
+    """
+    Load an INI style setup.cfg file
+
+    :param      path:  The file
+    :type       path:  Path
+
+    :returns:   The content
+    :rtype:     configparser.ConfigParser
+
+    :raises     DeclarativeSetupError:  Invalid content
+    """
+    # values like "%(prog)s" are kept as they are
+    config = configparser.ConfigParser(interpolation=None)
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            config.read_file(f)
+    except (OSError, configparser.Error) as e:
+        raise DeclarativeSetupError("Can not read {}: {}".format(path, e))
+
+    return config
+
+
+def _cfg_list(value: str) -> List[str]:
+    """
+    Split a setup.cfg list value by lines and commas
+
+    :param      value:  The value
+    :type       value:  str
+
+    :returns:   The non empty elements
+    :rtype:     List[str]
+    """
+    separator = '\n' if '\n' in value.strip() else ','
+
+    return [ele.strip() for ele in value.split(separator) if ele.strip()]
+
+
+def _cfg_dict(value: str) -> Dict[str, str]:
+    """
+    Split a setup.cfg dict value of "key = value" lines
+
+    :param      value:  The value
+    :type       value:  str
+
+    :returns:   The entries
+    :rtype:     Dict[str, str]
+    """
+    result = {}
+
+    for line in _cfg_list(value):
+        key, _, val = line.partition('=')
+        result[key.strip()] = val.strip()
+
+    return result
+
+
+def read_attr(root_dir: Path, attr: str) -> Any:
+    """
+    Statically read a literal module level assignment like "pkg.__version__"
+
+    The module is searched as "pkg.py" or "pkg/__init__.py" relative to the
+    root directory, it is never imported.
+
+    :param      root_dir:  The root directory
+    :type       root_dir:  Path
+    :param      attr:      The dotted module path and attribute name
+    :type       attr:      str
+
+    :returns:   The assigned value
+    :rtype:     Any
+
+    :raises     DeclarativeSetupError:  Module or literal assignment not found
+    """
+    module, _, name = attr.strip().rpartition('.')
+    if not module:
+        raise DeclarativeSetupError("Invalid attr '{}'".format(attr))
+
+    module_path = Path(root_dir).joinpath(*module.split('.'))
+    for path in (module_path.with_suffix('.py'), module_path / '__init__.py'):
+        if path.is_file():
+            break
+    else:
+        raise DeclarativeSetupError("Module of attr '{}' not found".
+                                    format(attr))
+
+    try:
+        tree = ast.parse(path.read_bytes(), filename=str(path))
+    except (OSError, SyntaxError, ValueError) as e:
+        raise DeclarativeSetupError("Can not parse {}: {}".format(path, e))
+
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            targets = node.targets
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            targets = [node.target]
+        else:
+            continue
+
+        if any(isinstance(ele, ast.Name) and ele.id == name
+               for ele in targets):
+            try:
+                return ast.literal_eval(node.value)
+            except ValueError:
+                raise DeclarativeSetupError("{} is not a literal in {}".
+                                            format(name, path))
+
+    raise DeclarativeSetupError("No assignment of {} found in {}".
+                                format(name, path))
+
+
+def _read_version(root_dir: Path, directive: Any) -> str:
+    """
+    Get version of a "file:" or "attr:" directive
+
+    :param      root_dir:   The root directory
+    :type       root_dir:   Path
+    :param      directive:  The version or a dict with "file" or "attr"
+    :type       directive:  Any
+
+    :returns:   The version
+    :rtype:     str
+
+    :raises     DeclarativeSetupError:  Unsupported directive
+    """
+    if isinstance(directive, str):
+        if directive.startswith('file:'):
+            directive = {"file": directive[len('file:'):].strip()}
+        elif directive.startswith('attr:'):
+            directive = {"attr": directive[len('attr:'):].strip()}
+        else:
+            return directive
+
+    if isinstance(directive, dict) and "attr" in directive:
+        return str(read_attr(root_dir=root_dir, attr=directive["attr"]))
+
+    if isinstance(directive, dict) and "file" in directive:
+        files = directive["file"]
+        if isinstance(files, str):
+            files = [files]
+        try:
+            return ''.join((Path(root_dir) / ele).read_text(encoding='utf-8')
+                           for ele in files).strip()
+        except OSError as e:
+            raise DeclarativeSetupError("Can not read version: {}".format(e))
+
+    raise DeclarativeSetupError("Unsupported version {}".format(directive))
+
+
+def _select_url(urls: Dict[str, str]) -> Optional[str]:
+    """
+    Select the package URL of the project URLs
+
+    :param      urls:  The project URLs by their label
+    :type       urls:  Dict[str, str]
+
+    :returns:   The first URL of URL_KEYS, the first URL otherwise
+    :rtype:     Optional[str]
+    """
+    by_key = {key.lower(): value for key, value in urls.items()}
+
+    for key in URL_KEYS:
+        if by_key.get(key):
+            return by_key[key]
+
+    return next(iter(urls.values()), None)
+
+
+def find_packages(root_dir: Path,
+                  include: Optional[List[str]] = None,
+                  exclude: Optional[List[str]] = None) -> List[str]:
+    """
+    Find packages like setuptools "find:" directive, "where" is root_dir
+
+    :param      root_dir:  The root directory
+    :type       root_dir:  Path
+    :param      include:   Patterns of included package names, all if None
+    :type       include:   Optional[List[str]]
+    :param      exclude:   Patterns of excluded package names
+    :type       exclude:   Optional[List[str]]
+
+    :returns:   Dotted names of all directories with an __init__.py file
+    :rtype:     List[str]
+    """
+    include = include or ['*']
+    exclude = exclude or []
+    packages = []
+
+    for dirpath, dirnames, filenames in os.walk(root_dir):
+        rel_dir = Path(dirpath).relative_to(root_dir)
+        # hidden directories are no packages, walk in a stable order
+        dirnames[:] = sorted(ele for ele in dirnames
+                             if not ele.startswith('.') and '.' not in ele)
+        if rel_dir == Path('.'):
+            continue
+        if '__init__.py' not in filenames:
+            # subdirectories of non packages are no packages either
+            dirnames[:] = []
+            continue
+
+        name = '.'.join(rel_dir.parts)
+        if any(fnmatch.fnmatchcase(name, ele) for ele in include) and \
+                not any(fnmatch.fnmatchcase(name, ele) for ele in exclude):
+            packages.append(name)
+
+    return packages
+
+
+def _check_where(where: Any) -> None:
+    """
+    Check the "where" option of a "find:" directive
+
+    :param      where:  The directories to search
+    :type       where:  Any
+
+    :raises     DeclarativeSetupError:  Packages outside the root directory
+    """
+    if isinstance(where, str):
+        where = [where]
+
+    if any(ele.strip().rstrip('/') not in ('', '.') for ele in where):
+        raise DeclarativeSetupError("Packages are expected in the directory "
+                                    "of the metadata file, 'where' {} is not "
+                                    "supported".format(where))
+
+
+def parse_pyproject(path: Path) -> Dict[str, Any]:
+    """
+    Read setup() arguments from the "[project]" table of a pyproject.toml
+
+    :param      path:  The pyproject.toml file
+    :type       path:  Path
+
+    :returns:   The setup() arguments
+    :rtype:     Dict[str, Any]
+
+    :raises     DeclarativeSetupError:  No "[project]" table or unsupported
+                                        content
+    """
+    path = Path(path)
+    root_dir = path.parent
+    content = _load_toml(path)
+
+    project = content.get('project')
+    if not isinstance(project, dict):
+        raise DeclarativeSetupError("No [project] table in {}".format(path))
+
+    setuptools = content.get('tool', {}).get('setuptools', {})
+    setup_data = {}
+
+    if 'version' in project:
+        setup_data['version'] = project['version']
+    elif 'version' in project.get('dynamic', []):
+        directive = setuptools.get('dynamic', {}).get('version')
+        if directive is None:
+            raise DeclarativeSetupError("Dynamic version without "
+                                        "[tool.setuptools.dynamic] in {}".
+                                        format(path))
+        setup_data['version'] = _read_version(root_dir=root_dir,
+                                              directive=directive)
+
+    url = _select_url(project.get('urls', {}))
+    if url:
+        setup_data['url'] = url
+
+    if 'dependencies' in project:
+        setup_data['install_requires'] = list(project['dependencies'])
+
+    packages = setuptools.get('packages')
+    if isinstance(packages, dict):
+        find = packages.get('find', {})
+        _check_where(find.get('where', ['.']))
+        packages = find_packages(root_dir=root_dir,
+                                 include=find.get('include'),
+                                 exclude=find.get('exclude'))
+    if packages is not None:
+        setup_data['packages'] = list(packages)
+
+    if 'data-files' in setuptools:
+        setup_data['data_files'] = [
+            (folder, list(files))
+            for folder, files in setuptools['data-files'].items()
+        ]
+
+    return setup_data
+
+
+def parse_setup_cfg(path: Path) -> Dict[str, Any]:
+    """
+    Read setup() arguments from the sections of a setup.cfg file
+
+    :param      path:  The setup.cfg file
+    :type       path:  Path
+
+    :returns:   The setup() arguments
+    :rtype:     Dict[str, Any]
+
+    :raises     DeclarativeSetupError:  No "[metadata]" section or
+                                        unsupported content
+    """
+    path = Path(path)
+    root_dir = path.parent
+    config = _load_cfg(path)
+
+    if not config.has_section('metadata'):
+        raise DeclarativeSetupError("No [metadata] section in {}".
+                                    format(path))
+
+    metadata = config['metadata']
+    options = config['options'] if config.has_section('options') else {}
+    setup_data = {}
+
+    if 'version' in metadata:
+        setup_data['version'] = _read_version(root_dir=root_dir,
+                                              directive=metadata['version'])
+
+    url = metadata.get('url') or \
+        _select_url(_cfg_dict(metadata.get('project_urls', '')))
+    if url:
+        setup_data['url'] = url
+
+    if 'install_requires' in options:
+        setup_data['install_requires'] = \
+            _cfg_list(options['install_requires'])
+
+    if 'packages' in options:
+        packages = options['packages'].strip()
+        if packages in ('find:', 'find_namespace:'):
+            find = {}
+            if config.has_section('options.packages.find'):
+                find = config['options.packages.find']
+            _check_where(find.get('where', '.'))
+            include = find.get('include')
+            exclude = find.get('exclude')
+            packages = find_packages(
+                root_dir=root_dir,
+                include=_cfg_list(include) if include else None,
+                exclude=_cfg_list(exclude) if exclude else None)
+        else:
+            packages = _cfg_list(packages)
+        setup_data['packages'] = packages
+
+    if config.has_section('options.data_files'):
+        setup_data['data_files'] = [
+            (folder, _cfg_list(files))
+            for folder, files in config['options.data_files'].items()
+        ]
+
+    return setup_data
+
+
+def parse_declarative(path: Path) -> Dict[str, Any]:
+    """
+    Read setup() arguments from a pyproject.toml or setup.cfg file
+
+    :param      path:  The metadata file
+    :type       path:  Path
+
+    :returns:   The setup() arguments
+    :rtype:     Dict[str, Any]
+
+    :raises     DeclarativeSetupError:  Unsupported file or content
+    """
+    name = Path(path).name
+
+    if name == PYPROJECT_FILE:
+        return parse_pyproject(path=path)
+    elif name == SETUP_CFG_FILE:
+        return parse_setup_cfg(path=path)
+
+    raise DeclarativeSetupError("{} is no declarative metadata file".
+                                format(path))
+
+
+def detect_setup_file(directory: Path) -> Optional[Path]:
+    """
+    Detect the metadata file of a package
+
+    A pyproject.toml file with a "[project]" table or a setup.cfg file with
+    a "[metadata]" section is preferred, as no code has to be executed.
+    Otherwise a setup.py file is used.
+
+    :param      directory:  The package directory
+    :type       directory:  Path
+
+    :returns:   The metadata file, None if not found
+    :rtype:     Optional[Path]
+    """
+    directory = Path(directory)
+
+    for path, parse in ((directory / PYPROJECT_FILE, parse_pyproject),
+                        (directory / SETUP_CFG_FILE, parse_setup_cfg)):
+        if not path.is_file():
+            continue
+        try:
+            if parse(path=path).get('version'):
+                return path
+        except DeclarativeSetupError:
+            pass
+
+    if (directory / SETUP_PY_FILE).is_file():
+        return directory / SETUP_PY_FILE
+
+    return None
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Exclude files of a package by glob patterns
+
+All patterns are translated to a single compiled regular expression, so an
+entry is checked against any number of patterns in one match call. The
+patterns follow the syntax of the "data_files" globs and .gitignore files:
+
+- "*" and "?" match within a path segment, "[...]" matches a character set
+- "**" matches any number of directories
+- a pattern without a "/" matches the file name in any directory, e.g.
+  "main.py" matches "main.py" and "pkg/main.py" but not "domain.py"
+- a pattern with a "/" matches the path relative to the setup.py directory,
+  a leading "/" is optional
+- a pattern matching a directory matches all files below it
+"""
+
+import re
+from typing import Iterable, List, Optional, Pattern, Sequence
+
+#: Patterns of the files excluded by "ignore_boot_main"
+BOOT_MAIN_PATTERNS = ("boot.py", "main.py")
+
+
+class ExcludeError(Exception):
+    """Base class for exceptions in this module."""
+    pass
+
+
+def _translate_segment(segment: str) -> str:
+    """
+    Translate a glob pattern of a single path segment to a regular expression
+
+    :param      segment:  The pattern of the path segment
+    :type       segment:  str
+
+    :returns:   The regular expression
+    :rtype:     str
+    """
+    result = []
+    idx = 0
+
+    while idx < len(segment):
+        char = segment[idx]
+        idx += 1
+
+        if char == '*':
+            result.append('[^/]*')
+        elif char == '?':
+            result.append('[^/]')
+        elif char == '[':
+            end = idx
+            if end < len(segment) and segment[end] == '!':
+                end += 1
+            if end < len(segment) and segment[end] == ']':
+                end += 1
+            end = segment.find(']', end)
+            if end < 0:
+                result.append(re.escape(char))
+                continue
+
+            chars = segment[idx:end].replace('\\', '\\\\')
+            if chars.startswith('!'):
+                chars = '^' + chars[1:]
+            elif chars.startswith('^'):
+                chars = '\\' + chars
+            result.append('[{}]'.format(chars))
+            idx = end + 1
+        else:
+            result.append(re.escape(char))
+
+    return ''.join(result)
+
+
+def translate(pattern: str) -> str:
+    """
+    Translate a glob pattern to a regular expression of relative POSIX paths
+
+    :param      pattern:  The pattern
+    :type       pattern:  str
+
+    :returns:   The regular expression
+    :rtype:     str
+
+    :raises     ExcludeError:  Empty pattern
+    """
+    pattern = pattern.strip().replace('\\', '/')
+    anchored = '/' in pattern.rstrip('/')
+    segments = [ele for ele in pattern.split('/') if ele]
+    if not segments:
+        raise ExcludeError("Invalid exclude pattern '{}'".format(pattern))
+
+    result = '' if anchored else '(?:.*/)?'
+    for idx, segment in enumerate(segments):
+        last = idx == len(segments) - 1
+        if segment == '**':
+            result += '.*' if last else '(?:.*/)?'
+        else:
+            result += _translate_segment(segment) + ('' if last else '/')
+
+    # all files below a matching directory
+    return result + '(?:/.*)?'
+
+
+class ExcludeMatcher(object):
+    """Single compiled matcher of several exclude patterns"""
+
+    def __init__(self, patterns: Optional[Iterable[str]] = None) -> None:
+        """
+        Init ExcludeMatcher class
+
+        :param      patterns:  The glob patterns
+        :type       patterns:  Optional[Iterable[str]]
+
+        :raises     ExcludeError:  Invalid pattern
+        """
+        self._patterns = list(dict.fromkeys(patterns or []))
+        self._regex = None
+
+        if self._patterns:
+            self._regex = self._compile(patterns=self._patterns)
+
+    @staticmethod
+    def _compile(patterns: List[str]) -> Pattern:
+        """
+        Compile all patterns to one regular expression
+
+        :param      patterns:  The glob patterns
+        :type       patterns:  List[str]
+
+        :returns:   The compiled regular expression
+        :rtype:     Pattern
+
+        :raises     ExcludeError:  Invalid pattern
+        """
+        try:
+            return re.compile('|'.join('(?:{})'.format(translate(ele))
+                                       for ele in patterns))
+        except re.error as e:
+            raise ExcludeError("Invalid exclude patterns {}: {}".
+                               format(patterns, e))
+
+    def __bool__(self) -> bool:
+        return self._regex is not None
+
+    @property
+    def patterns(self) -> List[str]:
+        """
+        Get the glob patterns
+
+        :returns:   The patterns
+        :rtype:     List[str]
+        """
+        return list(self._patterns)
+
+    def matches(self, path: str) -> bool:
+        """
+        Determine whether a path is excluded
+
+        :param      path:  The relative POSIX path
+        :type       path:  str
+
+        :returns:   True if any pattern matches, False otherwise
+        :rtype:     bool
+        """
+        return self._regex is not None and \
+            self._regex.fullmatch(path.lstrip('/')) is not None
+
+    def filter_paths(self, paths: Iterable[str]) -> List[str]:
+        """
+        Get all paths not excluded
+
+        :param      paths:  The relative POSIX paths
+        :type       paths:  Iterable[str]
+
+        :returns:   The paths not matching any pattern
+        :rtype:     List[str]
+        """
+        if self._regex is None:
+            return list(paths)
+
+        fullmatch = self._regex.fullmatch
+        return [path for path in paths
+                if fullmatch(path.lstrip('/')) is None]
+
+    def filter(self, entries: Iterable[Sequence[str]]) -> list:
+        """
+        Get all [path, value] entries of a not excluded path, e.g. URLs
+
+        Malformed entries without a path are kept.
+
+        :param      entries:  The entries
+        :type       entries:  Iterable[Sequence[str]]
+
+        :returns:   The entries with a path not matching any pattern
+        :rtype:     list
+        """
+        if self._regex is None:
+            return list(entries)
+
+        fullmatch = self._regex.fullmatch
+        return [ele for ele in entries
+                if not isinstance(ele, (list, tuple)) or not ele or
+                not isinstance(ele[0], str) or
+                fullmatch(ele[0].lstrip('/')) is None]
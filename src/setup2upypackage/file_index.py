@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Cached directory index of a package root directory
+
+Every directory is listed at most once with "os.scandir". The file type
+information of the returned DirEntry objects is cached, so all following file
+lookups and glob expansions are served without further directory scans or
+stat calls.
+
+The GitFileIndex is populated from the file list of the git index instead,
+so untracked or ignored files are never found and the cost only depends on
+the number of tracked files.
+"""
+
+import fnmatch
+import os
+import re
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional
+
+#: Directories never searched for package files
+IGNORED_DIRS = ('__pycache__', )
+
+#: Mode of git index entries of submodules, which are not files
+GITLINK_MODE = '160000'
+
+
+class FileIndexError(Exception):
+    """Base class for exceptions in this module."""
+    pass
+
+
+class FileIndex(object):
+    """Lazily populated index of files below a root directory"""
+
+    def __init__(self, root_dir: Path) -> None:
+        """
+        Init FileIndex class
+
+        :param      root_dir:  The root directory
+        :type       root_dir:  Path
+        """
+        self._root_dir = Path(root_dir)
+        # relative POSIX directory path -> {name: is_dir}
+        self._dirs = {}
+        # relative POSIX directory path -> mtime at time of the scan
+        self._mtimes = {}
+
+    @property
+    def root_dir(self) -> Path:
+        """
+        Get root directory of the index
+
+        :returns:   The root directory
+        :rtype:     Path
+        """
+        return self._root_dir
+
+    @staticmethod
+    def _join(rel_dir: str, name: str) -> str:
+        """
+        Join a relative directory and a name to a relative POSIX path
+
+        :param      rel_dir:  The relative directory, empty for the root
+        :type       rel_dir:  str
+        :param      name:     The name
+        :type       name:     str
+
+        :returns:   The relative path
+        :rtype:     str
+        """
+        return '{}/{}'.format(rel_dir, name) if rel_dir else name
+
+    @staticmethod
+    def _normalize(rel_path: str) -> str:
+        """
+        Normalize a relative path to POSIX style without leading "./"
+
+        :param      rel_path:  The relative path
+        :type       rel_path:  str
+
+        :returns:   The normalized path
+        :rtype:     str
+        """
+        parts = [ele for ele in str(rel_path).replace(os.sep, '/').split('/')
+                 if ele not in ('', '.')]
+
+        return '/'.join(parts)
+
+    def _scan(self, rel_dir: str) -> Dict[str, bool]:
+        """
+        Get the cached content of a directory, scan it if not yet indexed
+
+        :param      rel_dir:  The relative directory
+        :type       rel_dir:  str
+
+        :returns:   Dictionary of entry names and whether they are directories
+        :rtype:     Dict[str, bool]
+        """
+        if rel_dir in self._dirs:
+            return self._dirs[rel_dir]
+
+        entries = {}
+        self._mtimes[rel_dir] = self._get_mtime(rel_dir)
+        try:
+            with os.scandir(self._root_dir / rel_dir) as it:
+                for entry in it:
+                    # DirEntry caches the file type, no additional stat call
+                    if entry.is_dir():
+                        entries[entry.name] = True
+                    elif entry.is_file():
+                        entries[entry.name] = False
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            pass
+
+        self._dirs[rel_dir] = entries
+
+        return entries
+
+    @property
+    def scanned_dirs(self) -> List[str]:
+        """
+        Get the directories scanned so far
+
+        :returns:   Relative POSIX paths of the directories, empty for root
+        :rtype:     List[str]
+        """
+        return list(self._dirs)
+
+    def _get_mtime(self, rel_dir: str) -> Optional[int]:
+        """
+        Get modification time of a directory
+
+        :param      rel_dir:  The relative directory
+        :type       rel_dir:  str
+
+        :returns:   Modification time in nanoseconds, None if not existing
+        :rtype:     Optional[int]
+        """
+        try:
+            return os.stat(self._root_dir / rel_dir).st_mtime_ns
+        except OSError:
+            return None
+
+    def is_file(self, rel_path: str) -> bool:
+        """
+        Determine whether a relative path is an existing file
+
+        :param      rel_path:  The relative path
+        :type       rel_path:  str
+
+        :returns:   True if the path is a file, False otherwise
+        :rtype:     bool
+        """
+        rel_path = self._normalize(rel_path)
+        rel_dir, _, name = rel_path.rpartition('/')
+
+        return self._scan(rel_dir).get(name) is False
+
+    def is_dir(self, rel_path: str) -> bool:
+        """
+        Determine whether a relative path is an existing directory
+
+        :param      rel_path:  The relative path
+        :type       rel_path:  str
+
+        :returns:   True if the path is a directory, False otherwise
+        :rtype:     bool
+        """
+        rel_path = self._normalize(rel_path)
+        if not rel_path:
+            return True
+        rel_dir, _, name = rel_path.rpartition('/')
+
+        return self._scan(rel_dir).get(name) is True
+
+    def files(self,
+              rel_dir: str,
+              pattern: str = '*',
+              recursive: bool = False) -> List[str]:
+        """
+        Get files of a directory matching a name pattern
+
+        :param      rel_dir:    The relative directory
+        :type       rel_dir:    str
+        :param      pattern:    The file name pattern
+        :type       pattern:    str
+        :param      recursive:  Flag to include files of subdirectories
+        :type       recursive:  bool
+
+        :returns:   Relative POSIX paths of the matching files
+        :rtype:     List[str]
+        """
+        rel_dir = self._normalize(rel_dir)
+        result = []
+
+        for name, is_dir in self._scan(rel_dir).items():
+            if not is_dir:
+                if fnmatch.fnmatchcase(name, pattern):
+                    result.append(self._join(rel_dir, name))
+            elif recursive and name not in IGNORED_DIRS:
+                result.extend(self.files(rel_dir=self._join(rel_dir, name),
+                                         pattern=pattern,
+                                         recursive=True))
+
+        return result
+
+    @staticmethod
+    def has_magic(pattern: str) -> bool:
+        """
+        Determine whether a path contains glob pattern characters
+
+        :param      pattern:  The path
+        :type       pattern:  str
+
+        :returns:   True if the path is a glob pattern, False otherwise
+        :rtype:     bool
+        """
+        return re.search(r'[*?[]', str(pattern)) is not None
+
+    def glob(self, pattern: str) -> List[str]:
+        """
+        Expand a relative glob pattern to existing files
+
+        "**" matches any number of directories.
+
+        :param      pattern:  The glob pattern
+        :type       pattern:  str
+
+        :returns:   Sorted relative POSIX paths of the matching files
+        :rtype:     List[str]
+        """
+        parts = self._normalize(pattern).split('/')
+
+        return sorted(set(self._glob(rel_dir='', parts=parts)))
+
+    def _glob(self, rel_dir: str, parts: List[str]) -> List[str]:
+        """
+        Expand the remaining glob pattern parts below a directory
+
+        :param      rel_dir:  The relative directory
+        :type       rel_dir:  str
+        :param      parts:    The remaining pattern parts
+        :type       parts:    List[str]
+
+        :returns:   Relative POSIX paths of the matching files
+        :rtype:     List[str]
+        """
+        part, rest = parts[0], parts[1:]
+        entries = self._scan(rel_dir)
+        result = []
+
+        if part == '**':
+            if rest:
+                result.extend(self._glob(rel_dir=rel_dir, parts=rest))
+            for name, is_dir in entries.items():
+                if is_dir and name not in IGNORED_DIRS:
+                    result.extend(self._glob(rel_dir=self._join(rel_dir,
+                                                                name),
+                                             parts=parts))
+                elif not is_dir and not rest:
+                    result.append(self._join(rel_dir, name))
+            return result
+
+        for name, is_dir in entries.items():
+            if not fnmatch.fnmatchcase(name, part):
+                continue
+
+            path = self._join(rel_dir, name)
+            if rest and is_dir:
+                result.extend(self._glob(rel_dir=path, parts=rest))
+            elif not rest and not is_dir:
+                result.append(path)
+
+        return result
+
+    def invalidate(self, rel_dir: Optional[str] = None) -> None:
+        """
+        Drop cached directory content
+
+        :param      rel_dir:  The relative directory, all if None
+        :type       rel_dir:  Optional[str]
+        """
+        if rel_dir is None:
+            self._dirs.clear()
+            self._mtimes.clear()
+        else:
+            self._dirs.pop(self._normalize(rel_dir), None)
+            self._mtimes.pop(self._normalize(rel_dir), None)
+
+    def changed_dirs(self) -> List[str]:
+        """
+        Drop cached content of directories modified since they were scanned
+
+        Adding, removing or renaming an entry changes the modification time of
+        its directory, the content of files is not checked.
+
+        :returns:   Relative POSIX paths of the changed directories
+        :rtype:     List[str]
+        """
+        changed = [rel_dir for rel_dir, mtime in self._mtimes.items()
+                   if self._get_mtime(rel_dir) != mtime]
+
+        for rel_dir in changed:
+            self.invalidate(rel_dir)
+
+        return changed
+
+
+class GitFileIndex(FileIndex):
+    """Index of the files below a root directory tracked by git"""
+
+    def __init__(self, root_dir: Path) -> None:
+        """
+        Init GitFileIndex class and read the file list of the git index
+
+        :param      root_dir:  The root directory inside a git work tree
+        :type       root_dir:  Path
+
+        :raises     FileIndexError:  The root directory is not inside a git
+                                     work tree
+        """
+        super().__init__(root_dir=root_dir)
+        # relative POSIX directory path -> {name: is_dir} of all directories
+        self._tracked = None
+        self._index_file = Path(self._git('rev-parse', '--git-path',
+                                          'index').strip())
+        if not self._index_file.is_absolute():
+            self._index_file = self._root_dir / self._index_file
+        self._index_mtime = None
+        self._load()
+
+    def _git(self, *args) -> str:
+        """
+        Run a git command in the root directory
+
+        :param      args:  The arguments of the git command
+        :type       args:  tuple
+
+        :returns:   Output of the command
+        :rtype:     str
+
+        :raises     FileIndexError:  git is not available or the command
+                                     failed
+        """
+        try:
+            result = subprocess.run(['git'] + list(args),
+                                    cwd=str(self._root_dir),
+                                    stdout=subprocess.PIPE,
+                                    stderr=subprocess.DEVNULL,
+                                    check=True)
+        except (OSError, subprocess.CalledProcessError) as e:
+            raise FileIndexError("Can not list git files of {}: {}".
+                                 format(self._root_dir, e))
+
+        return result.stdout.decode('utf-8', errors='surrogateescape')
+
+    def _load(self) -> Dict[str, Dict[str, bool]]:
+        """
+        Read the file list of the git index once and index it by directory
+
+        :returns:   Dictionary of relative directories and their entries
+        :rtype:     Dict[str, Dict[str, bool]]
+        """
+        if self._tracked is not None:
+            return self._tracked
+
+        self._index_mtime = self._get_index_mtime()
+        output = self._git('ls-files', '--stage', '-z')
+
+        tracked = {'': {}}
+        for entry in output.split('\0'):
+            if not entry:
+                continue
+            info, _, path = entry.partition('\t')
+            if info.startswith(GITLINK_MODE):
+                continue
+
+            rel_dir, _, name = path.rpartition('/')
+            entries = tracked.get(rel_dir)
+            if entries is None:
+                entries = tracked[rel_dir] = {}
+                # register the new directory in all new parent directories
+                child = rel_dir
+                while child:
+                    parent, _, child_name = child.rpartition('/')
+                    parent_entries = tracked.get(parent)
+                    if parent_entries is not None:
+                        parent_entries[child_name] = True
+                        break
+                    tracked[parent] = {child_name: True}
+                    child = parent
+            entries[name] = False
+
+        self._tracked = tracked
+
+        return tracked
+
+    def _get_index_mtime(self) -> Optional[int]:
+        """
+        Get modification time of the git index file
+
+        :returns:   Modification time in nanoseconds, None if not existing
+        :rtype:     Optional[int]
+        """
+        try:
+            return os.stat(self._index_file).st_mtime_ns
+        except OSError:
+            return None
+
+    def _scan(self, rel_dir: str) -> Dict[str, bool]:
+        """
+        Get the tracked content of a directory
+
+        :param      rel_dir:  The relative directory
+        :type       rel_dir:  str
+
+        :returns:   Dictionary of entry names and whether they are directories
+        :rtype:     Dict[str, bool]
+        """
+        if rel_dir not in self._dirs:
+            self._dirs[rel_dir] = self._load().get(rel_dir, {})
+
+        return self._dirs[rel_dir]
+
+    def invalidate(self, rel_dir: Optional[str] = None) -> None:
+        """
+        Drop cached directory content, the git index is read again
+
+        :param      rel_dir:  The relative directory, all if None
+        :type       rel_dir:  Optional[str]
+        """
+        super().invalidate(rel_dir=rel_dir)
+        self._tracked = None
+
+    def changed_dirs(self) -> List[str]:
+        """
+        Drop cached content of all directories if the git index changed
+
+        :returns:   Relative POSIX paths of the changed directories
+        :rtype:     List[str]
+        """
+        if self._tracked is None or \
+                self._get_index_mtime() == self._index_mtime:
+            return []
+
+        changed = self.scanned_dirs
+        self.invalidate()
+
+        return changed
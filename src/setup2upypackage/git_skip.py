@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Skip a validation if nothing relevant changed since the last successful one
+
+The fingerprint of a successful validation consists of the git blob ids of
+the setup, changelog and package.json files and of the files the setup.py
+file reads, e.g. a version.py file loaded with "exec", and a digest of the
+index entries, mode and blob id per file, of all package and data
+directories. It is stored in the git directory, keyed on the files, the
+validation options and the version of this tool.
+
+The fingerprint is compared against the git index. Unstaged changes or
+untracked files in any of these paths never lead to a skip. Ignored files
+are found by the file system search for package and data files as well, so
+their paths, sizes and modification times are part of the directory digests,
+unless only files of the git index are used. A validation is never recorded
+if the files read by the setup file can not be found statically, like the
+metadata cache does not cache its data then.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .declarative import is_declarative
+from .file_index import IGNORED_DIRS
+from .static_setup import StaticSetupParser
+from .version import __version__
+
+#: File of all validation records, relative to the git directory
+RECORD_FILE = Path("upy-package") / "validations.json"
+
+
+class GitSkipError(Exception):
+    """Base class for exceptions in this module."""
+    pass
+
+
+def _git(args: List[str], cwd: Path) -> str:
+    """
+    Run a git command
+
+    :param      args:  The arguments of the git command
+    :type       args:  List[str]
+    :param      cwd:   The working directory
+    :type       cwd:   Path
+
+    :returns:   Output of the command
+    :rtype:     str
+
+    :raises     GitSkipError:  git is not available or the command failed
+    """
+    try:
+        result = subprocess.run(["git"] + args,
+                                cwd=str(cwd),
+                                stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL,
+                                check=True)
+    except (OSError, subprocess.CalledProcessError) as e:
+        raise GitSkipError("git {} failed: {}".format(args[0], e))
+
+    return result.stdout.decode("utf-8", errors="surrogateescape")
+
+
+class ValidationRecord(object):
+    """Fingerprint of the last successful validation of a package"""
+
+    def __init__(self,
+                 files: List[Optional[Path]],
+                 options: dict,
+                 logger: Optional[logging.Logger] = None) -> None:
+        """
+        Init ValidationRecord class
+
+        :param      files:    The setup, package.json and changelog files,
+                              the first one has to exist
+        :type       files:    List[Optional[Path]]
+        :param      options:  The validation options, e.g. ignore_version,
+                              ignored files are not part of the fingerprint
+                              if "git_files" is set
+        :type       options:  dict
+        :param      logger:   Logger object
+        :type       logger:   Optional[logging.Logger]
+
+        :raises     GitSkipError:  A file is not inside a git work tree
+        """
+        if logger is None:
+            logger = logging.getLogger(__name__)
+        self._logger = logger
+
+        cwd = Path(files[0]).resolve().parent
+        output = _git(["rev-parse", "--show-toplevel", "--absolute-git-dir"],
+                      cwd=cwd).splitlines()
+        if len(output) != 2:
+            raise GitSkipError("{} is not inside a git work tree".format(cwd))
+
+        self._top_dir = Path(output[0]).resolve()
+        self._record_file = Path(output[1]) / RECORD_FILE
+        self._files = [self._relative(path=file) for file in files if file]
+        self._git_files = bool(options.get("git_files"))
+
+        content = json.dumps({"files": self._files,
+                              "options": options,
+                              "version": __version__}, sort_keys=True)
+        self._key = hashlib.sha256(content.encode()).hexdigest()
+
+    @property
+    def record_file(self) -> Path:
+        """
+        Get path of the file of all validation records
+
+        :returns:   The record file
+        :rtype:     Path
+        """
+        return self._record_file
+
+    def _relative(self, path: Path) -> str:
+        """
+        Get path relative to the top directory of the work tree
+
+        :param      path:  The path
+        :type       path:  Path
+
+        :returns:   Relative POSIX path, empty for the top directory
+        :rtype:     str
+
+        :raises     GitSkipError:  The path is outside of the work tree
+        """
+        try:
+            relative = Path(path).resolve().relative_to(self._top_dir)
+        except ValueError:
+            raise GitSkipError("{} is outside of {}".format(path,
+                                                            self._top_dir))
+
+        return "" if relative == Path(".") else relative.as_posix()
+
+    def find_read_files(self) -> Optional[List[str]]:
+        """
+        Find the files read by the setup file
+
+        :returns:   Paths relative to the top directory, None if not all of
+                    them can be found statically or one is outside of the
+                    work tree
+        :rtype:     Optional[List[str]]
+        """
+        setup_file = self._top_dir / self._files[0]
+        if is_declarative(setup_file):
+            self._logger.debug("Files read by {} are not known".
+                               format(setup_file))
+            return None
+
+        read_files = StaticSetupParser(setup_file=setup_file,
+                                       logger=self._logger).find_read_files()
+        if read_files is None:
+            return None
+
+        try:
+            return [self._relative(path=path) for path in read_files]
+        except GitSkipError as e:
+            self._logger.debug("Not recording the validation: {}".format(e))
+            return None
+
+    def fingerprint(self,
+                    dirs: List[str],
+                    read_files: List[str] = ()) -> Optional[Dict[str, dict]]:
+        """
+        Get fingerprint of the files and directories from the git index
+
+        :param      dirs:        The directories relative to the top
+                                 directory
+        :type       dirs:        List[str]
+        :param      read_files:  The files read by the setup file relative to
+                                 the top directory
+        :type       read_files:  List[str]
+
+        :returns:   Blob id per file and read file and digest per directory,
+                    None if the work tree differs from the index for any of
+                    them
+        :rtype:     Optional[Dict[str, dict]]
+        """
+        pathspecs = ["--"] + [":(literal){}".format(path or ".")
+                              for path in self._files + list(read_files) +
+                              list(dirs)]
+
+        try:
+            _git(["diff", "--quiet"] + pathspecs, cwd=self._top_dir)
+        except GitSkipError:
+            self._logger.debug("Unstaged changes found")
+            return None
+
+        if _git(["ls-files", "-z", "--others", "--exclude-standard"] +
+                pathspecs, cwd=self._top_dir):
+            self._logger.debug("Untracked files found")
+            return None
+
+        entries = {}
+        for entry in _git(["ls-files", "-s", "-z"] + pathspecs,
+                          cwd=self._top_dir).split("\0"):
+            if not entry:
+                continue
+            info, path = entry.split("\t", 1)
+            mode, blob_id, stage = info.split(" ")
+            if stage != "0":
+                self._logger.debug("Unmerged file {}".format(path))
+                return None
+            entries[path] = (mode, blob_id)
+
+        if not self._git_files:
+            entries.update(self._ignored_entries(pathspecs=pathspecs))
+
+        files = {path: entries[path][1] if path in entries else None
+                 for path in self._files}
+        read_blobs = {path: entries[path][1] if path in entries else None
+                      for path in read_files}
+        digests = {}
+        for rel_dir in dirs:
+            prefix = rel_dir + "/" if rel_dir else ""
+            digest = hashlib.sha1()
+            for path in sorted(entries):
+                if path.startswith(prefix):
+                    digest.update("{} {} {}\0".format(
+                        *entries[path], path[len(prefix):]).encode(
+                            "utf-8", errors="surrogateescape"))
+            digests[rel_dir] = digest.hexdigest()
+
+        return {"files": files, "read_files": read_blobs, "dirs": digests}
+
+    def _ignored_entries(self, pathspecs: List[str]) -> Dict[str, tuple]:
+        """
+        Get entries of all ignored files, which are not in the git index
+
+        :param      pathspecs:  The pathspecs of the files and directories
+        :type       pathspecs:  List[str]
+
+        :returns:   "ignored" and the modification time and size per path
+        :rtype:     Dict[str, tuple]
+        """
+        entries = {}
+
+        for path in _git(["ls-files", "-z", "--others", "--ignored",
+                          "--exclude-standard"] + pathspecs,
+                         cwd=self._top_dir).split("\0"):
+            if not path or set(path.split("/")) & set(IGNORED_DIRS):
+                continue
+
+            try:
+                stat = (self._top_dir / path).stat()
+            except OSError:
+                continue
+            entries[path] = ("ignored",
+                             "{}-{}".format(stat.st_mtime_ns, stat.st_size))
+
+        return entries
+
+    def _load(self) -> dict:
+        """
+        Load all validation records
+
+        :returns:   The records, empty if not existing or invalid
+        :rtype:     dict
+        """
+        try:
+            return json.loads(self._record_file.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def is_unchanged(self) -> bool:
+        """
+        Determine whether nothing changed since the last successful validation
+
+        :returns:   True if the fingerprint equals the recorded one
+        :rtype:     bool
+        """
+        recorded = self._load().get(self._key)
+        if not recorded:
+            return False
+
+        # the setup file is part of the fingerprint, so unchanged it still
+        # reads the recorded files
+        return self.fingerprint(
+            dirs=list(recorded["dirs"]),
+            read_files=list(recorded.get("read_files", {}))) == recorded
+
+    def save(self, dirs: List[Path]) -> bool:
+        """
+        Record the fingerprint of a successful validation
+
+        :param      dirs:  The package and data directories
+        :type       dirs:  List[Path]
+
+        :returns:   True if recorded, False if the work tree differs from
+                    the index or the files read by the setup file are not
+                    known
+        :rtype:     bool
+        """
+        read_files = self.find_read_files()
+        if read_files is None:
+            return False
+
+        fingerprint = self.fingerprint(
+            dirs=list(dict.fromkeys(self._relative(path=ele) for ele in dirs)),
+            read_files=read_files)
+        if fingerprint is None:
+            return False
+
+        records = self._load()
+        records[self._key] = fingerprint
+
+        self._record_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self._record_file.with_name(
+            "{}.{}.tmp".format(self._record_file.name, os.getpid()))
+        tmp_file.write_text(json.dumps(records, sort_keys=True))
+        os.replace(str(tmp_file), str(self._record_file))
+
+        return True
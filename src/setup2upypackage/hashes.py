@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+SHA256 hashes of package and data files
+
+Files are hashed in parallel by a thread pool, large files are read via mmap.
+Hashes are cached by the inode, size and modification time of each file, so
+unchanged files are not hashed again. With a MetadataCache the hashes are
+kept across runs.
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .cache import MetadataCache
+
+#: Files of at least this size in bytes are read via mmap
+MMAP_THRESHOLD = 1024 * 1024
+
+
+class HashError(Exception):
+    """Base class for exceptions in this module."""
+    pass
+
+
+def hash_file(path: Path) -> str:
+    """
+    Get SHA256 hash of a file
+
+    :param      path:  The file
+    :type       path:  Path
+
+    :returns:   Hex digest of the file content
+    :rtype:     str
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                return hashlib.sha256(m).hexdigest()
+
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class FileHasher(object):
+    """Hash files below a root directory, cached by their stat data"""
+
+    def __init__(self,
+                 root_dir: Path,
+                 metadata_cache: Optional[MetadataCache] = None,
+                 max_workers: Optional[int] = None,
+                 logger: Optional[logging.Logger] = None) -> None:
+        """
+        Init FileHasher class
+
+        :param      root_dir:        The root directory
+        :type       root_dir:        Path
+        :param      metadata_cache:  The persistent cache of the hashes
+        :type       metadata_cache:  Optional[MetadataCache]
+        :param      max_workers:     Number of threads, default of
+                                     ThreadPoolExecutor if None
+        :type       max_workers:     Optional[int]
+        :param      logger:          Logger object
+        :type       logger:          Optional[logging.Logger]
+        """
+        if logger is None:
+            logger = logging.getLogger(__name__)
+        self._logger = logger
+
+        self._root_dir = Path(root_dir)
+        self._metadata_cache = metadata_cache
+        self._max_workers = max_workers
+
+        # relative path -> [inode, size, mtime, hash]
+        self._entries = {}
+        self._cache_key = None
+
+        if self._metadata_cache is not None:
+            self._cache_key = self._metadata_cache.key(
+                salt='hashes\0{}'.format(self._root_dir.resolve()))
+            self._entries = self._metadata_cache.get(self._cache_key) or {}
+
+    def _stat(self, rel_path: str) -> Optional[List[int]]:
+        """
+        Get inode, size and modification time of a file
+
+        :param      rel_path:  The relative path
+        :type       rel_path:  str
+
+        :returns:   The stat data, None if not existing
+        :rtype:     Optional[List[int]]
+        """
+        try:
+            stat = os.stat(self._root_dir / rel_path)
+        except OSError:
+            return None
+
+        return [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+    def _is_current(self, rel_path: str, stat: Optional[List[int]]) -> bool:
+        """
+        Determine whether the cached hash of a file is up to date
+
+        :param      rel_path:  The relative path
+        :type       rel_path:  str
+        :param      stat:      The current stat data
+        :type       stat:      Optional[List[int]]
+
+        :returns:   True if up to date, False otherwise
+        :rtype:     bool
+        """
+        entry = self._entries.get(rel_path)
+
+        return entry is not None and entry[:3] == stat
+
+    def is_outdated(self, rel_paths: List[str]) -> bool:
+        """
+        Determine whether any file changed since it was hashed
+
+        :param      rel_paths:  The relative paths
+        :type       rel_paths:  List[str]
+
+        :returns:   True if any hash is outdated, False otherwise
+        :rtype:     bool
+        """
+        return any(not self._is_current(ele, self._stat(ele))
+                   for ele in rel_paths)
+
+    def hashes(self, rel_paths: List[str]) -> Dict[str, str]:
+        """
+        Get SHA256 hashes of files, hash only new or changed files
+
+        :param      rel_paths:  The relative paths
+        :type       rel_paths:  List[str]
+
+        :returns:   Hex digest per relative path
+        :rtype:     Dict[str, str]
+
+        :raises     HashError:  A file does not exist or can not be read, e.g.
+                                a file of the git index deleted from the
+                                work tree
+        """
+        stats = {ele: self._stat(ele) for ele in rel_paths}
+        missing = [ele for ele, stat in stats.items() if stat is None]
+        if missing:
+            raise HashError("Can not hash missing files {}".format(missing))
+        outdated = [ele for ele, stat in stats.items()
+                    if not self._is_current(ele, stat)]
+
+        if outdated:
+            self._logger.debug("Hashing {} of {} files".
+                               format(len(outdated), len(stats)))
+
+            # hashlib releases the GIL while hashing
+            with ThreadPoolExecutor(max_workers=self._max_workers) as pool:
+                digests = pool.map(lambda ele: hash_file(self._root_dir / ele),
+                                   outdated)
+                try:
+                    for rel_path, digest in zip(outdated, digests):
+                        self._entries[rel_path] = stats[rel_path] + [digest]
+                except OSError as e:
+                    raise HashError("Can not hash file: {}".format(e))
+
+            if self._metadata_cache is not None:
+                self._metadata_cache.set(self._cache_key, self._entries)
+
+        return {ele: self._entries[ele][3] for ele in stats}
@@ -18,11 +18,17 @@ import argparse
 import json
 import logging
 from pathlib import Path
-from sys import stdout
+from sys import stderr, stdout
+from typing import TYPE_CHECKING, Optional
 
 from .setup2upypackage import Setup2uPyPackage
 from .version import __version__
 
+if TYPE_CHECKING:
+    # imported on demand, as subprocess and multiprocessing are slow to import
+    from .git_skip import ValidationRecord
+    from .setup_pool import SetupPool
+
 
 def parser_valid_file(parser: argparse.ArgumentParser, arg: str) -> Path:
     """
@@ -41,6 +47,28 @@ def parser_valid_file(parser: argparse.ArgumentParser, arg: str) -> Path:
         return Path(arg).resolve()
 
 
+def parser_valid_url_template(parser: argparse.ArgumentParser,
+                              arg: str) -> str:
+    """
+    Determine whether a URL template specification is valid.
+    :param      parser:                 The parser
+    :type       parser:                 parser object
+    :param      arg:                    The NAME=TEMPLATE or preset name
+    :type       arg:                    str
+    :raise      argparse.ArgumentError: Invalid specification
+    :returns:   The specification, parser error is thrown otherwise.
+    :rtype:     str
+    """
+    from .url_template import UrlTemplate, UrlTemplateError
+
+    try:
+        UrlTemplate.from_spec(spec=arg)
+    except UrlTemplateError as e:
+        parser.error(str(e))
+
+    return arg
+
+
 def parse_arguments() -> argparse.Namespace:
     """
     Parse CLI arguments.
@@ -69,9 +97,9 @@ def parse_arguments() -> argparse.Namespace:
     # specific arguments
     parser.add_argument('--setup_file',
                         dest='setup_file',
-                        required=True,
+                        required=False,
                         type=lambda x: parser_valid_file(parser, x),
-                        help='Path to setup.py file')
+                        help='Path to setup.py, pyproject.toml or setup.cfg file, detected in the current directory if not given')  # noqa: E501
 
     parser.add_argument('--package_file',
                         dest='package_file',
@@ -85,6 +113,12 @@ def parse_arguments() -> argparse.Namespace:
                         type=lambda x: parser_valid_file(parser, x),
                         help='Path to package changelog file')
 
+    parser.add_argument('--version_file',
+                        dest='version_file',
+                        required=False,
+                        type=lambda x: parser_valid_file(parser, x),
+                        help='Path to a version.py file to read __version__ or __version_info__ from without importing it, used instead of the setup.py or changelog version')  # noqa: E501
+
     parser.add_argument('--create',
                         dest='dump_to_file',
                         action='store_true',
@@ -115,6 +149,19 @@ def parse_arguments() -> argparse.Namespace:
                         required=False,
                         help='Boot and main files from check')
 
+    parser.add_argument('--exclude',
+                        dest='excludes',
+                        metavar='PATTERN',
+                        required=False,
+                        action='append',
+                        help='Exclude package and data files matching the glob pattern on create and validate, e.g. "main.py", "static/**/*.map" or "tests". A pattern without "/" matches the file name in any directory. Use several times for several patterns')  # noqa: E501
+
+    parser.add_argument('--force',
+                        dest='force',
+                        action='store_true',
+                        required=False,
+                        help='Validate even if no relevant file changed in the git index since the last successful validation')  # noqa: E501
+
     parser.add_argument('--print',
                         dest='print_result',
                         required=False,
@@ -126,11 +173,585 @@ def parse_arguments() -> argparse.Namespace:
                         action='store_true',
                         help='Print JSON data at stdout in readable format')
 
+    parser.add_argument('--recursive-packages',
+                        dest='recursive_packages',
+                        action='store_true',
+                        required=False,
+                        help='Include files of nested subpackages')
+
+    parser.add_argument('--url_template',
+                        dest='url_templates',
+                        required=False,
+                        action='append',
+                        type=lambda x: parser_valid_url_template(parser, x),
+                        help='Additionally print or create a package.<NAME>.json variant with URLs of the NAME=TEMPLATE, e.g. "mirror=https://example.com/{repo}/{ref}/{path}", or the preset "github" or "github-raw". Use several times for several variants')  # noqa: E501
+
+    parser.add_argument('--ref',
+                        dest='ref',
+                        required=False,
+                        help='Ref to pin in URL templates with a {ref} placeholder, e.g. a commit or "v{version}", HEAD if not given')  # noqa: E501
+
+    parser.add_argument('--git-files',
+                        dest='git_files',
+                        action='store_true',
+                        required=False,
+                        help='Search package and data files in the git index instead of the file system, untracked files are never part of the package')  # noqa: E501
+
+    parser.add_argument('--hashes',
+                        dest='hashes',
+                        action='store_true',
+                        required=False,
+                        help='Add SHA256 hashes of all files to the package data')  # noqa: E501
+
+    parser.add_argument('--check-urls',
+                        dest='check_urls',
+                        action='store_true',
+                        required=False,
+                        help='Check all package and data files exist with the same size below --url_base, e.g. on a mirror, using concurrent HEAD requests')  # noqa: E501
+
+    parser.add_argument('--url_base',
+                        dest='url_base',
+                        required=False,
+                        help='HTTP(S) URL or local directory the file paths are resolved against with --check-urls, e.g. "https://mirror.example.com/package"')  # noqa: E501
+
+    parser.add_argument('--check_concurrency',
+                        dest='check_concurrency',
+                        required=False,
+                        type=int,
+                        default=16,
+                        help='Maximum number of concurrent requests of --check-urls')  # noqa: E501
+
+    parser.add_argument('--check_retries',
+                        dest='check_retries',
+                        required=False,
+                        type=int,
+                        default=2,
+                        help='Number of retries of a failed request of --check-urls')  # noqa: E501
+
+    parser.add_argument('--check_timeout',
+                        dest='check_timeout',
+                        required=False,
+                        type=float,
+                        default=10.0,
+                        help='Timeout in seconds of a single request of --check-urls')  # noqa: E501
+
+    parser.add_argument('--profile',
+                        dest='profile',
+                        action='store_true',
+                        required=False,
+                        help='Write wall time and peak memory of each phase as JSON to stderr, respectively add them to each batch result')  # noqa: E501
+
+    parser.add_argument('--engine',
+                        dest='engine',
+                        required=False,
+                        default='run_setup',
+                        choices=['run_setup', 'ast'],
+                        help='Engine to parse the setup.py file, "ast" evaluates it statically and falls back to "run_setup" if not possible')  # noqa: E501
+
+    parser.add_argument('--isolate',
+                        dest='isolate',
+                        action='store_true',
+                        required=False,
+                        help='Execute setup.py files in isolated, prewarmed worker processes instead of in-process, workers are reused by batch runs and the daemon')  # noqa: E501
+
+    parser.add_argument('--setup_timeout',
+                        dest='setup_timeout',
+                        required=False,
+                        type=float,
+                        default=30.0,
+                        help='Timeout in seconds of a single setup.py execution with --isolate')  # noqa: E501
+
+    parser.add_argument('--setup_memory_limit',
+                        dest='setup_memory_limit',
+                        required=False,
+                        type=int,
+                        help='Address space limit in MB of a setup.py worker process with --isolate, unlimited if not given')  # noqa: E501
+
+    parser.add_argument('--cache_dir',
+                        dest='cache_dir',
+                        required=False,
+                        type=lambda x: Path(x).resolve(),
+                        help='Path to directory to cache parsed setup.py data, e.g. .upy-package-cache')  # noqa: E501
+
+    parser.add_argument('--batch_file',
+                        dest='batch_file',
+                        required=False,
+                        type=lambda x: parser_valid_file(parser, x),
+                        help='Path to JSON file listing several packages to validate or create')  # noqa: E501
+
+    parser.add_argument('--batch_glob',
+                        dest='batch_glob',
+                        required=False,
+                        help='Glob pattern of several setup.py files to validate or create')  # noqa: E501
+
+    parser.add_argument('--jobs',
+                        dest='jobs',
+                        required=False,
+                        type=int,
+                        help='Number of parallel processes of a batch run, CPU count if not given')  # noqa: E501
+
+    parser.add_argument('--daemon',
+                        dest='daemon',
+                        required=False,
+                        nargs='?',
+                        const='',
+                        type=lambda x: Path(x).resolve() if x else '',
+                        help='Send the request to a running "upy-package serve" daemon, optionally on the given socket path. Runs in-process if no daemon is running')  # noqa: E501
+
+    parser.add_argument('--bundle',
+                        dest='bundle_file',
+                        required=False,
+                        type=lambda x: Path(x).resolve(),
+                        help='Write all package and data files and the package.json file to this deterministic .tar, .tar.gz or .tgz file and an index of the member offsets to <file>.index.json')  # noqa: E501
+
+    parser.add_argument('--minify',
+                        dest='minify_dir',
+                        required=False,
+                        type=lambda x: Path(x).resolve(),
+                        help='Write minified copies of all package files and their package.json file to this directory inside the setup.py directory')  # noqa: E501
+
+    parser.add_argument('--watch',
+                        dest='watch',
+                        action='store_true',
+                        required=False,
+                        help='Create the package.json file and update it on changes of the setup.py, changelog, package or data files until interrupted')  # noqa: E501
+
+    subparsers = parser.add_subparsers(dest='command')
+    serve_parser = subparsers.add_parser(
+        'serve',
+        help='Serve requests of several packages over a Unix socket',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    serve_parser.add_argument('--socket',
+                              dest='socket',
+                              required=False,
+                              type=lambda x: Path(x).resolve(),
+                              help='Path to the socket, in $XDG_RUNTIME_DIR or a private directory of the temporary directory if not given')  # noqa: E501
+
     parsed_args = parser.parse_args()
 
+    if parsed_args.command == 'serve':
+        return parsed_args
+
+    if parsed_args.batch_file and parsed_args.batch_glob:
+        parser.error("--batch_file and --batch_glob are mutually exclusive")
+
+    if not (parsed_args.setup_file or
+            parsed_args.batch_file or
+            parsed_args.batch_glob):
+        from .declarative import detect_setup_file
+
+        parsed_args.setup_file = detect_setup_file(directory=Path.cwd())
+
+    if parsed_args.watch and not parsed_args.setup_file:
+        parser.error("--watch requires --setup_file")
+
+    if parsed_args.minify_dir and not parsed_args.setup_file:
+        parser.error("--minify requires --setup_file")
+
+    if parsed_args.bundle_file and not parsed_args.setup_file:
+        parser.error("--bundle requires --setup_file")
+
+    if parsed_args.check_urls and not parsed_args.url_base:
+        parser.error("--check-urls requires --url_base")
+
+    if parsed_args.check_concurrency < 1:
+        parser.error("--check_concurrency has to be at least 1")
+
+    if not (parsed_args.setup_file or
+            parsed_args.batch_file or
+            parsed_args.batch_glob):
+        parser.error("One of --setup_file, --batch_file or --batch_glob "
+                     "is required, no setup.py, pyproject.toml or setup.cfg "
+                     "file found in the current directory")
+
     return parsed_args
 
 
+def create_setup_pool(args: argparse.Namespace,
+                      logger: logging.Logger) -> Optional['SetupPool']:
+    """
+    Create the pool executing setup.py files if requested.
+    :param      args:    The parsed CLI arguments
+    :type       args:    argparse.Namespace
+    :param      logger:  The logger
+    :type       logger:  logging.Logger
+    :returns:   The setup pool, None if setup.py files are executed in-process
+    :rtype:     Optional[SetupPool]
+    """
+    if not args.isolate:
+        return None
+
+    from .setup_pool import SetupPool
+
+    return SetupPool(processes=1,
+                     timeout=args.setup_timeout,
+                     memory_limit=setup_memory_limit(args=args),
+                     logger=logger)
+
+
+def setup_memory_limit(args: argparse.Namespace) -> Optional[int]:
+    """
+    Get the address space limit of a setup.py worker in bytes.
+    :param      args:    The parsed CLI arguments
+    :type       args:    argparse.Namespace
+    :returns:   The limit, None if unlimited
+    :rtype:     Optional[int]
+    """
+    if not args.setup_memory_limit:
+        return None
+
+    return args.setup_memory_limit * 1024 * 1024
+
+
+def run_batch(args: argparse.Namespace, logger: logging.Logger) -> int:
+    """
+    Validate or create several packages in parallel.
+    :param      args:    The parsed CLI arguments
+    :type       args:    argparse.Namespace
+    :param      logger:  The logger
+    :type       logger:  logging.Logger
+    :returns:   Aggregated exit code of all packages
+    :rtype:     int
+    """
+    from .batch import BatchRunner
+
+    if args.batch_file:
+        runner = BatchRunner.from_batch_file(batch_file=args.batch_file,
+                                             processes=args.jobs,
+                                             logger=logger)
+    else:
+        runner = BatchRunner.from_glob(pattern=args.batch_glob,
+                                       processes=args.jobs,
+                                       logger=logger)
+
+    if args.dump_to_file:
+        action = "create"
+        options = {
+            "engine": args.engine,
+            "cache_dir": args.cache_dir,
+            "recursive_packages": args.recursive_packages,
+            "git_files": args.git_files,
+            "excludes": args.excludes,
+            "hashes": args.hashes,
+            "isolate": args.isolate,
+            "setup_timeout": args.setup_timeout,
+            "setup_memory_limit": setup_memory_limit(args=args),
+            "profile": args.profile,
+            "pretty": args.pretty_output,
+            "url_templates": args.url_templates,
+            "ref": args.ref,
+        }
+    else:
+        action = "validate"
+        options = {
+            "engine": args.engine,
+            "cache_dir": args.cache_dir,
+            "recursive_packages": args.recursive_packages,
+            "git_files": args.git_files,
+            "excludes": args.excludes,
+            "hashes": args.hashes,
+            "isolate": args.isolate,
+            "setup_timeout": args.setup_timeout,
+            "setup_memory_limit": setup_memory_limit(args=args),
+            "profile": args.profile,
+            "ignore_version": args.ignore_version,
+            "ignore_deps": args.ignore_deps,
+            "ignore_boot_main": args.ignore_boot_main,
+        }
+
+    return runner.run(action=action, stream=stdout, **options)
+
+
+def serve(args: argparse.Namespace, logger: logging.Logger) -> None:
+    """
+    Serve requests of several packages over a Unix socket.
+    :param      args:    The parsed CLI arguments
+    :type       args:    argparse.Namespace
+    :param      logger:  The logger
+    :type       logger:  logging.Logger
+    """
+    from .daemon import PackageServer
+
+    server = PackageServer(socket_path=args.socket,
+                           logger=logger,
+                           setup_pool=create_setup_pool(args=args,
+                                                        logger=logger))
+    server.serve_forever()
+
+
+def watch(args: argparse.Namespace, logger: logging.Logger) -> None:
+    """
+    Keep the package.json file up to date until interrupted.
+    :param      args:    The parsed CLI arguments
+    :type       args:    argparse.Namespace
+    :param      logger:  The logger
+    :type       logger:  logging.Logger
+    """
+    from .watch import PackageWatcher
+
+    # the watched package re-parses its setup.py file on changes
+    setup_pool = create_setup_pool(args=args, logger=logger)
+    try:
+        setup_2_upy_package = Setup2uPyPackage(
+            setup_file=args.setup_file,
+            package_file=args.package_file,
+            package_changelog_file=args.package_changelog_file,
+            version_file=args.version_file,
+            logger=logger,
+            engine=args.engine,
+            cache_dir=args.cache_dir,
+            recursive_packages=args.recursive_packages,
+            git_files=args.git_files,
+            excludes=args.excludes,
+            hashes=args.hashes,
+            setup_pool=setup_pool)
+
+        watcher = PackageWatcher(setup_2_upy_package=setup_2_upy_package,
+                                 output_path=args.package_file,
+                                 pretty=args.pretty_output,
+                                 logger=logger)
+        try:
+            watcher.run()
+        except KeyboardInterrupt:
+            pass
+    finally:
+        if setup_pool:
+            setup_pool.close()
+
+
+def minify(args: argparse.Namespace, logger: logging.Logger) -> None:
+    """
+    Write minified copies of all package files and their package.json file.
+    One JSON line with the saved bytes is written to stdout per file.
+    :param      args:    The parsed CLI arguments
+    :type       args:    argparse.Namespace
+    :param      logger:  The logger
+    :type       logger:  logging.Logger
+    """
+    from .minify import Minifier, MinifyError
+
+    setup_pool = create_setup_pool(args=args, logger=logger)
+    try:
+        setup_2_upy_package = Setup2uPyPackage(
+            setup_file=args.setup_file,
+            package_file=args.package_file,
+            package_changelog_file=args.package_changelog_file,
+            version_file=args.version_file,
+            logger=logger,
+            engine=args.engine,
+            cache_dir=args.cache_dir,
+            recursive_packages=args.recursive_packages,
+            git_files=args.git_files,
+            excludes=args.excludes,
+            setup_pool=setup_pool)
+
+        minifier = Minifier(setup_2_upy_package=setup_2_upy_package,
+                            output_dir=args.minify_dir,
+                            processes=args.jobs,
+                            logger=logger)
+        results = minifier.run(pretty=args.pretty_output)
+    except MinifyError as e:
+        raise SystemExit(str(e))
+    finally:
+        if setup_pool:
+            setup_pool.close()
+
+    for result in results:
+        stdout.write(json.dumps(result) + "\n")
+
+
+def bundle(args: argparse.Namespace, logger: logging.Logger) -> None:
+    """
+    Write all package and data files and the package.json file to a bundle.
+    The index of the bundle is written to stdout.
+    :param      args:    The parsed CLI arguments
+    :type       args:    argparse.Namespace
+    :param      logger:  The logger
+    :type       logger:  logging.Logger
+    """
+    from .bundle import BundleError, Bundler
+
+    setup_pool = create_setup_pool(args=args, logger=logger)
+    try:
+        setup_2_upy_package = Setup2uPyPackage(
+            setup_file=args.setup_file,
+            package_file=args.package_file,
+            package_changelog_file=args.package_changelog_file,
+            version_file=args.version_file,
+            logger=logger,
+            engine=args.engine,
+            cache_dir=args.cache_dir,
+            recursive_packages=args.recursive_packages,
+            git_files=args.git_files,
+            excludes=args.excludes,
+            hashes=args.hashes,
+            setup_pool=setup_pool)
+
+        bundler = Bundler(setup_2_upy_package=setup_2_upy_package,
+                          output_path=args.bundle_file,
+                          pretty=args.pretty_output,
+                          logger=logger)
+        index = bundler.run()
+    except BundleError as e:
+        raise SystemExit(str(e))
+    finally:
+        if setup_pool:
+            setup_pool.close()
+
+    if args.pretty_output:
+        stdout.write(json.dumps(index, indent=4))
+    else:
+        stdout.write(json.dumps(index))
+
+
+def create_validation_record(args: argparse.Namespace,
+                             logger: logging.Logger
+                             ) -> Optional['ValidationRecord']:
+    """
+    Create the record of the last successful validation if applicable.
+    Only plain validations of packages inside a git work tree are recorded.
+    :param      args:    The parsed CLI arguments
+    :type       args:    argparse.Namespace
+    :param      logger:  The logger
+    :type       logger:  logging.Logger
+    :returns:   The validation record, None if not applicable
+    :rtype:     Optional[ValidationRecord]
+    """
+    if args.force or not args.do_validate or args.dump_to_file or \
+            args.print_result or args.profile or args.check_urls:
+        return None
+
+    options = {
+        "engine": args.engine,
+        "recursive_packages": args.recursive_packages,
+        "git_files": args.git_files,
+        "excludes": args.excludes,
+        "hashes": args.hashes,
+        "ignore_version": args.ignore_version,
+        "ignore_deps": args.ignore_deps,
+        "ignore_boot_main": args.ignore_boot_main,
+    }
+
+    from .git_skip import GitSkipError, ValidationRecord
+
+    try:
+        return ValidationRecord(files=[args.setup_file,
+                                       args.package_file,
+                                       args.package_changelog_file,
+                                       args.version_file],
+                                options=options,
+                                logger=logger)
+    except GitSkipError as e:
+        logger.debug("Not recording the validation: {}".format(e))
+        return None
+
+
+def run_package(args: argparse.Namespace, logger: logging.Logger) -> dict:
+    """
+    Validate, print and/or create the package.json data of a package.
+    The request is sent to a running daemon if requested, the package is
+    processed in-process if no daemon is running.
+    :param      args:    The parsed CLI arguments
+    :type       args:    argparse.Namespace
+    :param      logger:  The logger
+    :type       logger:  logging.Logger
+    :returns:   The response, see daemon.process_request
+    :rtype:     dict
+    """
+    from .daemon import process_request
+    from .profiling import PhaseProfiler
+
+    request = {
+        "command": "run",
+        "setup_file": str(args.setup_file),
+        "package_file": (str(args.package_file)
+                         if args.package_file else None),
+        "package_changelog_file": (str(args.package_changelog_file)
+                                   if args.package_changelog_file else None),
+        "version_file": (str(args.version_file)
+                         if args.version_file else None),
+        "engine": args.engine,
+        "cache_dir": str(args.cache_dir) if args.cache_dir else None,
+        "recursive_packages": args.recursive_packages,
+        "git_files": args.git_files,
+        "excludes": args.excludes,
+        "hashes": args.hashes,
+        "profile": args.profile,
+        "validate": args.do_validate,
+        "print": args.print_result,
+        "create": args.dump_to_file,
+        "pretty": args.pretty_output,
+        "ignore_version": args.ignore_version,
+        "ignore_deps": args.ignore_deps,
+        "ignore_boot_main": args.ignore_boot_main,
+        "url_templates": args.url_templates,
+        "ref": args.ref,
+        "check_urls": args.check_urls,
+        "url_base": args.url_base,
+        "check_concurrency": args.check_concurrency,
+        "check_retries": args.check_retries,
+        "check_timeout": args.check_timeout,
+    }
+
+    validation_record = create_validation_record(args=args, logger=logger)
+    if validation_record and validation_record.is_unchanged():
+        logger.debug("Nothing changed since the last successful validation")
+        return {"success": True, "valid": True, "diff": {}, "skipped": True}
+
+    if args.daemon is not None:
+        from .daemon import DaemonClient, DaemonUnavailableError
+
+        client = DaemonClient(socket_path=args.daemon or None)
+        try:
+            return client.request(request=request)
+        except DaemonUnavailableError as e:
+            logger.debug("{}, running in-process".format(e))
+
+    profiler = None
+    if args.profile:
+        # include parsing the setup.py file
+        profiler = PhaseProfiler()
+        profiler.start()
+
+    # the request may parse the setup.py file again if it changed meanwhile,
+    # keep the pool until the request is finished
+    setup_pool = create_setup_pool(args=args, logger=logger)
+    try:
+        setup_2_upy_package = Setup2uPyPackage(
+            setup_file=args.setup_file,
+            package_file=args.package_file,
+            package_changelog_file=args.package_changelog_file,
+            version_file=args.version_file,
+            logger=logger,
+            engine=args.engine,
+            cache_dir=args.cache_dir,
+            recursive_packages=args.recursive_packages,
+            git_files=args.git_files,
+            excludes=args.excludes,
+            hashes=args.hashes,
+            hooks=[profiler] if profiler else None,
+            setup_pool=setup_pool)
+        logger.debug("Parsed setup.py with engine '{}'".
+                     format(setup_2_upy_package.setup_engine))
+
+        response = process_request(setup_2_upy_package=setup_2_upy_package,
+                                   request=request,
+                                   profiler=profiler)
+    finally:
+        if setup_pool:
+            setup_pool.close()
+
+    if validation_record and response.get("valid"):
+        from .git_skip import GitSkipError
+
+        try:
+            validation_record.save(dirs=setup_2_upy_package.scanned_dirs)
+        except (GitSkipError, OSError) as e:
+            logger.debug("Failed to record the validation: {}".format(e))
+
+    return response
+
+
 def main():
     # parse CLI arguments
     args = parse_arguments()
@@ -152,50 +773,56 @@ def main():
                                      max(log_levels.keys()))])
     logger.disabled = not args.debug
 
-    setup_file = args.setup_file
-    package_file = args.package_file
-    package_changelog_file = args.package_changelog_file
-    do_validate = args.do_validate
-    dump_to_file = args.dump_to_file
-    print_result = args.print_result
-    pretty_output = args.pretty_output
-    ignore_version = args.ignore_version
-    ignore_deps = args.ignore_deps
-    ignore_boot_main = args.ignore_boot_main
-
-    setup_2_upy_package = Setup2uPyPackage(
-        setup_file=setup_file,
-        package_file=package_file,
-        package_changelog_file=package_changelog_file,
-        logger=logger)
-
-    package_data = setup_2_upy_package.package_data
-
-    if do_validate:
-        validation_result = setup_2_upy_package.validate(
-            ignore_version=ignore_version,
-            ignore_deps=ignore_deps,
-            ignore_boot_main=ignore_boot_main)
-
-        if validation_result is False:
-            diff = setup_2_upy_package.validation_diff
-
-            if pretty_output:
-                stdout.write(json.dumps(diff, indent=4))
-            else:
-                stdout.write(json.dumps(diff))
-            raise SystemExit('Mismatch between setup.py data and package.json')
-
-    if print_result:
-        if pretty_output:
+    if args.command == 'serve':
+        serve(args=args, logger=logger)
+        return
+
+    if args.batch_file or args.batch_glob:
+        raise SystemExit(run_batch(args=args, logger=logger))
+
+    if args.watch:
+        watch(args=args, logger=logger)
+        return
+
+    if args.minify_dir:
+        minify(args=args, logger=logger)
+        return
+
+    if args.bundle_file:
+        bundle(args=args, logger=logger)
+        return
+
+    response = run_package(args=args, logger=logger)
+
+    if "profile" in response:
+        stderr.write(json.dumps(response["profile"]) + "\n")
+
+    if response.get("valid") is False:
+        if args.pretty_output:
+            stdout.write(json.dumps(response["diff"], indent=4))
+        else:
+            stdout.write(json.dumps(response["diff"]))
+
+    if response.get("url_check"):
+        if args.pretty_output:
+            stdout.write(json.dumps(response["url_check"], indent=4))
+        else:
+            stdout.write(json.dumps(response["url_check"]))
+
+    if not response["success"]:
+        raise SystemExit(response["error"])
+
+    if args.print_result:
+        package_data = response["package_data"]
+        if "variants" in response:
+            package_data = {"package_data": package_data,
+                            "variants": response["variants"]}
+
+        if args.pretty_output:
             stdout.write(json.dumps(package_data, indent=4))
         else:
             stdout.write(json.dumps(package_data))
 
-    if dump_to_file:
-        setup_2_upy_package.create(output_path=package_file,
-                                   pretty=pretty_output)
-
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Compact model of a MicroPython package.json manifest
+
+URL and hash entries are named tuples instead of two element lists, their
+file paths are interned, so the path shared by the URL and the hash entry of
+a file is stored once. URLs are created by a string join of a prefix, which
+is normalized once per manifest, and the file path instead of a Path object
+per file.
+
+The model serializes to the same JSON as the plain package data dict, see
+Manifest.to_dict.
+"""
+
+import sys
+from pathlib import PurePosixPath
+from typing import Iterable, List, NamedTuple, Optional
+
+
+class UrlEntry(NamedTuple):
+    """File path and download URL of a file"""
+    path: str
+    url: str
+
+
+class HashEntry(NamedTuple):
+    """File path and SHA256 hex digest of a file"""
+    path: str
+    digest: str
+
+
+def url_prefix(url: str) -> str:
+    """
+    Get normalized prefix of the URLs of all files
+
+    The prefix equals the string of a Path of the URL followed by a slash,
+    e.g. trailing slashes are removed. It is empty for the current directory.
+
+    :param      url:  The URL
+    :type       url:  str
+
+    :returns:   The prefix
+    :rtype:     str
+    """
+    prefix = str(PurePosixPath(url))
+
+    return "" if prefix == "." else prefix + "/"
+
+
+def url_entries(paths: Iterable[str], url: str) -> List[UrlEntry]:
+    """
+    Create URL entries of files
+
+    :param      paths:  The relative POSIX paths of the files
+    :type       paths:  Iterable[str]
+    :param      url:    The URL of the files
+    :type       url:    str
+
+    :returns:   The URL entries
+    :rtype:     List[UrlEntry]
+    """
+    prefix = url_prefix(url=url)
+    intern = sys.intern
+
+    return [UrlEntry(intern(path), prefix + path) for path in paths]
+
+
+class Manifest(object):
+    """mip compatible package.json data"""
+
+    __slots__ = ("urls", "deps", "version", "hashes")
+
+    def __init__(self,
+                 urls: List[UrlEntry],
+                 deps: list,
+                 version: str,
+                 hashes: Optional[List[HashEntry]] = None) -> None:
+        """
+        Init Manifest class
+
+        :param      urls:     The URL entries
+        :type       urls:     List[UrlEntry]
+        :param      deps:     The dependencies
+        :type       deps:     list
+        :param      version:  The version
+        :type       version:  str
+        :param      hashes:   The hash entries, not part of the manifest if
+                              None
+        :type       hashes:   Optional[List[HashEntry]]
+        """
+        self.urls = urls
+        self.deps = deps
+        self.version = version
+        self.hashes = hashes
+
+    @property
+    def paths(self) -> List[str]:
+        """
+        Get file paths of all URL entries
+
+        :returns:   The file paths
+        :rtype:     List[str]
+        """
+        return [entry.path for entry in self.urls]
+
+    def to_dict(self, plain: bool = True) -> dict:
+        """
+        Get package.json data of the manifest
+
+        Entries are serialized as JSON arrays in both cases.
+
+        :param      plain:  Flag to convert entries to lists, e.g. to compare
+                            with loaded JSON data, otherwise the entries are
+                            shared with the manifest
+        :type       plain:  bool
+
+        :returns:   The package.json data
+        :rtype:     dict
+        """
+        def entries(values: list) -> list:
+            return [list(ele) for ele in values] if plain else list(values)
+
+        data = {
+            "urls": entries(self.urls),
+            "deps": list(self.deps),
+            "version": self.version,
+        }
+        if self.hashes is not None:
+            data["hashes"] = entries(self.hashes)
+
+        return data
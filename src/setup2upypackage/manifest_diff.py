@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Difference of two MicroPython package.json manifests
+
+The "urls" and "hashes" entries of both manifests are indexed by their
+destination path, so missing, extra and changed entries are found in linear
+time. Malformed entries, which are not a pair of a path and a value, are
+reported as "invalid". Dependencies are looked up in a set as well, the same
+dependencies in another order are reported as "reordered".
+
+The report is a compact JSON serializable dict, long lists are truncated to
+a maximum number of entries with a summary of the total counts.
+"""
+
+from typing import Any, Dict, List, Optional
+
+
+class ManifestDiff(object):
+    """Difference of an expected and an actual package.json manifest"""
+
+    #: Default maximum number of reported entries per list
+    MAX_ENTRIES = 100
+
+    #: Entries of [path, value] lists compared by their path
+    PATH_KEYS = ("urls", "hashes")
+
+    def __init__(self,
+                 expected: dict,
+                 actual: dict,
+                 max_entries: Optional[int] = MAX_ENTRIES) -> None:
+        """
+        Init ManifestDiff class
+
+        :param      expected:     The expected manifest, based on setup.py
+        :type       expected:     dict
+        :param      actual:       The actual manifest, e.g. package.json
+        :type       actual:       dict
+        :param      max_entries:  Maximum entries per list, None for all
+        :type       max_entries:  Optional[int]
+        """
+        self._expected = expected
+        self._actual = actual
+        self._max_entries = max_entries
+        self._truncated = {}
+
+        self._report = self._compare()
+
+    @property
+    def report(self) -> Dict[str, Any]:
+        """
+        Get difference report, empty if both manifests are equal
+
+        :returns:   The difference report
+        :rtype:     Dict[str, Any]
+        """
+        return self._report
+
+    @property
+    def is_equal(self) -> bool:
+        """
+        Determine whether both manifests are equal
+
+        :returns:   True if equal, False otherwise
+        :rtype:     bool
+        """
+        return not self._report
+
+    def _limit(self, name: str, entries: List[Any]) -> List[Any]:
+        """
+        Limit a list of entries to the maximum number of entries
+
+        :param      name:     The name of the list in the report
+        :type       name:     str
+        :param      entries:  The entries
+        :type       entries:  List[Any]
+
+        :returns:   The (truncated) entries
+        :rtype:     List[Any]
+        """
+        if self._max_entries is not None and \
+                len(entries) > self._max_entries:
+            self._truncated[name] = len(entries)
+            return entries[:self._max_entries]
+
+        return entries
+
+    @staticmethod
+    def _index_entries(entries: List[List[str]]) -> tuple:
+        """
+        Index entries by their destination path
+
+        :param      entries:  The entries, each of [path, value]
+        :type       entries:  List[List[str]]
+
+        :returns:   Dict of path to value, dict of duplicated path counts and
+                    list of malformed entries
+        :rtype:     tuple
+        """
+        index = {}
+        duplicates = {}
+        invalid = []
+
+        if not isinstance(entries, list):
+            return index, duplicates, [entries]
+
+        for entry in entries:
+            if not isinstance(entry, (list, tuple)) or len(entry) != 2 or \
+                    not isinstance(entry[0], str):
+                invalid.append(entry)
+                continue
+
+            path, value = entry
+            if path in index:
+                duplicates[path] = duplicates.get(path, 1) + 1
+            index[path] = value
+
+        return index, duplicates, invalid
+
+    def _compare_entries(self,
+                         name: str,
+                         expected: list,
+                         actual: list) -> dict:
+        """
+        Compare [path, value] entries of both manifests, e.g. the URLs
+
+        :param      name:      The name of the entries in the report
+        :type       name:      str
+        :param      expected:  The expected entries
+        :type       expected:  list
+        :param      actual:    The actual entries
+        :type       actual:    list
+
+        :returns:   Difference of the entries, empty if equal
+        :rtype:     dict
+        """
+        expected_index, expected_duplicates, expected_invalid = \
+            self._index_entries(expected)
+        actual_index, actual_duplicates, actual_invalid = \
+            self._index_entries(actual)
+
+        missing = [[path, value] for path, value in expected_index.items()
+                   if path not in actual_index]
+        extra = [[path, value] for path, value in actual_index.items()
+                 if path not in expected_index]
+        changed = [
+            {"path": path, "expected": value, "actual": actual_index[path]}
+            for path, value in expected_index.items()
+            if path in actual_index and actual_index[path] != value
+        ]
+        # paths listed a different number of times
+        duplicates = sorted(
+            path for path in set(expected_duplicates) | set(actual_duplicates)
+            if expected_duplicates.get(path, 1) !=
+            actual_duplicates.get(path, 1)
+        )
+
+        result = {}
+        for kind, entries in (("missing", missing),
+                              ("extra", extra),
+                              ("changed", changed),
+                              ("duplicates", duplicates),
+                              ("invalid", expected_invalid + actual_invalid)):
+            if entries:
+                result[kind] = self._limit(name="{}.{}".format(name, kind),
+                                           entries=entries)
+
+        return result
+
+    def _compare_deps(self, expected: list, actual: list) -> dict:
+        """
+        Compare dependencies of both manifests
+
+        :param      expected:  The expected dependencies
+        :type       expected:  list
+        :param      actual:    The actual dependencies
+        :type       actual:    list
+
+        :returns:   Difference of the dependencies, empty if equal
+        :rtype:     dict
+        """
+        if expected == actual:
+            return {}
+
+        # dependencies might be given as [name, version] lists
+        expected_keys = [repr(ele) for ele in expected]
+        expected_key_set = set(expected_keys)
+        actual_keys = set(repr(ele) for ele in actual)
+
+        result = {}
+        missing = [ele for ele, key in zip(expected, expected_keys)
+                   if key not in actual_keys]
+        extra = [ele for ele in actual if repr(ele) not in expected_key_set]
+
+        if missing:
+            result["missing"] = self._limit(name="deps.missing",
+                                            entries=missing)
+        if extra:
+            result["extra"] = self._limit(name="deps.extra", entries=extra)
+        if not missing and not extra:
+            result["reordered"] = {"expected": expected, "actual": actual}
+
+        return result
+
+    def _compare(self) -> Dict[str, Any]:
+        """
+        Compare both manifests
+
+        :returns:   The difference report
+        :rtype:     Dict[str, Any]
+        """
+        report = {}
+        expected = self._expected
+        actual = self._actual
+
+        for name in self.PATH_KEYS:
+            if name in expected or name in actual:
+                entries = self._compare_entries(
+                    name=name,
+                    expected=expected.get(name, []),
+                    actual=actual.get(name, []))
+                if entries:
+                    report[name] = entries
+
+        if "deps" in expected or "deps" in actual:
+            deps = self._compare_deps(expected=expected.get("deps", []),
+                                      actual=actual.get("deps", []))
+            if deps:
+                report["deps"] = deps
+
+        for key in sorted(set(expected) | set(actual)):
+            if key in self.PATH_KEYS or key == "deps":
+                continue
+
+            if key not in actual:
+                report[key] = {"expected": expected[key]}
+            elif key not in expected:
+                report[key] = {"actual": actual[key]}
+            elif expected[key] != actual[key]:
+                report[key] = {
+                    "expected": expected[key],
+                    "actual": actual[key]
+                }
+
+        if self._truncated:
+            report["truncated"] = self._truncated
+
+        return report
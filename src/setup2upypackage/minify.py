@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Minify the Python files of a package for devices with little flash and RAM
+
+Docstrings and comments are removed, each indentation level is reduced to a
+single space and bracketed continuation lines are joined. The result is
+checked to compile to the same AST as the original file without docstrings.
+The minified copies are written to an output directory together with a
+package.json file pointing to them.
+
+Minifying requires Python 3.8 or newer, as older versions do not provide the
+end position of a docstring.
+"""
+
+import ast
+import io
+import json
+import logging
+import multiprocessing
+import os
+import re
+import sys
+import tokenize
+from pathlib import Path
+from typing import Iterator, List, Optional, Set, Tuple
+
+from .setup2upypackage import Setup2uPyPackage, write_if_changed
+
+#: Tokens without output
+_SKIPPED_TOKENS = (tokenize.COMMENT, tokenize.NL, tokenize.ENCODING,
+                   tokenize.ENDMARKER)
+
+#: Python 3.8+ provides end positions of nodes and parses strings as Constant
+_HAS_END_POSITIONS = sys.version_info >= (3, 8)
+
+#: Token starting an f-string, Python 3.12+
+_FSTRING_START = getattr(tokenize, 'FSTRING_START', None)
+_FSTRING_END = getattr(tokenize, 'FSTRING_END', None)
+
+
+class MinifyError(Exception):
+    """Base class for exceptions in this module."""
+    pass
+
+
+def _is_docstring(node: ast.AST) -> bool:
+    """
+    Determine whether a statement is a string expression
+
+    :param      node:  The statement
+    :type       node:  ast.AST
+
+    :returns:   True if the statement is a string expression
+    :rtype:     bool
+    """
+    if not isinstance(node, ast.Expr):
+        return False
+
+    if not _HAS_END_POSITIONS:
+        # strings are parsed as ast.Str before Python 3.8
+        return isinstance(node.value, ast.Str)
+
+    return isinstance(node.value, ast.Constant) and \
+        isinstance(node.value.value, str)
+
+
+def _docstring_nodes(tree: ast.AST) -> Iterator[Tuple[ast.AST, ast.Expr]]:
+    """
+    Get docstring expressions of a module, its classes and functions
+
+    :param      tree:  The parsed module
+    :type       tree:  ast.AST
+
+    :returns:   Generator of the owning node and its docstring expression
+    :rtype:     Iterator[Tuple[ast.AST, ast.Expr]]
+    """
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef,
+                                 ast.AsyncFunctionDef)):
+            continue
+
+        if node.body and _is_docstring(node.body[0]):
+            yield node, node.body[0]
+
+
+def strip_docstrings(tree: ast.AST) -> ast.AST:
+    """
+    Remove docstrings of a module, its classes and functions
+
+    A body consisting of the docstring only is replaced by "pass".
+
+    :param      tree:  The parsed module, modified in place
+    :type       tree:  ast.AST
+
+    :returns:   The module without docstrings
+    :rtype:     ast.AST
+    """
+    for node, docstring in list(_docstring_nodes(tree)):
+        node.body.pop(0)
+        if not node.body and not isinstance(node, ast.Module):
+            node.body.append(ast.Pass())
+
+    return tree
+
+
+def minify_source(source: str) -> str:
+    """
+    Minify Python source code
+
+    :param      source:  The source code
+    :type       source:  str
+
+    :returns:   The minified source code
+    :rtype:     str
+
+    :raises     MinifyError:  Python is older than 3.8
+    """
+    if not _HAS_END_POSITIONS:
+        raise MinifyError("Minifying requires Python 3.8 or newer")
+
+    tree = ast.parse(source)
+    lines = source.splitlines(keepends=True)
+
+    def _position(lineno: int, col_offset: int) -> Tuple[int, int]:
+        # AST column offsets are UTF-8 byte offsets, tokens use characters
+        line = lines[lineno - 1].encode()
+        return lineno, len(line[:col_offset].decode())
+
+    # docstring start position -> end position and replacement, which is
+    # "pass" if the docstring is the only statement of a body
+    docstrings = {}
+    for node, docstring in _docstring_nodes(tree):
+        replacement = 'pass' if len(node.body) == 1 and \
+            not isinstance(node, ast.Module) else ''
+        start = _position(docstring.lineno, docstring.col_offset)
+        end = _position(docstring.end_lineno, docstring.end_col_offset)
+        docstrings[start] = (end, replacement)
+
+    # absolute offset of each line start to slice the source
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line))
+
+    def _offset(position: Tuple[int, int]) -> int:
+        return offsets[position[0] - 1] + position[1]
+
+    output = []
+    line = []
+    depth = 0
+    prev_end = None
+    skip_until = None
+    fstring_depth = 0
+    fstring_start = None
+
+    tokens = tokenize.generate_tokens(io.StringIO(source).readline)
+    for token in tokens:
+        # copy f-strings verbatim, whitespace inside is significant
+        if token.type == _FSTRING_START:
+            if fstring_depth == 0:
+                fstring_start = token.start
+            fstring_depth += 1
+            continue
+        if fstring_depth:
+            if token.type == _FSTRING_END:
+                fstring_depth -= 1
+                if fstring_depth == 0:
+                    token = tokenize.TokenInfo(
+                        tokenize.STRING,
+                        source[_offset(fstring_start):_offset(token.end)],
+                        fstring_start, token.end, token.line)
+                else:
+                    continue
+            else:
+                continue
+
+        if skip_until is not None:
+            if token.start < skip_until:
+                continue
+            skip_until = None
+            # remove the statement separator of a removed docstring
+            if token.type == tokenize.OP and token.string == ';':
+                continue
+
+        if token.type == tokenize.INDENT:
+            depth += 1
+            continue
+        if token.type == tokenize.DEDENT:
+            depth -= 1
+            continue
+        if token.type in _SKIPPED_TOKENS:
+            continue
+        if token.type == tokenize.NEWLINE:
+            if line:
+                output.append(''.join(line).rstrip() + '\n')
+            line = []
+            prev_end = None
+            continue
+
+        string = token.string
+        if token.type == tokenize.STRING and token.start in docstrings:
+            skip_until, string = docstrings[token.start]
+            if not string:
+                continue
+
+        if not line:
+            line.append(' ' * depth)
+        elif prev_end is not None:
+            gap = source[_offset(prev_end):_offset(token.start)]
+            if '\\' in gap:
+                line.append(' \\\n')
+            elif gap:
+                line.append(' ')
+
+        line.append(string)
+        prev_end = token.end if skip_until is None else skip_until
+
+    if line:
+        output.append(''.join(line).rstrip() + '\n')
+
+    return ''.join(output)
+
+
+def is_equivalent(source: str, minified: str) -> bool:
+    """
+    Determine whether minified source code has the same AST as the original
+
+    :param      source:    The original source code
+    :type       source:    str
+    :param      minified:  The minified source code
+    :type       minified:  str
+
+    :returns:   True if the ASTs without docstrings are equal
+    :rtype:     bool
+    """
+    try:
+        minified_tree = ast.parse(minified)
+    except SyntaxError:
+        return False
+
+    return ast.dump(strip_docstrings(ast.parse(source))) == \
+        ast.dump(strip_docstrings(minified_tree))
+
+
+def _minify_file(job: Tuple[str, str]) -> dict:
+    """
+    Minify a single file
+
+    This function is executed inside a pool worker process.
+
+    :param      job:  The source and destination path
+    :type       job:  Tuple[str, str]
+
+    :returns:   Result with the file sizes and an optional error
+    :rtype:     dict
+    """
+    source_path, output_path = job
+    result = {
+        "file": source_path,
+        "minified_file": output_path,
+        "size": None,
+        "minified_size": None,
+        "saved": None,
+        "changed": None,
+        "error": None,
+    }
+
+    try:
+        with open(source_path, 'rb') as f:
+            content = f.read()
+        source = content.decode()
+        minified = minify_source(source)
+
+        if not is_equivalent(source, minified):
+            raise MinifyError("Minified file differs from the original")
+
+        minified_content = minified.encode()
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        result["changed"] = write_if_changed(path=Path(output_path),
+                                             content=minified_content)
+        result["size"] = len(content)
+        result["minified_size"] = len(minified_content)
+        result["saved"] = len(content) - len(minified_content)
+    except (Exception, SystemExit) as e:
+        result["error"] = "{}: {}".format(type(e).__name__, e)
+
+    return result
+
+
+class Minifier(object):
+    """Write minified copies of the package files and their package.json"""
+
+    def __init__(self,
+                 setup_2_upy_package: Setup2uPyPackage,
+                 output_dir: Path,
+                 processes: Optional[int] = None,
+                 logger: Optional[logging.Logger] = None) -> None:
+        """
+        Init Minifier class
+
+        :param      setup_2_upy_package:  The package
+        :type       setup_2_upy_package:  Setup2uPyPackage
+        :param      output_dir:           The output directory, inside the
+                                          directory of the setup.py file
+        :type       output_dir:           Path
+        :param      processes:            Number of worker processes, CPU
+                                          count if None
+        :type       processes:            Optional[int]
+        :param      logger:               Logger object
+        :type       logger:               Optional[logging.Logger]
+
+        :raises     MinifyError:  Output directory is not inside the
+                                  directory of the setup.py file or Python
+                                  is older than 3.8
+        """
+        if logger is None:
+            logger = logging.getLogger(__name__)
+        self._logger = logger
+
+        if not _HAS_END_POSITIONS:
+            raise MinifyError("Minifying requires Python 3.8 or newer")
+
+        self._package = setup_2_upy_package
+        self._root_dir = setup_2_upy_package.root_dir.resolve()
+        self._output_dir = Path(output_dir).resolve()
+        self._processes = processes
+
+        try:
+            self._rel_output_dir = \
+                self._output_dir.relative_to(self._root_dir).as_posix()
+        except ValueError:
+            raise MinifyError("Output directory {} is not inside {}".format(
+                self._output_dir, self._root_dir))
+
+    @property
+    def package_file(self) -> Path:
+        """
+        Get path of the package.json file of the minified files
+
+        :returns:   The package.json file path
+        :rtype:     Path
+        """
+        return self._output_dir / 'package.json'
+
+    def _minified_files(self) -> Set[str]:
+        """
+        Get the Python files of all packages, except excluded files
+
+        :returns:   Relative POSIX paths of the files
+        :rtype:     Set[str]
+        """
+        package_files = set(file.as_posix()
+                            for file in self._package.package_files
+                            if file.suffix == '.py')
+
+        return package_files.intersection(self._package.file_paths)
+
+    def package_data(self) -> dict:
+        """
+        Get package data with URLs of the minified copies
+
+        :returns:   mip compatible package.json data
+        :rtype:     dict
+        """
+        minified_files = self._minified_files()
+        package_data = dict(self._package.package_data)
+
+        package_data["urls"] = [
+            [path, re.sub(r'/{}$'.format(re.escape(path)),
+                          '/{}/{}'.format(self._rel_output_dir, path),
+                          url)]
+            if path in minified_files else [path, url]
+            for path, url in package_data["urls"]
+        ]
+        # hashes of the original files do not match the copies
+        package_data.pop("hashes", None)
+
+        return package_data
+
+    def run(self, pretty: bool = False) -> List[dict]:
+        """
+        Write the minified files and their package.json file
+
+        :param      pretty:  Flag to use an indentation of 4
+        :type       pretty:  bool
+
+        :returns:   Result per file with the number of saved bytes
+        :rtype:     List[dict]
+
+        :raises     MinifyError:  A file could not be minified
+        """
+        jobs = [(str(self._root_dir / file),
+                 str(self._output_dir / file))
+                for file in sorted(self._minified_files())]
+
+        results = []
+        if jobs:
+            with multiprocessing.Pool(processes=self._processes) as pool:
+                results = pool.map(_minify_file, jobs)
+
+        failed = [ele for ele in results if ele["error"]]
+        if failed:
+            raise MinifyError("Failed to minify {}".format(
+                ', '.join('{} ({})'.format(ele["file"], ele["error"])
+                          for ele in failed)))
+
+        for result in results:
+            self._logger.debug("Minified {}: {} bytes saved".format(
+                result["file"], result["saved"]))
+        self._logger.info("{} bytes saved in {} files".format(
+            sum(ele["saved"] for ele in results), len(results)))
+
+        indent = 4 if pretty else None
+        os.makedirs(self._output_dir, exist_ok=True)
+        write_if_changed(
+            path=self.package_file,
+            content=json.dumps(self.package_data(), indent=indent).encode())
+
+        return results
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Wall time and peak memory of the phases of a package run
+
+Methods of Setup2uPyPackage decorated with "phase" report an event to all
+registered hooks after each call
+
+    {"phase": "package_files", "wall_time": 0.0021, "self_time": 0.0021,
+     "peak_memory": 20480, "depth": 1}
+
+"wall_time" includes nested phases, e.g. the "urls" phase contains the
+"package_files" and "data_files" phases if those are not cached yet,
+"self_time" excludes them. "peak_memory" is the peak of memory allocated
+during the phase in bytes, measured with tracemalloc. It is None if
+tracemalloc is not tracing or the Python version can not reset the peak.
+
+Without registered hooks the decorated methods are called directly.
+"""
+
+import functools
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+#: Phases of a package run
+PHASE_PARSE_SETUP = 'parse_setup'
+PHASE_VERSION = 'version'
+PHASE_DEPS = 'deps'
+PHASE_PACKAGE_FILES = 'package_files'
+PHASE_DATA_FILES = 'data_files'
+PHASE_URLS = 'urls'
+PHASE_HASHES = 'hashes'
+PHASE_PACKAGE_JSON = 'package_json'
+PHASE_DIFF = 'diff'
+PHASE_WRITE = 'write'
+PHASE_CHECK_URLS = 'check_urls'
+
+# Python 3.9+
+_reset_peak = getattr(tracemalloc, 'reset_peak', None)
+
+
+class _Frame(object):
+    """Running phase"""
+
+    __slots__ = ('name', 'start', 'child_time', 'start_memory', 'peak')
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.start = time.perf_counter()
+        self.child_time = 0.0
+        self.start_memory = None
+        self.peak = None
+
+
+class PhaseRecorder(object):
+    """Measure phases and report them to registered hooks"""
+
+    def __init__(self,
+                 hooks: Optional[List[Callable[[dict], None]]] = None) -> None:
+        """
+        Init PhaseRecorder class
+
+        :param      hooks:  The hooks, called with the event of each phase
+        :type       hooks:  Optional[List[Callable[[dict], None]]]
+        """
+        self.hooks = list(hooks or [])
+        self._stack = []
+
+    def _trace_memory(self) -> bool:
+        """
+        Determine whether the peak memory of phases can be measured
+
+        :returns:   True if tracemalloc is tracing and can reset the peak
+        :rtype:     bool
+        """
+        return _reset_peak is not None and tracemalloc.is_tracing()
+
+    def enter(self, name: str) -> None:
+        """
+        Start a phase
+
+        :param      name:  The phase name
+        :type       name:  str
+        """
+        frame = _Frame(name=name)
+
+        if self._trace_memory():
+            current, peak = tracemalloc.get_traced_memory()
+            # keep the peak of the outer phase before resetting it
+            if self._stack and self._stack[-1].peak is not None:
+                self._stack[-1].peak = max(self._stack[-1].peak, peak)
+            _reset_peak()
+            frame.start_memory = current
+            frame.peak = current
+
+        self._stack.append(frame)
+
+    def exit(self) -> None:
+        """Finish the current phase and report it to all hooks"""
+        frame = self._stack.pop()
+        wall_time = time.perf_counter() - frame.start
+        peak_memory = None
+
+        if frame.peak is not None and self._trace_memory():
+            frame.peak = max(frame.peak, tracemalloc.get_traced_memory()[1])
+            _reset_peak()
+            peak_memory = frame.peak - frame.start_memory
+
+        if self._stack:
+            parent = self._stack[-1]
+            parent.child_time += wall_time
+            if parent.peak is not None and frame.peak is not None:
+                parent.peak = max(parent.peak, frame.peak)
+
+        event = {
+            "phase": frame.name,
+            "wall_time": wall_time,
+            "self_time": wall_time - frame.child_time,
+            "peak_memory": peak_memory,
+            "depth": len(self._stack),
+        }
+        for hook in list(self.hooks):
+            hook(event)
+
+
+def phase(name: str) -> Callable:
+    """
+    Decorate a method of an object with a "_phase_recorder" as phase
+
+    :param      name:  The phase name
+    :type       name:  str
+
+    :returns:   The decorator
+    :rtype:     Callable
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs) -> Any:
+            recorder = self._phase_recorder
+            if not recorder.hooks:
+                return func(self, *args, **kwargs)
+
+            recorder.enter(name=name)
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                recorder.exit()
+
+        return wrapper
+
+    return decorator
+
+
+class PhaseProfiler(object):
+    """Hook collecting the events of all phases into a profile"""
+
+    def __init__(self, trace_memory: bool = True) -> None:
+        """
+        Init PhaseProfiler class
+
+        :param      trace_memory:  Flag to start tracemalloc to measure the
+                                   peak memory of each phase
+        :type       trace_memory:  bool
+        """
+        self._trace_memory = trace_memory
+        self._started_tracing = False
+        self._events = []
+
+    def __call__(self, event: dict) -> None:
+        """
+        Collect an event
+
+        :param      event:  The event of a finished phase
+        :type       event:  dict
+        """
+        self._events.append(event)
+
+    @property
+    def events(self) -> List[dict]:
+        """
+        Get all collected events in the order the phases finished
+
+        :returns:   The events
+        :rtype:     List[dict]
+        """
+        return self._events
+
+    def start(self) -> None:
+        """Start tracing memory allocations, if not already tracing"""
+        if self._trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stop(self) -> None:
+        """Stop tracing memory allocations, if started by this profiler"""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def __enter__(self) -> 'PhaseProfiler':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Get the profile of all phases
+
+        Phases are listed in the order they first finished. Times of several
+        calls of a phase are summed up, of the memory the maximum is taken.
+
+        :returns:   JSON serializable profile
+        :rtype:     Dict[str, Any]
+        """
+        phases = {}
+
+        for event in self._events:
+            entry = phases.setdefault(event["phase"], {
+                "phase": event["phase"],
+                "calls": 0,
+                "wall_time": 0.0,
+                "self_time": 0.0,
+                "peak_memory": None,
+            })
+            entry["calls"] += 1
+            entry["wall_time"] += event["wall_time"]
+            entry["self_time"] += event["self_time"]
+            if event["peak_memory"] is not None:
+                entry["peak_memory"] = max(entry["peak_memory"] or 0,
+                                           event["peak_memory"])
+
+        peaks = [ele["peak_memory"] for ele in phases.values()
+                 if ele["peak_memory"] is not None]
+
+        return {
+            "wall_time": sum(ele["wall_time"] for ele in self._events
+                             if ele["depth"] == 0),
+            "peak_memory": max(peaks) if peaks else None,
+            "phases": list(phases.values()),
+        }
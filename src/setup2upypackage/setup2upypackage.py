@@ -8,14 +8,25 @@ files
 
 import json
 import logging
+import os
 import sys
-from distutils.core import run_setup
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 
-from changelog2version.extract_version import ExtractVersion
-from deepdiff import DeepDiff
-from mock import Mock
+from .changelog import extract_version
+from .exclude import BOOT_MAIN_PATTERNS, ExcludeError, ExcludeMatcher
+from .manifest import HashEntry, Manifest, UrlEntry, url_entries
+from .manifest_diff import ManifestDiff
+from .profiling import (PHASE_CHECK_URLS, PHASE_DATA_FILES, PHASE_DEPS,
+                        PHASE_DIFF, PHASE_HASHES, PHASE_PACKAGE_FILES,
+                        PHASE_PACKAGE_JSON, PHASE_PARSE_SETUP, PHASE_URLS,
+                        PHASE_VERSION, PHASE_WRITE, PhaseRecorder, phase)
+from .static_setup import StaticSetupError, StaticSetupParser
+from .url_template import UrlTemplate
+
+if TYPE_CHECKING:
+    # imported on demand, as multiprocessing is slow to import
+    from .setup_pool import SetupPool
 
 
 class Setup2uPyPackageError(Exception):
@@ -23,18 +34,84 @@ class Setup2uPyPackageError(Exception):
     pass
 
 
+def write_if_changed(path: Path, content: bytes) -> bool:
+    """
+    Write a file atomically if its content changes
+
+    The content is written to a temporary file in the same directory first,
+    which then replaces the existing file keeping its permissions.
+
+    :param      path:     The file path
+    :type       path:     Path
+    :param      content:  The content
+    :type       content:  bytes
+
+    :returns:   True if the file was written, False if it is up to date
+    :rtype:     bool
+    """
+    path = Path(path)
+    mode = 0o666
+
+    try:
+        with open(path, 'rb') as file:
+            if file.read() == content:
+                return False
+            mode = os.fstat(file.fileno()).st_mode & 0o7777
+    except OSError:
+        pass
+
+    # unique name in the same directory, created with the umask applied
+    tmp_path = path.with_name('.{}.{}.tmp'.format(path.name,
+                                                  os.urandom(4).hex()))
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, mode)
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(content)
+        if mode != 0o666:
+            # keep the permissions of the replaced file
+            os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+    return True
+
+
 class Setup2uPyPackage(object):
     """Handle MicroPython package JSON creation and validation"""
 
+    #: Engine executing the setup.py file with distutils "run_setup"
+    ENGINE_RUN_SETUP = "run_setup"
+    #: Engine statically evaluating the setup.py file, see StaticSetupParser
+    ENGINE_AST = "ast"
+    ENGINES = (ENGINE_RUN_SETUP, ENGINE_AST)
+    #: Engine reading a pyproject.toml or setup.cfg file, used for those
+    #: files independent of the configured engine
+    ENGINE_DECLARATIVE = "declarative"
+
+    #: setup() arguments used to create the package.json data
+    SETUP_KEYS = StaticSetupParser.SETUP_KEYS
+
     def __init__(self,
                  setup_file: Path,
                  package_file: Optional[Path],
                  package_changelog_file: Optional[Path],
-                 logger: Optional[logging.Logger] = None) -> None:
+                 logger: Optional[logging.Logger] = None,
+                 engine: str = ENGINE_RUN_SETUP,
+                 cache_dir: Optional[Path] = None,
+                 recursive_packages: bool = False,
+                 hashes: bool = False,
+                 hooks: Optional[List[Callable[[dict], None]]] = None,
+                 setup_pool: Optional['SetupPool'] = None,
+                 git_files: bool = False,
+                 excludes: Optional[List[str]] = None,
+                 version_file: Optional[Path] = None) -> None:
         """
         Init Setup2uPyPackage class
 
-        :param      setup_file:    The setup.py file
+        :param      setup_file:    The setup.py, pyproject.toml or setup.cfg
+                                   file
         :type       setup_file:    Path
         :param      package_file:  The package.json file
         :type       package_file:  Optional[Path]
@@ -42,6 +119,37 @@ class Setup2uPyPackage(object):
         :type       package_file:  Optional[Path]
         :param      logger:        Logger object
         :type       logger:        Optional[logging.Logger]
+        :param      engine:        The engine to parse the setup.py file
+        :type       engine:        str
+        :param      cache_dir:     The directory of the persistent cache
+        :type       cache_dir:     Optional[Path]
+        :param      recursive_packages:  Flag to include files of nested
+                                         subpackages of each package
+        :type       recursive_packages:  bool
+        :param      hashes:        Flag to add the SHA256 hashes of all files
+                                   to the package data
+        :type       hashes:        bool
+        :param      hooks:         Callbacks receiving the wall time and peak
+                                   memory of each phase, see add_hook
+        :type       hooks:         Optional[List[Callable[[dict], None]]]
+        :param      setup_pool:    The pool executing setup.py files in
+                                   isolated worker processes, in-process if
+                                   None
+        :type       setup_pool:    Optional[SetupPool]
+        :param      git_files:     Flag to search package and data files in
+                                   the git index instead of the file system
+        :type       git_files:     bool
+        :param      excludes:      Glob patterns of package and data files
+                                   to exclude, see ExcludeMatcher
+        :type       excludes:      Optional[List[str]]
+        :param      version_file:  The version.py file to statically read
+                                   the version from instead of the setup.py
+                                   or changelog file
+        :type       version_file:  Optional[Path]
+
+        :raises     Setup2uPyPackageError:  Unknown engine, invalid exclude
+                                            pattern or git files requested
+                                            outside of a git work tree
         """
         if logger is None:
             logger = self._create_logger()
@@ -50,11 +158,73 @@ class Setup2uPyPackage(object):
         self._setup_file = setup_file
         self._package_file = package_file
         self._package_changelog_file = package_changelog_file
+        self._version_file = version_file
+
+        if engine not in self.ENGINES:
+            raise Setup2uPyPackageError("Unknown engine '{}', use one of {}".
+                                        format(engine, self.ENGINES))
+        self._engine = engine
+        self._setup_engine = None
+        self._setup_read_files = None
+        self._setup_pool = setup_pool
+
+        self._metadata_cache = None
+        if cache_dir:
+            from .cache import MetadataCache
+
+            self._metadata_cache = MetadataCache(cache_dir=cache_dir,
+                                                 logger=self._logger)
+
+        from .file_index import FileIndex, FileIndexError, GitFileIndex
 
         self._setup_data = {}
         self._root_dir = self._setup_file.parent
+        if git_files:
+            try:
+                self._file_index = GitFileIndex(root_dir=self._root_dir)
+            except FileIndexError as e:
+                raise Setup2uPyPackageError(str(e))
+        else:
+            self._file_index = FileIndex(root_dir=self._root_dir)
+        self._recursive_packages = recursive_packages
+        self._hashes = hashes
+        self._excludes = list(excludes or [])
+        try:
+            self._exclude_matcher = ExcludeMatcher(patterns=self._excludes)
+        except ExcludeError as e:
+            raise Setup2uPyPackageError(str(e))
+        self._file_hasher = None
+        self._phase_recorder = PhaseRecorder(hooks=hooks)
+
+        # derived values, see _memoize
+        self._cache = {}
+        self._input_fingerprint = self._get_input_fingerprint()
+
+        self._setup_data = self._load_setup_data()
+
+    def add_hook(self, hook: Callable[[dict], None]) -> None:
+        """
+        Register a callback receiving the event of each finished phase
 
-        self._setup_data = self._parse_setup_file_content()
+        The event is a dict with the "phase" name, its "wall_time" and
+        "self_time" in seconds, its "peak_memory" in bytes and its nesting
+        "depth", see the profiling module.
+
+        :param      hook:  The callback
+        :type       hook:  Callable[[dict], None]
+        """
+        if hook not in self._phase_recorder.hooks:
+            self._phase_recorder.hooks.append(hook)
+
+    def remove_hook(self, hook: Callable[[dict], None]) -> None:
+        """
+        Unregister a callback registered with add_hook
+
+        :param      hook:  The callback
+        :type       hook:  Callable[[dict], None]
+        """
+        if hook in self._phase_recorder.hooks:
+            self._phase_recorder.hooks.remove(hook)
 
     @staticmethod
     def _create_logger(logger_name: str = None) -> logging.Logger:
@@ -87,22 +257,356 @@ class Setup2uPyPackage(object):
 
     def _parse_setup_file_content(self) -> dict:
         """
-        Parse setup.py file content
+        Parse setup.py file content with the configured engine
+
+        The "ast" engine falls back to "run_setup" if the setup.py file can
+        not be evaluated statically. The used engine is available as
+        "setup_engine" property afterwards. Declarative pyproject.toml and
+        setup.cfg files are read without executing any code.
 
-        see https://stackoverflow.com/a/61754034/13543363
+        The files read by a statically evaluated setup.py file are available
+        as "_setup_read_files" afterwards, None if not known.
 
         :returns:   Parsed setup.py file content
         :rtype:     dict
         """
-        sys.modules['sdist_upip'] = Mock()
-        res = run_setup(self._setup_file, stop_after="init")
+        from .declarative import (DeclarativeSetupError, is_declarative,
+                                  parse_declarative)
+
+        self._setup_read_files = None
+
+        if is_declarative(self._setup_file):
+            try:
+                setup_data = parse_declarative(path=self._setup_file)
+            except DeclarativeSetupError as e:
+                raise Setup2uPyPackageError(str(e))
+            self._setup_engine = self.ENGINE_DECLARATIVE
+            self._logger.debug("Read declarative {}".format(
+                Path(self._setup_file).name))
+            return setup_data
+
+        if self._engine == self.ENGINE_AST:
+            try:
+                # a version file replaces a possibly imported version
+                parser = StaticSetupParser(
+                    setup_file=self._setup_file,
+                    logger=self._logger,
+                    skip_keys=('version', ) if self._version_file else ())
+                setup_data = parser.parse()
+                self._setup_read_files = parser.read_files
+                self._setup_engine = self.ENGINE_AST
+                self._logger.debug("Parsed setup.py statically")
+                return setup_data
+            except StaticSetupError as e:
+                self._logger.info("Falling back to run_setup, setup.py can "
+                                  "not be evaluated statically: {}".format(e))
+
+        self._setup_engine = self.ENGINE_RUN_SETUP
+
+        return self._run_setup()
+
+    @phase(PHASE_PARSE_SETUP)
+    def _load_setup_data(self) -> dict:
+        """
+        Load setup.py file content from the persistent cache or parse it
+
+        The cache entry is keyed on the content of the setup.py and the
+        changelog file and contains the changelog version as well. Files
+        read by the setup.py file, e.g. a version.py file, are stored with
+        the entry, which is only used if none of them changed. The setup.py
+        data is not cached if these files can not be determined statically.
+
+        :returns:   Parsed setup.py file content
+        :rtype:     dict
+        """
+        if self._metadata_cache is None:
+            return self._parse_setup_file_content()
+
+        key = self._metadata_cache.key(self._setup_file,
+                                       self._package_changelog_file,
+                                       salt=self._engine + (
+                                           ':version_file'
+                                           if self._version_file else ''))
+        entry = self._metadata_cache.get(key)
+
+        if entry is not None and (
+                entry.get("read_files") is None or
+                entry.get("read_files_key") != self._metadata_cache.key(
+                    *entry["read_files"])):
+            self._logger.debug("Files read by setup.py changed")
+            entry = None
+
+        if entry is None:
+            setup_data = self._parse_setup_file_content()
+            read_files = self._setup_read_files
+            if self._setup_engine == self.ENGINE_RUN_SETUP:
+                read_files = StaticSetupParser(
+                    setup_file=self._setup_file,
+                    logger=self._logger).find_read_files()
+
+            entry = {
+                "engine": self._setup_engine,
+                "setup_data": {
+                    k: setup_data[k] for k in self.SETUP_KEYS
+                    if k in setup_data
+                },
+                "changelog_version": None,
+            }
+            if self._package_changelog_file:
+                entry["changelog_version"] = \
+                    self._get_package_changelog_version()
+
+            if read_files is None:
+                self._logger.debug("Not caching setup.py data, files read "
+                                   "by it are not known")
+            else:
+                entry["read_files"] = [str(ele) for ele in read_files]
+                entry["read_files_key"] = self._metadata_cache.key(
+                    *read_files)
+                self._metadata_cache.set(key, entry)
+        else:
+            self._logger.debug("Loaded setup.py data from cache")
+            self._setup_engine = entry["engine"]
+            setup_data = entry["setup_data"]
+            if setup_data.get('data_files'):
+                # JSON has no tuples
+                setup_data['data_files'] = [
+                    tuple(ele) for ele in setup_data['data_files']
+                ]
+
+        if entry["changelog_version"] is not None:
+            self._cache['package_changelog_version'] = (
+                self._memoize_token(self._package_changelog_file),
+                entry["changelog_version"]
+            )
 
-        kwargs = res.__dict__
-        kwargs.update(kwargs['metadata'].__dict__)
+        return setup_data
+
+    def _run_setup(self) -> dict:
+        """
+        Parse setup.py file content by executing it
+
+        The setup.py file is executed by a worker of the setup pool if one is
+        configured, in-process otherwise.
+
+        :returns:   Parsed setup.py file content
+        :rtype:     dict
+
+        :raises     Setup2uPyPackageError:  Execution by the setup pool failed
+        """
+        from .setup_pool import SetupPoolError, execute_setup
 
-        return kwargs
+        if self._setup_pool is None:
+            return execute_setup(setup_file=self._setup_file)
+
+        try:
+            return self._setup_pool.run(setup_file=self._setup_file)
+        except SetupPoolError as e:
+            raise Setup2uPyPackageError(str(e))
+
+    def _get_input_fingerprint(self) -> tuple:
+        """
+        Get modification time and size of all input files
+
+        :returns:   Tuple of (mtime, size) or None per input file
+        :rtype:     tuple
+        """
+        fingerprint = []
+
+        for file in (self._setup_file,
+                     self._package_file,
+                     self._package_changelog_file,
+                     self._version_file):
+            try:
+                stat = Path(file).stat()
+                fingerprint.append((stat.st_mtime_ns, stat.st_size))
+            except (OSError, TypeError):
+                fingerprint.append(None)
+
+        return tuple(fingerprint)
+
+    def _check_input_files(self) -> None:
+        """
+        Invalidate derived values depending on changed input files
+
+        The setup.py file is parsed again if it changed, a changed changelog,
+        version or package.json file only invalidates the values depending
+        on it.
+        """
+        fingerprint = self._get_input_fingerprint()
+
+        if fingerprint != self._input_fingerprint:
+            self._logger.debug("Input files changed, invalidating cache")
+            setup_file_changed, package_file_changed, changelog_changed, \
+                version_file_changed = [
+                    now != before for now, before in
+                    zip(fingerprint, self._input_fingerprint)
+                ]
+            self._input_fingerprint = fingerprint
+
+            if setup_file_changed:
+                self._cache.clear()
+                self._setup_data = self._load_setup_data()
+                return
+
+            if package_file_changed:
+                self._cache.pop('package_json_data', None)
+
+            if changelog_changed:
+                self._cache.pop('package_changelog_version', None)
+                self._cache.pop('manifest', None)
+                self._cache.pop('package_data', None)
+                if self._metadata_cache:
+                    self._setup_data = self._load_setup_data()
+
+            if version_file_changed:
+                self._cache.pop('package_file_version', None)
+                self._cache.pop('manifest', None)
+                self._cache.pop('package_data', None)
+
+    def _memoize(self, name: str, func: Callable[[], Any], *depends) -> Any:
+        """
+        Get a cached derived value or compute it
+
+        The cached value is used as long as the input files have not changed
+        and the depending values are equal to the ones used for computation.
+
+        :param      name:     The name of the value
+        :type       name:     str
+        :param      func:     The function to compute the value
+        :type       func:     Callable[[], Any]
+        :param      depends:  The values the computation depends on
+        :type       depends:  tuple
+
+        :returns:   The (cached) value
+        :rtype:     Any
+        """
+        self._check_input_files()
+
+        token = self._memoize_token(*depends)
+        if name in self._cache and self._cache[name][0] == token:
+            return self._cache[name][1]
+
+        value = func()
+        self._cache[name] = (token, value)
+
+        return value
+
+    @staticmethod
+    def _memoize_token(*depends) -> str:
+        """
+        Get token of values a memoized value depends on
+
+        :param      depends:  The values
+        :type       depends:  tuple
+
+        :returns:   The token
+        :rtype:     str
+        """
+        return repr(depends)
+
+    def check_for_changes(self) -> bool:
+        """
+        Drop cached derived values affected by changed files
+
+        In addition to the input files, the directories of packages and data
+        files are checked for added or removed files. Use this before reusing
+        an instance over a longer time, e.g. in a long-running process.
+
+        :returns:   True if any file changed, False otherwise
+        :rtype:     bool
+        """
+        input_files_changed = \
+            self._get_input_fingerprint() != self._input_fingerprint
+        self._check_input_files()
+
+        changed_dirs = self._file_index.changed_dirs()
+        if changed_dirs:
+            self._logger.debug("Directories changed: {}".format(changed_dirs))
+            for name in ('package_files', 'data_files', 'package_urls',
+                         'package_hashes', 'manifest', 'package_data'):
+                self._cache.pop(name, None)
+
+        # file content changes do not change the directory
+        hashes_changed = 'package_hashes' in self._cache and \
+            self._file_hasher.is_outdated(
+                [path for path, _ in self._cache['package_hashes'][1]])
+        if hashes_changed:
+            self._logger.debug("Content of files changed")
+            self._cache.pop('package_hashes', None)
+            self._cache.pop('manifest', None)
+            self._cache.pop('package_data', None)
+
+        return input_files_changed or bool(changed_dirs) or hashes_changed
 
     @property
+    def input_dirs(self) -> List[Path]:
+        """
+        Get directories of the input files and all scanned directories
+
+        Changes in these directories might change the package data, see
+        check_for_changes.
+
+        :returns:   Absolute paths of the directories
+        :rtype:     List[Path]
+        """
+        dirs = [Path(file).resolve().parent
+                for file in (self._setup_file,
+                             self._package_changelog_file)
+                if file]
+        root_dir = self._root_dir.resolve()
+        dirs.extend(root_dir / rel_dir
+                    for rel_dir in self._file_index.scanned_dirs)
+
+        return list(dict.fromkeys(dirs))
+
+    @property
+    def scanned_dirs(self) -> List[Path]:
+        """
+        Get directories scanned for package and data files so far
+
+        :returns:   Absolute paths of the directories
+        :rtype:     List[Path]
+        """
+        root_dir = self._root_dir.resolve()
+
+        return [root_dir / rel_dir
+                for rel_dir in self._file_index.scanned_dirs]
+
+    def refresh(self) -> None:
+        """
+        Parse the setup.py file again and drop all cached derived values
+
+        Use this after files of packages or data files have been added or
+        removed, changes of the input files are detected automatically.
+        """
+        self._cache.clear()
+        self._file_index.invalidate()
+        self._input_fingerprint = self._get_input_fingerprint()
+        self._setup_data = self._load_setup_data()
+
+    @property
+    def root_dir(self) -> Path:
+        """
+        Get directory of the setup.py file, the root of all package files
+
+        :returns:   The root directory
+        :rtype:     Path
+        """
+        return self._root_dir
+
+    @property
+    def setup_engine(self) -> str:
+        """
+        Get engine used to parse the setup.py file
+
+        :returns:   Used engine, "run_setup", "ast" or "declarative"
+        :rtype:     str
+        """
+        return self._setup_engine
+
+    @property
+    @phase(PHASE_VERSION)
     def package_version(self) -> str:
         """
         Get version of package based on setup.py "version" entry
@@ -124,22 +628,64 @@ class Setup2uPyPackage(object):
         :returns:   Package changelog version
         :rtype:     str
         """
-        if self._package_changelog_file:
-            ev = ExtractVersion(logger=self._logger)
+        return self._memoize('package_changelog_version',
+                             self._get_package_changelog_version,
+                             self._package_changelog_file)
 
-            version_line = ev.parse_changelog(
-                changelog_file=self._package_changelog_file
-            )
-            semver_string = ev.parse_semver_line(
-                release_version_line=version_line
-            )
+    @phase(PHASE_VERSION)
+    def _get_package_changelog_version(self) -> str:
+        """
+        Parse the package changelog version
 
-            return semver_string
+        :returns:   Package changelog version
+        :rtype:     str
+        """
+        if self._package_changelog_file:
+            return extract_version(
+                changelog_file=self._package_changelog_file,
+                logger=self._logger
+            )
         else:
             self._logger.warning("No package changelog file specified")
             return "-1.-1.-1"
 
     @property
+    def package_file_version(self) -> str:
+        """
+        Get version of the version file
+
+        :returns:   Version statically read from the version file
+        :rtype:     str
+        """
+        return self._memoize('package_file_version',
+                             self._get_package_file_version,
+                             self._version_file)
+
+    @phase(PHASE_VERSION)
+    def _get_package_file_version(self) -> str:
+        """
+        Statically read the version of the version file
+
+        :returns:   Version statically read from the version file
+        :rtype:     str
+
+        :raises     Setup2uPyPackageError:  No version found
+        """
+        if not self._version_file:
+            self._logger.warning("No version file specified")
+            return "-1.-1.-1"
+
+        from .version_file import VersionFileError, read_version
+
+        try:
+            return read_version(version_file=self._version_file,
+                                metadata_cache=self._metadata_cache,
+                                logger=self._logger)
+        except VersionFileError as e:
+            raise Setup2uPyPackageError(str(e))
+
+    @property
+    @phase(PHASE_DEPS)
     def package_deps(self) -> List[str]:
         """
         Get dependencies of package based on setup.py "install_requires" entry
@@ -174,12 +720,23 @@ class Setup2uPyPackage(object):
         """
         Get packages based on setup.py "packages" entry.
 
+        :returns:   Packages based on setup.py "packages" entry
+        :rtype:     List[str]
+        """
+        return self._memoize('package_files',
+                             self._get_package_files,
+                             self._setup_data.get('packages', []))
+
+    @phase(PHASE_PACKAGE_FILES)
+    def _get_package_files(self) -> List[str]:
+        """
+        Search the files of all packages of the setup.py "packages" entry
+
         :returns:   Packages based on setup.py "packages" entry
         :rtype:     List[str]
         """
         packages = []
         all_files = []
-        root_dir = self._root_dir
 
         if self._setup_data.get('packages', []):
             packages = self._setup_data['packages']
@@ -188,23 +745,41 @@ class Setup2uPyPackage(object):
             return []
 
         for package in packages:
-            p = root_dir.glob('{}/*.py'.format(package))
-            files = [x.relative_to(root_dir) for x in p if x.is_file()]
+            # dotted subpackage names are nested directories
+            files = self._file_index.files(
+                rel_dir=package.replace('.', '/'),
+                pattern='*.py',
+                recursive=self._recursive_packages)
             all_files.extend(files)
 
-        return all_files
+        # nested packages might be listed and found recursively
+        all_files = list(dict.fromkeys(all_files))
+
+        return [Path(file) for file in all_files]
 
     @property
     def data_files(self) -> List[str]:
         """
         Get data files based on setup.py "data_files" entry.
 
+        :returns:   Data files based on setup.py "data_files" entry
+        :rtype:     List[str]
+        """
+        return self._memoize('data_files',
+                             self._get_data_files,
+                             self._setup_data.get('data_files', []))
+
+    @phase(PHASE_DATA_FILES)
+    def _get_data_files(self) -> List[str]:
+        """
+        Search the existing files of the setup.py "data_files" entry
+
         :returns:   Data files based on setup.py "data_files" entry
         :rtype:     List[str]
         """
         data_files = []
         all_files = []
-        root_dir = self._root_dir
+        file_index = self._file_index
 
         if self._setup_data.get('data_files', []):
             data_files = self._setup_data['data_files']
@@ -217,16 +792,45 @@ class Setup2uPyPackage(object):
         for folder, file_list in data_files:
             files = []
             for file in file_list:
-                file = root_dir / Path(file)
-                if file.is_file():
-                    files.append(file.relative_to(root_dir))
+                if file_index.has_magic(file):
+                    files.extend(Path(ele) for ele in file_index.glob(file))
+                elif file_index.is_file(file):
+                    files.append(Path(file))
             all_files.extend(files)
 
         return all_files
 
+    @property
+    def file_paths(self) -> List[str]:
+        """
+        Get relative POSIX paths of all package and data files
+
+        Excluded files are not part of the package, so these are the files
+        of the package.json data, a bundle and minified copies.
+
+        :returns:   The paths of all package and data files
+        :rtype:     List[str]
+        """
+        return self._get_file_paths()
+
+    def _get_file_paths(self) -> List[str]:
+        """
+        Get relative POSIX paths of all package and data files
+
+        The paths are interned, so URL and hash entries of a file share them.
+        Excluded files are not part of the package.
+
+        :returns:   The paths of all package and data files
+        :rtype:     List[str]
+        """
+        return self._exclude_matcher.filter_paths(
+            sys.intern(file.as_posix())
+            for x in [self.package_files, self.data_files]
+            for file in x)
+
     def _create_url_elements(self,
                              package_files: List[str],
-                             url: str) -> List[str]:
+                             url: str) -> List[List[str]]:
         """
         Create URLs to all package elements.
 
@@ -235,56 +839,167 @@ class Setup2uPyPackage(object):
         :param      url:            The URL
         :type       url:            str
 
-        :returns:   List of URLs to download the package files
-        :rtype:     List[str]
+        :returns:   List of file path and URL of each file
+        :rtype:     List[List[str]]
+        """
+        entries = url_entries(paths=[str(file) for file in package_files],
+                              url=url)
+
+        return [list(entry) for entry in entries]
+
+    @property
+    def package_urls(self) -> List[UrlEntry]:
+        """
+        Get URL entries of all package and data files
+
+        The returned data is cached and shall not be modified.
+
+        :returns:   File path and URL of each file
+        :rtype:     List[UrlEntry]
         """
-        urls = []
+        return self._memoize('package_urls',
+                             self._get_package_urls,
+                             *[self._setup_data.get(key) for key in (
+                                 'url', 'packages', 'data_files')])
 
-        for file in package_files:
-            this_url = [
-                str(file),
-                str(Path(url) / file)
-            ]
-            self._logger.debug("File elements: {}: {}".format(file, this_url))
-            urls.append(this_url)
+    @phase(PHASE_URLS)
+    def _get_package_urls(self) -> List[UrlEntry]:
+        """
+        Create URL entries of all package and data files
+
+        :returns:   File path and URL of each file
+        :rtype:     List[UrlEntry]
+        """
+        url = self.package_url.replace('https://github.com/', 'github:')
+        urls = url_entries(paths=self._get_file_paths(), url=url)
+
+        self._logger.debug("url: {}".format(url))
+        self._logger.debug("urls: {} entries".format(len(urls)))
 
         return urls
 
     @property
-    def package_data(self) -> dict:
+    def package_hashes(self) -> List[HashEntry]:
         """
-        Get mip compatible package data
+        Get SHA256 hashes of all package and data files
 
-        :returns:   mip compatible package.json data
-        :rtype:     dict
+        The returned data is cached and shall not be modified.
+
+        :returns:   File path and hex digest of each file
+        :rtype:     List[HashEntry]
         """
-        urls = []
-        package_data = {
-            "urls": [],
-            "deps": [],
-            "version": "-1.-1.-1"
-        }
-        if self._package_changelog_file:
+        return self._memoize('package_hashes',
+                             self._get_package_hashes,
+                             *[self._setup_data.get(key) for key in (
+                                 'packages', 'data_files')])
+
+    @phase(PHASE_HASHES)
+    def _get_package_hashes(self) -> List[HashEntry]:
+        """
+        Hash all package and data files
+
+        :returns:   File path and hex digest of each file
+        :rtype:     List[HashEntry]
+
+        :raises     Setup2uPyPackageError:  A file can not be hashed, e.g. a
+                                            file of the git index deleted
+                                            from the work tree
+        """
+        from .hashes import FileHasher, HashError
+
+        if self._file_hasher is None:
+            self._file_hasher = FileHasher(root_dir=self._root_dir,
+                                           metadata_cache=self._metadata_cache,
+                                           logger=self._logger)
+
+        files = self._get_file_paths()
+        try:
+            hashes = self._file_hasher.hashes(rel_paths=files)
+        except HashError as e:
+            raise Setup2uPyPackageError(str(e))
+
+        return [HashEntry(file, hashes[file]) for file in files]
+
+    @property
+    def manifest(self) -> Manifest:
+        """
+        Get mip compatible package data as compact manifest model
+
+        The returned data is cached and shall not be modified.
+
+        :returns:   The manifest
+        :rtype:     Manifest
+        """
+        return self._memoize('manifest',
+                             self._get_manifest,
+                             *[self._setup_data.get(key) for key in (
+                                 'version', 'install_requires', 'url',
+                                 'packages', 'data_files')])
+
+    def _get_manifest(self) -> Manifest:
+        """
+        Create mip compatible package data as compact manifest model
+
+        :returns:   The manifest
+        :rtype:     Manifest
+        """
+        if self._version_file:
+            version = self.package_file_version
+        elif self._package_changelog_file:
             version = self.package_changelog_version
         else:
             version = self.package_version
         install_requires = self.package_deps
-        package_files = self.package_files
-        data_files = self.data_files
-        url = self.package_url.replace('https://github.com/', 'github:')
-        for x in [package_files, data_files]:
-            urls.extend(self._create_url_elements(package_files=x, url=url))
 
         self._logger.debug("version: {}".format(version))
         self._logger.debug("install_requires: {}".format(install_requires))
-        self._logger.debug("package_files: {}".format(package_files))
-        self._logger.debug("data_files: {}".format(data_files))
-        self._logger.debug("url: {}".format(url))
-        self._logger.debug("urls: {}".format(urls))
 
-        package_data["urls"] = urls
-        package_data["deps"] = install_requires
-        package_data["version"] = version
+        return Manifest(urls=self.package_urls,
+                        deps=install_requires,
+                        version=version,
+                        hashes=self.package_hashes if self._hashes else None)
+
+    @property
+    def package_data(self) -> dict:
+        """
+        Get mip compatible package data
+
+        This is a plain dict view of the manifest with lists as entries. The
+        returned data is cached and shall not be modified.
+
+        :returns:   mip compatible package.json data
+        :rtype:     dict
+        """
+        return self._memoize('package_data',
+                             self.manifest.to_dict,
+                             *[self._setup_data.get(key) for key in (
+                                 'version', 'install_requires', 'url',
+                                 'packages', 'data_files')])
+
+    def get_variant_data(self,
+                         url_template: UrlTemplate,
+                         ref: Optional[str] = None) -> dict:
+        """
+        Create mip compatible package data with URLs rendered by a template
+
+        Version, dependencies, hashes and the discovered files are shared
+        with the package data.
+
+        :param      url_template:  The URL template of the variant
+        :type       url_template:  UrlTemplate
+        :param      ref:           The ref to pin, see UrlTemplate.render
+        :type       ref:           Optional[str]
+
+        :returns:   mip compatible package.json data
+        :rtype:     dict
+        """
+        package_data = dict(self.package_data)
+
+        package_data["urls"] = url_template.render(
+            project_url=self.package_url,
+            paths=self.manifest.paths,
+            ref=ref,
+            version=package_data["version"])
 
         return package_data
 
@@ -293,6 +1008,20 @@ class Setup2uPyPackage(object):
         """
         Get package.json data
 
+        The returned data is cached and shall not be modified.
+
+        :returns:   Existing package.json data
+        :rtype:     dict
+        """
+        return self._memoize('package_json_data',
+                             self._get_package_json_data,
+                             self._package_file)
+
+    @phase(PHASE_PACKAGE_JSON)
+    def _get_package_json_data(self) -> dict:
+        """
+        Load package.json data
+
         :returns:   Existing package.json data
         :rtype:     dict
         """
@@ -323,9 +1052,44 @@ class Setup2uPyPackage(object):
         :returns:   Result of validation, True on success, False otherwise
         :rtype:     bool
         """
-        # list of URL entries might be sorted differently
+        diff = self.get_validation_diff(ignore_version=ignore_version,
+                                        ignore_deps=ignore_deps,
+                                        ignore_boot_main=ignore_boot_main,
+                                        max_entries=0)
+
+        return not diff
+
+    @phase(PHASE_DIFF)
+    def get_validation_diff(
+            self,
+            ignore_version: bool = False,
+            ignore_deps: bool = False,
+            ignore_boot_main: bool = False,
+            max_entries: Optional[int] = ManifestDiff.MAX_ENTRIES) -> dict:
+        """
+        Get difference of package.json and setup.py based data
+
+        The "urls" entries are compared independent of their order.
+
+        :param      ignore_version:     Flag to ignore the version
+        :type       ignore_version:     bool
+        :param      ignore_deps:        Flag to ignore the dependencies
+        :type       ignore_deps:        bool
+        :param      ignore_boot_main:   Flag to ignore the main and boot files
+        :type       ignore_boot_main:   bool
+        :param      max_entries:        Maximum entries per reported list
+        :type       max_entries:        Optional[int]
+
+        :returns:   Difference report, empty if equal, see ManifestDiff
+        :rtype:     dict
+        """
+        # copies, the cached data shall not be modified
         package_json_data = dict(self.package_json_data)
-        package_data = dict(self.package_data)
+        package_data = self.manifest.to_dict(plain=False)
+
+        # stored hashes are validated in any case
+        if "hashes" in package_json_data and "hashes" not in package_data:
+            package_data["hashes"] = self.package_hashes
 
         if ignore_version:
             package_json_data.pop("version", None)
@@ -335,62 +1099,63 @@ class Setup2uPyPackage(object):
             package_json_data.pop("deps", None)
             package_data.pop("deps", None)
 
+        exclude_matcher = self._exclude_matcher
         if ignore_boot_main:
-            package_json_data["urls"] = self._exclude_package_files(
-                package_files=package_json_data.get("urls")
-            )
+            exclude_matcher = ExcludeMatcher(
+                patterns=self._excludes + list(BOOT_MAIN_PATTERNS))
 
-            package_data["urls"] = self._exclude_package_files(
-                package_files=package_data.get("urls")
-            )
+        # excluded files are ignored in the package.json file as well
+        if exclude_matcher:
+            for data in (package_json_data, package_data):
+                for key in ManifestDiff.PATH_KEYS:
+                    if isinstance(data.get(key), list):
+                        data[key] = exclude_matcher.filter(data[key])
 
-        package_json_data.get("urls", []).sort()
-        package_data.get("urls", []).sort()
+        diff = ManifestDiff(expected=package_data,
+                            actual=package_json_data,
+                            max_entries=max_entries)
 
-        return package_json_data == package_data
+        return diff.report
 
     def _exclude_package_files(
             self,
             package_files: List[Tuple[str, str]],
-            excludes: List[str] = [
-                "boot.py", "main.py"
-            ]) -> List[Tuple[str, str]]:
+            excludes: List[str] = list(BOOT_MAIN_PATTERNS)
+    ) -> List[Tuple[str, str]]:
         """
-        Exclude elements of a list if the first element matches an exclude str
+        Exclude elements of a list if the first element matches an exclude
+        glob pattern, see ExcludeMatcher
 
         :param      package_files:  The package files
         :type       package_files:  List[Tuple[str, str]]
-        :param      excludes:       The list of excludes
+        :param      excludes:       The list of exclude patterns
         :type       excludes:       List[str]
 
         :returns:   List without elements matching the exclude list
         :rtype:     List[Tuple[str, str]]
         """
-        return [
-            ele for ele in package_files
-            if not any(i in ele[0] for i in excludes)
-        ]
+        return ExcludeMatcher(patterns=excludes).filter(package_files)
 
     @property
-    def validation_diff(self) -> DeepDiff:
+    def validation_diff(self) -> dict:
         """
         Get difference of package.json and setup.py
 
-        :returns:   The deep difference.
-        :rtype:     DeepDiff
+        :returns:   Difference report, empty if equal, see ManifestDiff
+        :rtype:     dict
         """
-        return DeepDiff(self.package_data, self.package_json_data)
+        return self.get_validation_diff()
 
-    def create(self,
-               output_path: Optional[Path] = None,
-               pretty: bool = True) -> None:
+    def _get_output_path(self, output_path: Optional[Path] = None) -> Path:
         """
-        Create package.json file in same directory as setup.py
+        Get path of the package.json file to create
 
         :param      output_path:  The output path
         :type       output_path:  Optional[Path]
-        :param      pretty:       Flag to use an indentation of 4
-        :type       pretty:       bool
+
+        :returns:   The output path, package file or package.json file in the
+                    setup.py directory if not given
+        :rtype:     Path
         """
         if not output_path:
             if self._package_file:
@@ -401,10 +1166,165 @@ class Setup2uPyPackage(object):
                     "No package.json data specified, using setup.py directory"
                 )
 
-        with open(output_path, 'w') as file:
+        return output_path
+
+    @phase(PHASE_WRITE)
+    def create(self,
+               output_path: Optional[Path] = None,
+               pretty: bool = True) -> bool:
+        """
+        Create package.json file in same directory as setup.py
+
+        The file is only written if its content changes. It is written to a
+        temporary file first, which replaces the existing file atomically.
+
+        :param      output_path:  The output path
+        :type       output_path:  Optional[Path]
+        :param      pretty:       Flag to use an indentation of 4
+        :type       pretty:       bool
+
+        :returns:   True if the file was written, False if it is up to date
+        :rtype:     bool
+        """
+        output_path = Path(self._get_output_path(output_path=output_path))
+
+        if pretty:
+            content = json.dumps(self.package_data, indent=4).encode()
+        else:
+            content = json.dumps(self.package_data).encode()
+
+        if not write_if_changed(path=output_path, content=content):
+            self._logger.debug("{} is up to date".format(output_path))
+            return False
+
+        self._logger.debug("Created {}".format(output_path))
+
+        return True
+
+    def get_variant_path(self,
+                         url_template: UrlTemplate,
+                         output_path: Optional[Path] = None) -> Path:
+        """
+        Get path of the package.json file of a variant
+
+        :param      url_template:  The URL template of the variant
+        :type       url_template:  UrlTemplate
+        :param      output_path:   The output path of the package.json file
+        :type       output_path:   Optional[Path]
+
+        :returns:   The output path with the variant name before the suffix,
+                    e.g. "package.github-raw.json"
+        :rtype:     Path
+        """
+        output_path = Path(self._get_output_path(output_path=output_path))
+
+        return output_path.with_name("{}.{}{}".format(output_path.stem,
+                                                      url_template.name,
+                                                      output_path.suffix))
+
+    @phase(PHASE_WRITE)
+    def create_variants(self,
+                        url_templates: List[UrlTemplate],
+                        ref: Optional[str] = None,
+                        output_path: Optional[Path] = None,
+                        pretty: bool = True) -> Dict[str, bool]:
+        """
+        Create a package.json file per URL template
+
+        The setup.py file is parsed and all files are discovered only once
+        for all variants. Files are only written if their content changes.
+
+        :param      url_templates:  The URL templates
+        :type       url_templates:  List[UrlTemplate]
+        :param      ref:            The ref to pin, see UrlTemplate.render
+        :type       ref:            Optional[str]
+        :param      output_path:    The output path of the package.json file,
+                                    see get_variant_path
+        :type       output_path:    Optional[Path]
+        :param      pretty:         Flag to use an indentation of 4
+        :type       pretty:         bool
+
+        :returns:   Per variant name True if the file was written, False if
+                    it is up to date
+        :rtype:     Dict[str, bool]
+
+        :raises     Setup2uPyPackageError:  Variant names are not unique
+        """
+        names = [ele.name for ele in url_templates]
+        if len(set(names)) != len(names):
+            raise Setup2uPyPackageError("Variant names are not unique: {}".
+                                        format(names))
+
+        changed = {}
+        for url_template in url_templates:
+            path = self.get_variant_path(url_template=url_template,
+                                         output_path=output_path)
+            package_data = self.get_variant_data(url_template=url_template,
+                                                 ref=ref)
+
             if pretty:
-                file.write(json.dumps(self.package_data, indent=4))
+                content = json.dumps(package_data, indent=4).encode()
             else:
-                file.write(json.dumps(self.package_data))
+                content = json.dumps(package_data).encode()
+
+            changed[url_template.name] = write_if_changed(path=path,
+                                                          content=content)
+            self._logger.debug("{} {}".format(
+                "Created" if changed[url_template.name] else "Up to date",
+                path))
+
+        return changed
+
+    @phase(PHASE_CHECK_URLS)
+    def check_urls(self,
+                   base: str,
+                   concurrency: Optional[int] = None,
+                   retries: Optional[int] = None,
+                   timeout: Optional[float] = None) -> dict:
+        """
+        Check all package and data files are reachable on a mirror
 
-        self._logger.debug("Created {}".format(output_path))
+        Each file path is resolved against the base and compared by
+        existence and size with the local file, see UrlChecker.
+
+        :param      base:         The HTTP(S) URL or directory of the mirror
+        :type       base:         str
+        :param      concurrency:  Maximum number of concurrent requests
+        :type       concurrency:  Optional[int]
+        :param      retries:      Number of retries of a failed request
+        :type       retries:      Optional[int]
+        :param      timeout:      Timeout of a single request in seconds
+        :type       timeout:      Optional[float]
+
+        :returns:   The report, empty if all files are reachable
+        :rtype:     dict
+
+        :raises     Setup2uPyPackageError:  Invalid base or concurrency
+        """
+        from .url_check import UrlChecker, UrlCheckError
+
+        options = {}
+        for key, value in (("concurrency", concurrency),
+                           ("retries", retries),
+                           ("timeout", timeout)):
+            if value is not None:
+                options[key] = value
+
+        try:
+            checker = UrlChecker(base=base, logger=self._logger, **options)
+        except UrlCheckError as e:
+            raise Setup2uPyPackageError(str(e))
+
+        files = []
+        for path in self.manifest.paths:
+            try:
+                size = (self._root_dir / path).stat().st_size
+            except OSError:
+                size = None
+            files.append((path, size))
+
+        report = checker.check(files=files)
+        self._logger.debug("Checked {} files against {}: {}".format(
+            len(files), base, report or "OK"))
+
+        return report
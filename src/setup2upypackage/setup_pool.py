@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Execute setup.py files in a pool of isolated, prewarmed worker processes
+
+Running a setup.py file in-process imports arbitrary modules, mocks modules
+in "sys.modules" and may hang or allocate without bounds. The workers of a
+SetupPool are forked from a forkserver which already imported distutils,
+setuptools and mock, so starting a worker is cheap. Each execution is
+bounded by a timeout, each worker by an optional address space limit. Only
+plain data of the SETUP_KEYS is sent back to the caller.
+
+Workers are started on first use and reused for further setup.py files, a
+worker exceeding the timeout is terminated and replaced on the next run.
+"""
+
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from multiprocessing.connection import Connection
+from multiprocessing.context import BaseContext
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Tuple, Union
+
+from .static_setup import StaticSetupParser
+
+#: Modules imported once by the forkserver and inherited by every worker
+PRELOAD_MODULES = ("distutils.core", "setuptools", "mock", __name__)
+
+#: Default timeout of a single setup.py execution in seconds
+DEFAULT_TIMEOUT = 30.0
+
+#: Seconds to wait for a terminated worker to exit before killing it
+_TERMINATE_TIMEOUT = 1.0
+
+
+class SetupPoolError(Exception):
+    """Base class for exceptions in this module."""
+    pass
+
+
+def _plain(value: Any) -> Any:
+    """
+    Convert a value to plain, picklable and JSON compatible data
+
+    Tuples are kept, e.g. for data_files, unknown objects are converted to
+    their string representation.
+
+    :param      value:  The value
+    :type       value:  Any
+
+    :returns:   The plain value
+    :rtype:     Any
+    """
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, tuple):
+        return tuple(_plain(ele) for ele in value)
+    if isinstance(value, list):
+        return [_plain(ele) for ele in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted((_plain(ele) for ele in value), key=str)
+    if isinstance(value, dict):
+        return {str(k): _plain(v) for k, v in value.items()}
+
+    return str(value)
+
+
+def execute_setup(setup_file: Path) -> dict:
+    """
+    Execute a setup.py file until its setup() call and get its arguments
+
+    see https://stackoverflow.com/a/61754034/13543363
+
+    :param      setup_file:  The setup.py file
+    :type       setup_file:  Path
+
+    :returns:   Plain setup() arguments of SETUP_KEYS
+    :rtype:     dict
+    """
+    # distutils is not available on Python 3.12+ without setuptools
+    import distutils.core
+    from mock import Mock
+
+    # do not return the distribution of a previously executed setup.py file
+    # of the same process if this one does not call setup()
+    distutils.core._setup_distribution = None
+
+    sys.modules['sdist_upip'] = Mock()
+    res = distutils.core.run_setup(str(setup_file), stop_after="init")
+
+    kwargs = dict(res.__dict__)
+    kwargs.update(kwargs['metadata'].__dict__)
+
+    return {
+        key: _plain(kwargs[key]) for key in StaticSetupParser.SETUP_KEYS
+        if kwargs.get(key) is not None
+    }
+
+
+def _limit_memory(memory_limit: int) -> None:
+    """
+    Limit the address space of the current process
+
+    :param      memory_limit:  The limit in bytes
+    :type       memory_limit:  int
+    """
+    try:
+        import resource
+    except ImportError:
+        # not available on Windows
+        return
+
+    resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+
+def _serve(connection: Connection,
+           memory_limit: Optional[int]) -> None:
+    """
+    Execute setup.py files received on a connection until it is closed
+
+    Modules imported and paths added by a setup.py file are removed after
+    each execution, so the next setup.py file of the same worker starts with
+    the preloaded state.
+
+    :param      connection:    The connection to the pool
+    :type       connection:    Connection
+    :param      memory_limit:  The address space limit in bytes
+    :type       memory_limit:  Optional[int]
+    """
+    if memory_limit:
+        _limit_memory(memory_limit=memory_limit)
+
+    modules = set(sys.modules)
+    path = list(sys.path)
+
+    while True:
+        try:
+            task = connection.recv()
+        except (EOFError, OSError):
+            break
+        if task is None:
+            break
+
+        setup_file, cwd = task
+        try:
+            os.chdir(cwd)
+            result = (True, execute_setup(setup_file=setup_file))
+        except BaseException as e:
+            # SystemExit or MemoryError of a setup.py must not end the worker
+            result = (False, "{}: {}".format(type(e).__name__, e))
+        finally:
+            for name in set(sys.modules) - modules:
+                del sys.modules[name]
+            sys.path[:] = path
+
+        try:
+            connection.send(result)
+        except (OSError, ValueError):
+            break
+
+
+class _Worker(object):
+    """Single worker process of a SetupPool"""
+
+    def __init__(self,
+                 context: BaseContext,
+                 memory_limit: Optional[int]) -> None:
+        """
+        Init _Worker class and start its process
+
+        :param      context:       The multiprocessing context
+        :type       context:       BaseContext
+        :param      memory_limit:  The address space limit in bytes
+        :type       memory_limit:  Optional[int]
+        """
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(target=_serve,
+                                       args=(child_connection, memory_limit),
+                                       daemon=True)
+        self.process.start()
+        child_connection.close()
+
+    def stop(self, terminate: bool = False) -> None:
+        """
+        Stop the worker process
+
+        :param      terminate:  Flag to terminate instead of asking the worker
+                                to exit
+        :type       terminate:  bool
+        """
+        if not terminate:
+            try:
+                self.connection.send(None)
+            except (OSError, ValueError):
+                terminate = True
+        self.connection.close()
+
+        if terminate:
+            self.process.terminate()
+        self.process.join(_TERMINATE_TIMEOUT)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+
+class SetupPool(object):
+    """Execute setup.py files in isolated, reused worker processes"""
+
+    def __init__(self,
+                 processes: Optional[int] = None,
+                 timeout: Optional[float] = DEFAULT_TIMEOUT,
+                 memory_limit: Optional[int] = None,
+                 logger: Optional[logging.Logger] = None) -> None:
+        """
+        Init SetupPool class
+
+        :param      processes:     Number of worker processes, CPU count if
+                                   None
+        :type       processes:     Optional[int]
+        :param      timeout:       Timeout of a single execution in seconds,
+                                   no timeout if None
+        :type       timeout:       Optional[float]
+        :param      memory_limit:  Address space limit of a worker in bytes,
+                                   no limit if None
+        :type       memory_limit:  Optional[int]
+        :param      logger:        Logger object
+        :type       logger:        Optional[logging.Logger]
+
+        :raises     SetupPoolError:  Invalid number of processes
+        """
+        if logger is None:
+            logger = logging.getLogger(__name__)
+        self._logger = logger
+
+        if processes is None:
+            processes = os.cpu_count() or 1
+        if processes < 1:
+            raise SetupPoolError("At least one process is required")
+        self._processes = processes
+        self._timeout = timeout
+        self._memory_limit = memory_limit
+
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            self._context = multiprocessing.get_context("forkserver")
+            # has no effect if the forkserver is already running
+            self._context.set_forkserver_preload(list(PRELOAD_MODULES))
+        else:
+            self._context = multiprocessing.get_context("spawn")
+
+        # slots of idle workers, None if not started yet
+        self._idle = queue.Queue()
+        for _ in range(self._processes):
+            self._idle.put(None)
+
+    @property
+    def processes(self) -> int:
+        """
+        Get number of worker processes
+
+        :returns:   The number of worker processes
+        :rtype:     int
+        """
+        return self._processes
+
+    def __enter__(self) -> 'SetupPool':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def run(self, setup_file: Path) -> dict:
+        """
+        Execute a setup.py file in a worker process
+
+        The setup.py file is executed in the current working directory of
+        the caller.
+
+        :param      setup_file:  The setup.py file
+        :type       setup_file:  Path
+
+        :returns:   Plain setup() arguments of SETUP_KEYS
+        :rtype:     dict
+
+        :raises     SetupPoolError:  Execution failed, timed out or the worker
+                                     died, e.g. by exceeding the memory limit
+        """
+        worker = self._idle.get()
+        try:
+            if worker is None:
+                worker = _Worker(context=self._context,
+                                 memory_limit=self._memory_limit)
+                self._logger.debug("Started setup.py worker {}".
+                                   format(worker.process.pid))
+
+            try:
+                worker.connection.send((str(setup_file), os.getcwd()))
+                if not worker.connection.poll(self._timeout):
+                    worker.stop(terminate=True)
+                    worker = None
+                    raise SetupPoolError("Execution of {} timed out after "
+                                         "{}s".format(setup_file,
+                                                      self._timeout))
+                success, result = worker.connection.recv()
+            except (EOFError, OSError) as e:
+                worker.stop(terminate=True)
+                worker = None
+                raise SetupPoolError("Worker executing {} died: {}".
+                                     format(setup_file, str(e) or "no result"))
+        finally:
+            self._idle.put(worker)
+
+        if not success:
+            raise SetupPoolError("Execution of {} failed: {}".
+                                 format(setup_file, result))
+
+        return result
+
+    def run_all(self,
+                setup_files: Iterable[Path]
+                ) -> Iterator[Tuple[Path, Union[dict, SetupPoolError]]]:
+        """
+        Execute several setup.py files in parallel
+
+        :param      setup_files:  The setup.py files
+        :type       setup_files:  Iterable[Path]
+
+        :returns:   Generator of each setup.py file and its setup() arguments
+                    or error in order of completion
+        :rtype:     Iterator[Tuple[Path, Union[dict, SetupPoolError]]]
+        """
+        with ThreadPoolExecutor(max_workers=self._processes) as executor:
+            futures = {
+                executor.submit(self.run, setup_file): setup_file
+                for setup_file in setup_files
+            }
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result()
+                except SetupPoolError as e:
+                    yield futures[future], e
+
+    def close(self) -> None:
+        """
+        Stop all idle worker processes
+
+        Workers are started again on the next run.
+        """
+        for _ in range(self._processes):
+            worker = self._idle.get()
+            if worker is not None:
+                worker.stop()
+            self._idle.put(None)
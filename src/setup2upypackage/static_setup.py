@@ -0,0 +1,908 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Statically read the relevant setup() arguments of a setup.py file
+
+The setup.py file is parsed with the "ast" module, its code is never executed.
+Literals, simple module level constants, path operations and file reads like
+"open(here / 'version.py').read()" or "exec(open('version.py').read())" are
+evaluated. Anything else can not be resolved and raises a StaticSetupError.
+
+Statements which are not modelled, e.g. "deps += [...]", "deps.append(...)"
+or the bodies of "if", "for" and "try" statements, mark all names they assign
+to or change as unknown. Using an unknown name in the setup() call raises a
+StaticSetupError as well, so the caller can fall back to executing the file.
+
+All files read while evaluating the setup.py file are available as
+"read_files", e.g. to include them in a cache key.
+"""
+
+import ast
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+#: Value of a name changed by a statement which is not modelled
+_UNKNOWN = object()
+
+
+class StaticSetupError(Exception):
+    """Raised if a setup.py file can not be evaluated statically."""
+    pass
+
+
+class _StaticFile(object):
+    """Lazy representation of a file opened by the setup.py file"""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def read(self) -> str:
+        """
+        Read the file content
+
+        :raise      StaticSetupError:  File can not be read
+
+        :returns:   The file content
+        :rtype:     str
+        """
+        try:
+            return self.path.read_text(encoding="utf-8")
+        except OSError as e:
+            raise StaticSetupError("Can not read {}: {}".format(self.path, e))
+
+
+class _StaticModule(object):
+    """Representation of an imported module or module member"""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, _StaticModule) and self.name == other.name
+
+    def __hash__(self) -> int:
+        return hash(self.name)
+
+
+class StaticSetupParser(object):
+    """Read setup() arguments of a setup.py file without executing it"""
+
+    #: setup() arguments used to create the package.json data
+    SETUP_KEYS = ('version', 'url', 'packages', 'install_requires',
+                  'data_files')
+
+    #: string methods without side effects which are evaluated
+    _STR_METHODS = ('format', 'join', 'lower', 'lstrip', 'replace', 'rstrip',
+                    'split', 'splitlines', 'strip', 'upper')
+
+    #: functions and methods which do not change their arguments
+    _PURE_CALLS = ('abspath', 'absolute', 'bool', 'dict', 'dirname',
+                   'exists', 'float', 'int', 'isfile', 'len', 'list', 'open',
+                   'print', 'read', 'read_text', 'realpath', 'repr',
+                   'resolve', 'set', 'sorted', 'str', 'tuple') + _STR_METHODS
+
+    #: functions and methods which read files or execute other modules
+    _READ_CALLS = ('__import__', 'exec_module', 'execfile', 'import_module',
+                   'load_source', 'open', 'read_bytes', 'read_text',
+                   'run_module', 'run_path')
+
+    def __init__(self,
+                 setup_file: Path,
+                 logger: Optional[logging.Logger] = None,
+                 skip_keys: Tuple[str, ...] = ()) -> None:
+        """
+        Init StaticSetupParser class
+
+        :param      setup_file:  The setup.py file
+        :type       setup_file:  Path
+        :param      logger:      Logger object
+        :type       logger:      Optional[logging.Logger]
+        :param      skip_keys:   Keys of SETUP_KEYS not to evaluate, e.g.
+                                 "version" if read from another source
+        :type       skip_keys:   Tuple[str, ...]
+        """
+        if logger is None:
+            logger = logging.getLogger(__name__)
+        self._logger = logger
+
+        self._setup_file = Path(setup_file)
+        self._root_dir = self._setup_file.parent
+        self._keys = tuple(key for key in self.SETUP_KEYS
+                           if key not in skip_keys)
+        self._function_effects = set()
+        self._read_files = []
+        self._read_calls = set()
+        self._trees = []
+
+    def parse(self) -> Dict[str, Any]:
+        """
+        Parse the setup.py file and evaluate the relevant setup() arguments
+
+        :raise      StaticSetupError:  The setup() arguments can not be
+                                       evaluated statically
+
+        :returns:   Evaluated setup() arguments of SETUP_KEYS
+        :rtype:     Dict[str, Any]
+        """
+        self._read_files = []
+        self._read_calls = set()
+        self._trees = []
+
+        try:
+            source = self._setup_file.read_text(encoding="utf-8")
+            tree = ast.parse(source, filename=str(self._setup_file))
+        except (OSError, SyntaxError, ValueError) as e:
+            raise StaticSetupError("Can not parse {}: {}".
+                                   format(self._setup_file, e))
+        self._trees.append(tree)
+
+        env = {
+            '__file__': self._setup_file.resolve(),
+            '__name__': '__main__',
+        }
+        self._function_effects = self._get_function_effects(tree=tree)
+        setup_call = self._execute(body=tree.body, env=env)
+
+        if setup_call is None:
+            for node in ast.walk(tree):
+                if self._is_setup_call(node):
+                    setup_call = node
+                    break
+            else:
+                raise StaticSetupError("No setup() call found in {}".
+                                       format(self._setup_file))
+
+        return self._evaluate_setup_call(node=setup_call, env=env)
+
+    @property
+    def read_files(self) -> List[Path]:
+        """
+        Get the files read while evaluating the last parsed file
+
+        :returns:   The absolute paths in the order of reading
+        :rtype:     List[Path]
+        """
+        return list(dict.fromkeys(self._read_files))
+
+    def find_read_files(self) -> Optional[List[Path]]:
+        """
+        Conservatively find all files the setup.py file reads if executed
+
+        Every call reading a file or executing another module has to be
+        resolved statically and no module next to the setup.py file may be
+        imported, as its code could read further files.
+
+        :returns:   The absolute paths, None if not all of them can be found
+        :rtype:     Optional[List[Path]]
+        """
+        try:
+            self.parse()
+        except StaticSetupError as e:
+            self._logger.debug("Static evaluation failed: {}".format(e))
+            if not self._trees:
+                return None
+
+        for tree in self._trees:
+            for node in ast.walk(tree):
+                if isinstance(node, ast.Call) and \
+                        self._is_read_call(node) and \
+                        node not in self._read_calls:
+                    self._logger.debug("Can not resolve file read in line "
+                                       "{}".format(node.lineno))
+                    return None
+                elif isinstance(node, (ast.Import, ast.ImportFrom)) and \
+                        self._imports_local_module(node):
+                    self._logger.debug("Imports a local module in line "
+                                       "{}".format(node.lineno))
+                    return None
+
+        return self.read_files
+
+    def _is_read_call(self, node: ast.Call) -> bool:
+        """
+        Determine whether the call might read a file or execute a module
+
+        :param      node:  The call node
+        :type       node:  ast.Call
+
+        :returns:   True if the call might read a file, False otherwise
+        :rtype:     bool
+        """
+        func = node.func
+        if isinstance(func, ast.Attribute):
+            return func.attr in self._READ_CALLS
+
+        return getattr(func, 'id', None) in self._READ_CALLS
+
+    def _imports_local_module(self, node: ast.AST) -> bool:
+        """
+        Determine whether the import statement imports a local module
+
+        :param      node:  The import or import from statement
+        :type       node:  ast.AST
+
+        :returns:   True if relative or a module next to the setup.py file
+                    is imported, False otherwise
+        :rtype:     bool
+        """
+        if isinstance(node, ast.ImportFrom):
+            if node.level or not node.module:
+                return True
+            modules = [node.module]
+        else:
+            modules = [alias.name for alias in node.names]
+
+        for module in modules:
+            name = module.split('.')[0]
+            if (self._root_dir / name).is_dir() or \
+                    (self._root_dir / '{}.py'.format(name)).is_file():
+                return True
+
+        return False
+
+    def parse_module(self,
+                     module_file: Path,
+                     source: Optional[str] = None,
+                     names: Tuple[str, ...] = ()) -> Dict[str, Any]:
+        """
+        Statically evaluate the module level constants of a module
+
+        Like a setup.py file, the module, e.g. a version.py file, is never
+        executed. Values which can not be evaluated are not part of the
+        result.
+
+        :param      module_file:  The module file
+        :type       module_file:  Path
+        :param      source:       The content of the module file, read from
+                                  the file if None
+        :type       source:       Optional[str]
+        :param      names:        Names in the order of preference, the
+                                  first assigned one has to be evaluable
+        :type       names:        Tuple[str, ...]
+
+        :raise      StaticSetupError:  The module can not be parsed or the
+                                       first assigned of names can not be
+                                       evaluated
+
+        :returns:   Evaluated constants of builtin data types by name
+        :rtype:     Dict[str, Any]
+        """
+        self._read_files = []
+        self._read_calls = set()
+        self._trees = []
+
+        module_file = Path(module_file)
+        try:
+            if source is None:
+                source = module_file.read_text(encoding="utf-8")
+            tree = ast.parse(source, filename=str(module_file))
+        except (OSError, SyntaxError, ValueError) as e:
+            raise StaticSetupError("Can not parse {}: {}".
+                                   format(module_file, e))
+        self._trees.append(tree)
+
+        env = {
+            '__file__': module_file.resolve(),
+            '__name__': module_file.stem,
+        }
+        self._function_effects = self._get_function_effects(tree=tree)
+        self._execute(body=tree.body, env=env)
+
+        for name in names:
+            if env.get(name) is _UNKNOWN:
+                raise StaticSetupError("Value of '{}' in {} can not be "
+                                       "evaluated statically".
+                                       format(name, module_file))
+            elif name in env:
+                break
+
+        return {key: value for key, value in env.items()
+                if self._is_plain_data(value)}
+
+    @staticmethod
+    def _is_setup_call(node: ast.AST) -> bool:
+        """
+        Determine whether the node is a call of setup()
+
+        :param      node:  The node
+        :type       node:  ast.AST
+
+        :returns:   True if node is a call of setup(), False otherwise
+        :rtype:     bool
+        """
+        if not isinstance(node, ast.Call):
+            return False
+
+        func = node.func
+        if isinstance(func, ast.Name):
+            return func.id == 'setup'
+        if isinstance(func, ast.Attribute):
+            return func.attr == 'setup'
+
+        return False
+
+    def _execute(self, body: list, env: dict) -> Optional[ast.Call]:
+        """
+        Statically execute module level statements to collect constants
+
+        Names of values which can not be evaluated and names changed by
+        statements which are not modelled are marked as unknown, an error is
+        only raised if such a name is used by setup().
+
+        :param      body:  The statements
+        :type       body:  list
+        :param      env:   The environment of known names
+        :type       env:   dict
+
+        :returns:   The setup() call if found at this level
+        :rtype:     Optional[ast.Call]
+        """
+        setup_call = None
+
+        for stmt in body:
+            if isinstance(stmt, ast.Import):
+                for alias in stmt.names:
+                    if alias.asname:
+                        env[alias.asname] = _StaticModule(alias.name)
+                    else:
+                        name = alias.name.split('.')[0]
+                        env[name] = _StaticModule(name)
+            elif isinstance(stmt, ast.ImportFrom):
+                for alias in stmt.names:
+                    env[alias.asname or alias.name] = _StaticModule(
+                        '{}.{}'.format(stmt.module, alias.name))
+            elif isinstance(stmt, (ast.Assign, ast.AnnAssign)):
+                targets = (stmt.targets if isinstance(stmt, ast.Assign)
+                           else [stmt.target])
+                if stmt.value is None:
+                    continue
+                changed = self._changed_names(node=stmt.value, env=env)
+                self._assign(targets=targets, value=stmt.value, env=env)
+                self._invalidate(names=changed, env=env)
+            elif isinstance(stmt, ast.With):
+                self._execute_with(stmt=stmt, env=env)
+            elif isinstance(stmt, ast.Expr) and \
+                    isinstance(stmt.value, ast.Call) and \
+                    self._is_setup_call(stmt.value):
+                setup_call = stmt.value
+            elif isinstance(stmt, ast.Expr) and \
+                    isinstance(stmt.value, ast.Call) and \
+                    isinstance(stmt.value.func, ast.Name) and \
+                    stmt.value.func.id == 'exec':
+                self._execute_exec(node=stmt.value, env=env)
+            elif isinstance(stmt, ast.Expr):
+                self._invalidate(names=self._changed_names(node=stmt,
+                                                           env=env),
+                                 env=env)
+            else:
+                # e.g. augmented assignments, if, for or try statements
+                self._invalidate(names=self._assigned_names(node=stmt,
+                                                            env=env),
+                                 env=env)
+
+        return setup_call
+
+    @staticmethod
+    def _base_name(node: ast.AST) -> Optional[str]:
+        """
+        Get the name of the object of an attribute or subscript, e.g. "deps"
+        of "deps.append" or "data['deps'][0]"
+
+        :param      node:  The node
+        :type       node:  ast.AST
+
+        :returns:   The name, None if the object is not a name
+        :rtype:     Optional[str]
+        """
+        while isinstance(node, (ast.Attribute, ast.Subscript, ast.Starred)):
+            node = node.value
+
+        if isinstance(node, ast.Name):
+            return node.id
+
+        return None
+
+    def _get_function_effects(self, tree: ast.AST) -> Set[str]:
+        """
+        Get names the functions defined in a module might change if called
+
+        These are names declared "global" and objects of method calls inside
+        any function body.
+
+        :param      tree:  The module
+        :type       tree:  ast.AST
+
+        :returns:   The names
+        :rtype:     Set[str]
+        """
+        names = set()
+
+        for node in ast.walk(tree):
+            if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef,
+                                     ast.Lambda)):
+                continue
+
+            for ele in ast.walk(node):
+                if isinstance(ele, ast.Global):
+                    names.update(ele.names)
+                elif isinstance(ele, ast.Call) and \
+                        isinstance(ele.func, ast.Attribute):
+                    names.add(self._base_name(ele.func.value))
+
+        names.discard(None)
+
+        return names
+
+    def _changed_names(self, node: ast.AST, env: dict) -> Set[str]:
+        """
+        Get names of mutable values a node might change in-place
+
+        These are objects of method calls like "deps.append(...)",
+        arguments of calls which are not known to be free of side effects and
+        names changed by functions defined in the module.
+
+        :param      node:  The node
+        :type       node:  ast.AST
+        :param      env:   The environment of known names
+        :type       env:   dict
+
+        :returns:   The names
+        :rtype:     Set[str]
+        """
+        names = set()
+        effects = set()
+
+        for ele in ast.walk(node):
+            if not isinstance(ele, ast.Call) or self._is_setup_call(ele):
+                continue
+
+            func = ele.func
+            if isinstance(func, ast.Attribute):
+                names.add(self._base_name(func.value))
+                func_name = func.attr
+            else:
+                func_name = getattr(func, 'id', None)
+
+            if func_name not in self._PURE_CALLS:
+                names.update(self._base_name(arg) for arg in ele.args)
+                names.update(self._base_name(keyword.value)
+                             for keyword in ele.keywords)
+                effects = self._function_effects
+
+        return {name for name in names
+                if isinstance(env.get(name), (list, dict, set))} | effects
+
+    def _assigned_names(self, node: ast.AST, env: dict) -> Set[str]:
+        """
+        Get all names a statement might assign to or change
+
+        :param      node:  The statement
+        :type       node:  ast.AST
+        :param      env:   The environment of known names
+        :type       env:   dict
+
+        :returns:   The names
+        :rtype:     Set[str]
+        """
+        names = self._changed_names(node=node, env=env)
+
+        for ele in ast.walk(node):
+            if isinstance(ele, ast.Name) and \
+                    isinstance(ele.ctx, (ast.Store, ast.Del)):
+                names.add(ele.id)
+            elif isinstance(ele, (ast.Attribute, ast.Subscript)) and \
+                    isinstance(ele.ctx, (ast.Store, ast.Del)):
+                names.add(self._base_name(ele))
+            elif isinstance(ele, (ast.FunctionDef, ast.AsyncFunctionDef,
+                                  ast.ClassDef)):
+                names.add(ele.name)
+            elif isinstance(ele, (ast.Global, ast.Nonlocal)):
+                names.update(ele.names)
+            elif isinstance(ele, ast.alias):
+                names.add(ele.asname or ele.name.split('.')[0])
+            elif isinstance(ele, ast.ExceptHandler) and ele.name:
+                names.add(ele.name)
+
+        names.discard(None)
+
+        return names
+
+    @classmethod
+    def _contains(cls, value: Any, target: Any) -> bool:
+        """
+        Determine whether the value is or contains the target object
+
+        :param      value:   The value
+        :type       value:   Any
+        :param      target:  The target object
+        :type       target:  Any
+
+        :returns:   True if the target is part of the value, False otherwise
+        :rtype:     bool
+        """
+        if value is target:
+            return True
+        elif isinstance(value, (list, tuple, set)):
+            return any(cls._contains(ele, target) for ele in value)
+        elif isinstance(value, dict):
+            return any(cls._contains(ele, target) for ele in value.values())
+
+        return False
+
+    def _invalidate(self, names: Set[str], env: dict) -> None:
+        """
+        Mark names as unknown, including all names sharing their values
+
+        :param      names:  The names
+        :type       names:  Set[str]
+        :param      env:    The environment of known names
+        :type       env:    dict
+        """
+        if not names:
+            return
+
+        shared = [env[name] for name in names
+                  if isinstance(env.get(name), (list, dict, set))]
+        for name in names:
+            env[name] = _UNKNOWN
+
+        for name, value in env.items():
+            if any(self._contains(value, ele) for ele in shared):
+                env[name] = _UNKNOWN
+
+        self._logger.debug("Unknown after not modelled statement: {}".
+                           format(sorted(names)))
+
+    def _assign(self, targets: list, value: ast.AST, env: dict) -> None:
+        """
+        Evaluate a value and assign it to simple name targets
+
+        :param      targets:  The targets
+        :type       targets:  list
+        :param      value:    The value node
+        :type       value:    ast.AST
+        :param      env:      The environment of known names
+        :type       env:      dict
+        """
+        try:
+            result = self._evaluate(node=value, env=env)
+            resolved = True
+        except StaticSetupError:
+            result = None
+            resolved = False
+
+        for target in targets:
+            if isinstance(target, ast.Name):
+                env[target.id] = result if resolved else _UNKNOWN
+            else:
+                # e.g. tuple unpacking or "data['key'] = value"
+                self._invalidate(names=self._assigned_names(node=target,
+                                                            env=env),
+                                 env=env)
+
+    def _execute_with(self, stmt: ast.With, env: dict) -> None:
+        """
+        Statically execute a "with open(...) as f" block
+
+        :param      stmt:  The with statement
+        :type       stmt:  ast.With
+        :param      env:   The environment of known names
+        :type       env:   dict
+        """
+        for item in stmt.items:
+            if isinstance(item.optional_vars, ast.Name):
+                self._assign(targets=[item.optional_vars],
+                             value=item.context_expr,
+                             env=env)
+
+        self._execute(body=stmt.body, env=env)
+
+    def _execute_exec(self, node: ast.Call, env: dict) -> None:
+        """
+        Statically execute the code given to exec(), e.g. a version.py file
+
+        :param      node:  The exec() call
+        :type       node:  ast.Call
+        :param      env:   The environment of known names
+        :type       env:   dict
+
+        :raise      StaticSetupError:  The executed code can not be evaluated,
+                                       so any name might be changed
+        """
+        if len(node.args) == 2 and isinstance(node.args[1], ast.Name):
+            # exec(source, namespace) only changes the namespace
+            self._invalidate(names=self._changed_names(node=node, env=env),
+                             env=env)
+            return
+        elif len(node.args) != 1:
+            raise StaticSetupError("exec() call in line {} can not be "
+                                   "evaluated statically".format(node.lineno))
+
+        try:
+            source = self._evaluate(node=node.args[0], env=env)
+            tree = ast.parse(source)
+        except (StaticSetupError, SyntaxError, TypeError, ValueError) as e:
+            raise StaticSetupError("Code of exec() call in line {} can not "
+                                   "be evaluated statically: {}".
+                                   format(node.lineno, e))
+
+        self._trees.append(tree)
+        self._function_effects |= self._get_function_effects(tree=tree)
+        self._execute(body=tree.body, env=env)
+
+    def _evaluate_setup_call(self, node: ast.Call, env: dict) -> dict:
+        """
+        Evaluate the relevant keyword arguments of the setup() call
+
+        :param      node:              The setup() call
+        :type       node:              ast.Call
+        :param      env:               The environment of known names
+        :type       env:               dict
+
+        :raise      StaticSetupError:  A relevant argument can not be evaluated
+
+        :returns:   Evaluated setup() arguments of SETUP_KEYS, except the
+                    skipped ones
+        :rtype:     dict
+        """
+        setup_data = {}
+
+        for keyword in node.keywords:
+            if keyword.arg is None:
+                # setup(**kwargs)
+                kwargs = self._evaluate(node=keyword.value, env=env)
+                if not isinstance(kwargs, dict):
+                    raise StaticSetupError("setup(**kwargs) is not a dict")
+                for key in self._keys:
+                    if key in kwargs:
+                        setup_data[key] = kwargs[key]
+            elif keyword.arg in self._keys:
+                setup_data[keyword.arg] = self._evaluate(node=keyword.value,
+                                                         env=env)
+
+        for key, value in setup_data.items():
+            if not self._is_plain_data(value):
+                raise StaticSetupError("Unsupported value of '{}'".
+                                       format(key))
+
+        self._logger.debug("Statically parsed setup data: {}".
+                           format(setup_data))
+
+        return setup_data
+
+    @classmethod
+    def _is_plain_data(cls, value: Any) -> bool:
+        """
+        Determine whether the value consists of builtin data types only
+
+        :param      value:  The value
+        :type       value:  Any
+
+        :returns:   True if value is plain data, False otherwise
+        :rtype:     bool
+        """
+        if value is None or isinstance(value, (str, int, float, bool)):
+            return True
+        elif isinstance(value, (list, tuple, set)):
+            return all(cls._is_plain_data(ele) for ele in value)
+        elif isinstance(value, dict):
+            return all(cls._is_plain_data(key) and cls._is_plain_data(val)
+                       for key, val in value.items())
+
+        return False
+
+    def _evaluate(self, node: ast.AST, env: dict) -> Any:
+        """
+        Evaluate an expression node without executing any code
+
+        :param      node:              The expression node
+        :type       node:              ast.AST
+        :param      env:               The environment of known names
+        :type       env:               dict
+
+        :raise      StaticSetupError:  The expression can not be evaluated
+
+        :returns:   The value of the expression
+        :rtype:     Any
+        """
+        if isinstance(node, ast.Constant):
+            return node.value
+        elif isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+            values = [self._evaluate(node=ele, env=env) for ele in node.elts]
+            if isinstance(node, ast.List):
+                return values
+            elif isinstance(node, ast.Set):
+                return set(values)
+            return tuple(values)
+        elif isinstance(node, ast.Dict):
+            result = {}
+            for key, value in zip(node.keys, node.values):
+                if key is None:
+                    result.update(self._evaluate(node=value, env=env))
+                else:
+                    result[self._evaluate(node=key, env=env)] = \
+                        self._evaluate(node=value, env=env)
+            return result
+        elif isinstance(node, ast.Name):
+            if node.id not in env:
+                raise StaticSetupError("Unknown name '{}'".format(node.id))
+            elif env[node.id] is _UNKNOWN:
+                raise StaticSetupError("Value of '{}' can not be evaluated "
+                                       "statically".format(node.id))
+            return env[node.id]
+        elif isinstance(node, ast.JoinedStr):
+            return ''.join(str(self._evaluate(node=ele, env=env))
+                           for ele in node.values)
+        elif isinstance(node, ast.FormattedValue):
+            if node.conversion != -1 or node.format_spec is not None:
+                raise StaticSetupError("Unsupported f-string formatting")
+            return self._evaluate(node=node.value, env=env)
+        elif isinstance(node, ast.BinOp):
+            return self._evaluate_binop(node=node, env=env)
+        elif isinstance(node, ast.Subscript):
+            value = self._evaluate(node=node.value, env=env)
+            index = node.slice
+            # Python < 3.9 wraps the subscript in an ast.Index node
+            if type(index).__name__ == 'Index':
+                index = index.value
+            try:
+                return value[self._evaluate(node=index, env=env)]
+            except (LookupError, TypeError) as e:
+                raise StaticSetupError("Invalid subscript: {}".format(e))
+        elif isinstance(node, ast.Attribute):
+            return self._evaluate_attribute(node=node, env=env)
+        elif isinstance(node, ast.Call):
+            return self._evaluate_call(node=node, env=env)
+
+        try:
+            # Python < 3.8 literals like ast.Str or ast.Num
+            return ast.literal_eval(node)
+        except ValueError:
+            raise StaticSetupError("Unsupported expression '{}'".
+                                   format(type(node).__name__))
+
+    def _evaluate_binop(self, node: ast.BinOp, env: dict) -> Any:
+        """
+        Evaluate a binary operation of known values
+
+        :param      node:              The binary operation node
+        :type       node:              ast.BinOp
+        :param      env:               The environment of known names
+        :type       env:               dict
+
+        :raise      StaticSetupError:  The operation is not supported
+
+        :returns:   The result of the operation
+        :rtype:     Any
+        """
+        left = self._evaluate(node=node.left, env=env)
+        right = self._evaluate(node=node.right, env=env)
+
+        try:
+            if isinstance(node.op, ast.Add):
+                return left + right
+            elif isinstance(node.op, ast.Div) and isinstance(left, Path):
+                return left / right
+            elif isinstance(node.op, ast.Mod) and isinstance(left, str):
+                return left % right
+        except TypeError as e:
+            raise StaticSetupError("Invalid operation: {}".format(e))
+
+        raise StaticSetupError("Unsupported operation '{}'".
+                               format(type(node.op).__name__))
+
+    def _evaluate_attribute(self, node: ast.Attribute, env: dict) -> Any:
+        """
+        Evaluate an attribute access of a path or a module
+
+        :param      node:              The attribute node
+        :type       node:              ast.Attribute
+        :param      env:               The environment of known names
+        :type       env:               dict
+
+        :raise      StaticSetupError:  The attribute is not supported
+
+        :returns:   The attribute value
+        :rtype:     Any
+        """
+        value = self._evaluate(node=node.value, env=env)
+
+        if isinstance(value, Path) and node.attr in ('parent', 'name',
+                                                     'stem', 'suffix'):
+            return getattr(value, node.attr)
+        elif isinstance(value, _StaticModule):
+            return _StaticModule('{}.{}'.format(value.name, node.attr))
+
+        raise StaticSetupError("Unsupported attribute '{}'".
+                               format(node.attr))
+
+    def _evaluate_call(self, node: ast.Call, env: dict) -> Any:
+        """
+        Evaluate a call of a known function without side effects
+
+        :param      node:              The call node
+        :type       node:              ast.Call
+        :param      env:               The environment of known names
+        :type       env:               dict
+
+        :raise      StaticSetupError:  The call is not supported
+
+        :returns:   The result of the call
+        :rtype:     Any
+        """
+        args = [self._evaluate(node=ele, env=env) for ele in node.args]
+        kwargs = {
+            ele.arg: self._evaluate(node=ele.value, env=env)
+            for ele in node.keywords if ele.arg is not None
+        }
+        func = node.func
+
+        if isinstance(func, ast.Name) and func.id not in env:
+            if func.id == 'open' and args:
+                path = self._resolve_path(args[0])
+                self._read_files.append(path)
+                self._read_calls.add(node)
+                return _StaticFile(path)
+            elif func.id in ('str', 'list', 'tuple') and len(args) == 1:
+                return {'str': str, 'list': list, 'tuple': tuple}[func.id](
+                    args[0])
+            raise StaticSetupError("Unsupported call of '{}'".
+                                   format(func.id))
+
+        if isinstance(func, ast.Attribute):
+            owner = self._evaluate(node=func.value, env=env)
+
+            if isinstance(owner, _StaticFile) and func.attr == 'read':
+                return owner.read()
+            elif isinstance(owner, Path):
+                if func.attr in ('resolve', 'absolute'):
+                    return self._resolve_path(owner)
+                elif func.attr == 'read_text':
+                    path = self._resolve_path(owner)
+                    self._read_files.append(path)
+                    self._read_calls.add(node)
+                    return _StaticFile(path).read()
+                elif func.attr == 'joinpath':
+                    return owner.joinpath(*args)
+            elif isinstance(owner, str) and func.attr in self._STR_METHODS:
+                return getattr(owner, func.attr)(*args, **kwargs)
+
+            if not isinstance(owner, _StaticModule):
+                raise StaticSetupError("Unsupported call of '{}'".
+                                       format(func.attr))
+            callee = '{}.{}'.format(owner.name, func.attr)
+        else:
+            callee = self._evaluate(node=func, env=env)
+            if not isinstance(callee, _StaticModule):
+                raise StaticSetupError("Unsupported call")
+            callee = callee.name
+
+        if callee in ('pathlib.Path', 'pathlib.PurePath'):
+            return Path(*[str(ele) for ele in args])
+        elif callee == 'os.path.join':
+            return os.path.join(*[str(ele) for ele in args])
+        elif callee == 'os.path.dirname':
+            return os.path.dirname(str(args[0]))
+        elif callee in ('os.path.abspath', 'os.path.realpath'):
+            return str(self._resolve_path(args[0]))
+
+        raise StaticSetupError("Unsupported call of '{}'".format(callee))
+
+    def _resolve_path(self, path: Any) -> Path:
+        """
+        Resolve a path relative to the directory of the setup.py file
+
+        :param      path:  The path
+        :type       path:  Any
+
+        :returns:   The absolute path
+        :rtype:     Path
+        """
+        path = Path(str(path))
+        if not path.is_absolute():
+            path = self._root_dir / path
+
+        return path.resolve()
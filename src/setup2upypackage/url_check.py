@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Check the files of a package are reachable on a mirror
+
+Every file path of the package is resolved against a base, which is either
+an HTTP(S) URL or a local directory, e.g. the document root of a mirror.
+Existence and size of each file are compared with the local file.
+
+URLs are checked with HEAD requests by a bounded pool of asyncio workers.
+Each worker keeps its HTTP/1.1 connections alive and reuses them for
+further requests to the same host. Failed connections, timeouts and
+temporary server errors are retried with an exponential backoff.
+
+The report is a JSON serializable dict, empty if all files are reachable
+
+    {"missing": [["pkg/foo.py", "https://mirror.example.com/pkg/foo.py"]],
+     "size": [{"path": "pkg/bar.py", "url": "...", "expected": 120,
+               "actual": 80}],
+     "failed": [{"path": "pkg/baz.py", "url": "...", "error": "HTTP 403"}]}
+"""
+
+import asyncio
+import logging
+import ssl
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote, urljoin, urlsplit
+from urllib.request import url2pathname
+
+from .version import __version__
+
+#: Default number of concurrent requests
+DEFAULT_CONCURRENCY = 16
+
+#: Default number of retries of a failed request
+DEFAULT_RETRIES = 2
+
+#: Default timeout of a single request in seconds
+DEFAULT_TIMEOUT = 10.0
+
+#: Delay before the first retry in seconds, doubled for each further retry
+RETRY_DELAY = 0.1
+
+#: HTTP status codes of temporary errors which are retried
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+#: HTTP status codes of files not existing on the mirror
+MISSING_STATUS = (404, 410)
+
+#: HTTP status codes of redirects which are followed
+REDIRECT_STATUS = (301, 302, 303, 307, 308)
+
+#: Maximum number of followed redirects per file
+MAX_REDIRECTS = 5
+
+
+class UrlCheckError(Exception):
+    """Base class for exceptions in this module."""
+    pass
+
+
+class _Connection(object):
+    """Persistent HTTP/1.1 connection to a single host"""
+
+    def __init__(self,
+                 scheme: str,
+                 host: str,
+                 port: int,
+                 timeout: float) -> None:
+        """
+        Init _Connection class, the connection is opened on first use
+
+        :param      scheme:   The scheme, "http" or "https"
+        :type       scheme:   str
+        :param      host:     The host
+        :type       host:     str
+        :param      port:     The port
+        :type       port:     int
+        :param      timeout:  The timeout of a single request in seconds
+        :type       timeout:  float
+        """
+        self._scheme = scheme
+        self._host = host
+        self._port = port
+        self._timeout = timeout
+        self._reader = None
+        self._writer = None
+
+    async def _open(self) -> None:
+        """Open the connection"""
+        ssl_context = None
+        if self._scheme == 'https':
+            ssl_context = ssl.create_default_context()
+
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self._host, self._port, ssl=ssl_context),
+            self._timeout)
+
+    def close(self) -> None:
+        """Close the connection"""
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = None
+        self._writer = None
+
+    async def _read_response(self) -> Tuple[int, Dict[str, str]]:
+        """
+        Read status and headers of a response without a body
+
+        :returns:   The status and the headers with lower case names
+        :rtype:     Tuple[int, Dict[str, str]]
+
+        :raises     ConnectionError:  The connection was closed
+        :raises     ValueError:       Invalid response
+        """
+        line = await self._reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by {}".
+                                  format(self._host))
+
+        parts = line.decode('latin-1').split(None, 2)
+        if len(parts) < 2 or not parts[0].startswith('HTTP/'):
+            raise ValueError("Invalid status line {!r}".format(line))
+        status = int(parts[1])
+
+        headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if parts[0] == 'HTTP/1.0' and \
+                headers.get('connection', '').lower() != 'keep-alive':
+            headers['connection'] = 'close'
+
+        return status, headers
+
+    async def head(self, target: str) -> Tuple[int, Dict[str, str]]:
+        """
+        Send a HEAD request
+
+        A kept alive connection closed by the server meanwhile is opened
+        again once.
+
+        :param      target:  The request target, path and query
+        :type       target:  str
+
+        :returns:   The status and the headers with lower case names
+        :rtype:     Tuple[int, Dict[str, str]]
+        """
+        reused = self._writer is not None
+        if not reused:
+            await self._open()
+
+        request = ("HEAD {} HTTP/1.1\r\n"
+                   "Host: {}\r\n"
+                   "User-Agent: upy-package/{}\r\n"
+                   "Accept: */*\r\n"
+                   "Connection: keep-alive\r\n"
+                   "\r\n").format(target, self._host, __version__)
+        try:
+            self._writer.write(request.encode('latin-1'))
+            await self._writer.drain()
+            status, headers = await asyncio.wait_for(self._read_response(),
+                                                     self._timeout)
+        except asyncio.TimeoutError:
+            self.close()
+            raise
+        except (OSError, EOFError):
+            self.close()
+            if reused:
+                return await self.head(target=target)
+            raise
+        except ValueError:
+            self.close()
+            raise
+
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+
+        return status, headers
+
+
+class UrlChecker(object):
+    """Check files of a package are reachable below a base URL or directory"""
+
+    def __init__(self,
+                 base: str,
+                 concurrency: int = DEFAULT_CONCURRENCY,
+                 retries: int = DEFAULT_RETRIES,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 logger: Optional[logging.Logger] = None) -> None:
+        """
+        Init UrlChecker class
+
+        :param      base:         The HTTP(S) URL, "file:" URL or directory
+                                  the file paths are resolved against
+        :type       base:         str
+        :param      concurrency:  Maximum number of concurrent requests
+        :type       concurrency:  int
+        :param      retries:      Number of retries of a failed request
+        :type       retries:      int
+        :param      timeout:      Timeout of a single request in seconds
+        :type       timeout:      float
+        :param      logger:       Logger object
+        :type       logger:       Optional[logging.Logger]
+
+        :raises     UrlCheckError:  Invalid base or concurrency
+        """
+        if logger is None:
+            logger = logging.getLogger(__name__)
+        self._logger = logger
+
+        if concurrency < 1:
+            raise UrlCheckError("Concurrency has to be at least 1")
+        self._concurrency = concurrency
+        self._retries = max(retries, 0)
+        self._timeout = timeout
+
+        base = str(base)
+        scheme = urlsplit(base).scheme
+        self._base_url = None
+        self._base_dir = None
+
+        if scheme in ('http', 'https'):
+            self._base_url = base.rstrip('/') + '/'
+        elif scheme == 'file':
+            self._base_dir = Path(url2pathname(urlsplit(base).path))
+        else:
+            self._base_dir = Path(base)
+
+        if self._base_dir is not None and not self._base_dir.is_dir():
+            raise UrlCheckError("Base '{}' is neither a HTTP(S) URL nor a "
+                                "directory".format(base))
+
+    def resolve(self, path: str) -> str:
+        """
+        Resolve a file path against the base
+
+        :param      path:  The relative POSIX path of the file
+        :type       path:  str
+
+        :returns:   The URL respectively the path of the file
+        :rtype:     str
+        """
+        if self._base_url is not None:
+            return self._base_url + quote(path.lstrip('/'))
+
+        return str(self._base_dir / path)
+
+    def check(self, files: List[Tuple[str, Optional[int]]]) -> dict:
+        """
+        Check existence and size of all files
+
+        :param      files:  The relative POSIX path and the expected size of
+                            each file, the size is not compared if None
+        :type       files:  List[Tuple[str, Optional[int]]]
+
+        :returns:   The report, empty if all files are reachable
+        :rtype:     dict
+        """
+        if self._base_url is None:
+            results = [self._check_local(path=path) for path, _ in files]
+        else:
+            results = asyncio.run(self._check_all(
+                paths=[path for path, _ in files]))
+
+        return self._report(files=files, results=results)
+
+    def _check_local(self, path: str) -> dict:
+        """
+        Check a file below the base directory
+
+        :param      path:  The relative POSIX path of the file
+        :type       path:  str
+
+        :returns:   The result with "url", "status" and "size"
+        :rtype:     dict
+        """
+        location = self.resolve(path=path)
+        try:
+            size = Path(location).stat().st_size
+        except OSError:
+            return {"url": location, "status": 404, "size": None}
+
+        if not Path(location).is_file():
+            return {"url": location, "status": 404, "size": None}
+
+        return {"url": location, "status": 200, "size": size}
+
+    async def _check_all(self, paths: List[str]) -> List[dict]:
+        """
+        Check all URLs with a bounded pool of workers
+
+        :param      paths:  The relative POSIX paths of the files
+        :type       paths:  List[str]
+
+        :returns:   The result of each path in the same order
+        :rtype:     List[dict]
+        """
+        queue = asyncio.Queue()
+        for idx, path in enumerate(paths):
+            queue.put_nowait((idx, path))
+        results = [None] * len(paths)
+
+        workers = [asyncio.ensure_future(self._worker(queue=queue,
+                                                      results=results))
+                   for _ in range(min(self._concurrency, len(paths)))]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+
+        return results
+
+    async def _worker(self, queue: asyncio.Queue, results: List) -> None:
+        """
+        Check queued URLs, reusing a connection per host
+
+        :param      queue:    The queue of index and path of each file
+        :type       queue:    asyncio.Queue
+        :param      results:  The results, set at the index of a file
+        :type       results:  List
+        """
+        connections = {}
+
+        try:
+            while True:
+                try:
+                    idx, path = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+
+                results[idx] = await self._check_url(
+                    url=self.resolve(path=path),
+                    connections=connections)
+        finally:
+            for connection in connections.values():
+                connection.close()
+
+    async def _head(self,
+                    url: str,
+                    connections: Dict[tuple, _Connection]
+                    ) -> Tuple[int, Dict[str, str]]:
+        """
+        Send a HEAD request over a kept alive connection to the host
+
+        :param      url:          The URL
+        :type       url:          str
+        :param      connections:  The connections of the worker by host
+        :type       connections:  Dict[tuple, _Connection]
+
+        :returns:   The status and the headers with lower case names
+        :rtype:     Tuple[int, Dict[str, str]]
+
+        :raises     ValueError:  Unsupported URL
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ValueError("Unsupported URL '{}'".format(url))
+
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        key = (parts.scheme, parts.hostname, port)
+        if key not in connections:
+            connections[key] = _Connection(scheme=parts.scheme,
+                                           host=parts.hostname,
+                                           port=port,
+                                           timeout=self._timeout)
+
+        target = parts.path or '/'
+        if parts.query:
+            target += '?' + parts.query
+
+        return await connections[key].head(target=target)
+
+    async def _check_url(self,
+                         url: str,
+                         connections: Dict[tuple, _Connection]) -> dict:
+        """
+        Check a URL, following redirects and retrying temporary errors
+
+        :param      url:          The URL
+        :type       url:          str
+        :param      connections:  The connections of the worker by host
+        :type       connections:  Dict[tuple, _Connection]
+
+        :returns:   The result with "url", "status" and "size" or "error"
+        :rtype:     dict
+        """
+        result = {"url": url}
+        location = url
+        redirects = 0
+        attempt = 0
+
+        while True:
+            try:
+                status, headers = await self._head(url=location,
+                                                   connections=connections)
+                error = None
+            except (OSError, EOFError, ValueError,
+                    asyncio.TimeoutError) as e:
+                status, headers = None, {}
+                error = "{}: {}".format(type(e).__name__, e) \
+                    if str(e) else type(e).__name__
+
+            retry = error is not None or status in RETRY_STATUS
+            if retry and attempt < self._retries:
+                await asyncio.sleep(RETRY_DELAY * 2 ** attempt)
+                attempt += 1
+                self._logger.debug("Retrying {} ({})".format(
+                    location, error or "HTTP {}".format(status)))
+                continue
+
+            if status in REDIRECT_STATUS and 'location' in headers and \
+                    redirects < MAX_REDIRECTS:
+                location = urljoin(location, headers['location'])
+                redirects += 1
+                continue
+
+            break
+
+        if error is not None:
+            result["error"] = error
+            return result
+
+        result["status"] = status
+        try:
+            result["size"] = int(headers['content-length'])
+        except (KeyError, ValueError):
+            result["size"] = None
+
+        return result
+
+    @staticmethod
+    def _report(files: List[Tuple[str, Optional[int]]],
+                results: List[dict]) -> dict:
+        """
+        Create the report of all results
+
+        :param      files:    The path and expected size of each file
+        :type       files:    List[Tuple[str, Optional[int]]]
+        :param      results:  The result of each file
+        :type       results:  List[dict]
+
+        :returns:   The report, empty if all files are reachable
+        :rtype:     dict
+        """
+        missing = []
+        size = []
+        failed = []
+
+        for (path, expected), result in zip(files, results):
+            url = result["url"]
+            status = result.get("status")
+
+            if "error" in result:
+                failed.append({"path": path, "url": url,
+                               "error": result["error"]})
+            elif status in MISSING_STATUS:
+                missing.append([path, url])
+            elif not 200 <= status < 300:
+                failed.append({"path": path, "url": url,
+                               "error": "HTTP {}".format(status)})
+            elif expected is not None and result["size"] is not None and \
+                    expected != result["size"]:
+                size.append({"path": path, "url": url,
+                             "expected": expected, "actual": result["size"]})
+
+        report = {}
+        for kind, entries in (("missing", missing),
+                              ("size", size),
+                              ("failed", failed)):
+            if entries:
+                report[kind] = entries
+
+        return report
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Render the URLs of package.json variants from templates
+
+A template is a format string with the placeholders of PLACEHOLDERS, e.g.
+"https://raw.githubusercontent.com/{owner}/{repo}/{ref}/{path}", without
+conversions or format specs. Owner,
+repository and host are taken from the project URL of the setup.py file.
+Everything except the file path is rendered once per template, so all
+variants of a package are created from the same discovered files with a
+string join per file.
+"""
+
+import re
+from string import Formatter
+from typing import List, Optional
+from urllib.parse import urlparse
+
+#: Placeholders usable in a template
+PLACEHOLDERS = ("url", "project_url", "host", "owner", "repo", "ref",
+                "version", "path")
+
+#: Ref of templates with a "{ref}" placeholder if no ref is pinned
+DEFAULT_REF = "HEAD"
+
+#: Templates usable by their name only
+PRESETS = {
+    "github": "github:{owner}/{repo}/{path}",
+    "github-raw": "https://raw.githubusercontent.com/{owner}/{repo}/{ref}/"
+                  "{path}",
+}
+
+#: Valid variant names, used as part of file names
+_NAME_PATTERN = re.compile(r'^[\w.-]+$')
+
+
+class UrlTemplateError(Exception):
+    """Base class for exceptions in this module."""
+    pass
+
+
+class UrlTemplate(object):
+    """Named template of the URLs of a package.json variant"""
+
+    def __init__(self, name: str, template: str) -> None:
+        """
+        Init UrlTemplate class
+
+        :param      name:      The name of the variant
+        :type       name:      str
+        :param      template:  The template
+        :type       template:  str
+
+        :raises     UrlTemplateError:  Invalid name or template
+        """
+        if not _NAME_PATTERN.match(name):
+            raise UrlTemplateError("Invalid variant name '{}'".format(name))
+
+        try:
+            parsed = [(field, spec, conversion) for _, field, spec, conversion
+                      in Formatter().parse(template) if field is not None]
+        except ValueError as e:
+            raise UrlTemplateError("Invalid template '{}': {}".
+                                   format(template, e))
+
+        # the file path is joined in, it can not be converted or formatted
+        for field, spec, conversion in parsed:
+            if spec or conversion:
+                raise UrlTemplateError("Conversion or format spec of {{{}}} "
+                                       "in '{}' is not supported".
+                                       format(field, template))
+
+        fields = set(field for field, _, _ in parsed)
+
+        unknown = fields - set(PLACEHOLDERS)
+        if unknown:
+            raise UrlTemplateError("Unknown placeholders {} in '{}', use {}".
+                                   format(sorted(unknown), template,
+                                          PLACEHOLDERS))
+        if "path" not in fields:
+            raise UrlTemplateError("No {{path}} placeholder in '{}'".
+                                   format(template))
+
+        self._name = name
+        self._template = template
+        self._fields = fields
+
+    @classmethod
+    def from_spec(cls, spec: str) -> 'UrlTemplate':
+        """
+        Create a template from a "NAME=TEMPLATE" or preset name string
+
+        :param      spec:  The specification
+        :type       spec:  str
+
+        :returns:   The template
+        :rtype:     UrlTemplate
+
+        :raises     UrlTemplateError:  Invalid specification
+        """
+        name, sep, template = spec.partition("=")
+        if sep:
+            return cls(name=name.strip(), template=template.strip())
+
+        if spec in PRESETS:
+            return cls(name=spec, template=PRESETS[spec])
+
+        raise UrlTemplateError("Invalid template '{}', use NAME=TEMPLATE or "
+                               "one of {}".format(spec, sorted(PRESETS)))
+
+    @property
+    def name(self) -> str:
+        """
+        Get name of the variant
+
+        :returns:   The name
+        :rtype:     str
+        """
+        return self._name
+
+    @property
+    def template(self) -> str:
+        """
+        Get the template
+
+        :returns:   The template
+        :rtype:     str
+        """
+        return self._template
+
+    def _values(self,
+                project_url: str,
+                ref: Optional[str],
+                version: str) -> dict:
+        """
+        Get the values of all placeholders except "path"
+
+        :param      project_url:  The project URL
+        :type       project_url:  str
+        :param      ref:          The pinned ref, DEFAULT_REF if None
+        :type       ref:          Optional[str]
+        :param      version:      The package version
+        :type       version:      str
+
+        :returns:   The values
+        :rtype:     dict
+
+        :raises     UrlTemplateError:  The project URL has no owner or
+                                       repository used by the template
+        """
+        project_url = project_url.rstrip("/")
+        parsed = urlparse(project_url)
+        segments = [ele for ele in parsed.path.split("/") if ele]
+
+        values = {
+            "url": project_url.replace("https://github.com/", "github:"),
+            "project_url": project_url,
+            "host": parsed.netloc,
+            "owner": segments[0] if segments else "",
+            "repo": (re.sub(r'\.git$', '', segments[1])
+                     if len(segments) > 1 else ""),
+            "ref": (ref or DEFAULT_REF).replace("{version}", version),
+            "version": version,
+        }
+
+        for key in ("host", "owner", "repo"):
+            if key in self._fields and not values[key]:
+                raise UrlTemplateError("No {} in project URL '{}' of "
+                                       "variant '{}'".format(key, project_url,
+                                                             self._name))
+
+        return values
+
+    def render(self,
+               project_url: str,
+               paths: List[str],
+               ref: Optional[str] = None,
+               version: str = "") -> List[List[str]]:
+        """
+        Render the URL elements of all files
+
+        :param      project_url:  The project URL
+        :type       project_url:  str
+        :param      paths:        The relative POSIX paths of the files
+        :type       paths:        List[str]
+        :param      ref:          The pinned ref, "{version}" is replaced by
+                                  the package version, DEFAULT_REF if None
+        :type       ref:          Optional[str]
+        :param      version:      The package version
+        :type       version:      str
+
+        :returns:   List of file path and URL of each file
+        :rtype:     List[List[str]]
+        """
+        values = self._values(project_url=project_url,
+                              ref=ref,
+                              version=version)
+        # the file path is joined in, not formatted per file
+        parts = self._template.format(path="\0", **values).split("\0")
+
+        return [[path, path.join(parts)] for path in paths]
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Statically read the version of a version.py module
+
+The module is parsed with the "ast" module and evaluated like a setup.py file
+by the StaticSetupParser, its code is never imported or executed. Typical
+modules like
+
+    __version_info__ = ('1', '2', '3')
+    __version__ = '.'.join(__version_info__)
+
+are supported. The first of VERSION_NAMES is used, otherwise the first of
+VERSION_INFO_NAMES joined by dots. A version changed by statements which can
+not be evaluated statically, e.g. "__version__ += '.dev'", is rejected.
+
+Results are cached by the SHA256 hash of the file path and content,
+in-process and optionally in the persistent metadata cache, so an unchanged
+file is never parsed twice.
+"""
+
+import hashlib
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .cache import MetadataCache
+from .static_setup import StaticSetupError, StaticSetupParser
+
+#: Names of a version string in the order of preference
+VERSION_NAMES = ("__version__", "VERSION", "version")
+
+#: Names of a version tuple, used if no version string is found
+VERSION_INFO_NAMES = ("__version_info__", "VERSION_INFO", "version_info")
+
+#: Maximum number of in-process cached versions
+CACHE_SIZE = 128
+
+#: Versions by content hash of the version file
+_versions = OrderedDict()
+
+
+class VersionFileError(Exception):
+    """Base class for exceptions in this module."""
+    pass
+
+
+def _select_version(constants: Dict[str, Any]) -> Optional[str]:
+    """
+    Get version of the module level constants of a version file
+
+    :param      constants:  The constants by name
+    :type       constants:  Dict[str, Any]
+
+    :returns:   The version, None if not found
+    :rtype:     Optional[str]
+    """
+    for name in VERSION_NAMES:
+        if isinstance(constants.get(name), (str, int, float)):
+            return str(constants[name])
+
+    for name in VERSION_INFO_NAMES:
+        if isinstance(constants.get(name), (list, tuple)):
+            return '.'.join(str(ele) for ele in constants[name])
+
+    return None
+
+
+def extract_version(version_file: Path,
+                    content: Optional[bytes] = None,
+                    logger: Optional[logging.Logger] = None) -> str:
+    """
+    Statically extract the version of a version file
+
+    :param      version_file:  The version file
+    :type       version_file:  Path
+    :param      content:       The content of the file, read if None
+    :type       content:       Optional[bytes]
+    :param      logger:        Logger object
+    :type       logger:        Optional[logging.Logger]
+
+    :returns:   The version
+    :rtype:     str
+
+    :raises     VersionFileError:  The file can not be read or parsed or
+                                   contains no static version
+    """
+    version_file = Path(version_file)
+    try:
+        if content is None:
+            content = version_file.read_bytes()
+        constants = StaticSetupParser(setup_file=version_file,
+                                      logger=logger).parse_module(
+            module_file=version_file,
+            source=content.decode("utf-8"),
+            names=VERSION_NAMES + VERSION_INFO_NAMES)
+    except (OSError, UnicodeDecodeError, StaticSetupError) as e:
+        raise VersionFileError("Can not read version of {}: {}".
+                               format(version_file, e))
+
+    version = _select_version(constants=constants)
+    if version is None:
+        raise VersionFileError("No version of {} found in {}".
+                               format(VERSION_NAMES + VERSION_INFO_NAMES,
+                                      version_file))
+
+    return version
+
+
+def read_version(version_file: Path,
+                 metadata_cache: Optional[MetadataCache] = None,
+                 logger: Optional[logging.Logger] = None) -> str:
+    """
+    Get version of a version file, cached by the hash of its content
+
+    :param      version_file:    The version file
+    :type       version_file:    Path
+    :param      metadata_cache:  The persistent cache
+    :type       metadata_cache:  Optional[MetadataCache]
+    :param      logger:          Logger object
+    :type       logger:          Optional[logging.Logger]
+
+    :returns:   The version
+    :rtype:     str
+
+    :raises     VersionFileError:  The file can not be read or parsed or
+                                   contains no version
+    """
+    if logger is None:
+        logger = logging.getLogger(__name__)
+
+    try:
+        content = Path(version_file).read_bytes()
+    except OSError as e:
+        raise VersionFileError("Can not read {}: {}".format(version_file, e))
+
+    # the module might read files relative to its location
+    digest = hashlib.sha256(
+        str(Path(version_file).resolve()).encode() + b"\0" + content
+    ).hexdigest()
+    if digest in _versions:
+        _versions.move_to_end(digest)
+        return _versions[digest]
+
+    entry = None
+    key = MetadataCache.key(salt="version_file:{}".format(digest))
+    if metadata_cache:
+        entry = metadata_cache.get(key)
+
+    if entry is None:
+        version = extract_version(version_file=version_file,
+                                  content=content,
+                                  logger=logger)
+        if metadata_cache:
+            metadata_cache.set(key, {"version": version})
+    else:
+        version = entry["version"]
+    logger.debug("Version of {}: {}".format(version_file, version))
+
+    _versions[digest] = version
+    if len(_versions) > CACHE_SIZE:
+        _versions.popitem(last=False)
+
+    return version
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Regenerate a package.json file on changes of its input files
+
+The directories of the setup.py and changelog file as well as all package and
+data file directories are watched with inotify, or by polling their content
+if inotify is not available. Bursts of events are debounced, only the values
+affected by the changed files are computed again and the package.json file is
+only written if its content changes.
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from .setup2upypackage import Setup2uPyPackage
+
+
+class WatchError(Exception):
+    """Base class for exceptions in this module."""
+    pass
+
+
+class PollingWatcher(object):
+    """Detect changes of directories by comparing their content"""
+
+    def __init__(self, interval: float = 0.5) -> None:
+        """
+        Init PollingWatcher class
+
+        :param      interval:  The polling interval in seconds
+        :type       interval:  float
+        """
+        self._interval = interval
+        self._snapshots = {}
+
+    @staticmethod
+    def _snapshot(directory: Path) -> Optional[frozenset]:
+        """
+        Get name, modification time and size of all entries of a directory
+
+        :param      directory:  The directory
+        :type       directory:  Path
+
+        :returns:   The entries, None if the directory does not exist
+        :rtype:     Optional[frozenset]
+        """
+        try:
+            with os.scandir(directory) as it:
+                return frozenset(
+                    (entry.name, stat.st_mtime_ns, stat.st_size)
+                    for entry in it
+                    for stat in (entry.stat(follow_symlinks=False), )
+                )
+        except OSError:
+            return None
+
+    def set_dirs(self, dirs: List[Path]) -> None:
+        """
+        Set the watched directories
+
+        :param      dirs:  The directories
+        :type       dirs:  List[Path]
+        """
+        self._snapshots = {
+            directory: self._snapshots.get(directory,
+                                           self._snapshot(directory))
+            for directory in dirs
+        }
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Wait for a change of any watched directory
+
+        :param      timeout:  The timeout in seconds
+        :type       timeout:  float
+
+        :returns:   True if a change was detected, False on timeout
+        :rtype:     bool
+        """
+        end = time.monotonic() + timeout
+
+        while True:
+            changed = False
+            for directory, snapshot in self._snapshots.items():
+                current = self._snapshot(directory)
+                if current != snapshot:
+                    self._snapshots[directory] = current
+                    changed = True
+            if changed:
+                return True
+
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(self._interval, remaining))
+
+    def close(self) -> None:
+        """Stop watching"""
+        self._snapshots = {}
+
+
+class InotifyWatcher(object):
+    """Detect changes of directories with Linux inotify"""
+
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_NONBLOCK = 0x00000800
+    IN_CLOEXEC = 0x00080000
+
+    #: Size of an event without the name, struct inotify_event
+    EVENT_SIZE = struct.calcsize('iIII')
+
+    #: Events of watched directories
+    MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM |
+            IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF |
+            IN_MOVE_SELF | IN_ONLYDIR)
+
+    def __init__(self) -> None:
+        """
+        Init InotifyWatcher class
+
+        :raises     WatchError:  inotify is not available
+        """
+        library = ctypes.util.find_library('c')
+        try:
+            self._libc = ctypes.CDLL(library, use_errno=True)
+            self._libc.inotify_init1
+        except (OSError, AttributeError, TypeError) as e:
+            raise WatchError("inotify not available: {}".format(e))
+
+        self._fd = self._libc.inotify_init1(self.IN_NONBLOCK |
+                                            self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise WatchError("inotify_init1 failed: {}".format(
+                os.strerror(ctypes.get_errno())))
+
+        # directory -> watch descriptor
+        self._watches = {}
+
+    def set_dirs(self, dirs: List[Path]) -> None:
+        """
+        Set the watched directories
+
+        Not existing directories are skipped, their parent directory reports
+        the creation.
+
+        :param      dirs:  The directories
+        :type       dirs:  List[Path]
+        """
+        for directory in set(self._watches) - set(dirs):
+            self._libc.inotify_rm_watch(self._fd, self._watches.pop(directory))
+
+        for directory in dirs:
+            if directory in self._watches:
+                continue
+
+            wd = self._libc.inotify_add_watch(self._fd,
+                                              os.fsencode(directory),
+                                              self.MASK)
+            if wd >= 0:
+                self._watches[directory] = wd
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Wait for a change of any watched directory
+
+        :param      timeout:  The timeout in seconds
+        :type       timeout:  float
+
+        :returns:   True if a change was detected, False on timeout
+        :rtype:     bool
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return False
+
+        # drain all queued events
+        changed = False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+
+            offset = 0
+            while offset + self.EVENT_SIZE <= len(data):
+                _, mask, _, length = struct.unpack_from('iIII', data, offset)
+                offset += self.EVENT_SIZE + length
+                # removed watches report IN_IGNORED
+                changed = changed or not (mask & self.IN_IGNORED)
+
+            if not data:
+                break
+
+        return changed
+
+    def close(self) -> None:
+        """Stop watching"""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+        self._watches = {}
+
+
+def create_watcher(polling: bool = False) -> object:
+    """
+    Create an inotify based watcher, fall back to polling if not available
+
+    :param      polling:  Flag to use polling in any case
+    :type       polling:  bool
+
+    :returns:   The watcher
+    :rtype:     InotifyWatcher or PollingWatcher
+    """
+    if not polling:
+        try:
+            return InotifyWatcher()
+        except WatchError:
+            pass
+
+    return PollingWatcher()
+
+
+class PackageWatcher(object):
+    """Keep a package.json file up to date with its setup.py based data"""
+
+    #: Default time in seconds without events before the data is updated
+    DEBOUNCE = 0.2
+
+    def __init__(self,
+                 setup_2_upy_package: Setup2uPyPackage,
+                 output_path: Optional[Path] = None,
+                 pretty: bool = False,
+                 debounce: float = DEBOUNCE,
+                 polling: bool = False,
+                 logger: Optional[logging.Logger] = None) -> None:
+        """
+        Init PackageWatcher class
+
+        :param      setup_2_upy_package:  The package
+        :type       setup_2_upy_package:  Setup2uPyPackage
+        :param      output_path:          The package.json file path
+        :type       output_path:          Optional[Path]
+        :param      pretty:               Flag to use an indentation of 4
+        :type       pretty:               bool
+        :param      debounce:             Time without events in seconds
+        :type       debounce:             float
+        :param      polling:              Flag to use polling in any case
+        :type       polling:              bool
+        :param      logger:               Logger object
+        :type       logger:               Optional[logging.Logger]
+        """
+        if logger is None:
+            logger = logging.getLogger(__name__)
+        self._logger = logger
+
+        self._package = setup_2_upy_package
+        self._output_path = output_path
+        self._pretty = pretty
+        self._debounce = debounce
+        self._polling = polling
+
+    def update(self) -> bool:
+        """
+        Compute the package data again and write it if it changed
+
+        :returns:   True if the package.json file was written
+        :rtype:     bool
+        """
+        self._package.check_for_changes()
+
+        changed = self._package.create(output_path=self._output_path,
+                                       pretty=self._pretty)
+        if changed:
+            self._logger.info("Updated package.json")
+        else:
+            self._logger.debug("Package data unchanged")
+
+        return changed
+
+    def run(self, stop: Optional[threading.Event] = None) -> None:
+        """
+        Watch the package files until stopped
+
+        :param      stop:  Event to stop watching, run forever if None
+        :type       stop:  Optional[threading.Event]
+        """
+        if stop is None:
+            stop = threading.Event()
+
+        watcher = create_watcher(polling=self._polling)
+        self._logger.debug("Watching with {}".format(
+            type(watcher).__name__))
+
+        try:
+            self.update()
+
+            while not stop.is_set():
+                watcher.set_dirs(self._package.input_dirs)
+
+                # changes between the last update and watching the dirs
+                if not self._package.check_for_changes():
+                    if not watcher.wait(timeout=0.5):
+                        continue
+
+                    # wait until a burst of events is over
+                    while watcher.wait(timeout=self._debounce) and \
+                            not stop.is_set():
+                        pass
+
+                try:
+                    self.update()
+                except (Exception, SystemExit) as e:
+                    # e.g. a setup.py file saved in the middle of an edit
+                    self._logger.warning("Failed to update: {}".format(e))
+        finally:
+            watcher.close()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Unittest for testing the batch file"""
+
+import io
+import json
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+from sys import stdout
+
+from setup2upypackage.batch import (BatchError, BatchRunner, _process_job,
+                                    run_batch)
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Run before every test method"""
+        # define a format
+        custom_format = '[%(asctime)s] [%(levelname)-8s] [%(filename)-15s @'\
+                        ' %(funcName)-15s:%(lineno)4s] %(message)s'
+
+        # set basic config and level for all loggers
+        logging.basicConfig(level=logging.INFO,
+                            format=custom_format,
+                            stream=stdout)
+
+        # create a logger for this TestSuite
+        self.test_logger = logging.getLogger(__name__)
+        self.test_logger.setLevel(logging.DEBUG)
+
+        self._here = Path(__file__).parent
+
+        self.setup_file = self._here / 'data' / 'setup.py'
+        self.package_changelog_file = \
+            self._here / 'data' / 'sample_changelog.md'
+        self.package_file = self._here / 'data' / 'package.json'
+
+    def tearDown(self) -> None:
+        """Run after every test method"""
+        pass
+
+    def test__process_job(self) -> None:
+        """Test processing of a single job"""
+        result = _process_job({
+            "setup_file": str(self.setup_file),
+            "package_file": str(self.package_file),
+            "action": "validate",
+        })
+        self.assertTrue(result["success"])
+        self.assertTrue(result["valid"])
+        self.assertIsNone(result["error"])
+
+        # changelog version 9.8.7 differs from package.json version 1.2.3
+        result = _process_job({
+            "setup_file": str(self.setup_file),
+            "package_file": str(self.package_file),
+            "package_changelog_file": str(self.package_changelog_file),
+            "action": "validate",
+        })
+        self.assertFalse(result["success"])
+        self.assertFalse(result["valid"])
+        self.assertIsNotNone(result["diff"])
+
+        result = _process_job({
+            "setup_file": str(self.setup_file),
+            "package_file": str(self.package_file),
+            "package_changelog_file": str(self.package_changelog_file),
+            "action": "validate",
+            "ignore_version": True,
+        })
+        self.assertTrue(result["success"])
+        self.assertNotIn("profile", result)
+
+        result = _process_job({
+            "setup_file": str(self.setup_file),
+            "package_file": str(self.package_file),
+            "action": "validate",
+            "profile": True,
+        })
+        self.assertTrue(result["success"])
+        self.assertEqual([ele["phase"] for ele in
+                          result["profile"]["phases"]][:1], ['parse_setup'])
+
+        result = _process_job({
+            "setup_file": str(self._here / 'data' / 'not_existing.py'),
+            "action": "validate",
+        })
+        self.assertFalse(result["success"])
+        self.assertIsNotNone(result["error"])
+
+    def test_run(self) -> None:
+        """Test running several jobs in parallel"""
+        jobs = [
+            {
+                "setup_file": self.setup_file,
+                "package_file": self.package_file,
+            },
+            {
+                "setup_file": self.setup_file,
+                "package_file": self.package_file,
+                "package_changelog_file": self.package_changelog_file,
+            },
+        ]
+        runner = BatchRunner(jobs=jobs, processes=2)
+        stream = io.StringIO()
+        exit_code = runner.run(action="validate", stream=stream)
+
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(len(lines), len(jobs))
+        results = [json.loads(line) for line in lines]
+        self.assertEqual(sorted(ele["success"] for ele in results),
+                         [False, True])
+        self.assertEqual(exit_code, 1)
+
+        stream = io.StringIO()
+        exit_code = runner.run(action="validate",
+                               stream=stream,
+                               ignore_version=True)
+        self.assertEqual(exit_code, 0)
+
+        with self.assertRaises(BatchError):
+            runner.run(action="unknown")
+
+    def test_run_create(self) -> None:
+        """Test creating several package files in parallel"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output_files = [Path(tmp_dir) / 'package{}.json'.format(idx)
+                            for idx in range(3)]
+            jobs = [{"setup_file": self.setup_file, "package_file": ele}
+                    for ele in output_files]
+
+            stream = io.StringIO()
+            exit_code = run_batch(jobs=jobs, action="create", stream=stream)
+
+            self.assertEqual(exit_code, 0)
+            self.assertEqual(len(stream.getvalue().splitlines()), len(jobs))
+
+            with open(self.package_file, 'r') as f:
+                expectation = json.load(f)
+            expectation["urls"].sort()
+            for output_file in output_files:
+                with open(output_file, 'r') as f:
+                    content = json.load(f)
+                content["urls"].sort()
+                self.assertEqual(content, expectation)
+
+            results = [json.loads(line)
+                       for line in stream.getvalue().splitlines()]
+            self.assertTrue(all(ele["changed"] for ele in results))
+
+            # unchanged files are not written again
+            output_files[0].write_text('{}')
+            stream = io.StringIO()
+            exit_code = run_batch(jobs=jobs, action="create", stream=stream)
+            self.assertEqual(exit_code, 0)
+
+            results = {ele["package_file"]: ele["changed"]
+                       for ele in map(json.loads,
+                                      stream.getvalue().splitlines())}
+            self.assertEqual(results, {
+                str(output_files[0]): True,
+                str(output_files[1]): False,
+                str(output_files[2]): False,
+            })
+
+    def test_from_batch_file(self) -> None:
+        """Test creating a batch runner from a JSON file"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            batch_file = Path(tmp_dir) / 'batch.json'
+            content = {
+                "packages": [
+                    {
+                        "setup_file": str(self.setup_file),
+                        "package_file": "package.json",
+                    }
+                ]
+            }
+            with open(batch_file, 'w') as f:
+                json.dump(content, f)
+
+            runner = BatchRunner.from_batch_file(batch_file=batch_file)
+
+            self.assertEqual(len(runner.jobs), 1)
+            self.assertEqual(runner.jobs[0]["setup_file"],
+                             str(self.setup_file.resolve()))
+            self.assertEqual(runner.jobs[0]["package_file"],
+                             str((Path(tmp_dir) / 'package.json').resolve()))
+            self.assertIsNone(runner.jobs[0]["package_changelog_file"])
+
+            with open(batch_file, 'w') as f:
+                json.dump([{"package_file": "package.json"}], f)
+
+            with self.assertRaises(BatchError):
+                BatchRunner.from_batch_file(batch_file=batch_file)
+
+    def test_from_glob(self) -> None:
+        """Test creating a batch runner from a glob pattern"""
+        runner = BatchRunner.from_glob(pattern='data/setup.py',
+                                       root_dir=self._here)
+
+        self.assertEqual(len(runner.jobs), 1)
+        self.assertEqual(runner.jobs[0]["setup_file"],
+                         str(self.setup_file.resolve()))
+        self.assertEqual(runner.jobs[0]["package_file"],
+                         str(self.package_file.resolve()))
+
+        runner = BatchRunner.from_glob(pattern='data/setup.py',
+                                       root_dir=self._here,
+                                       changelog_file_name='sample_changelog.md')   # noqa: E501
+        self.assertEqual(runner.jobs[0]["package_changelog_file"],
+                         str(self.package_changelog_file.resolve()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Unittest for testing the benchmark file"""
+
+import json
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+from sys import stdout
+
+from setup2upypackage.benchmark import (BENCHMARK_MAIN, BENCHMARKS,
+                                        BenchmarkError, BenchmarkRunner,
+                                        SyntheticRepo, compare)
+from setup2upypackage.setup2upypackage import Setup2uPyPackage
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Run before every test method"""
+        # define a format
+        custom_format = '[%(asctime)s] [%(levelname)-8s] [%(filename)-15s @'\
+                        ' %(funcName)-15s:%(lineno)4s] %(message)s'
+
+        # set basic config and level for all loggers
+        logging.basicConfig(level=logging.INFO,
+                            format=custom_format,
+                            stream=stdout)
+
+        # create a logger for this TestSuite
+        self.test_logger = logging.getLogger(__name__)
+        self.test_logger.setLevel(logging.DEBUG)
+        self.test_logger.disabled = True
+
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.repo = SyntheticRepo(root_dir=Path(self._tmp_dir.name) / 'repo',
+                                  packages=3,
+                                  modules=4,
+                                  data_files=5,
+                                  depth=2,
+                                  changelog_entries=7).generate()
+
+    def tearDown(self) -> None:
+        """Run after every test method"""
+        self._tmp_dir.cleanup()
+
+    def test_generate(self) -> None:
+        """Test the generated repository has the configured dimensions"""
+        s2pp = Setup2uPyPackage(
+            setup_file=self.repo.setup_file,
+            package_file=self.repo.package_file,
+            package_changelog_file=self.repo.changelog_file,
+            logger=self.test_logger)
+
+        self.assertEqual(len(s2pp.package_files), 3 * (4 + 1))
+        self.assertIn(Path('pkg2/level1/module3.py'), s2pp.package_files)
+        self.assertEqual(len(s2pp.data_files), 5)
+        self.assertIn(Path('static/level1/file4.txt'), s2pp.data_files)
+        self.assertEqual(s2pp.package_changelog_version, '7.0.0')
+        self.assertEqual(self.repo.version, '7.0.0')
+        self.assertTrue(s2pp.validate())
+
+        with self.assertRaises(BenchmarkError):
+            SyntheticRepo(root_dir=self.repo.root_dir, depth=0)
+
+    def test_run(self) -> None:
+        """Test all benchmarks are measured"""
+        runner = BenchmarkRunner(repo=self.repo,
+                                 repeat=2,
+                                 logger=self.test_logger)
+        results = runner.run()
+
+        self.assertEqual(list(results["benchmarks"]),
+                         list(BENCHMARKS) + [BENCHMARK_MAIN])
+        self.assertEqual(results["repo"], self.repo.dimensions)
+        for result in results["benchmarks"].values():
+            self.assertEqual(result["runs"], 2)
+            self.assertLessEqual(result["min"], result["median"])
+            self.assertLessEqual(result["median"], result["max"])
+        json.dumps(results)
+
+        with self.assertRaises(BenchmarkError):
+            runner.run(benchmarks=['unknown'])
+
+    def test_compare(self) -> None:
+        """Test the medians of two results are compared"""
+        baseline = {"benchmarks": {"validate": {"median": 2.0},
+                                   "create": {"median": 0}}}
+        results = {"benchmarks": {"validate": {"median": 1.0},
+                                  "create": {"median": 1.0},
+                                  "main": {"median": 1.0}}}
+
+        self.assertEqual(compare(baseline=baseline, results=results), {
+            "validate": {"baseline": 2.0, "median": 1.0, "ratio": 0.5},
+            "create": {"baseline": 0, "median": 1.0, "ratio": None},
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Unittest for testing the bundle file"""
+
+import gzip
+import json
+import logging
+import os
+import shutil
+import tarfile
+import tempfile
+import unittest
+from pathlib import Path
+from sys import stdout
+from unittest.mock import PropertyMock, patch
+
+from nose2.tools import params
+
+from setup2upypackage.bundle import BundleError, Bundler, default_mtime
+from setup2upypackage.setup2upypackage import Setup2uPyPackage
+
+
+class TestBundle(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Run before every test method"""
+        # define a format
+        custom_format = '[%(asctime)s] [%(levelname)-8s] [%(filename)-15s @'\
+                        ' %(funcName)-15s:%(lineno)4s] %(message)s'
+
+        # set basic config and level for all loggers
+        logging.basicConfig(level=logging.INFO,
+                            format=custom_format,
+                            stream=stdout)
+
+        # create a logger for this TestSuite
+        self.test_logger = logging.getLogger(__name__)
+        self.test_logger.setLevel(logging.DEBUG)
+        self.test_logger.disabled = True
+
+        self._here = Path(__file__).parent
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self._tmp_dir.name)
+        self.root_dir = self.tmp_path / 'data'
+        shutil.copytree(self._here / 'data', self.root_dir)
+        (self.root_dir / 'subdir1' / 'asdf.py').write_bytes(
+            os.urandom(70 * 1024))
+
+        self.s2pp = Setup2uPyPackage(
+            setup_file=self.root_dir / 'setup.py',
+            package_file=None,
+            package_changelog_file=None,
+            logger=self.test_logger)
+
+    def tearDown(self) -> None:
+        """Run after every test method"""
+        self._tmp_dir.cleanup()
+
+    @params(
+        ('bundle.tar', None),
+        ('bundle.tar.gz', 'gzip'),
+        ('bundle.tgz', 'gzip'),
+    )
+    def test_run(self, name: str, compression: str) -> None:
+        """Test bundle content, order and index"""
+        output_path = self.tmp_path / name
+        bundler = Bundler(setup_2_upy_package=self.s2pp,
+                          output_path=output_path,
+                          mtime=1234,
+                          logger=self.test_logger)
+        index = bundler.run()
+
+        self.assertEqual(index["compression"], compression)
+        self.assertEqual(index, json.loads(bundler.index_file.read_text()))
+        self.assertEqual(list(self.tmp_path.glob('.*.tmp')), [])
+
+        files = sorted(file.as_posix() for file in
+                       self.s2pp.package_files + self.s2pp.data_files)
+        names = [ele["name"] for ele in index["members"]]
+        self.assertEqual(names, ['package.json'] + files)
+
+        with tarfile.open(output_path) as tar:
+            self.assertEqual(tar.getnames(), names)
+            for member in tar.getmembers():
+                self.assertEqual(member.mtime, 1234)
+                self.assertEqual(member.mode, 0o644)
+                self.assertEqual((member.uid, member.gid), (0, 0))
+
+            package_json = json.load(tar.extractfile('package.json'))
+            # urls are sorted by path
+            self.assertEqual(package_json,
+                             dict(self.s2pp.package_data,
+                                  urls=sorted(self.s2pp.package_data["urls"])))
+
+        # every member can be extracted from its byte range
+        content = output_path.read_bytes()
+        for member in index["members"]:
+            data = content[member["offset"]:
+                           member["offset"] + member["length"]]
+            if compression:
+                data = gzip.decompress(data)
+            start = member["header_size"]
+            data = data[start:start + member["size"]]
+
+            if member["name"] == 'package.json':
+                self.assertEqual(json.loads(data), package_json)
+            else:
+                self.assertEqual(data,
+                                 (self.root_dir / member["name"]).read_bytes())
+
+    def test_run_deterministic(self) -> None:
+        """Test the same input results in the same bundle"""
+        contents = []
+
+        for _ in range(2):
+            output_path = self.tmp_path / 'bundle.tar.gz'
+            Bundler(setup_2_upy_package=self.s2pp,
+                    output_path=output_path,
+                    logger=self.test_logger).run()
+            contents.append(output_path.read_bytes())
+            os.utime(self.root_dir / 'subdir1' / 'asdf.py', (0, 0))
+
+        self.assertEqual(contents[0], contents[1])
+
+    def test_run_file_order(self) -> None:
+        """Test the bundle does not depend on the order files are found"""
+        s2pp = Setup2uPyPackage(
+            setup_file=self.root_dir / 'setup.py',
+            package_file=None,
+            package_changelog_file=None,
+            logger=self.test_logger,
+            hashes=True)
+        package_data = s2pp.package_data
+        reordered = dict(package_data,
+                         urls=package_data["urls"][::-1],
+                         hashes=package_data["hashes"][::-1])
+        contents = []
+
+        for data in (package_data, reordered):
+            output_path = self.tmp_path / 'bundle.tar'
+            with patch('setup2upypackage.setup2upypackage.Setup2uPyPackage.'
+                       'package_data', new_callable=PropertyMock,
+                       return_value=data):
+                Bundler(setup_2_upy_package=s2pp,
+                        output_path=output_path,
+                        logger=self.test_logger).run()
+            contents.append(output_path.read_bytes())
+
+        self.assertNotEqual(package_data["urls"], reordered["urls"])
+        self.assertEqual(contents[0], contents[1])
+
+    def test_default_mtime(self) -> None:
+        """Test the modification time is taken from SOURCE_DATE_EPOCH"""
+        with patch.dict(os.environ, {'SOURCE_DATE_EPOCH': '1700000000'}):
+            self.assertEqual(default_mtime(), 1700000000)
+
+        with patch.dict(os.environ, {'SOURCE_DATE_EPOCH': 'now'}):
+            with self.assertRaises(BundleError):
+                default_mtime()
+
+        with patch.dict(os.environ, clear=True):
+            self.assertEqual(default_mtime(), 0)
+
+    def test_unsupported_suffix(self) -> None:
+        """Test unsupported bundle files are rejected"""
+        with self.assertRaises(BundleError):
+            Bundler(setup_2_upy_package=self.s2pp,
+                    output_path=self.tmp_path / 'bundle.zip',
+                    logger=self.test_logger)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Unittest for testing the cache file"""
+
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from sys import stdout
+from unittest.mock import patch
+
+from nose2.tools import params
+
+from setup2upypackage.cache import MetadataCache
+from setup2upypackage.setup2upypackage import Setup2uPyPackage
+
+
+class TestMetadataCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Run before every test method"""
+        # define a format
+        custom_format = '[%(asctime)s] [%(levelname)-8s] [%(filename)-15s @'\
+                        ' %(funcName)-15s:%(lineno)4s] %(message)s'
+
+        # set basic config and level for all loggers
+        logging.basicConfig(level=logging.INFO,
+                            format=custom_format,
+                            stream=stdout)
+
+        # create a logger for this TestSuite
+        self.test_logger = logging.getLogger(__name__)
+        self.test_logger.setLevel(logging.DEBUG)
+
+        self._here = Path(__file__).parent
+        self.setup_file = self._here / 'data' / 'setup.py'
+        self.package_changelog_file = \
+            self._here / 'data' / 'sample_changelog.md'
+
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = Path(self._tmp_dir.name) / 'cache'
+
+    def tearDown(self) -> None:
+        """Run after every test method"""
+        self._tmp_dir.cleanup()
+
+    def test_key(self) -> None:
+        """Test cache key creation"""
+        key = MetadataCache.key(self.setup_file, None)
+        self.assertEqual(key, MetadataCache.key(self.setup_file, None))
+        changelog_key = MetadataCache.key(self.setup_file,
+                                          self.package_changelog_file)
+        self.assertNotEqual(key, changelog_key)
+        self.assertNotEqual(key, MetadataCache.key(self.setup_file, None,
+                                                   salt='ast'))
+
+        other_file = Path(self._tmp_dir.name) / 'setup.py'
+        other_file.write_bytes(self.setup_file.read_bytes())
+        self.assertEqual(key, MetadataCache.key(other_file, None))
+
+        other_file.write_bytes(self.setup_file.read_bytes() + b'\n')
+        self.assertNotEqual(key, MetadataCache.key(other_file, None))
+
+        with patch('setup2upypackage.cache.__version__', '99.0.0'):
+            self.assertNotEqual(key, MetadataCache.key(self.setup_file, None))
+
+    def test_get_set(self) -> None:
+        """Test getting and setting cache entries"""
+        cache = MetadataCache(cache_dir=self.cache_dir)
+        self.assertTrue(self.cache_dir.is_dir())
+
+        self.assertIsNone(cache.get('asdf'))
+        cache.set('asdf', {'version': '1.2.3'})
+        self.assertEqual(cache.get('asdf'), {'version': '1.2.3'})
+        self.assertEqual(list(self.cache_dir.iterdir()),
+                         [self.cache_dir / 'asdf.json'])
+
+        # corrupt entries are ignored
+        (self.cache_dir / 'asdf.json').write_text('{"version": ')
+        self.assertIsNone(cache.get('asdf'))
+
+        # not serializable data is not cached
+        cache.set('qwertz', {'path': Path('asdf')})
+        self.assertIsNone(cache.get('qwertz'))
+
+        cache.clear()
+        self.assertEqual(list(self.cache_dir.iterdir()), [])
+
+        # temporary files of parallel runs are neither evicted nor cleared
+        tmp_file = self.cache_dir / '.tmp-1234.json.tmp'
+        tmp_file.write_text('{"version": ')
+        cache = MetadataCache(cache_dir=self.cache_dir, max_size=0)
+        cache.set('asdf', {'version': '1.2.3'})
+        cache.clear()
+        self.assertEqual(list(self.cache_dir.iterdir()), [tmp_file])
+
+    def test_eviction(self) -> None:
+        """Test least recently used entries are evicted"""
+        data = {'content': 'x' * 100}
+        cache = MetadataCache(cache_dir=self.cache_dir, max_size=350)
+
+        for idx, key in enumerate(['a', 'b', 'c']):
+            cache.set(key, data)
+            os.utime(self.cache_dir / '{}.json'.format(key),
+                     ns=(idx * 10**9, idx * 10**9))
+
+        # use "a", "b" becomes the least recently used entry
+        self.assertEqual(cache.get('a'), data)
+        cache.set('d', data)
+
+        self.assertIsNone(cache.get('b'))
+        for key in ['a', 'c', 'd']:
+            self.assertEqual(cache.get(key), data)
+
+    def test_setup2upypackage(self) -> None:
+        """Test usage of the cache by Setup2uPyPackage"""
+        s2pp = Setup2uPyPackage(
+            setup_file=self.setup_file,
+            package_file=None,
+            package_changelog_file=self.package_changelog_file,
+            logger=self.test_logger,
+            cache_dir=self.cache_dir
+        )
+        expectation = s2pp.package_data
+        self.assertEqual(len(list(self.cache_dir.glob('*.json'))), 1)
+
+        with patch.object(Setup2uPyPackage,
+                          '_parse_setup_file_content') as parse, \
+                patch.object(Setup2uPyPackage,
+                             '_get_package_changelog_version') as changelog:
+            s2pp = Setup2uPyPackage(
+                setup_file=self.setup_file,
+                package_file=None,
+                package_changelog_file=self.package_changelog_file,
+                logger=self.test_logger,
+                cache_dir=self.cache_dir
+            )
+            self.assertEqual(s2pp.package_data, expectation)
+            self.assertEqual(s2pp.setup_engine,
+                             Setup2uPyPackage.ENGINE_RUN_SETUP)
+            parse.assert_not_called()
+            changelog.assert_not_called()
+
+        data_files_expectation = [
+            ('static', ['static/style.css',
+                        'static/favicon.ico',
+                        'static/js/function.js']),
+            ('other_files', ['other_files/index.tpl',
+                             'other_files/page.tpl'])
+        ]
+        self.assertEqual(s2pp._setup_data['data_files'],
+                         data_files_expectation)
+
+    @params(
+        (Setup2uPyPackage.ENGINE_RUN_SETUP, ),
+        (Setup2uPyPackage.ENGINE_AST, ),
+    )
+    def test_read_files(self, engine: str) -> None:
+        """Test a cache entry is not used if a file read by setup.py changed"""
+        data_dir = Path(self._tmp_dir.name) / 'data'
+        shutil.copytree(self._here / 'data', data_dir)
+        version_file = data_dir / 'sample_version.py'
+
+        def get_version() -> str:
+            return Setup2uPyPackage(setup_file=data_dir / 'setup.py',
+                                    package_file=None,
+                                    package_changelog_file=None,
+                                    logger=self.test_logger,
+                                    engine=engine,
+                                    cache_dir=self.cache_dir).package_version
+
+        self.assertEqual(get_version(), '1.2.3')
+        self.assertEqual(len(list(self.cache_dir.glob('*.json'))), 1)
+
+        version_file.write_text(version_file.read_text().replace(
+            "('1', '2', '3')", "('4', '5', '6')"))
+        self.assertEqual(get_version(), '4.5.6')
+
+        with patch.object(Setup2uPyPackage,
+                          '_parse_setup_file_content') as parse:
+            self.assertEqual(get_version(), '4.5.6')
+            parse.assert_not_called()
+
+        # files read by a not resolvable path are not known
+        setup_file = data_dir / 'setup.py'
+        setup_file.write_text(setup_file.read_text().replace(
+            "here / 'sample_version.py'",
+            "here / ''.join(reversed('yp.noisrev_elpmas'))"))
+        version_file.write_text(version_file.read_text().replace(
+            "('4', '5', '6')", "('7', '8', '9')"))
+        self.assertEqual(get_version(), '7.8.9')
+        self.assertEqual(len(list(self.cache_dir.glob('*.json'))), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
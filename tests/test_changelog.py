@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Unittest for testing the changelog file"""
+
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+from sys import stdout
+
+from changelog2version.extract_version import ExtractVersion
+from nose2.tools import params
+
+from setup2upypackage.changelog import (extract_version, find_version_line,
+                                        parse_version_line)
+
+
+class TestChangelog(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Run before every test method"""
+        # define a format
+        custom_format = '[%(asctime)s] [%(levelname)-8s] [%(filename)-15s @'\
+                        ' %(funcName)-15s:%(lineno)4s] %(message)s'
+
+        # set basic config and level for all loggers
+        logging.basicConfig(level=logging.INFO,
+                            format=custom_format,
+                            stream=stdout)
+
+        # create a logger for this TestSuite
+        self.test_logger = logging.getLogger(__name__)
+        self.test_logger.setLevel(logging.DEBUG)
+
+        self._here = Path(__file__).parent
+        self.package_changelog_file = \
+            self._here / 'data' / 'sample_changelog.md'
+
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.changelog_file = Path(self._tmp_dir.name) / 'changelog.md'
+
+    def tearDown(self) -> None:
+        """Run after every test method"""
+        self._tmp_dir.cleanup()
+
+    def _changelog2version(self, changelog_file: Path) -> str:
+        """
+        Get version of a changelog with changelog2version
+
+        :param      changelog_file:  The changelog file
+        :type       changelog_file:  Path
+
+        :returns:   Semantic version string
+        :rtype:     str
+        """
+        ev = ExtractVersion(logger=self.test_logger)
+        version_line = ev.parse_changelog(changelog_file=changelog_file)
+
+        return ev.parse_semver_line(release_version_line=version_line)
+
+    def test_extract_version(self) -> None:
+        """Test extracting the version of the sample changelog"""
+        self.assertEqual(extract_version(self.package_changelog_file),
+                         '9.8.7')
+        self.assertEqual(find_version_line(self.package_changelog_file),
+                         '## [9.8.7] - 2023-03-27')
+
+    @params(
+        ("## [Unreleased]\n## [1.2.3] - 2023-01-02\n## [1.2.2] - 2022-01-01",
+         "1.2.3"),
+        ("## [1.0.0-rc.1+build.5] - 2023-01-02 12:34:56",
+         "1.0.0-rc.1+build.5"),
+        ("## [1.2] - 2023-01-02\n## [0.1.0] - 2022-01-01", "0.1.0"),
+        ("## [01.2.3] - 2023-01-02", "0.0.0"),
+        ("# Changelog\nNo release yet", "0.0.0"),
+        ("", "0.0.0"),
+    )
+    def test_same_as_changelog2version(self,
+                                       content: str,
+                                       expectation: str) -> None:
+        """Test the result equals the one of changelog2version"""
+        self.changelog_file.write_text(content)
+
+        self.assertEqual(extract_version(self.changelog_file), expectation)
+        self.assertEqual(self._changelog2version(self.changelog_file),
+                         expectation)
+
+    def test_stops_at_first_release(self) -> None:
+        """Test the changelog history after the first release is not read"""
+        content = "## [Unreleased]\n## [2.0.0] - 2023-01-02\n"
+        content += "### Added\n- something\n" * 100000
+        self.changelog_file.write_text(content)
+
+        # invalid UTF-8 data after the history would fail to decode
+        with open(self.changelog_file, 'ab') as f:
+            f.write(b'\xff\xfe\xfa')
+
+        self.assertEqual(extract_version(self.changelog_file), '2.0.0')
+
+    def test_parse_version_line(self) -> None:
+        """Test parsing a release version line"""
+        self.assertEqual(parse_version_line('## [0.2.0] - 2022-05-19'),
+                         '0.2.0')
+        self.assertEqual(parse_version_line('## 0.2.0 - 2022-05-19'),
+                         '0.0.0')
+        self.assertEqual(parse_version_line('## [a.b.c] - 2022-05-19'),
+                         '0.0.0')
+
+
+if __name__ == '__main__':
+    unittest.main()
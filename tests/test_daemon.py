@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Unittest for testing the daemon file"""
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from sys import stdout
+from unittest.mock import patch
+
+from setup2upypackage.daemon import (DaemonClient, DaemonError,
+                                     DaemonUnavailableError, PackageServer,
+                                     check_socket_path, default_socket_path,
+                                     process_request)
+from setup2upypackage.setup2upypackage import Setup2uPyPackage
+
+
+class TestDaemon(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Run before every test method"""
+        # define a format
+        custom_format = '[%(asctime)s] [%(levelname)-8s] [%(filename)-15s @'\
+                        ' %(funcName)-15s:%(lineno)4s] %(message)s'
+
+        # set basic config and level for all loggers
+        logging.basicConfig(level=logging.INFO,
+                            format=custom_format,
+                            stream=stdout)
+
+        # create a logger for this TestSuite
+        self.test_logger = logging.getLogger(__name__)
+        self.test_logger.setLevel(logging.DEBUG)
+        self.test_logger.disabled = True
+
+        self._here = Path(__file__).parent
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.root_dir = Path(self._tmp_dir.name) / 'data'
+        shutil.copytree(self._here / 'data', self.root_dir)
+
+        self.setup_file = self.root_dir / 'setup.py'
+        self.package_file = self.root_dir / 'package.json'
+        self.socket_path = Path(self._tmp_dir.name) / 'upy-package.sock'
+
+        self.server = None
+        self.thread = None
+
+    def tearDown(self) -> None:
+        """Run after every test method"""
+        if self.thread is not None:
+            DaemonClient(socket_path=self.socket_path).request(
+                {"command": "shutdown"})
+            self.thread.join(timeout=10)
+        self._tmp_dir.cleanup()
+
+    def _start_server(self, default: bool = False) -> None:
+        """Start a server on the temporary or default socket in a thread"""
+        self.server = PackageServer(
+            socket_path=None if default else self.socket_path,
+            logger=self.test_logger)
+        self.thread = threading.Thread(target=self.server.serve_forever,
+                                       daemon=True)
+        self.thread.start()
+
+        # wait for the server to listen
+        client = DaemonClient(socket_path=self.socket_path)
+        for _ in range(100):
+            try:
+                client.request({"command": "ping"})
+                return
+            except DaemonUnavailableError:
+                self.thread.join(timeout=0.05)
+        self.fail("Server not started")
+
+    def _request(self, **kwargs) -> dict:
+        """Send a run request of the temporary package"""
+        request = {
+            "command": "run",
+            "setup_file": str(self.setup_file),
+            "package_file": str(self.package_file),
+            "engine": Setup2uPyPackage.ENGINE_AST,
+        }
+        request.update(kwargs)
+
+        return DaemonClient(socket_path=self.socket_path).request(request)
+
+    def test_process_request(self) -> None:
+        """Test processing a request in-process"""
+        s2pp = Setup2uPyPackage(setup_file=self.setup_file,
+                                package_file=self.package_file,
+                                package_changelog_file=None,
+                                logger=self.test_logger)
+
+        response = process_request(s2pp, {"validate": True, "print": True})
+        self.assertTrue(response["success"])
+        self.assertTrue(response["valid"])
+        self.assertEqual(response["package_data"], s2pp.package_data)
+
+        (self.root_dir / 'subdir1' / 'new.py').write_text('')
+        s2pp.refresh()
+        content = self.package_file.read_text()
+        response = process_request(s2pp, {"validate": True, "create": True})
+        self.assertFalse(response["success"])
+        self.assertFalse(response["valid"])
+        # not created due to the failed validation
+        self.assertEqual(self.package_file.read_text(), content)
+
+    def test_client_unavailable(self) -> None:
+        """Test the client fails if no daemon is running"""
+        client = DaemonClient(socket_path=self.socket_path)
+        with self.assertRaises(DaemonUnavailableError):
+            client.request({"command": "ping"})
+
+    def test_no_socket(self) -> None:
+        """Test other files on the socket path are never removed"""
+        self.socket_path.write_text('{}')
+
+        with self.assertRaises(DaemonError):
+            PackageServer(socket_path=self.socket_path).serve_forever()
+        self.assertEqual(self.socket_path.read_text(), '{}')
+
+        with self.assertRaises(DaemonUnavailableError):
+            DaemonClient(socket_path=self.socket_path).request(
+                {"command": "ping"})
+
+    def test_default_socket_path(self) -> None:
+        """Test the default socket is created in a private directory"""
+        tmp_path = Path(self._tmp_dir.name)
+
+        with patch.dict(os.environ, {'XDG_RUNTIME_DIR': str(tmp_path)}):
+            self.assertEqual(default_socket_path(),
+                             tmp_path / 'upy-package.sock')
+
+        with patch.dict(os.environ, {'XDG_RUNTIME_DIR': ''}), \
+                patch('setup2upypackage.daemon.tempfile.gettempdir',
+                      return_value=str(tmp_path)):
+            self.socket_path = default_socket_path()
+            self.assertEqual(self.socket_path.parent.parent, tmp_path)
+
+            self._start_server(default=True)
+            self.assertEqual(self.server.socket_path, self.socket_path)
+            self.assertEqual(self.socket_path.parent.stat().st_mode & 0o777,
+                             0o700)
+            self.assertTrue(check_socket_path(socket_path=self.socket_path,
+                                              private_dir=True))
+
+            # a directory accessible by other users is not trusted
+            self.socket_path.parent.chmod(0o755)
+            with self.assertRaises(DaemonError):
+                check_socket_path(socket_path=self.socket_path,
+                                  private_dir=True)
+            with self.assertRaises(DaemonUnavailableError):
+                DaemonClient().request({"command": "ping"})
+            self.socket_path.parent.chmod(0o700)
+
+    def test_serve(self) -> None:
+        """Test warm packages are reused and invalidated on changes"""
+        self._start_server()
+
+        response = self._request(validate=True, print=True)
+        self.assertTrue(response["success"])
+        self.assertTrue(response["valid"])
+        urls = response["package_data"]["urls"]
+
+        response = self._request(validate=True)
+        self.assertTrue(response["valid"])
+        response = DaemonClient(socket_path=self.socket_path).request(
+            {"command": "ping"})
+        self.assertEqual(response["packages"], 1)
+
+        # added package file
+        (self.root_dir / 'subdir1' / 'new.py').write_text('')
+        response = self._request(validate=True)
+        self.assertFalse(response["success"])
+        self.assertEqual(response["diff"]["urls"]["missing"][0][0],
+                         'subdir1/new.py')
+
+        # excluded files are a separate warm package
+        response = self._request(validate=True,
+                                 excludes=['subdir1/new.py'])
+        self.assertTrue(response["valid"])
+        response = DaemonClient(socket_path=self.socket_path).request(
+            {"command": "ping"})
+        self.assertEqual(response["packages"], 2)
+
+        response = self._request(create=True, print=True)
+        self.assertTrue(response["success"])
+        self.assertEqual(len(response["package_data"]["urls"]),
+                         len(urls) + 1)
+        self.assertEqual(json.loads(self.package_file.read_text()),
+                         response["package_data"])
+
+        # changed setup.py file
+        content = self.setup_file.read_text()
+        self.setup_file.write_text(content.replace("version=__version__",
+                                                   "version='3.2.1'"))
+        response = self._request(validate=True)
+        self.assertEqual(response["diff"]["version"],
+                         {"expected": "3.2.1", "actual": "1.2.3"})
+
+        response = self._request(setup_file=str(self.root_dir / 'none.py'))
+        self.assertFalse(response["success"])
+        self.assertIn("none.py", response["error"])
+
+        response = self._request(command="unknown")
+        self.assertFalse(response["success"])
+
+    def test_already_running(self) -> None:
+        """Test a second daemon on the same socket is not started"""
+        self._start_server()
+
+        with self.assertRaises(DaemonError):
+            PackageServer(socket_path=self.socket_path).serve_forever()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Unittest for testing the declarative file"""
+
+import logging
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from sys import stdout
+
+from nose2.tools import params
+
+from setup2upypackage.declarative import (DeclarativeSetupError,
+                                          detect_setup_file, find_packages,
+                                          parse_pyproject, parse_setup_cfg,
+                                          read_attr)
+from setup2upypackage.setup2upypackage import (Setup2uPyPackage,
+                                               Setup2uPyPackageError)
+
+
+class TestDeclarative(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Run before every test method"""
+        # define a format
+        custom_format = '[%(asctime)s] [%(levelname)-8s] [%(filename)-15s @'\
+                        ' %(funcName)-15s:%(lineno)4s] %(message)s'
+
+        # set basic config and level for all loggers
+        logging.basicConfig(level=logging.INFO,
+                            format=custom_format,
+                            stream=stdout)
+
+        # create a logger for this TestSuite
+        self.test_logger = logging.getLogger(__name__)
+        self.test_logger.setLevel(logging.DEBUG)
+        self.test_logger.disabled = True
+
+        self._here = Path(__file__).parent
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self._tmp_dir.name)
+
+        # package with a literal version in its __init__.py
+        (self.tmp_path / 'pkg' / 'sub').mkdir(parents=True)
+        (self.tmp_path / 'pkg' / '__init__.py').write_text(
+            '"""Package"""\n__version__: str = "4.5.6"\n')
+        (self.tmp_path / 'pkg' / 'sub' / '__init__.py').write_text('')
+        (self.tmp_path / 'tests').mkdir()
+        (self.tmp_path / 'tests' / '__init__.py').write_text('')
+        (self.tmp_path / 'VERSION').write_text('7.8.9\n')
+
+    def tearDown(self) -> None:
+        """Run after every test method"""
+        self._tmp_dir.cleanup()
+
+    @params(
+        ('pyproject.toml', ),
+        ('setup.cfg', ),
+    )
+    def test_package_data(self, file_name: str) -> None:
+        """Test declarative files result in the same data as setup.py"""
+        if file_name == 'pyproject.toml' and sys.version_info < (3, 11):
+            try:
+                import tomli  # noqa: F401
+            except ImportError:
+                self.skipTest('No TOML parser available')
+
+        expected = Setup2uPyPackage(
+            setup_file=self._here / 'data' / 'setup.py',
+            package_file=None,
+            package_changelog_file=None,
+            logger=self.test_logger,
+            engine=Setup2uPyPackage.ENGINE_AST)
+        s2pp = Setup2uPyPackage(
+            setup_file=self._here / 'data' / file_name,
+            package_file=self._here / 'data' / 'package.json',
+            package_changelog_file=None,
+            logger=self.test_logger)
+
+        self.assertEqual(s2pp.setup_engine,
+                         Setup2uPyPackage.ENGINE_DECLARATIVE)
+        self.assertEqual(s2pp.package_data, expected.package_data)
+        self.assertTrue(s2pp.validate())
+
+    def test_parse_pyproject(self) -> None:
+        """Test dynamic versions, found packages and URL selection"""
+        pyproject = self.tmp_path / 'pyproject.toml'
+        pyproject.write_text(
+            '[project]\n'
+            'name = "pkg"\n'
+            'dynamic = ["version"]\n'
+            '[project.urls]\n'
+            'Documentation = "https://example.com/docs"\n'
+            'Repository = "https://github.com/user/pkg"\n'
+            '[tool.setuptools.dynamic]\n'
+            'version = {attr = "pkg.__version__"}\n'
+            '[tool.setuptools.packages.find]\n'
+            'exclude = ["tests*"]\n')
+
+        self.assertEqual(parse_pyproject(path=pyproject), {
+            'version': '4.5.6',
+            'url': 'https://github.com/user/pkg',
+            'packages': ['pkg', 'pkg.sub'],
+        })
+
+        pyproject.write_text('[build-system]\nrequires = ["setuptools"]\n')
+        with self.assertRaises(DeclarativeSetupError):
+            parse_pyproject(path=pyproject)
+
+        pyproject.write_text('[project\n')
+        with self.assertRaises(DeclarativeSetupError):
+            parse_pyproject(path=pyproject)
+
+    def test_parse_setup_cfg(self) -> None:
+        """Test file versions, project URLs and comma separated lists"""
+        setup_cfg = self.tmp_path / 'setup.cfg'
+        setup_cfg.write_text(
+            '[metadata]\n'
+            'version = file: VERSION\n'
+            'project_urls =\n'
+            '    Bug Tracker = https://github.com/user/pkg/issues\n'
+            '    Source Code = https://github.com/user/pkg\n'
+            '[options]\n'
+            'packages = find:\n'
+            'install_requires = dep_a, dep_b\n'
+            '[options.packages.find]\n'
+            'include = pkg*\n')
+
+        self.assertEqual(parse_setup_cfg(path=setup_cfg), {
+            'version': '7.8.9',
+            'url': 'https://github.com/user/pkg',
+            'install_requires': ['dep_a', 'dep_b'],
+            'packages': ['pkg', 'pkg.sub'],
+        })
+
+        setup_cfg.write_text('[metadata]\nversion = 1.0.0\n'
+                             '[options]\npackages = find:\n'
+                             '[options.packages.find]\nwhere = src\n')
+        with self.assertRaises(DeclarativeSetupError):
+            parse_setup_cfg(path=setup_cfg)
+
+        setup_cfg.write_text('[flake8]\nmax-line-length = 79\n')
+        with self.assertRaises(Setup2uPyPackageError):
+            Setup2uPyPackage(setup_file=setup_cfg,
+                             package_file=None,
+                             package_changelog_file=None,
+                             logger=self.test_logger)
+
+    def test_read_attr(self) -> None:
+        """Test literal module level assignments are read statically"""
+        self.assertEqual(read_attr(root_dir=self.tmp_path,
+                                   attr='pkg.__version__'), '4.5.6')
+
+        for attr in ('__version__', 'pkg.missing', 'other.__version__'):
+            with self.assertRaises(DeclarativeSetupError):
+                read_attr(root_dir=self.tmp_path, attr=attr)
+
+    def test_find_packages(self) -> None:
+        """Test directories with an __init__.py file are found"""
+        self.assertEqual(find_packages(root_dir=self.tmp_path),
+                         ['pkg', 'pkg.sub', 'tests'])
+        self.assertEqual(find_packages(root_dir=self.tmp_path,
+                                       include=['pkg*'],
+                                       exclude=['*.sub']),
+                         ['pkg'])
+
+    def test_detect_setup_file(self) -> None:
+        """Test declarative files are preferred over a setup.py file"""
+        self.assertIsNone(detect_setup_file(directory=self.tmp_path))
+
+        (self.tmp_path / 'setup.py').write_text('')
+        self.assertEqual(detect_setup_file(directory=self.tmp_path),
+                         self.tmp_path / 'setup.py')
+
+        # setup.cfg without metadata, e.g. only for flake8
+        (self.tmp_path / 'setup.cfg').write_text('[flake8]\n')
+        self.assertEqual(detect_setup_file(directory=self.tmp_path),
+                         self.tmp_path / 'setup.py')
+
+        (self.tmp_path / 'setup.cfg').write_text(
+            '[metadata]\nversion = 1.0.0\n')
+        self.assertEqual(detect_setup_file(directory=self.tmp_path),
+                         self.tmp_path / 'setup.cfg')
+
+
+if __name__ == '__main__':
+    unittest.main()
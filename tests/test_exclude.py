@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Unittest for testing the exclude file"""
+
+import json
+import logging
+import shutil
+import tarfile
+import tempfile
+import unittest
+from pathlib import Path
+from sys import stdout
+
+from nose2.tools import params
+
+from setup2upypackage.bundle import Bundler
+from setup2upypackage.exclude import ExcludeError, ExcludeMatcher
+from setup2upypackage.minify import Minifier
+from setup2upypackage.setup2upypackage import (Setup2uPyPackage,
+                                               Setup2uPyPackageError)
+
+
+class TestExclude(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Run before every test method"""
+        # define a format
+        custom_format = '[%(asctime)s] [%(levelname)-8s] [%(filename)-15s @'\
+                        ' %(funcName)-15s:%(lineno)4s] %(message)s'
+
+        # set basic config and level for all loggers
+        logging.basicConfig(level=logging.INFO,
+                            format=custom_format,
+                            stream=stdout)
+
+        # create a logger for this TestSuite
+        self.test_logger = logging.getLogger(__name__)
+        self.test_logger.setLevel(logging.DEBUG)
+        self.test_logger.disabled = True
+
+        self._here = Path(__file__).parent
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.root_dir = Path(self._tmp_dir.name) / 'data'
+        shutil.copytree(self._here / 'data', self.root_dir)
+
+    def tearDown(self) -> None:
+        """Run after every test method"""
+        self._tmp_dir.cleanup()
+
+    @params(
+        ('main.py', 'main.py', True),
+        ('main.py', 'pkg/main.py', True),
+        ('main.py', 'domain.py', False),
+        ('main.py', 'main.pyc', False),
+        ('*.css', 'static/style.css', True),
+        ('static/*.js', 'static/js/function.js', False),
+        ('static/**/*.js', 'static/js/function.js', True),
+        ('static/**/*.js', 'static/function.js', True),
+        ('/static', 'static/js/function.js', True),
+        ('static', 'other/static/style.css', True),
+        ('other_dir/ba?.py', 'other_dir/baz.py', True),
+        ('other_dir/ba[!r].py', 'other_dir/bar.py', False),
+        ('other_dir/ba[!r].py', 'other_dir/baz.py', True),
+        ('a+b(c).py', 'a+b(c).py', True),
+        ('[.py', '[.py', True),
+    )
+    def test_matches(self, pattern: str, path: str, expected: bool) -> None:
+        """Test glob semantics of a single pattern"""
+        matcher = ExcludeMatcher(patterns=[pattern])
+
+        self.assertTrue(matcher)
+        self.assertEqual(matcher.matches(path), expected)
+
+    def test_filter(self) -> None:
+        """Test entries are filtered by all patterns in one pass"""
+        entries = [['main.py', 'url/main.py'],
+                   ['domain.py', 'url/domain.py'],
+                   ['static/style.css', 'url/static/style.css'],
+                   ['lib/boot.py', 'url/lib/boot.py']]
+        matcher = ExcludeMatcher(patterns=['main.py', 'boot.py', 'static'])
+
+        self.assertEqual(matcher.filter(entries),
+                         [['domain.py', 'url/domain.py']])
+        self.assertEqual(matcher.filter_paths(ele[0] for ele in entries),
+                         ['domain.py'])
+
+        matcher = ExcludeMatcher()
+        self.assertFalse(matcher)
+        self.assertEqual(matcher.filter(entries), entries)
+        self.assertFalse(matcher.matches('main.py'))
+
+        with self.assertRaises(ExcludeError):
+            ExcludeMatcher(patterns=['/'])
+
+    def test_create(self) -> None:
+        """Test excluded files are not part of a created package.json file"""
+        s2pp = Setup2uPyPackage(
+            setup_file=self.root_dir / 'setup.py',
+            package_file=self.root_dir / 'package.json',
+            package_changelog_file=None,
+            hashes=True,
+            excludes=['static/**/*.js', 'baz.py'],
+            logger=self.test_logger)
+        output_path = self.root_dir / 'created.json'
+
+        self.assertTrue(s2pp.create(output_path=output_path))
+        package_data = json.loads(output_path.read_text())
+        paths = [ele[0] for ele in package_data['urls']]
+
+        self.assertIn('other_dir/bar.py', paths)
+        self.assertIn('static/style.css', paths)
+        self.assertNotIn('other_dir/baz.py', paths)
+        self.assertNotIn('static/js/function.js', paths)
+        self.assertEqual([ele[0] for ele in package_data['hashes']], paths)
+
+        with self.assertRaises(Setup2uPyPackageError):
+            Setup2uPyPackage(setup_file=self.root_dir / 'setup.py',
+                             package_file=None,
+                             package_changelog_file=None,
+                             excludes=[''],
+                             logger=self.test_logger)
+
+    def test_bundle_minify(self) -> None:
+        """Test excluded files are neither bundled nor minified"""
+        s2pp = Setup2uPyPackage(
+            setup_file=self.root_dir / 'setup.py',
+            package_file=None,
+            package_changelog_file=None,
+            excludes=['baz.py', 'static/**/*.js'],
+            logger=self.test_logger)
+        paths = [ele[0] for ele in s2pp.package_data['urls']]
+        self.assertEqual(s2pp.file_paths, paths)
+
+        output_path = self.root_dir / 'bundle.tar'
+        Bundler(setup_2_upy_package=s2pp,
+                output_path=output_path,
+                logger=self.test_logger).run()
+        with tarfile.open(output_path) as tar:
+            self.assertEqual(tar.getnames(), ['package.json'] + sorted(paths))
+
+        results = Minifier(setup_2_upy_package=s2pp,
+                           output_dir=self.root_dir / 'build',
+                           logger=self.test_logger).run()
+        self.assertEqual(sorted(Path(ele["file"]).name for ele in results),
+                         ['asdf.py', 'bar.py', 'foo.py'])
+        self.assertFalse((self.root_dir / 'build' / 'other_dir' /
+                          'baz.py').exists())
+
+    def test_validate(self) -> None:
+        """Test excluded files are ignored in the package.json file"""
+        package_file = self.root_dir / 'package.json'
+        package_data = json.loads(package_file.read_text())
+        package_data['urls'].append(['domain.py', 'github:user/domain.py'])
+        package_data['urls'].append(['lib/main.py', 'github:user/main.py'])
+        package_file.write_text(json.dumps(package_data))
+
+        s2pp = Setup2uPyPackage(
+            setup_file=self.root_dir / 'setup.py',
+            package_file=package_file,
+            package_changelog_file=None,
+            excludes=['static'],
+            logger=self.test_logger)
+
+        # boot and main files are matched by name, not as substring
+        diff = s2pp.get_validation_diff(ignore_boot_main=True)
+        self.assertEqual(diff['urls'], {
+            'extra': [['domain.py', 'github:user/domain.py']]
+        })
+
+        s2pp = Setup2uPyPackage(
+            setup_file=self.root_dir / 'setup.py',
+            package_file=package_file,
+            package_changelog_file=None,
+            excludes=['static', 'domain.py', 'main.py'],
+            logger=self.test_logger)
+        self.assertTrue(s2pp.validate())
+
+        # malformed entries are a mismatch
+        package_data['urls'].append(['lib/foo.py'])
+        package_file.write_text(json.dumps(package_data))
+        s2pp.refresh()
+        self.assertFalse(s2pp.validate(ignore_boot_main=True))
+        self.assertEqual(s2pp.get_validation_diff()['urls'],
+                         {'invalid': [['lib/foo.py']]})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Unittest for testing the file_index file"""
+
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from sys import stdout
+from unittest.mock import patch
+
+from setup2upypackage.file_index import FileIndex, GitFileIndex
+from setup2upypackage.setup2upypackage import (Setup2uPyPackage,
+                                               Setup2uPyPackageError)
+
+
+class TestFileIndex(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Run before every test method"""
+        # define a format
+        custom_format = '[%(asctime)s] [%(levelname)-8s] [%(filename)-15s @'\
+                        ' %(funcName)-15s:%(lineno)4s] %(message)s'
+
+        # set basic config and level for all loggers
+        logging.basicConfig(level=logging.INFO,
+                            format=custom_format,
+                            stream=stdout)
+
+        # create a logger for this TestSuite
+        self.test_logger = logging.getLogger(__name__)
+        self.test_logger.setLevel(logging.DEBUG)
+
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.root_dir = Path(self._tmp_dir.name)
+
+        for file in ['pkg/__init__.py',
+                     'pkg/foo.py',
+                     'pkg/data.txt',
+                     'pkg/sub/__init__.py',
+                     'pkg/sub/bar.py',
+                     'pkg/sub/deep/baz.py',
+                     'pkg/__pycache__/foo.cpython-39.pyc',
+                     'static/style.css',
+                     'static/js/function.js',
+                     'static/js/lib/other.js']:
+            path = self.root_dir / file
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(file)
+
+    def tearDown(self) -> None:
+        """Run after every test method"""
+        self._tmp_dir.cleanup()
+
+    def test_is_file(self) -> None:
+        """Test file and directory lookup"""
+        index = FileIndex(root_dir=self.root_dir)
+
+        self.assertTrue(index.is_file('pkg/foo.py'))
+        self.assertTrue(index.is_file('./pkg/foo.py'))
+        self.assertFalse(index.is_file('pkg/sub'))
+        self.assertFalse(index.is_file('pkg/not_existing.py'))
+        self.assertFalse(index.is_file('not_existing/foo.py'))
+
+        self.assertTrue(index.is_dir('pkg/sub'))
+        self.assertTrue(index.is_dir(''))
+        self.assertFalse(index.is_dir('pkg/foo.py'))
+
+    def test_files(self) -> None:
+        """Test listing files of a directory"""
+        index = FileIndex(root_dir=self.root_dir)
+
+        self.assertEqual(sorted(index.files('pkg', pattern='*.py')),
+                         ['pkg/__init__.py', 'pkg/foo.py'])
+        self.assertEqual(sorted(index.files('pkg', pattern='*.py',
+                                            recursive=True)),
+                         ['pkg/__init__.py',
+                          'pkg/foo.py',
+                          'pkg/sub/__init__.py',
+                          'pkg/sub/bar.py',
+                          'pkg/sub/deep/baz.py'])
+        self.assertEqual(index.files('not_existing'), [])
+
+    def test_glob(self) -> None:
+        """Test expanding glob patterns"""
+        index = FileIndex(root_dir=self.root_dir)
+
+        self.assertTrue(index.has_magic('static/*.css'))
+        self.assertFalse(index.has_magic('static/style.css'))
+
+        self.assertEqual(index.glob('static/*'), ['static/style.css'])
+        self.assertEqual(index.glob('static/js/*.js'),
+                         ['static/js/function.js'])
+        self.assertEqual(index.glob('static/**/*.js'),
+                         ['static/js/function.js',
+                          'static/js/lib/other.js'])
+        self.assertEqual(index.glob('static/**'),
+                         ['static/js/function.js',
+                          'static/js/lib/other.js',
+                          'static/style.css'])
+        self.assertEqual(index.glob('*/sub/b?r.py'), ['pkg/sub/bar.py'])
+        self.assertEqual(index.glob('not_existing/*'), [])
+
+    def test_scan_once(self) -> None:
+        """Test every directory is scanned only once"""
+        index = FileIndex(root_dir=self.root_dir)
+
+        with patch('setup2upypackage.file_index.os.scandir',
+                   wraps=os.scandir) as scandir:
+            index.files('pkg', pattern='*.py', recursive=True)
+            index.is_file('pkg/foo.py')
+            index.is_file('pkg/sub/bar.py')
+            index.glob('pkg/**/*.py')
+
+            scanned = [Path(ele.args[0]) for ele in scandir.call_args_list]
+            self.assertEqual(len(scanned), len(set(scanned)))
+
+            index.invalidate('pkg')
+            index.is_file('pkg/foo.py')
+            self.assertEqual(scandir.call_args.args[0], self.root_dir / 'pkg')
+
+    def test_changed_dirs(self) -> None:
+        """Test directories with added or removed files are detected"""
+        index = FileIndex(root_dir=self.root_dir)
+        index.files('pkg', pattern='*.py', recursive=True)
+        self.assertEqual(index.changed_dirs(), [])
+
+        (self.root_dir / 'pkg' / 'sub' / 'new.py').write_text('')
+        (self.root_dir / 'pkg' / 'foo.py').unlink()
+        self.assertEqual(sorted(index.changed_dirs()), ['pkg', 'pkg/sub'])
+        self.assertEqual(sorted(index.files('pkg', pattern='*.py',
+                                            recursive=True)),
+                         ['pkg/__init__.py',
+                          'pkg/sub/__init__.py',
+                          'pkg/sub/bar.py',
+                          'pkg/sub/deep/baz.py',
+                          'pkg/sub/new.py'])
+        self.assertEqual(index.changed_dirs(), [])
+
+    def test_setup2upypackage(self) -> None:
+        """Test recursive packages and data file patterns"""
+        setup_file = self.root_dir / 'setup.py'
+        setup_file.write_text("""
+from setuptools import setup
+
+setup(
+    name='pkg',
+    version='1.0.0',
+    url='https://github.com/brainelectronics/pkg',
+    packages=['pkg', 'pkg.sub'],
+    data_files=[
+        ('static', ['static/style.css', 'static/**/*.js', 'static/none.txt'])
+    ],
+)
+""")
+        s2pp = Setup2uPyPackage(
+            setup_file=setup_file,
+            package_file=None,
+            package_changelog_file=None,
+            logger=self.test_logger,
+            engine=Setup2uPyPackage.ENGINE_AST
+        )
+        self.assertEqual(sorted(s2pp.package_files),
+                         [Path('pkg/__init__.py'),
+                          Path('pkg/foo.py'),
+                          Path('pkg/sub/__init__.py'),
+                          Path('pkg/sub/bar.py')])
+        self.assertEqual(s2pp.data_files,
+                         [Path('static/style.css'),
+                          Path('static/js/function.js'),
+                          Path('static/js/lib/other.js')])
+
+        s2pp = Setup2uPyPackage(
+            setup_file=setup_file,
+            package_file=None,
+            package_changelog_file=None,
+            logger=self.test_logger,
+            engine=Setup2uPyPackage.ENGINE_AST,
+            recursive_packages=True
+        )
+        self.assertEqual(sorted(s2pp.package_files),
+                         [Path('pkg/__init__.py'),
+                          Path('pkg/foo.py'),
+                          Path('pkg/sub/__init__.py'),
+                          Path('pkg/sub/bar.py'),
+                          Path('pkg/sub/deep/baz.py')])
+
+    @unittest.skipIf(shutil.which('git') is None, 'git is not available')
+    def test_git_file_index(self) -> None:
+        """Test only files tracked by git are found"""
+        with self.assertRaises(Setup2uPyPackageError):
+            Setup2uPyPackage(setup_file=self.root_dir / 'setup.py',
+                             package_file=None,
+                             package_changelog_file=None,
+                             logger=self.test_logger,
+                             git_files=True)
+
+        def git(*args) -> None:
+            subprocess.run(['git'] + list(args),
+                           cwd=str(self.root_dir),
+                           stdout=subprocess.DEVNULL,
+                           check=True)
+
+        git('init', '-q')
+        git('add', 'pkg', 'static/style.css', 'static/js/function.js')
+        # tracked, but ignored by the file system index
+        git('add', '-f', 'pkg/__pycache__/foo.cpython-39.pyc')
+
+        # the index lists the sub directory only
+        index = GitFileIndex(root_dir=self.root_dir / 'pkg')
+        self.assertEqual(sorted(index.files('', pattern='*.py',
+                                            recursive=True)),
+                         ['__init__.py',
+                          'foo.py',
+                          'sub/__init__.py',
+                          'sub/bar.py',
+                          'sub/deep/baz.py'])
+
+        index = GitFileIndex(root_dir=self.root_dir)
+        with patch('setup2upypackage.file_index.os.scandir') as scandir:
+            self.assertTrue(index.is_file('static/style.css'))
+            self.assertTrue(index.is_dir('static/js'))
+            self.assertFalse(index.is_dir('static/js/lib'))
+            self.assertEqual(index.glob('static/**/*.js'),
+                             ['static/js/function.js'])
+            scandir.assert_not_called()
+        self.assertEqual(sorted(index.scanned_dirs),
+                         ['', 'static', 'static/js'])
+
+        # the index changes if a file is added
+        self.assertEqual(index.changed_dirs(), [])
+        git('add', 'static/js/lib/other.js')
+        self.assertEqual(sorted(index.changed_dirs()),
+                         ['', 'static', 'static/js'])
+        self.assertEqual(index.glob('static/**/*.js'),
+                         ['static/js/function.js', 'static/js/lib/other.js'])
+
+    @unittest.skipIf(shutil.which('git') is None, 'git is not available')
+    def test_git_files_setup2upypackage(self) -> None:
+        """Test untracked package and data files are not part of a package"""
+        subprocess.run(['git', 'init', '-q'],
+                       cwd=str(self.root_dir),
+                       check=True)
+        subprocess.run(['git', 'add', 'pkg/foo.py', 'static/style.css'],
+                       cwd=str(self.root_dir),
+                       check=True)
+
+        setup_file = self.root_dir / 'setup.py'
+        setup_file.write_text("""
+from setuptools import setup
+
+setup(
+    name='pkg',
+    version='1.0.0',
+    url='https://github.com/brainelectronics/pkg',
+    packages=['pkg'],
+    data_files=[('static', ['static/style.css', 'static/**/*.js'])],
+)
+""")
+        s2pp = Setup2uPyPackage(
+            setup_file=setup_file,
+            package_file=None,
+            package_changelog_file=None,
+            logger=self.test_logger,
+            engine=Setup2uPyPackage.ENGINE_AST,
+            git_files=True
+        )
+        self.assertEqual(s2pp.package_files, [Path('pkg/foo.py')])
+        self.assertEqual(s2pp.data_files, [Path('static/style.css')])
+        self.assertEqual(
+            [ele[0] for ele in s2pp.package_urls],
+            ['pkg/foo.py', 'static/style.css'])
+
+
+if __name__ == '__main__':
+    unittest.main()
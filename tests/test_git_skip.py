@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Unittest for testing the git_skip file"""
+
+import logging
+import shutil
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from sys import stdout
+
+from setup2upypackage.git_skip import GitSkipError, ValidationRecord
+from setup2upypackage.setup2upypackage import Setup2uPyPackage
+
+
+@unittest.skipIf(shutil.which('git') is None, 'git is not available')
+class TestGitSkip(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Run before every test method"""
+        # define a format
+        custom_format = '[%(asctime)s] [%(levelname)-8s] [%(filename)-15s @'\
+                        ' %(funcName)-15s:%(lineno)4s] %(message)s'
+
+        # set basic config and level for all loggers
+        logging.basicConfig(level=logging.INFO,
+                            format=custom_format,
+                            stream=stdout)
+
+        # create a logger for this TestSuite
+        self.test_logger = logging.getLogger(__name__)
+        self.test_logger.setLevel(logging.DEBUG)
+        self.test_logger.disabled = True
+
+        self._here = Path(__file__).parent
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self._tmp_dir.name)
+        self.root_dir = self.tmp_path / 'data'
+        shutil.copytree(self._here / 'data', self.root_dir)
+
+        self._git('init', '-q')
+        self._git('add', '.')
+
+        self.files = [self.root_dir / 'setup.py',
+                      self.root_dir / 'package.json',
+                      self.root_dir / 'sample_changelog.md']
+        self.options = {"ignore_version": True}
+
+    def tearDown(self) -> None:
+        """Run after every test method"""
+        self._tmp_dir.cleanup()
+
+    def _git(self, *args) -> None:
+        subprocess.run(['git'] + list(args),
+                       cwd=str(self.tmp_path),
+                       stdout=subprocess.DEVNULL,
+                       check=True)
+
+    def _record(self) -> ValidationRecord:
+        return ValidationRecord(files=self.files,
+                                options=self.options,
+                                logger=self.test_logger)
+
+    def _save(self) -> bool:
+        s2pp = Setup2uPyPackage(
+            setup_file=self.root_dir / 'setup.py',
+            package_file=self.root_dir / 'package.json',
+            package_changelog_file=None,
+            logger=self.test_logger)
+        self.assertTrue(s2pp.validate())
+
+        return self._record().save(dirs=s2pp.scanned_dirs)
+
+    def test_is_unchanged(self) -> None:
+        """Test the recorded fingerprint equals the one of the index"""
+        self.assertFalse(self._record().is_unchanged())
+        self.assertTrue(self._save())
+        self.assertTrue(self._record().record_file.is_file())
+        self.assertTrue(self._record().is_unchanged())
+
+        # other options are recorded independently
+        self.options = {}
+        self.assertFalse(self._record().is_unchanged())
+        self.options = {"ignore_version": True}
+
+        # files outside of the package and data directories
+        (self.root_dir / 'README.md').write_text('Changed\n')
+        self._git('add', '.')
+        self.assertTrue(self._record().is_unchanged())
+
+        # files of a data directory
+        (self.root_dir / 'static' / 'style.css').write_text('body {}\n')
+        self._git('add', '.')
+        self.assertFalse(self._record().is_unchanged())
+
+        self.assertTrue(self._save())
+        self.assertTrue(self._record().is_unchanged())
+
+        # setup, changelog and package.json files
+        (self.root_dir / 'sample_changelog.md').write_text('Changed\n')
+        self._git('add', '.')
+        self.assertFalse(self._record().is_unchanged())
+
+    def test_read_files(self) -> None:
+        """Test files read by the setup.py file are part of the fingerprint"""
+        self.options = {}
+        self.assertTrue(self._save())
+        self.assertEqual(self._record().find_read_files(),
+                         ['data/sample_version.py'])
+
+        version_file = self.root_dir / 'sample_version.py'
+        version_file.write_text(version_file.read_text().replace("'3'",
+                                                                 "'4'"))
+        self._git('add', '.')
+        self.assertFalse(self._record().is_unchanged())
+
+        # read files which can not be found statically are never recorded
+        setup_file = self.root_dir / 'setup.py'
+        setup_file.write_text(setup_file.read_text().replace(
+            "open(here / 'sample_version.py')",
+            "open(here / ''.join(reversed('yp.noisrev_elpmas')))"))
+        self._git('add', '.')
+        self.assertIsNone(self._record().find_read_files())
+        self.assertFalse(self._record().save(dirs=[]))
+        self.assertFalse(self._record().is_unchanged())
+
+    def test_work_tree_changes(self) -> None:
+        """Test unstaged changes and untracked files prevent a skip"""
+        self.assertTrue(self._save())
+
+        package_file = self.root_dir / 'package.json'
+        content = package_file.read_text()
+        package_file.write_text(content + '\n')
+        self.assertFalse(self._record().is_unchanged())
+
+        package_file.write_text(content)
+        self.assertTrue(self._record().is_unchanged())
+
+        (self.root_dir / 'subdir1' / 'new.py').write_text('')
+        self.assertFalse(self._record().is_unchanged())
+        self.assertFalse(
+            self._record().save(dirs=[self.root_dir / 'subdir1']))
+
+    def test_ignored_files(self) -> None:
+        """Test ignored files found by the file system search prevent a skip"""
+        (self.tmp_path / '.gitignore').write_text('*.mpy\n__pycache__/\n')
+        self.assertTrue(self._save())
+        self.assertTrue(self._record().is_unchanged())
+
+        # never part of the package
+        (self.root_dir / 'subdir1' / '__pycache__').mkdir()
+        (self.root_dir / 'subdir1' / '__pycache__' / 'asdf.pyc').write_text('')
+        self.assertTrue(self._record().is_unchanged())
+
+        ignored_file = self.root_dir / 'subdir1' / 'build.mpy'
+        ignored_file.write_text('')
+        self.assertFalse(self._record().is_unchanged())
+        self.assertTrue(self._save())
+        self.assertTrue(self._record().is_unchanged())
+
+        ignored_file.write_text('changed')
+        self.assertFalse(self._record().is_unchanged())
+
+        # only files of the git index are part of the package
+        self.options = {"ignore_version": True, "git_files": True}
+        self.assertTrue(self._save())
+        ignored_file.unlink()
+        self.assertTrue(self._record().is_unchanged())
+
+    def test_no_git(self) -> None:
+        """Test files outside of a git work tree can not be recorded"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            setup_file = Path(tmp_dir) / 'setup.py'
+            setup_file.write_text('')
+            with self.assertRaises(GitSkipError):
+                ValidationRecord(files=[setup_file], options={})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Unittest for testing the hashes file"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from sys import stdout
+from unittest.mock import patch
+
+from setup2upypackage import hashes
+from setup2upypackage.cache import MetadataCache
+from setup2upypackage.hashes import FileHasher, HashError, hash_file
+from setup2upypackage.setup2upypackage import (Setup2uPyPackage,
+                                               Setup2uPyPackageError)
+
+
+class TestHashes(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Run before every test method"""
+        # define a format
+        custom_format = '[%(asctime)s] [%(levelname)-8s] [%(filename)-15s @'\
+                        ' %(funcName)-15s:%(lineno)4s] %(message)s'
+
+        # set basic config and level for all loggers
+        logging.basicConfig(level=logging.INFO,
+                            format=custom_format,
+                            stream=stdout)
+
+        # create a logger for this TestSuite
+        self.test_logger = logging.getLogger(__name__)
+        self.test_logger.setLevel(logging.DEBUG)
+        self.test_logger.disabled = True
+
+        self._here = Path(__file__).parent
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.root_dir = Path(self._tmp_dir.name) / 'data'
+        shutil.copytree(self._here / 'data', self.root_dir)
+
+        self.setup_file = self.root_dir / 'setup.py'
+        self.package_file = self.root_dir / 'package.json'
+        self.cache_dir = Path(self._tmp_dir.name) / 'cache'
+
+    def tearDown(self) -> None:
+        """Run after every test method"""
+        self._tmp_dir.cleanup()
+
+    def _modify(self, path: Path, content: str) -> None:
+        """Write a file with a different modification time"""
+        path.write_text(content)
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    def test_hash_file(self) -> None:
+        """Test hashing small and mmap read large files"""
+        small_file = self.root_dir / 'small.bin'
+        small_file.write_bytes(b'asdf')
+        self.assertEqual(hash_file(small_file),
+                         hashlib.sha256(b'asdf').hexdigest())
+
+        large_file = self.root_dir / 'large.bin'
+        content = os.urandom(hashes.MMAP_THRESHOLD + 1)
+        large_file.write_bytes(content)
+        with patch('setup2upypackage.hashes.mmap.mmap',
+                   wraps=hashes.mmap.mmap) as mmap:
+            self.assertEqual(hash_file(large_file),
+                             hashlib.sha256(content).hexdigest())
+            mmap.assert_called_once()
+
+        empty_file = self.root_dir / 'empty.bin'
+        empty_file.write_bytes(b'')
+        self.assertEqual(hash_file(empty_file),
+                         hashlib.sha256(b'').hexdigest())
+
+    def test_file_hasher(self) -> None:
+        """Test only new or changed files are hashed"""
+        files = ['subdir1/asdf.py', 'other_dir/foo.py', 'static/style.css']
+        metadata_cache = MetadataCache(cache_dir=self.cache_dir,
+                                       logger=self.test_logger)
+
+        with patch('setup2upypackage.hashes.hash_file',
+                   wraps=hash_file) as hashed:
+            hasher = FileHasher(root_dir=self.root_dir,
+                                metadata_cache=metadata_cache,
+                                logger=self.test_logger)
+            result = hasher.hashes(rel_paths=files)
+            self.assertEqual(hashed.call_count, 3)
+            self.assertEqual(result['static/style.css'],
+                             hash_file(self.root_dir / 'static/style.css'))
+            self.assertFalse(hasher.is_outdated(files))
+
+            # unchanged files of a later run are not hashed again
+            hashed.reset_mock()
+            hasher = FileHasher(root_dir=self.root_dir,
+                                metadata_cache=metadata_cache,
+                                logger=self.test_logger)
+            self.assertEqual(hasher.hashes(rel_paths=files), result)
+            hashed.assert_not_called()
+
+            self._modify(self.root_dir / 'other_dir/foo.py', 'changed')
+            self.assertTrue(hasher.is_outdated(files))
+            new_result = hasher.hashes(rel_paths=files)
+            self.assertEqual(hashed.call_count, 1)
+            self.assertEqual(new_result['other_dir/foo.py'],
+                             hashlib.sha256(b'changed').hexdigest())
+
+    def test_missing_file(self) -> None:
+        """Test missing files are reported"""
+        hasher = FileHasher(root_dir=self.root_dir, logger=self.test_logger)
+
+        with self.assertRaises(HashError) as context:
+            hasher.hashes(rel_paths=['subdir1/asdf.py', 'subdir1/none.py'])
+        self.assertIn('subdir1/none.py', str(context.exception))
+
+    @unittest.skipIf(shutil.which('git') is None, 'git is not available')
+    def test_deleted_git_file(self) -> None:
+        """Test a file of the git index deleted from the work tree"""
+        subprocess.run(['git', 'init', '-q'], cwd=str(self.root_dir),
+                       check=True)
+        subprocess.run(['git', 'add', '.'], cwd=str(self.root_dir),
+                       check=True)
+        (self.root_dir / 'subdir1' / 'asdf.py').unlink()
+
+        s2pp = Setup2uPyPackage(
+            setup_file=self.setup_file,
+            package_file=self.package_file,
+            package_changelog_file=None,
+            logger=self.test_logger,
+            git_files=True,
+            hashes=True
+        )
+        with self.assertRaises(Setup2uPyPackageError) as context:
+            s2pp.package_hashes
+        self.assertIn('subdir1/asdf.py', str(context.exception))
+
+    def test_package_data(self) -> None:
+        """Test hashes of the package data and their validation"""
+        s2pp = Setup2uPyPackage(
+            setup_file=self.setup_file,
+            package_file=self.package_file,
+            package_changelog_file=None,
+            logger=self.test_logger,
+            hashes=True
+        )
+        package_data = s2pp.package_data
+        self.assertEqual([ele[0] for ele in package_data["hashes"]],
+                         [ele[0] for ele in package_data["urls"]])
+        self.assertEqual(dict(package_data["hashes"])['subdir1/asdf.py'],
+                         hash_file(self.root_dir / 'subdir1/asdf.py'))
+
+        # package.json without hashes
+        self.assertFalse(s2pp.validate())
+        self.assertTrue(s2pp.create(output_path=self.package_file))
+        self.assertTrue(s2pp.validate())
+
+        # stored hashes are validated without the hashes option
+        s2pp = Setup2uPyPackage(
+            setup_file=self.setup_file,
+            package_file=self.package_file,
+            package_changelog_file=None,
+            logger=self.test_logger
+        )
+        self.assertNotIn("hashes", s2pp.package_data)
+        self.assertTrue(s2pp.validate())
+
+        self._modify(self.root_dir / 'subdir1/asdf.py', 'changed')
+        s2pp.check_for_changes()
+        diff = s2pp.validation_diff
+        self.assertEqual(list(diff), ["hashes"])
+        self.assertEqual(diff["hashes"]["changed"][0]["path"],
+                         'subdir1/asdf.py')
+        self.assertEqual(
+            json.loads(self.package_file.read_text())["hashes"][0][1],
+            diff["hashes"]["changed"][0]["actual"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Unittest for testing the import time of the CLI"""
+
+import json
+import logging
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+from typing import List
+
+
+class TestImportTime(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Run before every test method"""
+        # define a format
+        custom_format = '[%(asctime)s] [%(levelname)-8s] [%(filename)-15s @'\
+                        ' %(funcName)-15s:%(lineno)4s] %(message)s'
+
+        # set basic config and level for all loggers
+        logging.basicConfig(level=logging.INFO,
+                            format=custom_format,
+                            stream=sys.stdout)
+
+        # create a logger for this TestSuite
+        self.test_logger = logging.getLogger(__name__)
+        self.test_logger.setLevel(logging.DEBUG)
+
+        self._here = Path(__file__).parent
+
+        with open(self._here / 'data' / 'import_time_budget.json', 'r') as f:
+            self.budget = json.load(f)
+
+        # make the package importable the same way as in this process
+        self.env = dict(os.environ)
+        self.env['PYTHONPATH'] = os.pathsep.join(sys.path)
+
+    def tearDown(self) -> None:
+        """Run after every test method"""
+        pass
+
+    def _run_python(self, args: List[str]) -> subprocess.CompletedProcess:
+        """
+        Run a new Python interpreter
+
+        :param      args:  The interpreter arguments
+        :type       args:  List[str]
+
+        :returns:   The completed process
+        :rtype:     subprocess.CompletedProcess
+        """
+        return subprocess.run([sys.executable] + args,
+                              env=self.env,
+                              stdout=subprocess.PIPE,
+                              stderr=subprocess.PIPE,
+                              universal_newlines=True,
+                              check=True)
+
+    def test_import_time_budget(self) -> None:
+        """Test cumulative import time of the CLI module is within budget"""
+        module = self.budget['module']
+        durations = []
+
+        for _ in range(self.budget['runs']):
+            result = self._run_python(['-X', 'importtime',
+                                       '-c', 'import {}'.format(module)])
+
+            for line in result.stderr.splitlines():
+                # import time: self [us] | cumulative | imported package
+                fields = [ele.strip() for ele in line.split('|')]
+                if len(fields) == 3 and fields[2] == module:
+                    durations.append(int(fields[1]))
+                    break
+
+        self.assertEqual(len(durations), self.budget['runs'])
+        self.test_logger.debug("Import time of {}: {}us".
+                               format(module, min(durations)))
+        self.assertLessEqual(min(durations), self.budget['budget_us'])
+
+    def test_deferred_imports(self) -> None:
+        """Test heavy modules are not imported at CLI start"""
+        module = self.budget['module']
+        result = self._run_python([
+            '-c',
+            'import json, sys, {}; print(json.dumps(sorted(sys.modules)))'.
+            format(module)
+        ])
+        imported = json.loads(result.stdout)
+
+        for name in self.budget['deferred_modules']:
+            self.assertNotIn(name, imported)
+
+
+if __name__ == '__main__':
+    unittest.main()
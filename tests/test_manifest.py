@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Unittest for testing the manifest file"""
+
+import json
+import logging
+import unittest
+from pathlib import Path
+from sys import stdout
+
+from nose2.tools import params
+
+from setup2upypackage.manifest import (HashEntry, Manifest, UrlEntry,
+                                       url_entries)
+from setup2upypackage.setup2upypackage import Setup2uPyPackage
+
+
+class TestManifest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Run before every test method"""
+        # define a format
+        custom_format = '[%(asctime)s] [%(levelname)-8s] [%(filename)-15s @'\
+                        ' %(funcName)-15s:%(lineno)4s] %(message)s'
+
+        # set basic config and level for all loggers
+        logging.basicConfig(level=logging.INFO,
+                            format=custom_format,
+                            stream=stdout)
+
+        # create a logger for this TestSuite
+        self.test_logger = logging.getLogger(__name__)
+        self.test_logger.setLevel(logging.DEBUG)
+        self.test_logger.disabled = True
+
+        self._here = Path(__file__).parent
+        self.root_dir = self._here / 'data'
+
+    @params(
+        ('github:user/repo', ),
+        ('github:user/repo/', ),
+        ('https://example.com/repo', ),
+        ('base.com//url/', ),
+        ('.', ),
+        ('', ),
+    )
+    def test_url_entries(self, url: str) -> None:
+        """Test URLs equal the ones joined by Path objects"""
+        paths = ['boot.py', 'pkg/foo.py', 'static/index.html']
+
+        entries = url_entries(paths=paths, url=url)
+
+        self.assertEqual(entries,
+                         [(path, str(Path(url) / path)) for path in paths])
+        self.assertTrue(all(isinstance(ele, UrlEntry) for ele in entries))
+        self.assertEqual(entries[1].url, str(Path(url) / 'pkg/foo.py'))
+
+    def test_to_dict(self) -> None:
+        """Test the manifest serializes to the plain package data"""
+        manifest = Manifest(
+            urls=url_entries(paths=['pkg/foo.py'], url='github:user/repo'),
+            deps=['github:user/dep'],
+            version='1.2.3',
+            hashes=[HashEntry('pkg/foo.py', 'abc')])
+        expectation = {
+            'urls': [['pkg/foo.py', 'github:user/repo/pkg/foo.py']],
+            'deps': ['github:user/dep'],
+            'version': '1.2.3',
+            'hashes': [['pkg/foo.py', 'abc']],
+        }
+
+        self.assertEqual(manifest.to_dict(), expectation)
+        self.assertEqual(json.dumps(manifest.to_dict(plain=False)),
+                         json.dumps(expectation))
+        self.assertEqual(manifest.paths, ['pkg/foo.py'])
+
+        manifest.hashes = None
+        self.assertNotIn('hashes', manifest.to_dict())
+
+        with self.assertRaises(AttributeError):
+            manifest.other = 'value'
+
+    def test_setup2upypackage(self) -> None:
+        """Test the manifest of a package and its package data view"""
+        s2pp = Setup2uPyPackage(
+            setup_file=self.root_dir / 'setup.py',
+            package_file=self.root_dir / 'package.json',
+            package_changelog_file=None,
+            hashes=True,
+            logger=self.test_logger)
+
+        manifest = s2pp.manifest
+        self.assertIs(s2pp.manifest, manifest)
+        self.assertEqual(manifest.to_dict(), s2pp.package_data)
+        self.assertEqual(json.dumps(manifest.to_dict(plain=False)),
+                         json.dumps(s2pp.package_data))
+
+        # paths are shared by the URL and hash entries of a file
+        for url_entry, hash_entry in zip(manifest.urls, manifest.hashes):
+            self.assertIs(url_entry.path, hash_entry.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Unittest for testing the manifest_diff file"""
+
+import json
+import unittest
+
+from nose2.tools import params
+
+from setup2upypackage.manifest_diff import ManifestDiff
+
+
+class TestManifestDiff(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Run before every test method"""
+        self.expected = {
+            "urls": [
+                ["pkg/__init__.py", "github:user/repo/pkg/__init__.py"],
+                ["pkg/foo.py", "github:user/repo/pkg/foo.py"],
+                ["pkg/bar.py", "github:user/repo/pkg/bar.py"],
+            ],
+            "deps": ["github:user/dep_1", "github:user/dep_2"],
+            "version": "1.2.3",
+        }
+
+    def test_equal(self) -> None:
+        """Test equal manifests with differently ordered URLs"""
+        actual = json.loads(json.dumps(self.expected))
+        actual["urls"].reverse()
+
+        diff = ManifestDiff(expected=self.expected, actual=actual)
+        self.assertTrue(diff.is_equal)
+        self.assertEqual(diff.report, {})
+
+    def test_urls(self) -> None:
+        """Test missing, extra and changed URL entries"""
+        actual = {
+            "urls": [
+                ["pkg/__init__.py", "github:user/repo/pkg/__init__.py"],
+                ["pkg/foo.py", "github:user/other/pkg/foo.py"],
+                ["pkg/baz.py", "github:user/repo/pkg/baz.py"],
+            ],
+            "deps": self.expected["deps"],
+            "version": "1.2.3",
+        }
+
+        diff = ManifestDiff(expected=self.expected, actual=actual)
+        self.assertFalse(diff.is_equal)
+        self.assertEqual(diff.report, {
+            "urls": {
+                "missing": [["pkg/bar.py", "github:user/repo/pkg/bar.py"]],
+                "extra": [["pkg/baz.py", "github:user/repo/pkg/baz.py"]],
+                "changed": [{
+                    "path": "pkg/foo.py",
+                    "expected": "github:user/repo/pkg/foo.py",
+                    "actual": "github:user/other/pkg/foo.py"
+                }],
+            }
+        })
+
+    def test_duplicates(self) -> None:
+        """Test URL entries listed a different number of times"""
+        actual = json.loads(json.dumps(self.expected))
+        actual["urls"].append(actual["urls"][0])
+
+        diff = ManifestDiff(expected=self.expected, actual=actual)
+        self.assertEqual(diff.report,
+                         {"urls": {"duplicates": ["pkg/__init__.py"]}})
+
+        # same duplicates on both sides are no difference
+        diff = ManifestDiff(expected=actual, actual=actual)
+        self.assertTrue(diff.is_equal)
+
+    @params(
+        ([["pkg/baz.py"]], [["pkg/baz.py"]]),
+        (["pkg/baz.py"], ["pkg/baz.py"]),
+        ([["pkg/baz.py", "url", "extra"]], [["pkg/baz.py", "url", "extra"]]),
+        ([[["pkg"], "url"]], [[["pkg"], "url"]]),
+    )
+    def test_invalid(self, entries: list, expectation: list) -> None:
+        """Test malformed URL entries are reported instead of raising"""
+        actual = json.loads(json.dumps(self.expected))
+        actual["urls"].extend(entries)
+
+        diff = ManifestDiff(expected=self.expected, actual=actual)
+        self.assertEqual(diff.report, {"urls": {"invalid": expectation}})
+
+        actual["urls"] = "pkg/foo.py"
+        diff = ManifestDiff(expected=self.expected, actual=actual)
+        self.assertEqual(diff.report["urls"]["invalid"], ["pkg/foo.py"])
+        self.assertEqual(len(diff.report["urls"]["missing"]), 3)
+
+    @params(
+        (["github:user/dep_1"],
+         {"missing": ["github:user/dep_2"]}),
+        (["github:user/dep_1", "github:user/dep_2", "github:user/dep_3"],
+         {"extra": ["github:user/dep_3"]}),
+        (["github:user/dep_2", "github:user/dep_1"],
+         {"reordered": {
+             "expected": ["github:user/dep_1", "github:user/dep_2"],
+             "actual": ["github:user/dep_2", "github:user/dep_1"]}}),
+    )
+    def test_deps(self, deps: list, expectation: dict) -> None:
+        """Test missing, extra and reordered dependencies"""
+        actual = dict(self.expected, deps=deps)
+
+        diff = ManifestDiff(expected=self.expected, actual=actual)
+        self.assertEqual(diff.report, {"deps": expectation})
+
+    def test_other_keys(self) -> None:
+        """Test changed, missing and additional other entries"""
+        actual = dict(self.expected, version="1.2.4", author="someone")
+        actual.pop("deps")
+
+        diff = ManifestDiff(expected=self.expected, actual=actual)
+        self.assertEqual(diff.report, {
+            "deps": {"missing": self.expected["deps"]},
+            "version": {"expected": "1.2.3", "actual": "1.2.4"},
+            "author": {"actual": "someone"},
+        })
+
+    def test_truncated(self) -> None:
+        """Test long lists are truncated with a summary"""
+        expected = {
+            "urls": [["pkg/{}.py".format(idx), "url_{}".format(idx)]
+                     for idx in range(250)]
+        }
+
+        diff = ManifestDiff(expected=expected, actual={"urls": []})
+        report = diff.report
+        self.assertEqual(len(report["urls"]["missing"]),
+                         ManifestDiff.MAX_ENTRIES)
+        self.assertEqual(report["truncated"], {"urls.missing": 250})
+
+        diff = ManifestDiff(expected=expected,
+                            actual={"urls": []},
+                            max_entries=None)
+        self.assertEqual(len(diff.report["urls"]["missing"]), 250)
+        self.assertNotIn("truncated", diff.report)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Unittest for testing the minify file"""
+
+import ast
+import json
+import logging
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from sys import stdout
+
+from nose2.tools import params
+
+from setup2upypackage.minify import (Minifier, MinifyError, is_equivalent,
+                                     minify_source, strip_docstrings)
+from setup2upypackage.setup2upypackage import Setup2uPyPackage
+
+SAMPLE_SOURCE = '''#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+"""
+Module docstring
+"""
+
+import os   # comment
+
+
+class Sample(object):
+    """Class docstring"""
+
+    def __init__(self, value: int = 1) -> None:
+        """
+        Init docstring
+        """
+        # comment only line
+        self._value = value
+
+    def empty(self):
+        """Only a docstring"""
+
+    def text(self) -> str:
+        return """
+    keep   this
+        indentation
+"""
+
+    def call(self):
+        return os.path.join('a',
+                            'b',    # comment
+                            f'{self._value:>4} x')
+
+
+def one_liner(): "docstring"; return 1
+
+
+x = 1 + \\
+    2
+'''
+
+SAMPLE_MINIFIED = '''import os
+class Sample(object):
+ def __init__(self, value: int = 1) -> None:
+  self._value = value
+ def empty(self):
+  pass
+ def text(self) -> str:
+  return """
+    keep   this
+        indentation
+"""
+ def call(self):
+  return os.path.join('a', 'b', f'{self._value:>4} x')
+def one_liner(): return 1
+x = 1 + \\
+2
+'''
+
+
+class TestMinify(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Run before every test method"""
+        # define a format
+        custom_format = '[%(asctime)s] [%(levelname)-8s] [%(filename)-15s @'\
+                        ' %(funcName)-15s:%(lineno)4s] %(message)s'
+
+        # set basic config and level for all loggers
+        logging.basicConfig(level=logging.INFO,
+                            format=custom_format,
+                            stream=stdout)
+
+        # create a logger for this TestSuite
+        self.test_logger = logging.getLogger(__name__)
+        self.test_logger.setLevel(logging.DEBUG)
+        self.test_logger.disabled = True
+
+        self._here = Path(__file__).parent
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.root_dir = Path(self._tmp_dir.name) / 'data'
+        shutil.copytree(self._here / 'data', self.root_dir)
+        (self.root_dir / 'subdir1' / 'asdf.py').write_text(SAMPLE_SOURCE)
+
+        self.setup_file = self.root_dir / 'setup.py'
+
+    def tearDown(self) -> None:
+        """Run after every test method"""
+        self._tmp_dir.cleanup()
+
+    def test_minify_source(self) -> None:
+        """Test docstrings, comments and indentation are removed"""
+        minified = minify_source(SAMPLE_SOURCE)
+
+        self.assertEqual(minified, SAMPLE_MINIFIED)
+        self.assertTrue(is_equivalent(SAMPLE_SOURCE, minified))
+
+    @params(
+        ('"""Only a docstring"""\n', ''),
+        ('if True:\n    x = [1,\n         2]  # two\n',
+         'if True:\n x = [1, 2]\n'),
+        ('def f():\n\n    """doc"""\n\n    return 1\n',
+         'def f():\n return 1\n'),
+        ('class A:\n    "doc" "string"\n', 'class A:\n pass\n'),
+        ('s = "ä"; """no docstring"""\n', 's = "ä"; """no docstring"""\n'),
+    )
+    def test_minify_source_cases(self, source: str, expectation: str) -> None:
+        """Test minification of specific constructs"""
+        minified = minify_source(source)
+
+        self.assertEqual(minified, expectation)
+        self.assertTrue(is_equivalent(source, minified))
+
+    def test_strip_docstrings(self) -> None:
+        """Test docstrings of modules, classes and functions are removed"""
+        source = '"""module"""\nclass A:\n    """class"""\n' \
+                 '    def f(self):\n        """function"""\n        return 1\n'
+        dump = ast.dump(strip_docstrings(ast.parse(source)))
+
+        for docstring in ('module', 'class', 'function'):
+            self.assertNotIn(repr(docstring), dump)
+        self.assertTrue(is_equivalent(
+            source, 'class A:\n def f(self):\n  return 1\n'))
+
+        if sys.version_info < (3, 8):
+            with self.assertRaises(MinifyError):
+                minify_source(source)
+        else:
+            self.assertNotIn('"""', minify_source(source))
+
+    def test_is_equivalent(self) -> None:
+        """Test different ASTs are detected"""
+        self.assertTrue(is_equivalent('"""doc"""\nx = 1\n', 'x=1'))
+        self.assertFalse(is_equivalent('x = 1\n', 'x = 2\n'))
+        self.assertFalse(is_equivalent('x = 1\n', 'x = (\n'))
+
+    def test_minifier(self) -> None:
+        """Test minified copies and their package.json are written"""
+        s2pp = Setup2uPyPackage(setup_file=self.setup_file,
+                                package_file=None,
+                                package_changelog_file=None,
+                                logger=self.test_logger)
+        output_dir = self.root_dir / 'build' / 'minified'
+        minifier = Minifier(setup_2_upy_package=s2pp,
+                            output_dir=output_dir,
+                            processes=2,
+                            logger=self.test_logger)
+
+        results = minifier.run()
+        self.assertEqual(sorted(Path(ele["file"]).name for ele in results),
+                         ['asdf.py', 'bar.py', 'baz.py', 'foo.py'])
+        result = [ele for ele in results if ele["file"].endswith('asdf.py')][0]
+        self.assertEqual(result["saved"],
+                         result["size"] - result["minified_size"])
+        self.assertGreater(result["saved"], 0)
+        self.assertTrue(result["changed"])
+
+        minified = (output_dir / 'subdir1' / 'asdf.py').read_text()
+        self.assertEqual(minified, SAMPLE_MINIFIED)
+
+        package_data = json.loads(minifier.package_file.read_text())
+        urls = dict(package_data["urls"])
+        self.assertTrue(urls['subdir1/asdf.py'].endswith(
+            '/build/minified/subdir1/asdf.py'))
+        self.assertEqual(package_data["version"], s2pp.package_data["version"])
+        self.assertEqual(package_data["deps"], s2pp.package_data["deps"])
+
+        # unchanged files are not written again
+        results = minifier.run()
+        self.assertFalse(any(ele["changed"] for ele in results))
+
+    def test_minifier_errors(self) -> None:
+        """Test invalid output directories and files are reported"""
+        s2pp = Setup2uPyPackage(setup_file=self.setup_file,
+                                package_file=None,
+                                package_changelog_file=None,
+                                logger=self.test_logger)
+
+        with self.assertRaises(MinifyError):
+            Minifier(setup_2_upy_package=s2pp,
+                     output_dir=Path(self._tmp_dir.name) / 'outside',
+                     logger=self.test_logger)
+
+        (self.root_dir / 'subdir1' / 'asdf.py').write_text('x = (\n')
+        minifier = Minifier(setup_2_upy_package=s2pp,
+                            output_dir=self.root_dir / 'build',
+                            logger=self.test_logger)
+        with self.assertRaises(MinifyError) as context:
+            minifier.run()
+        self.assertIn('asdf.py', str(context.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Unittest for testing the profiling file"""
+
+import logging
+import shutil
+import tempfile
+import tracemalloc
+import unittest
+from pathlib import Path
+from sys import stdout
+
+from setup2upypackage.daemon import process_request
+from setup2upypackage.profiling import PhaseProfiler, PhaseRecorder, phase
+from setup2upypackage.setup2upypackage import Setup2uPyPackage
+
+
+class Sample(object):
+    """Object with phases"""
+
+    def __init__(self, hooks: list = None) -> None:
+        self._phase_recorder = PhaseRecorder(hooks=hooks)
+
+    @phase('outer')
+    def outer(self, size: int) -> int:
+        return self.inner(size=size) + 1
+
+    @phase('inner')
+    def inner(self, size: int) -> int:
+        data = bytearray(size)
+        return len(data)
+
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Run before every test method"""
+        # define a format
+        custom_format = '[%(asctime)s] [%(levelname)-8s] [%(filename)-15s @'\
+                        ' %(funcName)-15s:%(lineno)4s] %(message)s'
+
+        # set basic config and level for all loggers
+        logging.basicConfig(level=logging.INFO,
+                            format=custom_format,
+                            stream=stdout)
+
+        # create a logger for this TestSuite
+        self.test_logger = logging.getLogger(__name__)
+        self.test_logger.setLevel(logging.DEBUG)
+        self.test_logger.disabled = True
+
+        self._here = Path(__file__).parent
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.root_dir = Path(self._tmp_dir.name) / 'data'
+        shutil.copytree(self._here / 'data', self.root_dir)
+
+    def tearDown(self) -> None:
+        """Run after every test method"""
+        self._tmp_dir.cleanup()
+
+    def test_phase(self) -> None:
+        """Test nested phases are reported with their time and memory"""
+        events = []
+        sample = Sample(hooks=[events.append])
+
+        with PhaseProfiler():
+            self.assertEqual(sample.outer(size=1024 * 1024), 1024 * 1024 + 1)
+        self.assertFalse(tracemalloc.is_tracing())
+
+        self.assertEqual([(ele["phase"], ele["depth"]) for ele in events],
+                         [('inner', 1), ('outer', 0)])
+        inner, outer = events
+        self.assertGreaterEqual(outer["wall_time"], inner["wall_time"])
+        self.assertAlmostEqual(outer["self_time"],
+                               outer["wall_time"] - inner["wall_time"])
+
+        if hasattr(tracemalloc, 'reset_peak'):
+            self.assertGreaterEqual(inner["peak_memory"], 1024 * 1024)
+            self.assertGreaterEqual(outer["peak_memory"],
+                                    inner["peak_memory"])
+
+    def test_phase_without_hooks(self) -> None:
+        """Test phases are not measured without hooks"""
+        sample = Sample()
+        self.assertEqual(sample.outer(size=1), 2)
+        self.assertEqual(sample._phase_recorder._stack, [])
+
+    def test_report(self) -> None:
+        """Test events are summed up per phase"""
+        profiler = PhaseProfiler(trace_memory=False)
+        sample = Sample(hooks=[profiler])
+
+        with profiler:
+            sample.outer(size=1)
+            sample.inner(size=1)
+        self.assertEqual(len(profiler.events), 3)
+
+        report = profiler.report()
+        self.assertEqual([(ele["phase"], ele["calls"], ele["peak_memory"])
+                          for ele in report["phases"]],
+                         [('inner', 2, None), ('outer', 1, None)])
+        self.assertAlmostEqual(
+            report["wall_time"],
+            sum(ele["wall_time"] for ele in profiler.events[1:]))
+        self.assertIsNone(report["peak_memory"])
+
+    def test_setup2upypackage_hooks(self) -> None:
+        """Test the phases of a package run are reported to all hooks"""
+        profiler = PhaseProfiler()
+        events = []
+
+        with profiler:
+            s2pp = Setup2uPyPackage(
+                setup_file=self.root_dir / 'setup.py',
+                package_file=self.root_dir / 'package.json',
+                package_changelog_file=None,
+                logger=self.test_logger,
+                hooks=[profiler])
+            s2pp.add_hook(events.append)
+            s2pp.add_hook(events.append)
+
+            self.assertTrue(s2pp.validate())
+            s2pp.create(output_path=self.root_dir / 'created.json')
+
+        phases = [ele["phase"] for ele in profiler.report()["phases"]]
+        self.assertEqual(phases[0], 'parse_setup')
+        self.assertEqual(set(phases),
+                         set(['parse_setup', 'package_json', 'version',
+                              'deps', 'package_files', 'data_files', 'urls',
+                              'diff', 'write']))
+        self.assertEqual(len(events), len(profiler.events) - 1)
+
+        s2pp.remove_hook(events.append)
+        s2pp.refresh()
+        self.assertEqual(profiler.events[-1]["phase"], 'parse_setup')
+        self.assertEqual(len(events), len(profiler.events) - 2)
+
+    def test_process_request_profile(self) -> None:
+        """Test a requested profile is part of the response"""
+        s2pp = Setup2uPyPackage(
+            setup_file=self.root_dir / 'setup.py',
+            package_file=self.root_dir / 'package.json',
+            package_changelog_file=None,
+            logger=self.test_logger)
+
+        response = process_request(setup_2_upy_package=s2pp,
+                                   request={"validate": True})
+        self.assertNotIn("profile", response)
+
+        response = process_request(setup_2_upy_package=s2pp,
+                                   request={"validate": True,
+                                            "profile": True})
+        self.assertTrue(response["valid"])
+        self.assertEqual(response["profile"]["phases"][-1]["phase"], 'diff')
+        self.assertEqual(s2pp._phase_recorder.hooks, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
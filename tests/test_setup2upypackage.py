@@ -4,11 +4,14 @@
 
 import json
 import logging
+import os
+import shutil
+import tempfile
 import unittest
 from pathlib import Path
 from random import shuffle
 from sys import stdout
-from unittest.mock import PropertyMock, mock_open, patch
+from unittest.mock import PropertyMock, patch
 
 from nose2.tools import params
 
@@ -274,6 +277,70 @@ class TestSetup2uPyPackage(unittest.TestCase):
             self.assertEqual(len(ele), 2)   # consist of [path, url]
             self.assertEqual(this_expectation, ele)
 
+    def test_package_data_memoized(self) -> None:
+        """Test derived package data is computed only once"""
+        self.package_logger.disabled = True
+
+        s2pp = Setup2uPyPackage(
+            setup_file=self.setup_file,
+            package_file=self.package_file,
+            package_changelog_file=self.package_changelog_file,
+            logger=self.package_logger
+        )
+
+        with patch.object(s2pp, '_get_package_files',
+                          wraps=s2pp._get_package_files) as package_files, \
+                patch.object(s2pp, '_get_data_files',
+                             wraps=s2pp._get_data_files) as data_files, \
+                patch.object(s2pp, '_get_package_changelog_version',
+                             wraps=s2pp._get_package_changelog_version) as \
+                changelog_version, \
+                patch.object(s2pp, '_get_package_json_data',
+                             wraps=s2pp._get_package_json_data) as json_data:
+            package_data = s2pp.package_data
+            s2pp.validate(ignore_version=True)
+            s2pp.validation_diff
+
+            self.assertIs(s2pp.package_data, package_data)
+            for mocked in (package_files, data_files, changelog_version,
+                           json_data):
+                self.assertEqual(mocked.call_count, 1)
+
+            # validation must not modify the cached data
+            self.assertEqual(s2pp.package_data, package_data)
+
+            s2pp.refresh()
+            self.assertIsNot(s2pp.package_data, package_data)
+            self.assertEqual(s2pp.package_data, package_data)
+            self.assertEqual(package_files.call_count, 2)
+
+    def test_package_data_input_file_changed(self) -> None:
+        """Test derived package data is invalidated on input file changes"""
+        self.package_logger.disabled = True
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            changelog_file = Path(tmp_dir) / 'changelog.md'
+            shutil.copy(self.package_changelog_file, changelog_file)
+
+            s2pp = Setup2uPyPackage(
+                setup_file=self.setup_file,
+                package_file=None,
+                package_changelog_file=changelog_file,
+                logger=self.package_logger
+            )
+            self.assertEqual(s2pp.package_data['version'], '9.8.7')
+
+            content = changelog_file.read_text()
+            changelog_file.write_text(
+                content.replace('## Released\n',
+                                '## Released\n## [10.0.0] - 2023-04-01\n'))
+            # ensure a different modification time on coarse filesystems
+            stat = changelog_file.stat()
+            os.utime(changelog_file, ns=(stat.st_atime_ns,
+                                         stat.st_mtime_ns + 10**9))
+
+            self.assertEqual(s2pp.package_data['version'], '10.0.0')
+
     def test_package_json_data(self) -> None:
         """Test package.json data property"""
         with self.assertRaises(Setup2uPyPackageError) as context:
@@ -417,10 +484,37 @@ class TestSetup2uPyPackage(unittest.TestCase):
             self.assertEqual(len(ele), 2)
         self.assertEqual(result, package[:-1])
 
-    @unittest.skip("Not yet implemented")
     def test_validation_diff(self) -> None:
         """Test validation difference property"""
-        pass
+        self.package_logger.disabled = True
+
+        s2pp = Setup2uPyPackage(
+            setup_file=self.setup_file,
+            package_file=self.package_file,
+            package_changelog_file=None,
+            logger=self.package_logger
+        )
+        self.assertEqual(s2pp.validation_diff, {})
+
+        package_json_data = dict(s2pp.package_json_data)
+        package_json_data["version"] = "93.10.22"
+        removed_url = package_json_data["urls"][0]
+        package_json_data["urls"] = package_json_data["urls"][1:] + [
+            ["boot.py", "github:brainelectronics/repo/boot.py"]
+        ]
+        with patch('setup2upypackage.setup2upypackage.Setup2uPyPackage.package_json_data', new_callable=PropertyMock) as patched:     # noqa: E501
+            patched.return_value = package_json_data
+            diff = s2pp.validation_diff
+            self.assertEqual(diff["version"]["actual"], "93.10.22")
+            self.assertEqual(diff["urls"]["missing"], [removed_url])
+            self.assertEqual(diff["urls"]["extra"],
+                             [["boot.py",
+                               "github:brainelectronics/repo/boot.py"]])
+
+            diff = s2pp.get_validation_diff(ignore_version=True,
+                                            ignore_boot_main=True)
+            self.assertNotIn("version", diff)
+            self.assertNotIn("extra", diff["urls"])
 
     @params(
         ("asdf.json", False),   # path, pretty
@@ -444,17 +538,47 @@ class TestSetup2uPyPackage(unittest.TestCase):
         else:
             expectation = json.dumps(test_data)
 
-        output_path = path
-        if path is None:
-            output_path = self._here / 'data' / 'package.json'
-
-        m = mock_open()
-        with patch('setup2upypackage.setup2upypackage.open', m, create=False):
-            self.s2pp.create(output_path=path, pretty=pretty)
-
-        m.assert_called_once_with(output_path, 'w')
-        handle = m()
-        self.assertEqual(handle.write.call_args.args[0], expectation)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            setup_file = Path(tmp_dir) / 'setup.py'
+            shutil.copy(self.setup_file, setup_file)
+            shutil.copy(self._here / 'data' / 'sample_version.py', tmp_dir)
+            s2pp = Setup2uPyPackage(
+                setup_file=setup_file,
+                package_file=None,
+                package_changelog_file=None,
+                logger=self.package_logger
+            )
+
+            output_path = path
+            if path is None:
+                output_path = Path(tmp_dir) / 'package.json'
+            else:
+                path = Path(tmp_dir) / path
+                output_path = path
+
+            self.assertTrue(s2pp.create(output_path=path, pretty=pretty))
+            self.assertEqual(output_path.read_text(), expectation)
+            self.assertEqual(sorted(os.listdir(tmp_dir)),
+                             sorted(['sample_version.py', 'setup.py',
+                                     output_path.name]))
+
+            # unchanged content is not written again
+            os.chmod(output_path, 0o640)
+            stat = output_path.stat()
+            with patch('setup2upypackage.setup2upypackage.os.replace') as \
+                    replace:
+                self.assertFalse(s2pp.create(output_path=path,
+                                             pretty=pretty))
+                replace.assert_not_called()
+            self.assertEqual(output_path.stat().st_mtime_ns,
+                             stat.st_mtime_ns)
+
+            # changed content replaces the file, keeping its permissions
+            package_data.return_value = {"asdf": 456}
+            self.assertTrue(s2pp.create(output_path=path, pretty=pretty))
+            self.assertIn('456', output_path.read_text())
+            self.assertEqual(output_path.stat().st_mode & 0o777, 0o640)
+            self.assertEqual(len(os.listdir(tmp_dir)), 3)
 
 
 if __name__ == '__main__':
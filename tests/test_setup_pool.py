@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Unittest for testing the setup_pool file"""
+
+import io
+import json
+import logging
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from sys import stdout
+from unittest.mock import patch
+
+from setup2upypackage.batch import BatchRunner
+from setup2upypackage.daemon import process_request
+from setup2upypackage.main import parse_arguments, run_package
+from setup2upypackage.setup2upypackage import (Setup2uPyPackage,
+                                               Setup2uPyPackageError)
+from setup2upypackage.setup_pool import (SetupPool, SetupPoolError,
+                                         execute_setup)
+
+SETUP_TEMPLATE = """
+{code}
+from setuptools import setup
+setup(name='sample', version='{version}', packages=['sample'])
+"""
+
+
+class TestSetupPool(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Run before every test method"""
+        # define a format
+        custom_format = '[%(asctime)s] [%(levelname)-8s] [%(filename)-15s @'\
+                        ' %(funcName)-15s:%(lineno)4s] %(message)s'
+
+        # set basic config and level for all loggers
+        logging.basicConfig(level=logging.INFO,
+                            format=custom_format,
+                            stream=stdout)
+
+        # create a logger for this TestSuite
+        self.test_logger = logging.getLogger(__name__)
+        self.test_logger.setLevel(logging.DEBUG)
+        self.test_logger.disabled = True
+
+        self._here = Path(__file__).parent
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self._tmp_dir.name)
+        self.root_dir = self.tmp_path / 'data'
+        shutil.copytree(self._here / 'data', self.root_dir)
+
+        self.setup_pool = SetupPool(processes=1,
+                                    timeout=10,
+                                    logger=self.test_logger)
+
+    def tearDown(self) -> None:
+        """Run after every test method"""
+        self.setup_pool.close()
+        self._tmp_dir.cleanup()
+
+    def _write_setup(self, name: str, code: str = '',
+                     version: str = '1.0.0') -> Path:
+        setup_file = self.tmp_path / name / 'setup.py'
+        setup_file.parent.mkdir()
+        setup_file.write_text(SETUP_TEMPLATE.format(code=code,
+                                                    version=version))
+
+        return setup_file
+
+    def test_run(self) -> None:
+        """Test a setup.py file is executed in a worker process"""
+        setup_file = self.root_dir / 'setup.py'
+        setup_data = self.setup_pool.run(setup_file=setup_file)
+
+        self.assertEqual(setup_data, execute_setup(setup_file=setup_file))
+        self.assertEqual(setup_data['version'], '1.2.3')
+        self.assertIsInstance(setup_data['data_files'][0], tuple)
+        json.dumps(setup_data)
+
+        with self.assertRaises(SetupPoolError):
+            self.setup_pool.run(setup_file=self.tmp_path / 'missing.py')
+
+        # a setup.py file without a setup() call
+        setup_file = self.tmp_path / 'other.py'
+        setup_file.write_text('import sys\n')
+        with self.assertRaises(SetupPoolError):
+            self.setup_pool.run(setup_file=setup_file)
+
+    def test_isolation(self) -> None:
+        """Test modules of a setup.py file do not leak to the next one"""
+        first = self._write_setup(
+            name='first',
+            code='import sys, types\n'
+                 'sys.modules["leaked"] = types.ModuleType("leaked")\n'
+                 'sys.path.append("/leaked")\n')
+        second = self._write_setup(
+            name='second',
+            code='import sys\n'
+                 'assert "leaked" not in sys.modules\n'
+                 'assert "/leaked" not in sys.path\n',
+            version='2.0.0')
+
+        self.assertEqual(self.setup_pool.run(setup_file=first)['version'],
+                         '1.0.0')
+        self.assertEqual(self.setup_pool.run(setup_file=second)['version'],
+                         '2.0.0')
+        self.assertNotIn('leaked', sys.modules)
+
+    def test_timeout(self) -> None:
+        """Test a hanging setup.py file is terminated"""
+        setup_pool = SetupPool(processes=1,
+                               timeout=0.5,
+                               logger=self.test_logger)
+        hanging = self._write_setup(name='hanging',
+                                    code='import time\ntime.sleep(60)\n')
+
+        with setup_pool:
+            with self.assertRaises(SetupPoolError):
+                setup_pool.run(setup_file=hanging)
+
+            # the worker is replaced
+            setup_data = setup_pool.run(setup_file=self.root_dir / 'setup.py')
+            self.assertEqual(setup_data['version'], '1.2.3')
+
+    @unittest.skipIf(sys.platform == 'win32', 'No address space limit')
+    def test_memory_limit(self) -> None:
+        """Test a setup.py file exceeding the memory limit fails"""
+        setup_pool = SetupPool(processes=1,
+                               timeout=10,
+                               memory_limit=1024 * 1024 * 1024,
+                               logger=self.test_logger)
+        greedy = self._write_setup(name='greedy',
+                                   code='data = bytearray(2 * 1024 ** 3)\n')
+
+        with setup_pool:
+            with self.assertRaises(SetupPoolError):
+                setup_pool.run(setup_file=greedy)
+
+            setup_data = setup_pool.run(setup_file=self.root_dir / 'setup.py')
+            self.assertEqual(setup_data['version'], '1.2.3')
+
+    def test_run_all(self) -> None:
+        """Test several setup.py files are executed in parallel"""
+        setup_files = [self._write_setup(name='pkg{}'.format(idx),
+                                         version='{}.0.0'.format(idx))
+                       for idx in range(4)]
+        setup_files.append(self.tmp_path / 'missing.py')
+
+        with SetupPool(processes=2, logger=self.test_logger) as setup_pool:
+            results = dict(setup_pool.run_all(setup_files=setup_files))
+
+        self.assertEqual(set(results), set(setup_files))
+        for idx in range(4):
+            self.assertEqual(results[setup_files[idx]]['version'],
+                             '{}.0.0'.format(idx))
+        self.assertIsInstance(results[setup_files[-1]], SetupPoolError)
+
+        with self.assertRaises(SetupPoolError):
+            SetupPool(processes=0)
+
+    def test_setup2upypackage(self) -> None:
+        """Test a package with a setup pool results in the same data"""
+        expected = Setup2uPyPackage(
+            setup_file=self.root_dir / 'setup.py',
+            package_file=self.root_dir / 'package.json',
+            package_changelog_file=None,
+            logger=self.test_logger)
+        s2pp = Setup2uPyPackage(
+            setup_file=self.root_dir / 'setup.py',
+            package_file=self.root_dir / 'package.json',
+            package_changelog_file=None,
+            logger=self.test_logger,
+            setup_pool=self.setup_pool)
+
+        self.assertEqual(s2pp.package_data, expected.package_data)
+        self.assertTrue(s2pp.validate())
+
+        with self.assertRaises(Setup2uPyPackageError):
+            Setup2uPyPackage(setup_file=self.tmp_path / 'missing.py',
+                             package_file=None,
+                             package_changelog_file=None,
+                             logger=self.test_logger,
+                             setup_pool=self.setup_pool)
+
+    def test_batch_isolate(self) -> None:
+        """Test a batch run executes all setup.py files with a setup pool"""
+        runner = BatchRunner(
+            jobs=[
+                {"setup_file": self.root_dir / 'setup.py',
+                 "package_file": self.root_dir / 'package.json'},
+                {"setup_file": self.root_dir / 'setup.py',
+                 "package_file": self.root_dir / 'package.json'},
+                {"setup_file": self._write_setup(
+                    name='failing', code='raise ValueError("broken")\n')},
+            ],
+            processes=2,
+            logger=self.test_logger)
+        stream = io.StringIO()
+
+        exit_code = runner.run(action="validate",
+                               stream=stream,
+                               isolate=True,
+                               setup_timeout=10)
+        results = [json.loads(line) for line in stream.getvalue().splitlines()]
+
+        self.assertEqual(exit_code, 1)
+        self.assertEqual(len(results), 3)
+        self.assertEqual(sorted(ele["success"] for ele in results),
+                         [False, True, True])
+        error = [ele["error"] for ele in results if not ele["success"]][0]
+        self.assertIn('ValueError: broken', error)
+
+    def test_run_package(self) -> None:
+        """Test the pool is kept until a re-parsing request is finished"""
+        setup_file = self.root_dir / 'setup.py'
+        calls = []
+        run = SetupPool.run
+        close = SetupPool.close
+
+        def changing_request(**kwargs) -> dict:
+            setup_file.write_text(setup_file.read_text().replace(
+                'version=__version__', "version='2.0.0'"))
+            return process_request(**kwargs)
+
+        argv = ['upy-package', '--setup_file', str(setup_file),
+                '--print', '--isolate']
+        with patch.object(sys, 'argv', argv), \
+                patch.object(SetupPool, 'run', autospec=True,
+                             side_effect=lambda *args, **kwargs:
+                             calls.append('run') or run(*args, **kwargs)), \
+                patch.object(SetupPool, 'close', autospec=True,
+                             side_effect=lambda *args:
+                             calls.append('close') or close(*args)), \
+                patch('setup2upypackage.daemon.process_request',
+                      side_effect=changing_request):
+            response = run_package(args=parse_arguments(),
+                                   logger=self.test_logger)
+
+        self.assertTrue(response["success"])
+        self.assertEqual(response["package_data"]["version"], '2.0.0')
+        self.assertEqual(calls, ['run', 'run', 'close'])
+
+
+if __name__ == '__main__':
+    unittest.main()
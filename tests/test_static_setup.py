@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Unittest for testing the static_setup file"""
+
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+from sys import stdout
+
+from nose2.tools import params
+
+from setup2upypackage.setup2upypackage import (Setup2uPyPackage,
+                                               Setup2uPyPackageError)
+from setup2upypackage.static_setup import StaticSetupError, StaticSetupParser
+
+
+class TestStaticSetupParser(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Run before every test method"""
+        # define a format
+        custom_format = '[%(asctime)s] [%(levelname)-8s] [%(filename)-15s @'\
+                        ' %(funcName)-15s:%(lineno)4s] %(message)s'
+
+        # set basic config and level for all loggers
+        logging.basicConfig(level=logging.INFO,
+                            format=custom_format,
+                            stream=stdout)
+
+        # create a logger for this TestSuite
+        self.test_logger = logging.getLogger(__name__)
+        self.test_logger.setLevel(logging.DEBUG)
+
+        self._here = Path(__file__).parent
+        self.setup_file = self._here / 'data' / 'setup.py'
+
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp_dir = Path(self._tmp_dir.name)
+
+    def tearDown(self) -> None:
+        """Run after every test method"""
+        self._tmp_dir.cleanup()
+
+    def _write_setup_file(self, content: str) -> Path:
+        """
+        Write a setup.py file to the temporary directory
+
+        :param      content:  The content
+        :type       content:  str
+
+        :returns:   Path to the setup.py file
+        :rtype:     Path
+        """
+        setup_file = self.tmp_dir / 'setup.py'
+        setup_file.write_text(content)
+
+        return setup_file
+
+    def test_parse(self) -> None:
+        """Test parsing the sample setup.py file without executing it"""
+        parser = StaticSetupParser(setup_file=self.setup_file)
+        result = parser.parse()
+
+        s2pp = Setup2uPyPackage(
+            setup_file=self.setup_file,
+            package_file=None,
+            package_changelog_file=None,
+            logger=self.test_logger
+        )
+        for key in StaticSetupParser.SETUP_KEYS:
+            self.assertEqual(result[key], s2pp._setup_data[key])
+
+    def test_parse_constants(self) -> None:
+        """Test parsing module level constants and file reads"""
+        (self.tmp_dir / 'VERSION').write_text('4.5.6\n')
+        setup_file = self._write_setup_file("""
+import os
+from pathlib import Path
+from setuptools import setup
+
+here = Path(__file__).parent.resolve()
+NAME = 'pkg'
+BASE_URL = 'https://github.com/brainelectronics/'
+DEPS: list = ['dep_1']
+
+with open(os.path.join(os.path.dirname(__file__), 'README.md')) as f:
+    long_description = f.read()
+
+kwargs = dict(zip([1], [2]))
+
+setup(
+    name=NAME,
+    version=(here / 'VERSION').read_text().strip(),
+    url=BASE_URL + f'{NAME}-repo',
+    packages=[NAME, '{}.sub'.format(NAME)],
+    install_requires=DEPS + ['dep_2'],
+    data_files=[('static', ['static/{}.css'.format(NAME)])],
+    long_description=long_description,
+)
+""")
+        result = StaticSetupParser(setup_file=setup_file).parse()
+
+        self.assertEqual(result, {
+            'version': '4.5.6',
+            'url': 'https://github.com/brainelectronics/pkg-repo',
+            'packages': ['pkg', 'pkg.sub'],
+            'install_requires': ['dep_1', 'dep_2'],
+            'data_files': [('static', ['static/pkg.css'])],
+        })
+
+    @params(
+        ("setup(version=get_version())", ),
+        ("from setuptools import find_packages\n"
+         "setup(packages=find_packages())", ),
+        ("VERSION = read()\nsetup(version=VERSION)", ),
+        ("setup(version=open('not_existing').read())", ),
+        ("print('no setup call')", ),
+        ("setup(version=", ),
+    )
+    def test_parse_unsupported(self, content: str) -> None:
+        """Test parsing setup.py files which can not be evaluated"""
+        setup_file = self._write_setup_file(content)
+
+        with self.assertRaises(StaticSetupError):
+            StaticSetupParser(setup_file=setup_file).parse()
+
+    @params(
+        ("deps = ['a']\ndeps += ['b']\nsetup(install_requires=deps)", ),
+        ("pkgs = ['pkg']\npkgs.append('other')\nsetup(packages=pkgs)", ),
+        ("deps = ['a']\nif True:\n    deps = []\n"
+         "setup(install_requires=deps)", ),
+        ("pkgs = []\nfor ele in ('a', 'b'):\n    pkgs.append(ele)\n"
+         "setup(packages=pkgs)", ),
+        ("VERSION = '1.0.0'\ntry:\n    VERSION = read()\n"
+         "except Exception:\n    pass\nsetup(version=VERSION)", ),
+        ("kwargs = {'packages': ['pkg']}\nkwargs['packages'] = ['other']\n"
+         "setup(**kwargs)", ),
+        ("deps = ['a']\nkwargs = {'install_requires': deps}\n"
+         "deps.extend(['b'])\nsetup(**kwargs)", ),
+        ("deps = ['a']\nx = deps.pop()\nsetup(install_requires=deps)", ),
+        ("deps = ['a']\nupdate(deps)\nsetup(install_requires=deps)", ),
+        ("VERSION = '1.0.0'\nVERSION, URL = read()\nsetup(version=VERSION)",
+         ),
+        ("def get():\n    global VERSION\n    VERSION = '2.0.0'\n"
+         "VERSION = '1.0.0'\nget()\nsetup(version=VERSION)", ),
+        ("__version__ = '0.0.0'\n"
+         "def read(name):\n    return open(name).read()\n"
+         "exec(read('version.py'))\nsetup(version=__version__)", ),
+        ("__version__ = '0.0.0'\nexec(open('version.py').read(), globals())\n"
+         "setup(version=__version__)", ),
+    )
+    def test_parse_not_modelled(self, content: str) -> None:
+        """Test names changed by not modelled statements are unknown"""
+        setup_file = self._write_setup_file(content)
+
+        with self.assertRaises(StaticSetupError):
+            StaticSetupParser(setup_file=setup_file).parse()
+
+    def test_parse_not_modelled_unrelated(self) -> None:
+        """Test not modelled statements only affect the changed names"""
+        setup_file = self._write_setup_file("""
+import sys
+from setuptools import setup
+
+sys.path.insert(0, '.')
+deps = ['a']
+extra = ['b']
+extra.append('c')
+for ele in extra:
+    print(ele)
+
+if __name__ == '__main__':
+    setup(version='1.0.0', install_requires=deps)
+""")
+        result = StaticSetupParser(setup_file=setup_file).parse()
+
+        self.assertEqual(result, {'version': '1.0.0',
+                                  'install_requires': ['a']})
+
+    def test_find_read_files(self) -> None:
+        """Test finding all files a setup.py file reads"""
+        parser = StaticSetupParser(setup_file=self.setup_file)
+        version_file = self._here / 'data' / 'sample_version.py'
+
+        self.assertEqual(parser.find_read_files(), [version_file.resolve()])
+        parser.parse()
+        self.assertEqual(parser.read_files, parser.find_read_files())
+
+        (self.tmp_dir / 'VERSION').write_text('1.0.0')
+        for content in ("exec(open(get_path()).read())\nsetup()",
+                        "if True:\n    open('VERSION').read()\nsetup()",
+                        "import runpy\nrunpy.run_path('version.py')\n"
+                        "setup()",
+                        "from local import VERSION\nsetup(version=VERSION)",
+                        "from . import VERSION\nsetup(version=VERSION)"):
+            (self.tmp_dir / 'local').mkdir(exist_ok=True)
+            setup_file = self._write_setup_file(content)
+            self.assertIsNone(
+                StaticSetupParser(setup_file=setup_file).find_read_files(),
+                content)
+
+        setup_file = self._write_setup_file(
+            "import os\nfrom setuptools import setup\n"
+            "setup(version=open('VERSION').read())")
+        self.assertEqual(
+            StaticSetupParser(setup_file=setup_file).find_read_files(),
+            [(self.tmp_dir / 'VERSION').resolve()])
+
+    def test_engine(self) -> None:
+        """Test selecting the engine of Setup2uPyPackage"""
+        s2pp = Setup2uPyPackage(
+            setup_file=self.setup_file,
+            package_file=None,
+            package_changelog_file=None,
+            logger=self.test_logger,
+            engine=Setup2uPyPackage.ENGINE_AST
+        )
+        self.assertEqual(s2pp.setup_engine, Setup2uPyPackage.ENGINE_AST)
+        self.assertEqual(s2pp.package_version, '1.2.3')
+
+        s2pp = Setup2uPyPackage(
+            setup_file=self.setup_file,
+            package_file=None,
+            package_changelog_file=None,
+            logger=self.test_logger
+        )
+        self.assertEqual(s2pp.setup_engine,
+                         Setup2uPyPackage.ENGINE_RUN_SETUP)
+
+        # fall back to run_setup if static evaluation is not possible
+        setup_file = self._write_setup_file("""
+from setuptools import setup
+
+def get_version():
+    return '7.8.9'
+
+setup(
+    name='pkg',
+    version=get_version(),
+    url='https://github.com/brainelectronics/pkg',
+)
+""")
+        s2pp = Setup2uPyPackage(
+            setup_file=setup_file,
+            package_file=None,
+            package_changelog_file=None,
+            logger=self.test_logger,
+            engine=Setup2uPyPackage.ENGINE_AST
+        )
+        self.assertEqual(s2pp.setup_engine,
+                         Setup2uPyPackage.ENGINE_RUN_SETUP)
+        self.assertEqual(s2pp.package_version, '7.8.9')
+
+        setup_file = self._write_setup_file("""
+from setuptools import setup
+
+pkgs = ['pkg']
+deps = ['micropython-logging']
+pkgs.append('other')
+if True:
+    deps = []
+
+setup(
+    name='pkg',
+    version='1.0.0',
+    url='https://github.com/brainelectronics/pkg',
+    packages=pkgs,
+    install_requires=deps,
+)
+""")
+        s2pp = Setup2uPyPackage(
+            setup_file=setup_file,
+            package_file=None,
+            package_changelog_file=None,
+            logger=self.test_logger,
+            engine=Setup2uPyPackage.ENGINE_AST
+        )
+        self.assertEqual(s2pp.setup_engine,
+                         Setup2uPyPackage.ENGINE_RUN_SETUP)
+        self.assertEqual(s2pp._setup_data['packages'], ['pkg', 'other'])
+        self.assertEqual(s2pp.package_deps, [])
+
+        with self.assertRaises(Setup2uPyPackageError):
+            Setup2uPyPackage(
+                setup_file=self.setup_file,
+                package_file=None,
+                package_changelog_file=None,
+                logger=self.test_logger,
+                engine='unknown'
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
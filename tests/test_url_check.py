@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Unittest for testing the url_check file"""
+
+import functools
+import http.server
+import logging
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from sys import stdout
+
+from nose2.tools import params
+
+from setup2upypackage.daemon import process_request
+from setup2upypackage.setup2upypackage import (Setup2uPyPackage,
+                                               Setup2uPyPackageError)
+from setup2upypackage.url_check import UrlChecker, UrlCheckError
+
+
+class MirrorHandler(http.server.SimpleHTTPRequestHandler):
+    """Keep-alive file server counting connections and failing on request"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.connections += 1
+
+    def do_HEAD(self) -> None:
+        failures = self.server.failures
+        if failures.get(self.path, 0) > 0:
+            failures[self.path] -= 1
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        super().do_HEAD()
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class TestUrlCheck(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Run before every test method"""
+        # define a format
+        custom_format = '[%(asctime)s] [%(levelname)-8s] [%(filename)-15s @'\
+                        ' %(funcName)-15s:%(lineno)4s] %(message)s'
+
+        # set basic config and level for all loggers
+        logging.basicConfig(level=logging.INFO,
+                            format=custom_format,
+                            stream=stdout)
+
+        # create a logger for this TestSuite
+        self.test_logger = logging.getLogger(__name__)
+        self.test_logger.setLevel(logging.DEBUG)
+        self.test_logger.disabled = True
+
+        self._here = Path(__file__).parent
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.root_dir = Path(self._tmp_dir.name) / 'data'
+        shutil.copytree(self._here / 'data', self.root_dir)
+        self.mirror_dir = Path(self._tmp_dir.name) / 'mirror'
+        shutil.copytree(self.root_dir, self.mirror_dir)
+
+        handler = functools.partial(MirrorHandler,
+                                    directory=str(self.mirror_dir))
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0),
+                                                      handler)
+        self.server.daemon_threads = True
+        self.server.connections = 0
+        self.server.failures = {}
+        self.thread = threading.Thread(target=self.server.serve_forever,
+                                       daemon=True)
+        self.thread.start()
+        self.base_url = 'http://127.0.0.1:{}/'.format(
+            self.server.server_address[1])
+
+        self.s2pp = Setup2uPyPackage(setup_file=self.root_dir / 'setup.py',
+                                     package_file=None,
+                                     package_changelog_file=None,
+                                     logger=self.test_logger)
+
+    def tearDown(self) -> None:
+        """Run after every test method"""
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        self._tmp_dir.cleanup()
+
+    def _files(self) -> list:
+        return [(path, (self.root_dir / path).stat().st_size)
+                for path in self.s2pp.manifest.paths]
+
+    def test_reachable(self) -> None:
+        """Test all files of a complete mirror are reachable"""
+        files = self._files()
+        checker = UrlChecker(base=self.base_url,
+                             concurrency=2,
+                             logger=self.test_logger)
+
+        self.assertEqual(checker.check(files=files), {})
+        # connections are kept alive and reused by each worker
+        self.assertLessEqual(self.server.connections, 2)
+        self.assertGreater(len(files), 2)
+
+        self.assertEqual(checker.resolve('static/my file.css'),
+                         self.base_url + 'static/my%20file.css')
+
+    @params(
+        (1, ),
+        (8, ),
+    )
+    def test_mismatch(self, concurrency: int) -> None:
+        """Test missing files and files of another size are reported"""
+        files = self._files()
+        (self.mirror_dir / files[0][0]).unlink()
+        (self.mirror_dir / files[1][0]).write_text('changed')
+
+        report = UrlChecker(base=self.base_url,
+                            concurrency=concurrency,
+                            logger=self.test_logger).check(files=files)
+
+        self.assertEqual(report, {
+            'missing': [[files[0][0], self.base_url + files[0][0]]],
+            'size': [{'path': files[1][0],
+                      'url': self.base_url + files[1][0],
+                      'expected': files[1][1],
+                      'actual': 7}],
+        })
+
+    def test_retries(self) -> None:
+        """Test temporary server errors are retried"""
+        files = self._files()
+        self.server.failures['/' + files[0][0]] = 2
+
+        checker = UrlChecker(base=self.base_url,
+                             retries=2,
+                             logger=self.test_logger)
+        self.assertEqual(checker.check(files=files), {})
+
+        self.server.failures['/' + files[0][0]] = 2
+        checker = UrlChecker(base=self.base_url,
+                             retries=1,
+                             logger=self.test_logger)
+        self.assertEqual(checker.check(files=files), {
+            'failed': [{'path': files[0][0],
+                        'url': self.base_url + files[0][0],
+                        'error': 'HTTP 503'}]
+        })
+
+    def test_unreachable(self) -> None:
+        """Test a closed port is reported as failed after all retries"""
+        self.server.shutdown()
+        self.server.server_close()
+        files = self._files()[:1]
+
+        report = UrlChecker(base=self.base_url,
+                            retries=1,
+                            timeout=2.0,
+                            logger=self.test_logger).check(files=files)
+
+        self.assertEqual(list(report), ['failed'])
+        self.assertEqual(report['failed'][0]['path'], files[0][0])
+
+    def test_local_directory(self) -> None:
+        """Test a local directory is used as base"""
+        (self.mirror_dir / 'package.json').unlink()
+
+        self.assertEqual(self.s2pp.check_urls(base=str(self.mirror_dir)), {})
+        self.assertEqual(
+            self.s2pp.check_urls(base=self.mirror_dir.as_uri()), {})
+
+        shutil.rmtree(str(self.mirror_dir / 'static'))
+        report = self.s2pp.check_urls(base=str(self.mirror_dir))
+        self.assertTrue(report['missing'])
+        self.assertTrue(all(ele[0].startswith('static/')
+                            for ele in report['missing']))
+
+        with self.assertRaises(UrlCheckError):
+            UrlChecker(base=str(self.mirror_dir), concurrency=0)
+
+        with self.assertRaises(Setup2uPyPackageError):
+            self.s2pp.check_urls(base=str(self.root_dir / 'missing'))
+
+    def test_process_request(self) -> None:
+        """Test a failed check is reported in the response"""
+        request = {"check_urls": True, "url_base": self.base_url}
+
+        response = process_request(setup_2_upy_package=self.s2pp,
+                                   request=request)
+        self.assertEqual(response, {"success": True, "url_check": {}})
+
+        path = self.s2pp.manifest.paths[0]
+        (self.mirror_dir / path).unlink()
+        response = process_request(setup_2_upy_package=self.s2pp,
+                                   request=request)
+        self.assertFalse(response["success"])
+        self.assertEqual(response["url_check"],
+                         {"missing": [[path, self.base_url + path]]})
+
+
+if __name__ == '__main__':
+    unittest.main()
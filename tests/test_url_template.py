@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Unittest for testing the url_template file"""
+
+import json
+import logging
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from sys import stdout
+
+from nose2.tools import params
+
+from setup2upypackage.daemon import process_request
+from setup2upypackage.setup2upypackage import (Setup2uPyPackage,
+                                               Setup2uPyPackageError)
+from setup2upypackage.url_template import UrlTemplate, UrlTemplateError
+
+PROJECT_URL = 'https://github.com/brainelectronics/micropython-package'
+
+
+class TestUrlTemplate(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Run before every test method"""
+        # define a format
+        custom_format = '[%(asctime)s] [%(levelname)-8s] [%(filename)-15s @'\
+                        ' %(funcName)-15s:%(lineno)4s] %(message)s'
+
+        # set basic config and level for all loggers
+        logging.basicConfig(level=logging.INFO,
+                            format=custom_format,
+                            stream=stdout)
+
+        # create a logger for this TestSuite
+        self.test_logger = logging.getLogger(__name__)
+        self.test_logger.setLevel(logging.DEBUG)
+        self.test_logger.disabled = True
+
+        self._here = Path(__file__).parent
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.root_dir = Path(self._tmp_dir.name) / 'data'
+        shutil.copytree(self._here / 'data', self.root_dir)
+
+    def tearDown(self) -> None:
+        """Run after every test method"""
+        self._tmp_dir.cleanup()
+
+    @params(
+        ('github', None,
+         'github:brainelectronics/micropython-package/pkg/foo.py'),
+        ('github-raw', None,
+         'https://raw.githubusercontent.com/brainelectronics/'
+         'micropython-package/HEAD/pkg/foo.py'),
+        ('github-raw', 'v{version}',
+         'https://raw.githubusercontent.com/brainelectronics/'
+         'micropython-package/v1.2.3/pkg/foo.py'),
+        ('mirror=https://example.com/{repo}/{ref}/{path}?v={version}',
+         '0123abc',
+         'https://example.com/micropython-package/0123abc/pkg/foo.py?v=1.2.3'),
+        ('legacy={url}/{path}', None,
+         'github:brainelectronics/micropython-package/pkg/foo.py'),
+    )
+    def test_render(self, spec: str, ref: str, expected: str) -> None:
+        """Test URLs of presets and custom templates"""
+        url_template = UrlTemplate.from_spec(spec=spec)
+        urls = url_template.render(project_url=PROJECT_URL + '/',
+                                   paths=['pkg/foo.py'],
+                                   ref=ref,
+                                   version='1.2.3')
+
+        self.assertEqual(urls, [['pkg/foo.py', expected]])
+
+    @params(
+        ('no_name', ),
+        ('in valid={path}', ),
+        ('name=https://example.com/', ),
+        ('name=https://example.com/{branch}/{path}', ),
+        ('name=https://example.com/{path', ),
+        ('name=https://example.com/{path!r}', ),
+        ('name=https://example.com/{path:>10}', ),
+        ('name=https://example.com/{owner!s}/{path}', ),
+        ('name=https://example.com/{path[0]}', ),
+    )
+    def test_from_spec_errors(self, spec: str) -> None:
+        """Test invalid names and templates are rejected"""
+        with self.assertRaises(UrlTemplateError):
+            UrlTemplate.from_spec(spec=spec)
+
+    def test_render_errors(self) -> None:
+        """Test placeholders missing in the project URL are rejected"""
+        url_template = UrlTemplate.from_spec(spec='github')
+        with self.assertRaises(UrlTemplateError):
+            url_template.render(project_url='https://example.com',
+                                paths=['foo.py'])
+
+    def test_create_variants(self) -> None:
+        """Test all variants are created from the same discovered files"""
+        s2pp = Setup2uPyPackage(
+            setup_file=self.root_dir / 'setup.py',
+            package_file=self.root_dir / 'package.json',
+            package_changelog_file=None,
+            logger=self.test_logger)
+        url_templates = [
+            UrlTemplate.from_spec(spec='github'),
+            UrlTemplate.from_spec(spec='github-raw'),
+            UrlTemplate.from_spec(
+                spec='mirror=https://mirror.example.com/{repo}/{ref}/{path}'),
+        ]
+
+        changed = s2pp.create_variants(url_templates=url_templates,
+                                       ref='v{version}',
+                                       pretty=False)
+        self.assertEqual(changed, {'github': True,
+                                   'github-raw': True,
+                                   'mirror': True})
+
+        # the github preset equals the default package data
+        content = (self.root_dir / 'package.github.json').read_text()
+        self.assertEqual(json.loads(content), s2pp.package_data)
+
+        content = (self.root_dir / 'package.mirror.json').read_text()
+        package_data = json.loads(content)
+        self.assertEqual(package_data['version'], '1.2.3')
+        self.assertEqual(package_data['deps'], s2pp.package_deps)
+        self.assertEqual(package_data['urls'][0],
+                         ['subdir1/asdf.py',
+                          'https://mirror.example.com/'
+                          'micropython-package-validation/v1.2.3/'
+                          'subdir1/asdf.py'])
+
+        changed = s2pp.create_variants(url_templates=url_templates,
+                                       ref='v{version}',
+                                       pretty=False)
+        self.assertEqual(changed, {'github': False,
+                                   'github-raw': False,
+                                   'mirror': False})
+
+        with self.assertRaises(Setup2uPyPackageError):
+            s2pp.create_variants(url_templates=url_templates[:1] * 2)
+
+    def test_process_request(self) -> None:
+        """Test variants of a request are printed and created"""
+        s2pp = Setup2uPyPackage(
+            setup_file=self.root_dir / 'setup.py',
+            package_file=self.root_dir / 'package.json',
+            package_changelog_file=None,
+            logger=self.test_logger)
+
+        response = process_request(setup_2_upy_package=s2pp, request={
+            "package_file": str(self.root_dir / 'created.json'),
+            "print": True,
+            "create": True,
+            "url_templates": ['github-raw'],
+            "ref": 'main',
+        })
+
+        self.assertTrue(response["success"])
+        self.assertEqual(list(response["variants"]), ['github-raw'])
+        self.assertEqual(response["changed_variants"], {'github-raw': True})
+        content = (self.root_dir / 'created.github-raw.json').read_text()
+        self.assertEqual(json.loads(content),
+                         response["variants"]['github-raw'])
+        self.assertIn('/main/subdir1/asdf.py', content)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Unittest for testing the version_file file"""
+
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from sys import stdout
+from unittest.mock import patch
+
+from nose2.tools import params
+
+from setup2upypackage import version_file
+from setup2upypackage.cache import MetadataCache
+from setup2upypackage.setup2upypackage import (Setup2uPyPackage,
+                                               Setup2uPyPackageError)
+from setup2upypackage.version_file import (VersionFileError,
+                                           extract_version, read_version)
+
+SETUP_FILE = """
+from setuptools import setup
+from sample.version import __version__
+
+setup(
+    name='sample',
+    version=__version__,
+    url='https://github.com/brainelectronics/sample',
+    packages=['sample'],
+)
+"""
+
+
+class TestVersionFile(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Run before every test method"""
+        # define a format
+        custom_format = '[%(asctime)s] [%(levelname)-8s] [%(filename)-15s @'\
+                        ' %(funcName)-15s:%(lineno)4s] %(message)s'
+
+        # set basic config and level for all loggers
+        logging.basicConfig(level=logging.INFO,
+                            format=custom_format,
+                            stream=stdout)
+
+        # create a logger for this TestSuite
+        self.test_logger = logging.getLogger(__name__)
+        self.test_logger.setLevel(logging.DEBUG)
+        self.test_logger.disabled = True
+
+        self._here = Path(__file__).parent
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self._tmp_dir.name)
+        self.version_file = self.tmp_path / 'version.py'
+
+        version_file._versions.clear()
+
+    def tearDown(self) -> None:
+        """Run after every test method"""
+        self._tmp_dir.cleanup()
+
+    @params(
+        ("__version__ = '1.2.3'\n", '1.2.3'),
+        ("__version_info__ = ('1', '2', '3')\n"
+         "__version__ = '.'.join(__version_info__)\n", '1.2.3'),
+        ("__version_info__ = (1, 2, 3)\n", '1.2.3'),
+        ("MAJOR = 4\nVERSION = f'{MAJOR}.0.1'\n", '4.0.1'),
+        ("import os\n__version__: str = '2.0.0-rc1'\n", '2.0.0-rc1'),
+        ("exec(open('VERSION').read())\n", '5.6.7'),
+    )
+    def test_extract_version(self, content: str, expected: str) -> None:
+        """Test versions of supported modules"""
+        (self.tmp_path / 'VERSION').write_text("__version__ = '5.6.7'\n")
+        self.version_file.write_text(content)
+
+        self.assertEqual(extract_version(version_file=self.version_file),
+                         expected)
+
+    @params(
+        ("__author__ = 'brainelectronics'\n", ),
+        ("__version__ = get_version()\n", ),
+        ("__version__ = \n", ),
+        ("__version__ = '1.0.0'\n__version__ += '.dev'\n", ),
+        ("__version__ = '1.0.0'\n__version__ += '.dev'\n"
+         "VERSION = '1.0.0'\n", ),
+        ("__version_info__ = [1, 0, 0]\n__version_info__.append('dev')\n", ),
+        ("if True:\n    __version__ = '1.0.0'\n", ),
+        ("__version__ = '0.0.0'\nexec(get_source())\n", ),
+    )
+    def test_extract_version_errors(self, content: str) -> None:
+        """Test modules without a static version are rejected"""
+        self.version_file.write_text(content)
+
+        with self.assertRaises(VersionFileError):
+            extract_version(version_file=self.version_file)
+
+    def test_sample_version(self) -> None:
+        """Test the version of the sample version file of the setup.py"""
+        version = read_version(
+            version_file=self._here / 'data' / 'sample_version.py')
+
+        self.assertEqual(version, '1.2.3')
+
+    def test_read_version_cached(self) -> None:
+        """Test an unchanged file is parsed only once"""
+        self.version_file.write_text("__version__ = '1.0.0'\n")
+
+        with patch('setup2upypackage.version_file.extract_version',
+                   wraps=extract_version) as extract:
+            self.assertEqual(read_version(version_file=self.version_file),
+                             '1.0.0')
+            self.assertEqual(read_version(version_file=self.version_file),
+                             '1.0.0')
+            self.assertEqual(extract.call_count, 1)
+
+            self.version_file.write_text("__version__ = '1.0.1'\n")
+            self.assertEqual(read_version(version_file=self.version_file),
+                             '1.0.1')
+            self.assertEqual(extract.call_count, 2)
+
+            # persistent cache of another process
+            metadata_cache = MetadataCache(cache_dir=self.tmp_path / 'cache')
+            read_version(version_file=self.version_file,
+                         metadata_cache=MetadataCache(
+                             cache_dir=self.tmp_path / 'cache'))
+            version_file._versions.clear()
+            self.assertEqual(read_version(version_file=self.version_file,
+                                          metadata_cache=metadata_cache),
+                             '1.0.1')
+            self.assertEqual(extract.call_count, 3)
+
+        with self.assertRaises(VersionFileError):
+            read_version(version_file=self.tmp_path / 'missing.py')
+
+    def test_setup2upypackage(self) -> None:
+        """Test a package version of a version file without importing it"""
+        package_dir = self.tmp_path / 'sample'
+        package_dir.mkdir()
+        (package_dir / '__init__.py').write_text('')
+        setup_file = self.tmp_path / 'setup.py'
+        setup_file.write_text(SETUP_FILE)
+        version_file = package_dir / 'version.py'
+        version_file.write_text("__version_info__ = ('0', '1', '0')\n"
+                                "__version__ = '.'.join(__version_info__)\n")
+
+        s2pp = Setup2uPyPackage(setup_file=setup_file,
+                                package_file=None,
+                                package_changelog_file=None,
+                                engine=Setup2uPyPackage.ENGINE_AST,
+                                version_file=version_file,
+                                logger=self.test_logger)
+
+        # the imported version is not required for a static evaluation
+        self.assertEqual(s2pp.setup_engine, Setup2uPyPackage.ENGINE_AST)
+        self.assertEqual(s2pp.package_data['version'], '0.1.0')
+        self.assertEqual(s2pp.package_file_version, '0.1.0')
+
+        version_file.write_text("__version__ = '0.2.0-beta'\n")
+        # ensure a different modification time
+        stat = version_file.stat()
+        os.utime(str(version_file), ns=(stat.st_atime_ns,
+                                        stat.st_mtime_ns + 1000000))
+        self.assertEqual(s2pp.package_data['version'], '0.2.0-beta')
+
+        version_file.write_text("__author__ = 'brainelectronics'\n")
+        s2pp.refresh()
+        with self.assertRaises(Setup2uPyPackageError):
+            s2pp.package_data
+
+    def test_changelog_precedence(self) -> None:
+        """Test a version file is used instead of a changelog version"""
+        data_dir = self.tmp_path / 'data'
+        shutil.copytree(self._here / 'data', data_dir)
+        self.version_file.write_text("__version__ = '7.7.7'\n")
+
+        s2pp = Setup2uPyPackage(
+            setup_file=data_dir / 'setup.py',
+            package_file=data_dir / 'package.json',
+            package_changelog_file=data_dir / 'sample_changelog.md',
+            version_file=self.version_file,
+            logger=self.test_logger)
+
+        self.assertEqual(s2pp.package_data['version'], '7.7.7')
+        self.assertNotEqual(s2pp.package_changelog_version, '7.7.7')
+
+
+if __name__ == '__main__':
+    unittest.main()
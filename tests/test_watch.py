@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Unittest for testing the watch file"""
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from sys import stdout
+from unittest.mock import patch
+
+from nose2.tools import params
+
+from setup2upypackage.setup2upypackage import Setup2uPyPackage
+from setup2upypackage.watch import (InotifyWatcher, PackageWatcher,
+                                    PollingWatcher, WatchError)
+
+
+class TestWatch(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Run before every test method"""
+        # define a format
+        custom_format = '[%(asctime)s] [%(levelname)-8s] [%(filename)-15s @'\
+                        ' %(funcName)-15s:%(lineno)4s] %(message)s'
+
+        # set basic config and level for all loggers
+        logging.basicConfig(level=logging.INFO,
+                            format=custom_format,
+                            stream=stdout)
+
+        # create a logger for this TestSuite
+        self.test_logger = logging.getLogger(__name__)
+        self.test_logger.setLevel(logging.DEBUG)
+        self.test_logger.disabled = True
+
+        self._here = Path(__file__).parent
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.root_dir = Path(self._tmp_dir.name) / 'data'
+        shutil.copytree(self._here / 'data', self.root_dir)
+
+        self.setup_file = self.root_dir / 'setup.py'
+        self.package_file = self.root_dir / 'package.json'
+        self.changelog_file = self.root_dir / 'sample_changelog.md'
+
+    def tearDown(self) -> None:
+        """Run after every test method"""
+        self._tmp_dir.cleanup()
+
+    def _create_watcher(self, polling: bool) -> object:
+        """Create an inotify or polling watcher"""
+        if polling:
+            return PollingWatcher(interval=0.01)
+
+        try:
+            return InotifyWatcher()
+        except WatchError as e:
+            self.skipTest(str(e))
+
+    def _touch_changelog(self, content: str) -> None:
+        """Write the changelog with a different modification time"""
+        self.changelog_file.write_text(content)
+        stat = self.changelog_file.stat()
+        os.utime(self.changelog_file, ns=(stat.st_atime_ns,
+                                          stat.st_mtime_ns + 10**9))
+
+    @params((True, ), (False, ))
+    def test_watcher(self, polling: bool) -> None:
+        """Test added, removed and modified files are detected"""
+        watcher = self._create_watcher(polling=polling)
+        watcher.set_dirs([self.root_dir, self.root_dir / 'subdir1'])
+
+        try:
+            self.assertFalse(watcher.wait(timeout=0.05))
+
+            (self.root_dir / 'subdir1' / 'new.py').write_text('')
+            self.assertTrue(watcher.wait(timeout=1))
+            self.assertFalse(watcher.wait(timeout=0.05))
+
+            self._touch_changelog('## [1.0.0] - 2023-01-01\n')
+            self.assertTrue(watcher.wait(timeout=1))
+
+            (self.root_dir / 'subdir1' / 'new.py').unlink()
+            self.assertTrue(watcher.wait(timeout=1))
+
+            # no longer watched
+            watcher.set_dirs([self.root_dir / 'subdir1'])
+            self._touch_changelog('## [2.0.0] - 2023-01-01\n')
+            self.assertFalse(watcher.wait(timeout=0.05))
+        finally:
+            watcher.close()
+
+    def test_update(self) -> None:
+        """Test only affected values are computed again"""
+        s2pp = Setup2uPyPackage(
+            setup_file=self.setup_file,
+            package_file=self.package_file,
+            package_changelog_file=self.changelog_file,
+            logger=self.test_logger
+        )
+        package_watcher = PackageWatcher(setup_2_upy_package=s2pp,
+                                         logger=self.test_logger)
+        self.assertTrue(package_watcher.update())
+        self.assertFalse(package_watcher.update())
+        urls = s2pp.package_data["urls"]
+
+        # added file only updates the URLs
+        with patch.object(s2pp, '_get_package_changelog_version',
+                          wraps=s2pp._get_package_changelog_version) as \
+                changelog_version:
+            (self.root_dir / 'subdir1' / 'new.py').write_text('')
+            self.assertTrue(package_watcher.update())
+            self.assertEqual(changelog_version.call_count, 0)
+
+        package_data = json.loads(self.package_file.read_text())
+        self.assertEqual(len(package_data["urls"]), len(urls) + 1)
+        self.assertIn('subdir1/new.py', [ele[0]
+                                         for ele in package_data["urls"]])
+
+        # changelog edit only updates the version
+        with patch.object(s2pp, '_get_package_files',
+                          wraps=s2pp._get_package_files) as package_files:
+            self._touch_changelog('## [10.0.0] - 2023-04-01\n')
+            self.assertTrue(package_watcher.update())
+            self.assertEqual(package_files.call_count, 0)
+
+        package_data = json.loads(self.package_file.read_text())
+        self.assertEqual(package_data["version"], "10.0.0")
+
+        # unrelated changes do not rewrite the file
+        (self.root_dir / 'unrelated.txt').write_text('')
+        self.assertFalse(package_watcher.update())
+
+    def test_update_unchanged_existing_file(self) -> None:
+        """Test an up to date package.json file is not written"""
+        s2pp = Setup2uPyPackage(
+            setup_file=self.setup_file,
+            package_file=self.package_file,
+            package_changelog_file=None,
+            logger=self.test_logger
+        )
+        self.package_file.write_text(json.dumps(s2pp.package_data))
+
+        stat = self.package_file.stat()
+
+        package_watcher = PackageWatcher(setup_2_upy_package=s2pp,
+                                         logger=self.test_logger)
+        self.assertFalse(package_watcher.update())
+        self.assertEqual(self.package_file.stat().st_mtime_ns,
+                         stat.st_mtime_ns)
+
+    def test_run(self) -> None:
+        """Test the package.json file is updated while running"""
+        s2pp = Setup2uPyPackage(
+            setup_file=self.setup_file,
+            package_file=self.package_file,
+            package_changelog_file=None,
+            logger=self.test_logger
+        )
+        package_watcher = PackageWatcher(setup_2_upy_package=s2pp,
+                                         debounce=0.05,
+                                         polling=True,
+                                         logger=self.test_logger)
+        stop = threading.Event()
+        thread = threading.Thread(target=package_watcher.run,
+                                  kwargs={"stop": stop},
+                                  daemon=True)
+        thread.start()
+
+        try:
+            (self.root_dir / 'other_dir' / 'new.py').write_text('')
+            for _ in range(100):
+                if 'other_dir/new.py' in self.package_file.read_text():
+                    break
+                thread.join(timeout=0.05)
+            else:
+                self.fail("package.json not updated")
+        finally:
+            stop.set()
+            thread.join(timeout=5)
+        self.assertFalse(thread.is_alive())
+
+
+if __name__ == '__main__':
+    unittest.main()